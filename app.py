@@ -1,25 +1,64 @@
 import os
+import shutil
+import importlib
+import uuid
 import streamlit as st
 import traceback
 import logging
-from datetime import datetime, timedelta
+from datetime import datetime
+from pathlib import Path
 # Corrigido: Usar o extended_database_manager que tem sido o foco da revisão
 from db.extended_database_manager import ExtendedDatabaseManager 
-# Melhoria: Importações explícitas de views
-from views.inventory import mostrar_inventario_geral, adicionar_item_form
-from views.thomas import mostrar_inventario_thomas, mostrar_perfil_thomas
-from views.consumption import mostrar_categorias, registrar_consumo
-from views.reports import mostrar_relatorios
-from views.shopping import mostrar_planejamento_feira
-from views.settings import mostrar_configuracoes
-from views.recipes import mostrar_receitas # <--- Adicionado
-
-# Melhoria: Importações explícitas de utils.constants
-from utils.constants import CATEGORIAS_ALIMENTOS, UNIDADES_MEDIDA, LOCAIS_ARMAZENAMENTO
-from utils.db_optimizer import otimizar_banco_dados, realizar_backup
-from utils.validador import validar_produto, sanitizar_texto
+from db.shared_manager import obter_gerenciador
 # Melhoria: Importações explícitas de config
-from config import DB_PATH, load_config, get_current_datetime, get_current_user
+from config import DB_PATH, load_config, get_current_datetime, get_current_user, garantir_diretorios
+
+# Registro de páginas: rótulo -> (módulo, função). As views são importadas
+# apenas quando a página é selecionada, o que mantém plotly, numpy e requests
+# fora do caminho da primeira renderização.
+PAGINAS = {
+    "📋 Inventário Geral": ("views.inventory", "mostrar_inventario_geral"),
+    "👶 Thomás": ("views.thomas", "mostrar_inventario_thomas"),
+    "👶 Perfil Thomás": ("views.thomas", "mostrar_perfil_thomas"),
+    "🔄 Categorias": ("views.consumption", "mostrar_categorias"),
+    "📊 Relatórios": ("views.reports", "mostrar_relatorios"),
+    "📝 Registrar Consumo": ("views.consumption", "registrar_consumo"),
+    "🛒 Fazer Feira": ("views.shopping", "mostrar_planejamento_feira"),
+    "➕ Adicionar Item": ("views.inventory", "adicionar_item_form"),
+    "⚙️ Configurações": ("views.settings", "mostrar_configuracoes"),
+    "🍽️ Receitas": ("views.receitas", "mostrar_receitas"),
+}
+
+def carregar_pagina(rotulo):
+    """
+    Importa sob demanda a função que renderiza a página selecionada.
+    
+    Args:
+        rotulo: Rótulo da página no menu de navegação
+        
+    Returns:
+        Função que recebe o gerenciador do banco e renderiza a página
+    """
+    modulo, funcao = PAGINAS[rotulo]
+    return getattr(importlib.import_module(modulo), funcao)
+
+def realizar_backup(db_path):
+    """
+    Copia o arquivo do banco para a pasta de backups, sem abrir conexão.
+    
+    Returns:
+        tuple: (sucesso, caminho_do_backup ou mensagem de erro)
+    """
+    try:
+        if not os.path.exists(db_path):
+            return False, f"Arquivo não encontrado: {db_path}"
+        pasta = Path(db_path).parent / "backups"
+        pasta.mkdir(exist_ok=True)
+        destino = pasta / f"{Path(db_path).stem}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.db"
+        shutil.copy2(db_path, destino)
+        return True, str(destino)
+    except OSError as e:
+        return False, str(e)
 
 # Import or define DatabaseErrorHandler
 class DatabaseErrorHandler:
@@ -77,6 +116,9 @@ logging.basicConfig(
     ]
 )
 
+# Diretórios de dados criados uma vez, fora do import de config
+garantir_diretorios()
+
 # Variáveis para rodapé
 CURRENT_DATE = get_current_datetime()
 CURRENT_USER = get_current_user()
@@ -100,7 +142,26 @@ def verificar_itens_vencimento(db):
         except Exception:
             pass
             
-        itens_proximos = db.obter_itens_proximos_vencimento(dias=dias_alerta)
+        # Usa os alertas pré-calculados pelo worker quando recentes
+        precomputado = db.obter_resultado_precomputado(f"alertas_vencimento:{dias_alerta}", max_idade_segundos=900)
+        if precomputado is not None:
+            itens_proximos = precomputado["dados"]
+        else:
+            itens_proximos = db.obter_itens_proximos_vencimento(dias=dias_alerta)
+        
+        # Valor que deve sobrar sem consumo até a validade nos próximos 7 dias
+        precomputado = db.obter_resultado_precomputado("desperdicio_previsto:7", max_idade_segundos=900)
+        if precomputado is not None:
+            desperdicio = precomputado["dados"]
+        else:
+            from utils.previsao_consumo import resumir_desperdicio
+            desperdicio = resumir_desperdicio(db.obter_risco_desperdicio(horizonte_dias=7))
+        
+        if desperdicio["valor_total"] > 0:
+            maiores = ", ".join(
+                f"{item['nome']} (R$ {item['valor_em_risco']:.2f})" for item in desperdicio["itens"][:3]
+            )
+            st.warning(f"💸 R$ {desperdicio['valor_total']:.2f} em risco esta semana: {maiores}")
         
         if not itens_proximos or len(itens_proximos) == 0:
             return
@@ -159,32 +220,46 @@ def verificar_itens_vencimento(db):
         st.error(f"Erro ao verificar vencimentos: {str(e)}")
         logging.error(f"Erro ao verificar vencimentos: {str(e)}")
 
-@st.cache_resource(ttl=3600)
+# Resultado da última execução da fábrica por banco: (nível, mensagem).
+# A fábrica roda na sessão que disparou a criação; cada sessão exibe o aviso
+_avisos_carregamento = {}
+
 def carregar_banco_dados(db_path):
+    """
+    Cria o gerenciador do banco com verificação rápida e recuperação.
+    
+    Usada como fábrica do gerenciador compartilhado (db.shared_manager): roda
+    uma vez por processo, ou quando a instância compartilhada é substituída.
+    Não escreve na interface; problemas ficam em _avisos_carregamento para
+    que cada sessão os exiba.
+    """
+    _avisos_carregamento.pop(str(db_path), None)
     try:
         db_manager = ExtendedDatabaseManager(db_path)
+        # Verificação rápida na inicialização; a completa é feita pelo worker
         success, msg = db_manager.verificar_integridade()
         
         if not success:
-            st.error(f"Problema com o banco de dados: {msg}")
+            logging.error(f"Problema com o banco de dados: {msg}")
             if "corrompido" in msg.lower() or "danificado" in msg.lower():
+                db_manager.fechar()
                 if DatabaseErrorHandler.handle_critical_error(db_path, msg):
-                    st.success("Recuperação realizada. Alguns dados podem ter sido perdidos.")
+                    _avisos_carregamento[str(db_path)] = ("warning", f"Problema com o banco de dados: {msg}. Recuperação realizada; alguns dados podem ter sido perdidos.")
                     db_manager = ExtendedDatabaseManager(db_path)
                 else:
-                    st.error("Falha na recuperação. O aplicativo pode estar instável.")
+                    _avisos_carregamento[str(db_path)] = ("error", f"Problema com o banco de dados: {msg}. Falha na recuperação; o aplicativo pode estar instável.")
             else:
-                st.warning("Tentando inicializar banco de dados...")
+                logging.warning("Tentando inicializar banco de dados...")
                 init_success, init_msg = db_manager.inicializar_banco()
                 if not init_success:
-                    st.error(f"Falha ao inicializar banco: {init_msg}")
+                    logging.error(f"Falha ao inicializar banco: {init_msg}")
+                    _avisos_carregamento[str(db_path)] = ("error", f"Falha ao inicializar banco: {init_msg}")
                     return None
         
         return db_manager
     except Exception as e:
-        st.error(f"Erro crítico ao conectar ao banco de dados: {str(e)}")
-        st.error("A aplicação não pode funcionar corretamente. Verifique a conexão com o banco.")
-        st.code(traceback.format_exc())
+        logging.error(f"Erro crítico ao conectar ao banco de dados: {str(e)}\n{traceback.format_exc()}")
+        _avisos_carregamento[str(db_path)] = ("error", f"Erro crítico ao conectar ao banco de dados: {str(e)}")
         return None
 
 def main():
@@ -212,25 +287,33 @@ def main():
         if "tema" not in st.session_state:
             st.session_state.tema = "claro"
         
-        if "db" not in st.session_state:
-            with st.spinner("Conectando ao banco de dados..."):
-                db_manager = carregar_banco_dados(DB_PATH)
-                if db_manager:
-                    st.session_state.db = db_manager
-                    logging.info(f"Banco de dados inicializado com sucesso: {DB_PATH}")
-                else:
-                    st.error("Não foi possível inicializar o banco de dados. Verifique os logs.")
-                    logging.error(f"Falha ao inicializar banco de dados: {DB_PATH}")
-                    try:
-                        backup_success, backup_path = realizar_backup(DB_PATH)
-                        if backup_success:
-                            st.info(f"Backup automático criado em: {backup_path}")
-                            logging.info(f"Backup automático criado: {backup_path}")
-                    except Exception as backup_error:
-                        logging.error(f"Falha no backup automático: {str(backup_error)}")
-                    return
+        if "sessao_id" not in st.session_state:
+            st.session_state.sessao_id = uuid.uuid4().hex
         
-        db = st.session_state.db
+        # Uma instância por processo, compartilhada por todas as sessões;
+        # obtida a cada execução para acompanhar substituições da conexão
+        with st.spinner("Conectando ao banco de dados..."):
+            db = obter_gerenciador(DB_PATH, st.session_state.sessao_id, fabrica=carregar_banco_dados)
+            # Cada sessão exibe uma vez o resultado da criação da instância
+            aviso = _avisos_carregamento.get(str(DB_PATH))
+            if aviso and (db is None or st.session_state.get("aviso_carregamento") != aviso):
+                st.session_state.aviso_carregamento = aviso
+                nivel, mensagem = aviso
+                if nivel == "error":
+                    st.error(mensagem)
+                else:
+                    st.warning(mensagem)
+            if db is None:
+                st.error("Não foi possível inicializar o banco de dados. Verifique os logs.")
+                logging.error(f"Falha ao inicializar banco de dados: {DB_PATH}")
+                try:
+                    backup_success, backup_path = realizar_backup(DB_PATH)
+                    if backup_success:
+                        st.info(f"Backup automático criado em: {backup_path}")
+                        logging.info(f"Backup automático criado: {backup_path}")
+                except Exception as backup_error:
+                    logging.error(f"Falha no backup automático: {str(backup_error)}")
+                return
     
     except Exception as e:
         st.error(f"Erro crítico na inicialização: {str(e)}")
@@ -238,18 +321,13 @@ def main():
         st.code(traceback.format_exc())
         return
     
-    # Initialize ultima_verificacao if it doesn't exist
-    if "ultima_verificacao" not in st.session_state:
-        st.session_state.ultima_verificacao = datetime.now() - timedelta(hours=2)  # Force first verification
-        
-    if (datetime.now() - st.session_state.ultima_verificacao).total_seconds() > 3600:
-        try:
-            success, msg = db.verificar_integridade()
-            st.session_state.ultima_verificacao = datetime.now()
-            if not success:
-                st.warning(f"Verificação periódica do banco de dados: {msg}")
-        except Exception as e:
-            st.error(f"Erro na verificação periódica: {str(e)}")
+    # Só lê o último resultado (a verificação completa é gravada pelo worker)
+    try:
+        ultima_verificacao = db.obter_ultima_verificacao_integridade()
+        if ultima_verificacao and not ultima_verificacao["sucesso"]:
+            st.warning(f"Verificação periódica do banco de dados: {ultima_verificacao['mensagem']}")
+    except Exception as e:
+        st.error(f"Erro na verificação periódica: {str(e)}")
     
     with st.sidebar:
         st.title("🛒 Menu Principal")
@@ -281,16 +359,7 @@ def main():
         st.subheader("Navegação")
         page = st.radio(
             "Escolha uma opção:",
-            [
-             "📋 Inventário Geral", 
-             "👶 Thomás", "👶 Perfil Thomás", 
-             "🔄 Categorias", 
-             "📊 Relatórios", 
-             "📝 Registrar Consumo",
-             "🛒 Fazer Feira",
-             "➕ Adicionar Item",
-             "⚙️ Configurações", "🍽️ Receitas"
-            ],
+            list(PAGINAS),
             help="Navegue entre as seções do sistema.")
         
         st.divider()
@@ -321,26 +390,8 @@ def main():
     try:
         # Use session state page if set, otherwise use radio selection
         current_page = st.session_state.get('page', page)
-        if current_page == "📋 Inventário Geral":
-            mostrar_inventario_geral(db)
-        elif current_page == "👶 Thomás":
-            mostrar_inventario_thomas(db)
-        elif current_page == "👶 Perfil Thomás":
-            mostrar_perfil_thomas(db)
-        elif current_page == "🔄 Categorias":
-            mostrar_categorias(db) 
-        elif current_page == "📊 Relatórios":
-            mostrar_relatorios(db)
-        elif current_page == "📝 Registrar Consumo":
-            registrar_consumo(db)
-        elif current_page == "🛒 Fazer Feira":
-            mostrar_planejamento_feira(db)
-        elif current_page == "➕ Adicionar Item":
-            adicionar_item_form(db)
-        elif current_page == "⚙️ Configurações":
-            mostrar_configuracoes(db)
-        elif current_page == "🍽️ Receitas":
-            mostrar_receitas(db)
+        if current_page in PAGINAS:
+            carregar_pagina(current_page)(db)
     except Exception as e:
         st.error(f"Erro ao carregar a página {page}: {str(e)}")
         st.error("Por favor, recarregue a página ou contate o suporte.")
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Benchmark dos métodos públicos do ExtendedDatabaseManager.
+
+Para cada tamanho de dados, cria um banco temporário com
+dados_sinteticos.gerar_dados (sempre a mesma semente), executa cada método
+uma vez para aquecer e depois mede várias execuções. Os resultados (mediana e
+mínimo em ms) são salvos em JSON e comparados com a linha de base em
+manager_baseline.json: um método regride quando a mediana passa da base em
+mais que o limite relativo E o limite absoluto (evita alarmes em métodos de
+poucos milissegundos). Gere a linha de base na mesma máquina que fará as
+comparações.
+
+Uso:
+    python benchmarks/benchmark_manager.py                        # compara com a linha de base
+    python benchmarks/benchmark_manager.py --tamanhos pequeno,medio,grande
+    python benchmarks/benchmark_manager.py --filtro preco --repeticoes 9
+    python benchmarks/benchmark_manager.py --saida resultado.json --salvar-baseline
+
+Retorna código 1 se algum método regredir.
+"""
+import argparse
+import datetime
+import json
+import platform
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from dados_sinteticos import gerar_dados  # noqa: E402
+from db.extended_database_manager import ExtendedDatabaseManager  # noqa: E402
+
+BASELINE_PADRAO = Path(__file__).resolve().parent / "manager_baseline.json"
+# Limites folgados: o objetivo é pegar mudanças de complexidade (varreduras
+# completas, laços N+1), não oscilações de 20-50% entre execuções na mesma máquina
+LIMITES_PADRAO = {"relativo": 1.0, "absoluto_ms": 5.0}
+
+# nome: (itens, consumos, preços)
+TAMANHOS = {
+    "pequeno": (200, 2000, 2000),
+    "medio": (1000, 20000, 20000),
+    "grande": (5000, 100000, 100000),
+}
+
+
+def _casos(db: ExtendedDatabaseManager) -> List[Tuple[str, Callable[[], Any]]]:
+    """Métodos medidos, com argumentos tirados do próprio banco gerado."""
+    db.cursor.execute(
+        "SELECT i.id, i.nome FROM itens i JOIN historico_precos h ON h.item_id = i.id "
+        "GROUP BY i.id ORDER BY COUNT(*) DESC LIMIT 5"
+    )
+    populares = db.cursor.fetchall()
+    item_id, nome = populares[0]["id"], populares[0]["nome"]
+    termo = nome.split()[0][:4].lower()
+    nomes = [row["nome"] for row in populares]
+    categoria = db.obter_categorias()[0]
+    mes = datetime.date.today().replace(day=1)
+
+    return [
+        ("carregar_inventario", db.carregar_inventario),
+        ("buscar_itens", lambda: db.buscar_itens(termo)),
+        ("buscar_item_por_id", lambda: db.buscar_item_por_id(item_id)),
+        ("carregar_por_categoria", lambda: db.carregar_por_categoria(categoria)),
+        ("obter_categorias", db.obter_categorias),
+        ("obter_itens_proximos_vencimento", lambda: db.obter_itens_proximos_vencimento(7)),
+        ("obter_itens_vencidos_no_inventario", db.obter_itens_vencidos_no_inventario),
+        ("obter_registros_consumo", lambda: db.obter_registros_consumo(mes)),
+        ("obter_nutrientes_consumidos", lambda: db.obter_nutrientes_consumidos(periodo_dias=7)),
+        ("obter_nutrientes_consumidos_thomas", lambda: db.obter_nutrientes_consumidos(True, 30)),
+        ("obter_estoque_nutricional", db.obter_estoque_nutricional),
+        ("obter_cobertura_nutricional", db.obter_cobertura_nutricional),
+        ("obter_locais_compra", db.obter_locais_compra),
+        ("obter_historico_precos_por_nome", lambda: db.obter_historico_precos_por_nome(nome)),
+        ("obter_historico_precos_completo", db.obter_historico_precos_completo),
+        ("calcular_estatisticas_preco", db.calcular_estatisticas_preco),
+        ("obter_precos_por_local", lambda: db.obter_precos_por_local(nomes)),
+        ("obter_melhor_local_compra", lambda: db.obter_melhor_local_compra(nome)),
+        ("obter_comparativo_precos_mercados", db.obter_comparativo_precos_mercados),
+        ("obter_sugestoes_compra", db.obter_sugestoes_compra),
+        ("obter_risco_desperdicio", db.obter_risco_desperdicio),
+        ("obter_itens_restritos", db.obter_itens_restritos),
+        ("obter_pontuacao_periodo", db.obter_pontuacao_periodo),
+        ("calcular_resumo_semanal", db.calcular_resumo_semanal),
+        ("registrar_consumo", lambda: db.registrar_consumo(item_id, 0.01)),
+    ]
+
+
+def medir(funcao: Callable[[], Any], repeticoes: int) -> Dict[str, float]:
+    """Executa uma vez para aquecer e devolve mediana e mínimo de várias execuções, em ms."""
+    funcao()
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return {"mediana_ms": round(statistics.median(tempos), 3), "min_ms": round(min(tempos), 3)}
+
+
+def executar(tamanhos: List[str], repeticoes: int, filtro: Optional[str] = None, semente: int = 42) -> Dict[str, Any]:
+    """Gera os bancos e mede os métodos em cada tamanho."""
+    resultado: Dict[str, Any] = {
+        "gerado_em": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "repeticoes": repeticoes,
+        "semente": semente,
+        "tamanhos": {},
+        "resultados": {},
+    }
+    for tamanho in tamanhos:
+        itens, consumos, precos = TAMANHOS[tamanho]
+        with tempfile.TemporaryDirectory() as pasta:
+            with ExtendedDatabaseManager(str(Path(pasta) / "benchmark.db")) as db:
+                db.inicializar_banco()
+                inicio = time.perf_counter()
+                gerar_dados(db, itens, consumos, precos, semente=semente)
+                resultado["tamanhos"][tamanho] = {
+                    "itens": itens, "consumos": consumos, "precos": precos,
+                    "geracao_s": round(time.perf_counter() - inicio, 2),
+                }
+                resultado["resultados"][tamanho] = {
+                    nome: medir(funcao, repeticoes)
+                    for nome, funcao in _casos(db) if not filtro or filtro in nome
+                }
+    return resultado
+
+
+def comparar(resultado: Dict[str, Any], baseline: Dict[str, Any]) -> List[str]:
+    """
+    Compara as medianas com a linha de base.
+
+    Args:
+        resultado: Saída de executar.
+        baseline: Linha de base, com 'resultados' e opcionalmente 'limites'
+            ({"relativo", "absoluto_ms", "por_metodo": {nome: {...}}}).
+
+    Returns:
+        List[str]: Descrição de cada regressão encontrada.
+    """
+    limites = {**LIMITES_PADRAO, **baseline.get("limites", {})}
+    regressoes = []
+    for tamanho, metodos in resultado["resultados"].items():
+        base_tamanho = baseline.get("resultados", {}).get(tamanho, {})
+        for nome, medida in metodos.items():
+            if nome not in base_tamanho:
+                continue
+            limite = {**limites, **limites.get("por_metodo", {}).get(nome, {})}
+            base = base_tamanho[nome]["mediana_ms"]
+            atual = medida["mediana_ms"]
+            if atual > base * (1 + limite["relativo"]) and atual - base > limite["absoluto_ms"]:
+                regressoes.append(f"{tamanho}/{nome}: {atual:.2f} ms (base {base:.2f} ms, +{(atual / base - 1) * 100:.0f}%)")
+    return regressoes
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tamanhos", default="pequeno,medio", help=f"Lista separada por vírgulas: {', '.join(TAMANHOS)}")
+    parser.add_argument("--repeticoes", type=int, default=5, help="Execuções medidas por método (usa a mediana)")
+    parser.add_argument("--filtro", help="Mede apenas métodos cujo nome contém o texto")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PADRAO, help="Arquivo JSON da linha de base")
+    parser.add_argument("--saida", type=Path, help="Salva o resultado em JSON")
+    parser.add_argument("--salvar-baseline", action="store_true", help="Grava o resultado como nova linha de base")
+    args = parser.parse_args(argv)
+
+    tamanhos = [t.strip() for t in args.tamanhos.split(",") if t.strip()]
+    desconhecidos = [t for t in tamanhos if t not in TAMANHOS]
+    if desconhecidos:
+        parser.error(f"tamanho(s) desconhecido(s): {', '.join(desconhecidos)}")
+
+    resultado = executar(tamanhos, args.repeticoes, args.filtro)
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8")) if args.baseline.exists() else {}
+
+    for tamanho, metodos in resultado["resultados"].items():
+        info = resultado["tamanhos"][tamanho]
+        print(f"\n{tamanho}: {info['itens']} itens, {info['consumos']} consumos, {info['precos']} preços "
+              f"(gerados em {info['geracao_s']}s)")
+        base_tamanho = baseline.get("resultados", {}).get(tamanho, {})
+        for nome, medida in sorted(metodos.items(), key=lambda kv: kv[1]["mediana_ms"], reverse=True):
+            base = base_tamanho.get(nome, {}).get("mediana_ms")
+            comparacao = f"  (base {base:9.2f} ms)" if base else ""
+            print(f"  {medida['mediana_ms']:9.2f} ms  {nome}{comparacao}")
+
+    if args.saida:
+        args.saida.write_text(json.dumps(resultado, ensure_ascii=False, indent=2), encoding="utf-8")
+    if args.salvar_baseline:
+        novo = {"limites": baseline.get("limites", LIMITES_PADRAO), **resultado}
+        args.baseline.write_text(json.dumps(novo, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+        print(f"\nLinha de base salva em {args.baseline}")
+        return 0
+
+    if not baseline:
+        print(f"\nSem linha de base em {args.baseline}; use --salvar-baseline para criar.")
+        return 0
+    regressoes = comparar(resultado, baseline)
+    for regressao in regressoes:
+        print(f"\nREGRESSÃO: {regressao}")
+    return 1 if regressoes else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
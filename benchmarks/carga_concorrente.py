@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Teste de carga com sessões concorrentes no ExtendedDatabaseManager.
+
+Simula K sessões (threads) fazendo uma mistura de leituras (inventário,
+relatórios, busca) e escritas (consumo, cadastro de itens) sobre um único
+gerenciador, como acontece com várias abas do Streamlit no mesmo processo.
+Com --processos P, cada um de P processos abre seu próprio gerenciador no
+mesmo arquivo e roda K sessões, o que reproduz o app junto com o worker.
+
+Mede:
+- vazão (operações/s) e latência p50/p95/p99 por operação;
+- tempo de espera pelo lock de transação do gerenciador (instrumentado);
+- erros, separando 'database is locked' dos demais, tanto os levantados
+  quanto os que o gerenciador só registra no log.
+
+Uso:
+    python benchmarks/carga_concorrente.py --sessoes 8 --duracao 10
+    python benchmarks/carga_concorrente.py --sessoes 4 --processos 3 --tamanho pequeno
+    python benchmarks/carga_concorrente.py --banco data/geladeira.db --json
+
+O banco informado em --banco é copiado antes do teste; o original não é alterado.
+"""
+import argparse
+import json
+import logging
+import multiprocessing
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from benchmark_manager import TAMANHOS  # noqa: E402
+from dados_sinteticos import gerar_dados  # noqa: E402
+from db.extended_database_manager import ExtendedDatabaseManager  # noqa: E402
+
+# operação: peso na mistura
+MISTURA = {
+    "carregar_inventario": 25,
+    "buscar_itens": 20,
+    "obter_itens_proximos_vencimento": 10,
+    "obter_nutrientes_consumidos": 10,
+    "obter_comparativo_precos_mercados": 5,
+    "obter_sugestoes_compra": 5,
+    "registrar_consumo": 20,
+    "adicionar_item": 5,
+}
+TERMOS_BUSCA = ["arroz", "leite", "banana", "frango", "pão", "queijo", "feijão", "suco"]
+ERRO_LOCK = "database is locked"
+
+
+class _LockInstrumentado:
+    """Envolve o lock do gerenciador e registra quanto cada aquisição esperou."""
+
+    def __init__(self, lock):
+        self._lock = lock
+        self.esperas_ms: List[float] = []
+
+    def acquire(self, blocking: bool = True, timeout: float = -1) -> bool:
+        inicio = time.perf_counter()
+        adquirido = self._lock.acquire(blocking, timeout)
+        self.esperas_ms.append((time.perf_counter() - inicio) * 1000)
+        return adquirido
+
+    def release(self):
+        self._lock.release()
+
+    def locked(self) -> bool:
+        return self._lock.locked()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+        return False
+
+
+class _ContadorErros(logging.Handler):
+    """Conta os erros que o gerenciador registra no log sem levantar exceção."""
+
+    def __init__(self):
+        super().__init__(logging.ERROR)
+        self.erros: Counter = Counter()
+
+    def emit(self, record: logging.LogRecord):
+        mensagem = record.getMessage()
+        self.erros[ERRO_LOCK if ERRO_LOCK in mensagem else "outros (log)"] += 1
+
+
+def _operacoes(db: ExtendedDatabaseManager, rng: random.Random, item_ids: List[int],
+               prefixo: str) -> Dict[str, Callable[[], Any]]:
+    contador = iter(range(1, 10 ** 9))
+    return {
+        "carregar_inventario": db.carregar_inventario,
+        "buscar_itens": lambda: db.buscar_itens(rng.choice(TERMOS_BUSCA)),
+        "obter_itens_proximos_vencimento": lambda: db.obter_itens_proximos_vencimento(7),
+        "obter_nutrientes_consumidos": lambda: db.obter_nutrientes_consumidos(periodo_dias=7),
+        "obter_comparativo_precos_mercados": db.obter_comparativo_precos_mercados,
+        "obter_sugestoes_compra": db.obter_sugestoes_compra,
+        "registrar_consumo": lambda: db.registrar_consumo(rng.choice(item_ids), 0.01),
+        "adicionar_item": lambda: db.adicionar_item(
+            f"Carga {prefixo}-{next(contador)}", "Outros", 1, "unidade", None, "Armário", custo_unitario=1.0
+        ),
+    }
+
+
+def _sessao(db: ExtendedDatabaseManager, indice: str, fim: float, semente: int, item_ids: List[int],
+            pausa_ms: float, latencias: Dict[str, List[float]], erros: Counter):
+    """Executa operações sorteadas pela MISTURA até o fim do teste."""
+    rng = random.Random(f"{semente}-{indice}")
+    operacoes = _operacoes(db, rng, item_ids, indice)
+    nomes, pesos = list(MISTURA), list(MISTURA.values())
+    while time.monotonic() < fim:
+        nome = rng.choices(nomes, pesos)[0]
+        inicio = time.perf_counter()
+        try:
+            operacoes[nome]()
+        except Exception as e:
+            erros[ERRO_LOCK if ERRO_LOCK in str(e) else type(e).__name__] += 1
+        latencias.setdefault(nome, []).append((time.perf_counter() - inicio) * 1000)
+        if pausa_ms:
+            time.sleep(rng.expovariate(1000 / pausa_ms))
+
+
+def executar_processo(banco: str, sessoes: int, duracao: float, semente: int = 42, pausa_ms: float = 0.0,
+                      indice_processo: int = 0) -> Dict[str, Any]:
+    """
+    Roda as sessões em threads sobre um único gerenciador.
+
+    Args:
+        banco: Arquivo do banco (já preenchido).
+        sessoes: Número de threads concorrentes.
+        duracao: Duração do teste em segundos.
+        semente: Semente da mistura de operações.
+        pausa_ms: Pausa média entre operações de uma sessão (distribuição exponencial).
+        indice_processo: Identifica o processo nos nomes dos itens criados.
+
+    Returns:
+        Dict[str, Any]: 'latencias' ({operação: [ms]}), 'esperas_lock_ms',
+        'erros' e 'duracao_s' medidos.
+    """
+    logger_db = logging.getLogger("db.extended_database_manager")
+    contador_log = _ContadorErros()
+    logger_db.addHandler(contador_log)
+    logger_db.propagate = False
+
+    latencias: Dict[str, List[float]] = {}
+    erros: Counter = Counter()
+    with ExtendedDatabaseManager(banco) as db:
+        lock = _LockInstrumentado(db.lock)
+        db.lock = lock
+        db.cursor.execute("SELECT id FROM itens")
+        item_ids = [row["id"] for row in db.cursor.fetchall()]
+
+        inicio = time.monotonic()
+        fim = inicio + duracao
+        # Cada thread grava em dicionários próprios; a junção é feita no final
+        resultados = [({}, Counter()) for _ in range(sessoes)]
+        threads = [
+            threading.Thread(target=_sessao, args=(db, f"{indice_processo}-{i}", fim, semente, item_ids, pausa_ms,
+                                                   *resultados[i]))
+            for i in range(sessoes)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        duracao_real = time.monotonic() - inicio
+
+    logger_db.removeHandler(contador_log)
+    for latencias_sessao, erros_sessao in resultados:
+        for nome, valores in latencias_sessao.items():
+            latencias.setdefault(nome, []).extend(valores)
+        erros.update(erros_sessao)
+    erros.update(contador_log.erros)
+    return {"latencias": latencias, "esperas_lock_ms": lock.esperas_ms, "erros": dict(erros),
+            "duracao_s": duracao_real}
+
+
+def _percentis(valores: List[float]) -> Dict[str, float]:
+    if not valores:
+        return {"n": 0}
+    if len(valores) == 1:
+        p = [valores[0]] * 99
+    else:
+        p = statistics.quantiles(valores, n=100, method="inclusive")
+    return {"n": len(valores), "p50_ms": round(p[49], 3), "p95_ms": round(p[94], 3),
+            "p99_ms": round(p[98], 3), "max_ms": round(max(valores), 3)}
+
+
+def resumir(parciais: List[Dict[str, Any]], sessoes: int, processos: int) -> Dict[str, Any]:
+    """Junta os resultados dos processos em vazão, percentis, espera de lock e erros."""
+    latencias: Dict[str, List[float]] = {}
+    esperas: List[float] = []
+    erros: Counter = Counter()
+    for parcial in parciais:
+        for nome, valores in parcial["latencias"].items():
+            latencias.setdefault(nome, []).extend(valores)
+        esperas.extend(parcial["esperas_lock_ms"])
+        erros.update(parcial["erros"])
+
+    todas = [v for valores in latencias.values() for v in valores]
+    duracao = max(parcial["duracao_s"] for parcial in parciais)
+    espera = _percentis(esperas)
+    espera["total_ms"] = round(sum(esperas), 1)
+    return {
+        "modo": "processos" if processos > 1 else "threads",
+        "processos": processos,
+        "sessoes_por_processo": sessoes,
+        "duracao_s": round(duracao, 2),
+        "operacoes": len(todas),
+        "vazao_ops_s": round(len(todas) / duracao, 1) if duracao else 0.0,
+        "latencia": {"geral": _percentis(todas),
+                     "por_operacao": {nome: _percentis(v) for nome, v in sorted(latencias.items())}},
+        "espera_lock": espera,
+        "erros": dict(erros),
+    }
+
+
+def _preparar_banco(pasta: str, banco: Optional[Path], tamanho: str, semente: int) -> str:
+    destino = str(Path(pasta) / "carga.db")
+    if banco:
+        shutil.copy2(banco, destino)
+        return destino
+    itens, consumos, precos = TAMANHOS[tamanho]
+    with ExtendedDatabaseManager(destino) as db:
+        db.inicializar_banco()
+        gerar_dados(db, itens, consumos, precos, semente=semente)
+    return destino
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sessoes", type=int, default=8, help="Sessões (threads) por processo")
+    parser.add_argument("--processos", type=int, default=1, help="Processos, cada um com seu gerenciador")
+    parser.add_argument("--duracao", type=float, default=10.0, help="Duração em segundos")
+    parser.add_argument("--pausa-ms", type=float, default=0.0, help="Pausa média entre operações de uma sessão")
+    parser.add_argument("--tamanho", default="pequeno", choices=list(TAMANHOS), help="Dados sintéticos gerados")
+    parser.add_argument("--banco", type=Path, help="Usa uma cópia deste banco em vez de gerar dados")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--json", action="store_true", help="Imprime o resultado em JSON")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as pasta:
+        banco = _preparar_banco(pasta, args.banco, args.tamanho, args.semente)
+        if args.processos > 1:
+            contexto = multiprocessing.get_context("spawn")
+            with contexto.Pool(args.processos) as pool:
+                parciais = pool.starmap(executar_processo, [
+                    (banco, args.sessoes, args.duracao, args.semente, args.pausa_ms, p) for p in range(args.processos)
+                ])
+        else:
+            parciais = [executar_processo(banco, args.sessoes, args.duracao, args.semente, args.pausa_ms)]
+    resultado = resumir(parciais, args.sessoes, args.processos)
+
+    if args.json:
+        print(json.dumps(resultado, ensure_ascii=False, indent=2))
+        return 0
+
+    geral = resultado["latencia"]["geral"]
+    print(f"{resultado['processos']} processo(s) × {resultado['sessoes_por_processo']} sessões, "
+          f"{resultado['duracao_s']}s: {resultado['operacoes']} operações, {resultado['vazao_ops_s']} ops/s")
+    print(f"latência geral: p50 {geral.get('p50_ms', 0):.2f} ms, p95 {geral.get('p95_ms', 0):.2f} ms, "
+          f"p99 {geral.get('p99_ms', 0):.2f} ms")
+    print(f"\n{'operação':36} {'n':>7} {'p50':>9} {'p95':>9} {'p99':>9}")
+    for nome, p in resultado["latencia"]["por_operacao"].items():
+        print(f"{nome:36} {p['n']:7d} {p['p50_ms']:9.2f} {p['p95_ms']:9.2f} {p['p99_ms']:9.2f}")
+    espera = resultado["espera_lock"]
+    if espera["n"]:
+        print(f"\nespera pelo lock de transação: {espera['n']} aquisições, total {espera['total_ms']} ms, "
+              f"p95 {espera['p95_ms']:.2f} ms, p99 {espera['p99_ms']:.2f} ms, máx {espera['max_ms']:.2f} ms")
+    print("\nerros: " + (", ".join(f"{n}× {tipo}" for tipo, n in resultado["erros"].items()) or "nenhum"))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
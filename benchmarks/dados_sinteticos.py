@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Gerador determinístico de dados sintéticos para o banco do inventário.
+
+Produz N itens, M registros de consumo e P preços com distribuições parecidas
+com as de uma casa real: poucas categorias concentram a maior parte dos itens,
+a popularidade dos itens segue uma lei de potência (alguns itens são
+consumidos todo dia, a maioria raramente), quantidades e custos são
+log-normais, a validade depende da categoria e os preços variam por loja,
+com inflação ao longo do tempo e ruído. A mesma semente gera sempre o mesmo
+banco.
+
+Uso:
+    python benchmarks/dados_sinteticos.py inventario.db --itens 1000 --consumos 20000 --precos 20000
+"""
+import argparse
+import datetime
+import sys
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from db.extended_database_manager import ExtendedDatabaseManager  # noqa: E402
+
+# categoria: (peso, unidade, local, validade mínima e máxima em dias, custo médio, alimentos)
+CATEGORIAS = {
+    "Frutas": (10, "unidade", "Fruteira", 3, 12, 1.5, ["Banana", "Maçã", "Laranja", "Mamão", "Pera", "Uva"]),
+    "Verduras": (6, "unidade", "Geladeira – Inferior", 3, 8, 4.0, ["Alface", "Couve", "Rúcula", "Espinafre"]),
+    "Legumes": (8, "kg", "Geladeira – Inferior", 5, 20, 6.0, ["Cenoura", "Batata", "Abobrinha", "Tomate", "Cebola"]),
+    "Carnes": (6, "kg", "Freezer", 2, 90, 35.0, ["Frango", "Carne Moída", "Alcatra", "Linguiça"]),
+    "Laticínios": (8, "unidade", "Geladeira – Superior", 5, 30, 7.0, ["Leite", "Iogurte", "Queijo", "Manteiga"]),
+    "Grãos": (7, "kg", "Despensa", 90, 365, 8.0, ["Arroz", "Feijão", "Lentilha", "Grão-de-bico"]),
+    "Massas": (4, "pacote", "Armário", 120, 540, 5.0, ["Macarrão", "Lasanha", "Talharim"]),
+    "Padaria": (5, "unidade", "Armário", 2, 7, 3.0, ["Pão", "Bisnaguinha", "Bolo"]),
+    "Bebidas": (5, "l", "Despensa", 30, 365, 6.0, ["Suco", "Água", "Refrigerante"]),
+    "Ovos": (3, "unidade", "Geladeira – Superior", 14, 30, 0.8, ["Ovo"]),
+    "Condimentos": (3, "unidade", "Armário", 180, 720, 6.0, ["Sal", "Azeite", "Vinagre", "Orégano"]),
+    "Snacks": (3, "pacote", "Armário", 60, 240, 7.0, ["Biscoito", "Granola", "Castanha"]),
+}
+LOJAS = {"Atacadão": 0.88, "Mercado do Bairro": 1.05, "Supermercado Central": 1.0,
+         "Feira": 0.92, "Hortifruti": 1.08, "Empório": 1.25}
+MARCAS = ["", " Integral", " Orgânico", " Light", " Premium", " Tradicional"]
+DIAS_HISTORICO = 180
+
+
+def gerar_dados(db: ExtendedDatabaseManager, itens: int, consumos: int, precos: int, semente: int = 42,
+                hoje: Optional[datetime.date] = None, fracao_nutricional: float = 0.7) -> Dict[str, int]:
+    """
+    Preenche o banco com dados sintéticos.
+
+    Args:
+        db: Gerenciador com o banco já inicializado (de preferência vazio).
+        itens: Número de itens no inventário.
+        consumos: Número de registros de consumo nos últimos 180 dias.
+        precos: Número de registros em historico_precos.
+        semente: Semente do gerador aleatório.
+        hoje: Data de referência (padrão: hoje). Fixe para comparar bancos entre dias.
+        fracao_nutricional: Fração dos itens com informação nutricional.
+
+    Returns:
+        Dict[str, int]: Quantidade de linhas inseridas em cada tabela.
+    """
+    rng = np.random.default_rng(semente)
+    hoje = hoje or datetime.date.today()
+    nomes_categorias = list(CATEGORIAS)
+    pesos = np.array([CATEGORIAS[c][0] for c in nomes_categorias], dtype=float)
+
+    # Itens: categoria pelo peso, nome = alimento + variação, ~5% já vencidos
+    categorias = rng.choice(len(nomes_categorias), size=itens, p=pesos / pesos.sum())
+    linhas_itens = []
+    custos = np.empty(itens)
+    for i, c in enumerate(categorias):
+        categoria = nomes_categorias[c]
+        _, unidade, local, val_min, val_max, custo_medio, alimentos = CATEGORIAS[categoria]
+        nome = f"{alimentos[rng.integers(len(alimentos))]}{MARCAS[rng.integers(len(MARCAS))]} {i + 1}"
+        dias = -int(rng.integers(1, 10)) if rng.random() < 0.05 else int(rng.integers(val_min, val_max + 1))
+        custos[i] = round(custo_medio * rng.lognormal(0, 0.3), 2)
+        quantidade = round(float(rng.lognormal(0.7, 0.6)), 2) if rng.random() > 0.1 else 0.0
+        linhas_itens.append((
+            nome, quantidade, unidade, local, categoria, int(val_max <= 30),
+            (hoje + datetime.timedelta(days=dias)).isoformat(), int(rng.random() < 0.2),
+            int(rng.choice([3, 1, 2], p=[0.6, 0.1, 0.3])), int(categoria == "Laticínios"), custos[i],
+        ))
+
+    # Popularidade em lei de potência: o item de posição k tem peso 1/k^1.1
+    popularidade = 1.0 / np.arange(1, itens + 1) ** 1.1
+    popularidade = popularidade[rng.permutation(itens)]
+    popularidade /= popularidade.sum()
+
+    item_consumo = rng.choice(itens, size=consumos, p=popularidade)
+    dias_consumo = np.sort(rng.integers(0, DIAS_HISTORICO, size=consumos))[::-1]
+    linhas_consumo = [
+        (int(item) + 1, round(float(q), 2), (hoje - datetime.timedelta(days=int(d))).isoformat(), int(t))
+        for item, q, d, t in zip(item_consumo, rng.lognormal(-0.5, 0.5, size=consumos), dias_consumo,
+                                 rng.random(consumos) < 0.2)
+    ]
+
+    # Preços: custo do item × fator da loja × inflação de ~0,5%/mês × ruído
+    nomes_lojas = list(LOJAS)
+    fatores = np.array([LOJAS[l] for l in nomes_lojas])
+    item_preco = rng.choice(itens, size=precos, p=popularidade)
+    dias_preco = np.sort(rng.integers(0, DIAS_HISTORICO, size=precos))[::-1]
+    lojas = rng.integers(len(nomes_lojas), size=precos)
+    valores = (custos[item_preco] * fatores[lojas] * (1 - 0.005 * dias_preco / 30)
+               * rng.lognormal(0, 0.08, size=precos))
+    linhas_precos = [
+        (int(item) + 1, round(float(v), 2), (hoje - datetime.timedelta(days=int(d))).isoformat(),
+         nomes_lojas[loja], int(q))
+        for item, v, d, loja, q in zip(item_preco, valores, dias_preco, lojas, rng.integers(1, 6, size=precos))
+    ]
+
+    com_nutricional = np.flatnonzero(rng.random(itens) < fracao_nutricional)
+    macros = rng.lognormal([4.5, 1.5, 2.5, 1.0, 0.5, 3.5, 0.0, 3.0, 1.5, -1.0], 0.6,
+                           size=(len(com_nutricional), 10)).round(2)
+    linhas_nutricional = [(int(i) + 1, *map(float, m), float(rng.integers(50, 500)))
+                          for i, m in zip(com_nutricional, macros)]
+
+    with db.transaction() as cursor:
+        cursor.executemany(
+            """
+            INSERT INTO itens (nome, quantidade, unidade, localizacao, categoria, perecivel, validade,
+                               para_thomas, compatibilidade_thomas, contem_leite, custo_unitario)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            linhas_itens
+        )
+        cursor.executemany(
+            "INSERT INTO consumo (item_id, quantidade, data_consumo, para_thomas) VALUES (?, ?, ?, ?)",
+            linhas_consumo
+        )
+        cursor.executemany(
+            """
+            INSERT INTO historico_precos (item_id, valor_unitario, data_compra, local_compra, quantidade_comprada)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+            linhas_precos
+        )
+        cursor.executemany(
+            """
+            INSERT INTO nutricional (item_id, calorias_100g, proteinas_g, carboidratos_g, gorduras_g, fibras_g,
+                                     calcio_mg, ferro_mg, vitamina_a_mcg, vitamina_c_mg, vitamina_d_mcg,
+                                     peso_por_unidade)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            linhas_nutricional
+        )
+    db.conn.execute("ANALYZE")
+
+    return {"itens": itens, "consumo": consumos, "historico_precos": precos, "nutricional": len(linhas_nutricional)}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("banco", type=Path, help="Arquivo do banco a criar")
+    parser.add_argument("--itens", type=int, default=1000)
+    parser.add_argument("--consumos", type=int, default=20000)
+    parser.add_argument("--precos", type=int, default=20000)
+    parser.add_argument("--semente", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    if args.banco.exists():
+        print(f"{args.banco} já existe; escolha outro arquivo.", file=sys.stderr)
+        return 1
+    with ExtendedDatabaseManager(str(args.banco.resolve())) as db:
+        sucesso, mensagem = db.inicializar_banco()
+        if not sucesso:
+            print(mensagem, file=sys.stderr)
+            return 1
+        linhas = gerar_dados(db, args.itens, args.consumos, args.precos, semente=args.semente)
+    print(", ".join(f"{n} {tabela}" for tabela, n in linhas.items()))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
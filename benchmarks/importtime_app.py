@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Benchmark de tempo de importação na inicialização do app.
+
+Executa `python -X importtime -c "import app"` em processos novos, soma o tempo
+cumulativo do módulo, o tempo próprio dos módulos do projeto e confere se
+nenhum módulo proibido (views, plotly.express, requests...) foi carregado antes
+da primeira renderização. Os limites ficam em importtime_budget.json.
+
+Uso:
+    python benchmarks/importtime_app.py               # compara com o orçamento
+    python benchmarks/importtime_app.py --execucoes 7 --top 20
+    python benchmarks/importtime_app.py --json        # saída para acompanhamento em CI
+
+Retorna código 1 se algum limite for ultrapassado.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+ORCAMENTO_PADRAO = Path(__file__).resolve().parent / "importtime_budget.json"
+PACOTES_PROPRIOS = {"app", "config", "db", "views", "utils", "worker"}
+
+
+def medir_importacao(modulo: str) -> Tuple[List[Tuple[str, int, int]], int]:
+    """
+    Importa o módulo em um processo novo com -X importtime.
+
+    Args:
+        modulo: Nome do módulo a importar.
+
+    Returns:
+        Tuple: (lista de (nome, próprio_us, cumulativo_us), cumulativo do módulo em us)
+    """
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="0")
+    processo = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {modulo}"],
+        cwd=ROOT_DIR, env=env, capture_output=True, text=True,
+    )
+    if processo.returncode != 0:
+        raise RuntimeError(f"Falha ao importar {modulo}:\n{processo.stderr[-2000:]}")
+
+    registros = []
+    total = 0
+    for linha in processo.stderr.splitlines():
+        if not linha.startswith("import time:") or "imported package" in linha:
+            continue
+        proprio, cumulativo, nome = linha[len("import time:"):].split("|")
+        nome_limpo = nome.strip()
+        registros.append((nome_limpo, int(proprio), int(cumulativo)))
+        if nome_limpo == modulo and not nome.startswith("  "):
+            total = int(cumulativo)
+    return registros, total
+
+
+def executar(modulo: str, execucoes: int) -> Dict:
+    """Mede várias execuções e devolve as medianas e os módulos carregados."""
+    totais, proprios = [], []
+    carregados = set()
+    por_modulo: Dict[str, List[int]] = {}
+    # Primeira execução só aquece o cache de bytecode e o sistema de arquivos
+    medir_importacao(modulo)
+    for _ in range(execucoes):
+        registros, total = medir_importacao(modulo)
+        totais.append(total)
+        proprios.append(sum(p for nome, p, _ in registros if nome.split(".")[0] in PACOTES_PROPRIOS))
+        for nome, _, cumulativo in registros:
+            carregados.add(nome)
+            por_modulo.setdefault(nome, []).append(cumulativo)
+
+    return {
+        "modulo": modulo,
+        "total_ms": statistics.median(totais) / 1000,
+        "modulos_proprios_ms": statistics.median(proprios) / 1000,
+        "carregados": carregados,
+        "cumulativo_ms": {nome: statistics.median(v) / 1000 for nome, v in por_modulo.items()},
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--orcamento", type=Path, default=ORCAMENTO_PADRAO, help="Arquivo JSON com os limites")
+    parser.add_argument("--execucoes", type=int, default=5, help="Número de medições (usa a mediana)")
+    parser.add_argument("--top", type=int, default=10, help="Quantos módulos mais lentos listar")
+    parser.add_argument("--json", action="store_true", help="Imprime o resultado em JSON")
+    args = parser.parse_args(argv)
+
+    orcamento = json.loads(args.orcamento.read_text(encoding="utf-8"))
+    resultado = executar(orcamento.get("modulo", "app"), args.execucoes)
+    proibidos = sorted(set(orcamento.get("modulos_proibidos", [])) & resultado["carregados"])
+
+    violacoes = []
+    if resultado["total_ms"] > orcamento["orcamento_total_ms"]:
+        violacoes.append(f"total {resultado['total_ms']:.1f} ms > {orcamento['orcamento_total_ms']} ms")
+    if resultado["modulos_proprios_ms"] > orcamento["orcamento_modulos_proprios_ms"]:
+        violacoes.append(
+            f"módulos do projeto {resultado['modulos_proprios_ms']:.1f} ms > {orcamento['orcamento_modulos_proprios_ms']} ms"
+        )
+    if proibidos:
+        violacoes.append(f"módulos carregados na inicialização: {', '.join(proibidos)}")
+
+    mais_lentos = sorted(resultado["cumulativo_ms"].items(), key=lambda kv: kv[1], reverse=True)[:args.top]
+    if args.json:
+        print(json.dumps({
+            "modulo": resultado["modulo"],
+            "total_ms": round(resultado["total_ms"], 1),
+            "modulos_proprios_ms": round(resultado["modulos_proprios_ms"], 1),
+            "modulos_proibidos_carregados": proibidos,
+            "mais_lentos": [{"modulo": n, "cumulativo_ms": round(ms, 1)} for n, ms in mais_lentos],
+            "violacoes": violacoes,
+        }, ensure_ascii=False, indent=2))
+    else:
+        print(f"import {resultado['modulo']}: {resultado['total_ms']:.1f} ms "
+              f"(orçamento {orcamento['orcamento_total_ms']} ms, mediana de {args.execucoes})")
+        print(f"módulos do projeto: {resultado['modulos_proprios_ms']:.1f} ms "
+              f"(orçamento {orcamento['orcamento_modulos_proprios_ms']} ms)")
+        print(f"\n{args.top} importações mais caras (cumulativo):")
+        for nome, ms in mais_lentos:
+            print(f"  {ms:9.1f} ms  {nome}")
+        for violacao in violacoes:
+            print(f"\nORÇAMENTO EXCEDIDO: {violacao}")
+    return 1 if violacoes else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
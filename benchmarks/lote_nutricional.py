@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Vazão e latência das consultas nutricionais em lote.
+
+Sobe um servidor HTTP local que imita a busca do Open Food Facts com um
+atraso fixo por requisição e mede buscar_info_nutricional_lote com cache e
+TACO vazios em memória: vazão (consultas/s) e latência p50/p95 de cada
+requisição. Sequencialmente o lote levaria consultas x atraso.
+
+Uso:
+    python benchmarks/lote_nutricional.py
+    python benchmarks/lote_nutricional.py --consultas 200 --workers 16 --atraso-ms 100
+"""
+import argparse
+import json
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from utils.cache_nutricional import CacheNutricional  # noqa: E402
+from utils.food_api import GrupoChamadaUnica, IntegracaoAlimentos, LimitadorTaxa, criar_sessao_http  # noqa: E402
+from utils.taco import TabelaTaco  # noqa: E402
+
+
+class _ServidorLento(BaseHTTPRequestHandler):
+    """Responde toda busca com um produto após o atraso configurado."""
+    atraso = 0.05
+
+    def do_GET(self):
+        time.sleep(self.atraso)
+        termo = parse_qs(urlparse(self.path).query)["search_terms"][0]
+        corpo = json.dumps({"count": 1, "products": [{
+            "product_name": termo, "nutriments": {"energy-kcal_100g": 100}
+        }]}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def log_message(self, *args):
+        pass
+
+
+def executar(consultas: int, workers: int, atraso: float) -> dict:
+    """Roda um lote contra o servidor local e devolve as medidas."""
+    _ServidorLento.atraso = atraso
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), _ServidorLento)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    sessao = criar_sessao_http()
+    try:
+        integracao = IntegracaoAlimentos(
+            cache=CacheNutricional(":memory:"), taco=TabelaTaco(":memory:"), sessao=sessao,
+            url_openfoodfacts=f"http://127.0.0.1:{servidor.server_address[1]}/cgi/search.pl",
+            limitador=LimitadorTaxa(0), chamadas=GrupoChamadaUnica(),
+        )
+        latencias = []
+        buscar_original = integracao._buscar_openfoodfacts
+
+        def buscar_medindo(nome):
+            inicio = time.perf_counter()
+            try:
+                return buscar_original(nome)
+            finally:
+                latencias.append(time.perf_counter() - inicio)
+
+        integracao._buscar_openfoodfacts = buscar_medindo
+        inicio = time.perf_counter()
+        integracao.buscar_info_nutricional_lote([f"produto {i}" for i in range(consultas)], max_workers=workers)
+        duracao = time.perf_counter() - inicio
+    finally:
+        sessao.close()
+        servidor.shutdown()
+        servidor.server_close()
+
+    quantis = statistics.quantiles(latencias, n=20)
+    return {
+        "consultas": consultas,
+        "workers": workers,
+        "duracao_s": round(duracao, 3),
+        "sequencial_s": round(consultas * atraso, 3),
+        "vazao": round(consultas / duracao, 1),
+        "p50_ms": round(statistics.median(latencias) * 1000, 1),
+        "p95_ms": round(quantis[-1] * 1000, 1),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--consultas", type=int, default=40, help="Produtos distintos no lote")
+    parser.add_argument("--workers", type=int, default=8, help="Consultas simultâneas")
+    parser.add_argument("--atraso-ms", type=float, default=50.0, help="Atraso do servidor por requisição")
+    parser.add_argument("--json", action="store_true", help="Imprime o resultado em JSON")
+    args = parser.parse_args(argv)
+
+    resultado = executar(args.consultas, args.workers, args.atraso_ms / 1000)
+    if args.json:
+        print(json.dumps(resultado, indent=2))
+    else:
+        print(f"lote de {resultado['consultas']} com {resultado['workers']} workers: "
+              f"{resultado['duracao_s']}s (sequencial {resultado['sequencial_s']}s)")
+        print(f"  {resultado['vazao']} consultas/s, p50 {resultado['p50_ms']} ms, p95 {resultado['p95_ms']} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,6 @@
 from pathlib import Path
 from typing import Dict, Any, Optional
-from dotenv import load_dotenv, find_dotenv
+from dotenv import load_dotenv
 import os
 import datetime
 import logging
@@ -17,28 +17,29 @@ except ImportError:
     NIVEL_ALERTA_VENCIMENTO = 7  # Default: 7 days
     NIVEL_ALERTA_QUANTIDADE = 20  # Default: 20%
 
-# Carregar variáveis de ambiente do arquivo .env
-env_path = find_dotenv()
-if env_path:
-    load_dotenv(env_path)
-    logger.info(f"Environment variables loaded from {env_path}")
-else:
-    logger.warning("No .env file found")
-
 # Diretórios do projeto
 ROOT_DIR = Path(__file__).parent.absolute()
 DATA_DIR = ROOT_DIR / "data"
 DB_DIR = ROOT_DIR / "db"
 
-# Garantir que os diretórios existam
-try:
-    DATA_DIR.mkdir(exist_ok=True)
-    DB_DIR.mkdir(exist_ok=True)
-    logger.info("Project directories verified")
-except PermissionError:
-    logger.error("Permission denied when creating directories")
-except Exception as e:
-    logger.error(f"Error creating directories: {str(e)}")
+# Carregar variáveis de ambiente do arquivo .env na raiz do projeto
+# (caminho fixo: find_dotenv() inspeciona a pilha e percorre diretórios a cada import)
+env_path = ROOT_DIR / ".env"
+if env_path.is_file():
+    load_dotenv(env_path)
+    logger.info(f"Environment variables loaded from {env_path}")
+
+def garantir_diretorios() -> bool:
+    """Cria os diretórios de dados do projeto, se necessário. Chamado na inicialização do app."""
+    try:
+        DATA_DIR.mkdir(exist_ok=True)
+        DB_DIR.mkdir(exist_ok=True)
+        return True
+    except PermissionError:
+        logger.error("Permission denied when creating directories")
+    except Exception as e:
+        logger.error(f"Error creating directories: {str(e)}")
+    return False
 
 # Configurações da aplicação
 PAGE_TITLE = os.getenv("PAGE_TITLE", "GELADEIRA - Sistema de Gerenciamento de Alimentos")
@@ -2,6 +2,7 @@ import os
 import shutil
 import sqlite3
 import logging
+import time
 from datetime import datetime
 from pathlib import Path
 
@@ -89,34 +90,99 @@ class DatabaseErrorHandler:
             return False, f"Erro inesperado ao verificar integridade: {e}"
 
     @staticmethod
-    def optimize_database(conn):
+    def optimize_database(conn, orcamento_segundos=2.0):
         """
-        Otimiza o banco de dados
+        Otimiza o banco de dados sem bloqueá-lo por longos períodos.
+        
+        Em vez de VACUUM/REINDEX completos, delega para otimizar_incremental,
+        que trabalha em fatias limitadas pelo orçamento de tempo.
         
         Args:
             conn: Conexão com o banco de dados
+            orcamento_segundos: Tempo máximo aproximado da otimização
             
         Returns:
             bool: True se a otimização foi bem-sucedida
         """
+        logging.info("Iniciando otimização do banco de dados...")
+        resultado = DatabaseErrorHandler.otimizar_incremental(conn, orcamento_segundos)
+        if resultado["sucesso"]:
+            logging.info(
+                f"Otimização concluída: {resultado['paginas_recuperadas']} páginas recuperadas, "
+                f"{len(resultado['tabelas_analisadas'])} tabelas analisadas em {resultado['duracao_segundos']:.3f}s"
+            )
+        return resultado["sucesso"]
+
+    @staticmethod
+    def otimizar_incremental(conn, orcamento_segundos=0.5, paginas_por_fatia=256):
+        """
+        Recupera espaço livre e atualiza estatísticas em fatias que cabem no orçamento de tempo.
+        
+        Executa PRAGMA incremental_vacuum(paginas_por_fatia) enquanto houver páginas
+        livres e tempo disponível, e depois ANALYZE nas tabelas sem estatísticas,
+        uma por vez. O que não couber no orçamento fica para a próxima execução.
+        Requer auto_vacuum=INCREMENTAL (aplicado pela migração do schema); sem ele,
+        apenas a etapa de ANALYZE é executada.
+        
+        Args:
+            conn: Conexão com o banco de dados
+            orcamento_segundos: Tempo máximo aproximado a ser gasto
+            paginas_por_fatia: Páginas liberadas por chamada de incremental_vacuum
+            
+        Returns:
+            dict: sucesso, paginas_recuperadas, paginas_livres_restantes,
+                  tabelas_analisadas, duracao_segundos e concluido
+        """
+        inicio = time.perf_counter()
+        limite = inicio + orcamento_segundos
+        resultado = {
+            "sucesso": True,
+            "paginas_recuperadas": 0,
+            "paginas_livres_restantes": 0,
+            "tabelas_analisadas": [],
+            "duracao_segundos": 0.0,
+            "concluido": False,
+        }
         try:
             cursor = conn.cursor()
-            logging.info("Iniciando otimização do banco de dados...")
-            
-            # Executar VACUUM para recuperar espaço
-            cursor.execute("VACUUM")
-            
-            # Otimizar índices e estruturas
-            cursor.execute("PRAGMA optimize")
-            
-            # Reindexar
-            cursor.execute("REINDEX")
-            
-            logging.info("Otimização do banco de dados concluída com sucesso.")
-            return True
+            paginas_livres = cursor.execute("PRAGMA freelist_count").fetchone()[0]
+            incremental = cursor.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+
+            # 1. Devolver páginas livres ao sistema de arquivos, uma fatia por vez
+            while incremental and paginas_livres > 0 and time.perf_counter() < limite:
+                cursor.execute(f"PRAGMA incremental_vacuum({int(paginas_por_fatia)})").fetchall()
+                restantes = cursor.execute("PRAGMA freelist_count").fetchone()[0]
+                resultado["paginas_recuperadas"] += paginas_livres - restantes
+                if restantes >= paginas_livres:
+                    break
+                paginas_livres = restantes
+            resultado["paginas_livres_restantes"] = paginas_livres
+
+            # 2. ANALYZE direcionado às tabelas ainda sem estatísticas
+            cursor.execute("PRAGMA analysis_limit = 400")
+            tabelas = [row[0] for row in cursor.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%' ORDER BY name"
+            ).fetchall()]
+            com_estatisticas = set()
+            if cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'").fetchone():
+                com_estatisticas = {row[0] for row in cursor.execute("SELECT DISTINCT tbl FROM sqlite_stat1").fetchall()}
+            pendentes = [t for t in tabelas if t not in com_estatisticas]
+            for tabela in pendentes:
+                if time.perf_counter() >= limite:
+                    break
+                cursor.execute(f'ANALYZE "{tabela}"')
+                resultado["tabelas_analisadas"].append(tabela)
+
+            # 3. Com tempo restante, deixa o SQLite reanalisar o que mudou muito
+            if time.perf_counter() < limite:
+                cursor.execute("PRAGMA optimize")
+                resultado["concluido"] = (
+                    (paginas_livres == 0 or not incremental)
+                    and len(resultado["tabelas_analisadas"]) == len(pendentes)
+                )
+            conn.commit()
         except sqlite3.Error as e:
             logging.error(f"Erro ao otimizar banco de dados: {e}")
-            return False
-        except Exception as e:
-            logging.error(f"Erro inesperado ao otimizar banco de dados: {e}")
-            return False
+            resultado["sucesso"] = False
+        resultado["duracao_segundos"] = time.perf_counter() - inicio
+        return resultado
@@ -4,13 +4,122 @@ import pandas as pd
 import os
 import datetime
 import shutil
+import time
 from contextlib import contextmanager
 from typing import Tuple, List, Dict, Any, Optional, Generator
 from pathlib import Path
-from threading import Lock
+from threading import Lock, local
 
 logger = logging.getLogger(__name__)
 
+# Versão atual do schema, gravada em PRAGMA user_version
+VERSAO_SCHEMA = 5
+
+# Migrações aplicadas em ordem por inicializar_banco: versão de destino -> método
+MIGRACOES = (
+    (2, "_migracao_auto_vacuum_incremental"),
+    (3, "_migracao_triagem_restricoes"),
+    (4, "_migracao_densidade_nutricional"),
+    (5, "_migracao_pontuacao"),
+)
+
+# Tabelas que um arquivo precisa conter para ser aceito como backup válido
+TABELAS_ESSENCIAIS = ("itens", "nutricional", "consumo", "configuracoes")
+
+# Último resultado de verificação de integridade por banco, compartilhado por
+# todas as sessões do processo: {db_path: {"completa": {...}, "rapida": {...}}}
+_cache_integridade: Dict[str, Dict[str, Dict[str, Any]]] = {}
+_cache_integridade_lock = Lock()
+# A verificação completa é do worker; o resultado fica em resultados_precomputados
+CHAVE_INTEGRIDADE_COMPLETA = "integridade_completa"
+
+# Colunas da tabela nutricional -> nomes exibidos nos relatórios de consumo
+COLUNAS_NUTRIENTES = {
+    'calorias_100g': 'Calorias (kcal)',
+    'proteinas_g': 'Proteínas (g)',
+    'carboidratos_g': 'Carboidratos (g)',
+    'gorduras_g': 'Gorduras (g)',
+    'fibras_g': 'Fibras (g)',
+    'calcio_mg': 'Cálcio (mg)',
+    'ferro_mg': 'Ferro (mg)',
+    'vitamina_a_mcg': 'Vitamina A (mcg)',
+    'vitamina_c_mg': 'Vitamina C (mg)',
+    'vitamina_d_mcg': 'Vitamina D (mcg)',
+    'acucar_100g': 'Açúcar (g)',
+    'sodio_100g': 'Sódio (g)'
+}
+
+
+def _fator_nutricional(quantidades: pd.Series, unidades: pd.Series, peso_por_unidade: pd.Series,
+                       densidade: pd.Series) -> pd.Series:
+    """
+    Fator que multiplica os valores por 100 g/ml da tabela nutricional.
+
+    Contagem usa peso_por_unidade e volume usa a densidade do item; contagem
+    sem peso conhecido usa os valores nutricionais como "por unidade".
+    """
+    from utils.unidades import CONTAGEM, dimensoes_serie, para_gramas
+
+    unidades = unidades.fillna('unidade').replace('', 'unidade')
+    quantidades = quantidades.astype(float)
+    gramas = para_gramas(quantidades, unidades, peso_por_unidade, densidade)
+    por_unidade = gramas.isna().to_numpy() & (dimensoes_serie(unidades) == CONTAGEM)
+    return (gramas / 100.0).where(~por_unidade, quantidades).fillna(0.0)
+
+
+# Contadores de pontuacao_periodo gerados por evento. Os modelos são usados
+# tanto pelos gatilhos (linha NEW) quanto pela carga inicial da migração 5.
+CATEGORIAS_SAUDAVEIS = ("Frutas", "Verduras", "Legumes")
+# Consumo até este número de dias antes da validade conta como desperdício evitado
+DIAS_APROVEITAMENTO = 3
+
+_EVENTOS_CONSUMO = """
+    SELECT strftime('%Y-%m', COALESCE({c}.data_consumo, date('now'))) AS periodo, m.metrica,
+           COALESCE(CASE m.metrica
+               WHEN 'consumos' THEN 1
+               WHEN 'consumos_saudaveis' THEN i.categoria IN ({categorias})
+               WHEN 'consumos_thomas_restritos' THEN {c}.para_thomas = 1 AND i.compatibilidade_thomas = 1
+               WHEN 'aproveitamentos' THEN {aproveitado}
+               WHEN 'valor_aproveitado' THEN CASE WHEN {aproveitado}
+                   THEN {c}.quantidade * COALESCE(i.custo_unitario, 0) ELSE 0 END
+           END, 0) AS valor
+    FROM {fonte}itens i,
+         (SELECT 'consumos' AS metrica UNION ALL SELECT 'consumos_saudaveis'
+          UNION ALL SELECT 'consumos_thomas_restritos' UNION ALL SELECT 'aproveitamentos'
+          UNION ALL SELECT 'valor_aproveitado') m
+    WHERE i.id = {c}.item_id
+"""
+
+_EVENTOS_COMPRA = """
+    SELECT strftime('%Y-%m', COALESCE({c}.data_compra, date('now'))) AS periodo, m.metrica,
+           COALESCE(CASE m.metrica
+               WHEN 'compras' THEN 1
+               WHEN 'gasto' THEN {c}.valor_unitario * COALESCE({c}.quantidade_comprada, 1)
+               WHEN 'economia' THEN MAX((
+                   SELECT anterior.valor_unitario FROM historico_precos anterior
+                   WHERE anterior.item_id = {c}.item_id AND anterior.id < {c}.id
+                   ORDER BY anterior.id DESC LIMIT 1
+               ) - {c}.valor_unitario, 0) * COALESCE({c}.quantidade_comprada, 1)
+           END, 0) AS valor
+    FROM {fonte}(SELECT 'compras' AS metrica UNION ALL SELECT 'gasto' UNION ALL SELECT 'economia') m
+    WHERE 1
+"""
+
+_EVENTOS_DESCARTE = """
+    SELECT strftime('%Y-%m', COALESCE({c}.data_descarte, date('now'))) AS periodo, m.metrica,
+           CASE m.metrica WHEN 'descartes' THEN 1 ELSE COALESCE({c}.valor, 0) END AS valor
+    FROM {fonte}(SELECT 'descartes' AS metrica UNION ALL SELECT 'valor_descartado') m
+    WHERE 1
+"""
+
+
+def _eventos_sql(modelo: str, linha: str, fonte: str = "") -> str:
+    aproveitado = (f"julianday(i.validade) - julianday(COALESCE({linha}.data_consumo, date('now'))) "
+                   f"BETWEEN 0 AND {DIAS_APROVEITAMENTO}")
+    categorias = ", ".join(f"'{categoria}'" for categoria in CATEGORIAS_SAUDAVEIS)
+    return modelo.format(c=linha, fonte=fonte, aproveitado=aproveitado, categorias=categorias)
+
+
 class ExtendedDatabaseManager:
     """
     Gerenciador estendido do banco de dados para o Sistema GELADEIRA.
@@ -28,7 +137,7 @@ class ExtendedDatabaseManager:
         self.db_path = db_path
         self.lock = Lock()
         self.conn = None
-        self.cursor = None
+        self._cursores = local()
         try:
             # Garante que o diretório do banco de dados existe
             if db_path != ":memory:":
@@ -37,6 +146,9 @@ class ExtendedDatabaseManager:
             self.conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30.0)
             # Habilitar suporte a chaves estrangeiras
             self.conn.execute("PRAGMA foreign_keys = ON")
+            # WAL permite que o worker de manutenção escreva sem bloquear leituras da aplicação
+            if db_path != ":memory:":
+                self.conn.execute("PRAGMA journal_mode = WAL")
             # Habilitar o uso de dicionários nos resultados
             self.conn.row_factory = sqlite3.Row
             self.cursor = self.conn.cursor()
@@ -51,6 +163,29 @@ class ExtendedDatabaseManager:
             self.conn = None
             self.cursor = None
 
+    @property
+    def cursor(self) -> Optional[sqlite3.Cursor]:
+        """
+        Cursor da thread atual.
+
+        A conexão é compartilhada entre as sessões do app e o worker, mas um
+        mesmo cursor usado por duas threads ao mesmo tempo corrompe o estado
+        do módulo sqlite3 (até segmentation fault). Cada thread recebe o seu.
+        """
+        if not self.conn:
+            return None
+        cursor = getattr(self._cursores, "cursor", None)
+        if cursor is None:
+            cursor = self._cursores.cursor = self.conn.cursor()
+        return cursor
+
+    @cursor.setter
+    def cursor(self, valor: Optional[sqlite3.Cursor]):
+        # Descarta os cursores de todas as threads (nova conexão, restauração ou fechamento)
+        self._cursores = local()
+        if valor is not None:
+            self._cursores.cursor = valor
+
     def __enter__(self):
         """Suporte para uso de context manager (with statement)."""
         return self
@@ -81,30 +216,119 @@ class ExtendedDatabaseManager:
             logger.error(f"Erro durante a transação: {str(e)}")
             raise
             
-    def verificar_integridade(self) -> Tuple[bool, str]:
+    def verificar_integridade(self, completa: bool = False, max_idade_segundos: Optional[float] = None) -> Tuple[bool, str]:
         """
         Verifica a integridade do banco de dados.
 
+        Por padrão executa o PRAGMA quick_check, de custo baixo. A verificação
+        completa (PRAGMA integrity_check) percorre todo o arquivo e é executada
+        pelo worker (tarefa 'integridade'). O resultado é guardado em cache
+        compartilhado pelo processo; o da completa também é gravado em
+        resultados_precomputados, onde os outros processos o leem.
+
+        Args:
+            completa (bool): Se True, executa PRAGMA integrity_check.
+            max_idade_segundos (Optional[float]): Se informado, reaproveita um
+                resultado em cache mais recente que essa idade.
+
         Returns:
             tuple: (sucesso, mensagem)
         """
         if not self.conn:
             return False, "Conexão com o banco de dados não está ativa."
 
+        tipo = "completa" if completa else "rapida"
+        if max_idade_segundos is not None:
+            resultado_cache = self._obter_resultado_integridade(tipo, max_idade_segundos)
+            if resultado_cache:
+                return resultado_cache["sucesso"], resultado_cache["mensagem"]
+
+        pragma = "PRAGMA integrity_check;" if completa else "PRAGMA quick_check;"
+        inicio = time.monotonic()
         try:
-            # Verificação de integridade usando PRAGMA
-            self.cursor.execute("PRAGMA integrity_check;")
-            resultado = self.cursor.fetchone()
-            
+            if self.db_path == ":memory:":
+                with self.lock:
+                    resultado = self.conn.execute(pragma).fetchone()
+            else:
+                # Conexão própria para não competir pelo cursor compartilhado
+                conn = sqlite3.connect(self.db_path, timeout=30.0)
+                try:
+                    resultado = conn.execute(pragma).fetchone()
+                finally:
+                    conn.close()
+
             if resultado and resultado[0].lower() == "ok":
-                return True, "Banco de dados íntegro"
-            return False, f"Problemas de integridade detectados: {resultado[0] if resultado else 'desconhecido'}"
+                sucesso, mensagem = True, "Banco de dados íntegro"
+            else:
+                sucesso, mensagem = False, f"Problemas de integridade detectados: {resultado[0] if resultado else 'desconhecido'}"
         except sqlite3.DatabaseError as db_err:
-            return False, f"Erro de banco de dados ao verificar integridade: {str(db_err)}"
+            sucesso, mensagem = False, f"Erro de banco de dados ao verificar integridade: {str(db_err)}"
         except Exception as e:
             logger.exception("Erro ao verificar integridade do banco")
             return False, f"Erro inesperado ao verificar integridade: {str(e)}"
-            
+
+        self._registrar_resultado_integridade(tipo, sucesso, mensagem, time.monotonic() - inicio)
+        return sucesso, mensagem
+
+    def _registrar_resultado_integridade(self, tipo: str, sucesso: bool, mensagem: str, duracao: float):
+        """Guarda o resultado de uma verificação no cache do processo (e no banco, se completa)."""
+        with _cache_integridade_lock:
+            _cache_integridade.setdefault(str(self.db_path), {})[tipo] = {
+                "sucesso": sucesso,
+                "mensagem": mensagem,
+                "tipo": tipo,
+                "duracao_segundos": duracao,
+                "timestamp": time.time(),
+                "data_hora": datetime.datetime.now(),
+            }
+        if tipo == "completa":
+            self.salvar_resultado_precomputado(
+                CHAVE_INTEGRIDADE_COMPLETA, {"sucesso": sucesso, "mensagem": mensagem, "duracao_segundos": duracao}
+            )
+
+    def _resultados_integridade(self) -> Dict[str, Dict[str, Any]]:
+        """Resultados conhecidos por tipo: cache do processo e verificação completa gravada pelo worker."""
+        with _cache_integridade_lock:
+            resultados = dict(_cache_integridade.get(str(self.db_path), {}))
+        gravado = self.obter_resultado_precomputado(CHAVE_INTEGRIDADE_COMPLETA)
+        if gravado and ("completa" not in resultados
+                        or gravado["gerado_em"].timestamp() > resultados["completa"]["timestamp"]):
+            resultados["completa"] = {
+                **gravado["dados"],
+                "tipo": "completa",
+                "timestamp": gravado["gerado_em"].timestamp(),
+                "data_hora": gravado["gerado_em"],
+            }
+        return resultados
+
+    def _obter_resultado_integridade(self, tipo: str, max_idade_segundos: float) -> Optional[Dict[str, Any]]:
+        """Retorna o resultado em cache do tipo pedido, se for recente o suficiente."""
+        # Uma verificação completa também atende a um pedido de verificação rápida
+        tipos = ("rapida", "completa") if tipo == "rapida" else (tipo,)
+        resultados = self._resultados_integridade()
+        candidatos = [resultados[t] for t in tipos if t in resultados]
+        if not candidatos:
+            return None
+        resultado = max(candidatos, key=lambda r: r["timestamp"])
+        if time.time() - resultado["timestamp"] <= max_idade_segundos:
+            return dict(resultado)
+        return None
+
+    def obter_ultima_verificacao_integridade(self) -> Optional[Dict[str, Any]]:
+        """
+        Obtém o resultado mais recente de verificação de integridade, sem executar nada.
+
+        Inclui a verificação completa gravada pelo worker.
+
+        Returns:
+            Optional[Dict[str, Any]]: Dicionário com 'sucesso', 'mensagem', 'tipo',
+            'duracao_segundos' e 'data_hora', ou None se nunca houve verificação.
+        """
+        resultados = list(self._resultados_integridade().values())
+        if not resultados:
+            return None
+        return dict(max(resultados, key=lambda r: r["timestamp"]))
+
     def inicializar_banco(self) -> Tuple[bool, str]:
         """
         Inicializa a estrutura básica do banco de dados.
@@ -113,6 +337,12 @@ class ExtendedDatabaseManager:
             tuple: (sucesso, mensagem)
         """
         try:
+            # auto_vacuum só pode ser definido antes da criação da primeira tabela;
+            # bancos existentes recebem a configuração pela migração da versão 2
+            self.cursor.execute("SELECT COUNT(*) FROM sqlite_master WHERE type = 'table'")
+            if self.cursor.fetchone()[0] == 0:
+                self.cursor.execute("PRAGMA auto_vacuum = INCREMENTAL")
+
             # Criar tabelas básicas
             self.cursor.execute("""
             CREATE TABLE IF NOT EXISTS itens (
@@ -235,6 +465,66 @@ class ExtendedDatabaseManager:
             )
             """)
             
+            # Tabela para resultados pré-calculados pelo worker de manutenção
+            self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS resultados_precomputados (
+                chave TEXT PRIMARY KEY,
+                geracao INTEGER NOT NULL DEFAULT 1,
+                gerado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                dados TEXT NOT NULL
+            )
+            """)
+            
+            # Catálogo de receitas, importado por utils.importador_receitas
+            self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS receitas (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                chave TEXT NOT NULL UNIQUE,
+                titulo TEXT NOT NULL,
+                tempo_preparo INTEGER,
+                porcoes INTEGER,
+                instrucoes TEXT,
+                imagem TEXT,
+                total_ingredientes INTEGER NOT NULL DEFAULT 0,
+                dados TEXT
+            )
+            """)
+
+            self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS receita_ingredientes (
+                receita_id INTEGER NOT NULL,
+                chave TEXT NOT NULL,
+                posicao INTEGER NOT NULL DEFAULT 0,
+                nome TEXT NOT NULL,
+                quantidade REAL,
+                unidade TEXT,
+                PRIMARY KEY (receita_id, chave),
+                FOREIGN KEY (receita_id) REFERENCES receitas (id) ON DELETE CASCADE
+            ) WITHOUT ROWID
+            """)
+            
+            # Tabelas de acompanhamento do worker de manutenção
+            self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS worker_heartbeat (
+                worker_id TEXT PRIMARY KEY,
+                pid INTEGER,
+                host TEXT,
+                iniciado_em TIMESTAMP,
+                ultimo_heartbeat TIMESTAMP
+            )
+            """)
+            
+            self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS worker_execucoes (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                tarefa TEXT NOT NULL,
+                inicio TIMESTAMP NOT NULL,
+                duracao_segundos REAL NOT NULL,
+                sucesso INTEGER NOT NULL,
+                mensagem TEXT
+            )
+            """)
+            
             # Criar alias para compatibilidade com testes
             self.cursor.execute("""
             CREATE VIEW IF NOT EXISTS inventario AS
@@ -251,11 +541,177 @@ class ExtendedDatabaseManager:
             self._criar_indices()
             
             self.conn.commit()
+
+            # Aplicar migrações pendentes e registrar a versão do schema
+            self._aplicar_migracoes()
             return True, "Banco de dados inicializado com sucesso"
         except sqlite3.Error as e:
             logger.error(f"Erro ao inicializar banco de dados: {str(e)}")
             return False, f"Erro ao inicializar banco de dados: {str(e)}"
 
+    def _aplicar_migracoes(self):
+        """
+        Aplica, em ordem, as migrações com versão maior que o PRAGMA user_version
+        do banco, gravando a nova versão após cada uma.
+        """
+        versao = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        for versao_destino, nome_metodo in MIGRACOES:
+            if versao_destino <= versao:
+                continue
+            logger.info(f"Aplicando migração para a versão {versao_destino} do schema...")
+            getattr(self, nome_metodo)()
+            self.conn.execute(f"PRAGMA user_version = {versao_destino}")
+            self.conn.commit()
+            versao = versao_destino
+        if versao < VERSAO_SCHEMA:
+            self.conn.execute(f"PRAGMA user_version = {VERSAO_SCHEMA}")
+            self.conn.commit()
+
+    def _migracao_auto_vacuum_incremental(self):
+        """
+        Migração 2: habilita auto_vacuum=INCREMENTAL para que o espaço livre possa
+        ser recuperado aos poucos com PRAGMA incremental_vacuum. Em bancos já
+        existentes a mudança exige um VACUUM completo, executado uma única vez.
+        """
+        if self.conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2:
+            return
+        self.conn.commit()
+        self.conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        self.conn.execute("VACUUM")
+
+    def _migracao_triagem_restricoes(self):
+        """
+        Migração 3: colunas e gatilhos da triagem de restrições.
+
+        - itens.ingredientes: texto livre com a lista de ingredientes.
+        - itens.restricoes_detectadas: substâncias encontradas na última triagem
+          (NULL quando nenhuma).
+        - itens.triagem_pendente: 1 quando o item precisa ser triado de novo.
+          Gatilhos marcam o item ao mudar nome/ingredientes e marcam todos os
+          itens quando as restrições mudam.
+        """
+        colunas = {row[1] for row in self.conn.execute("PRAGMA table_info(itens)")}
+        for coluna, definicao in (
+            ("ingredientes", "TEXT"),
+            ("restricoes_detectadas", "TEXT"),
+            ("triagem_pendente", "INTEGER DEFAULT 1"),
+        ):
+            if coluna not in colunas:
+                self.conn.execute(f"ALTER TABLE itens ADD COLUMN {coluna} {definicao}")
+
+        self.conn.executescript("""
+        CREATE INDEX IF NOT EXISTS idx_itens_triagem_pendente ON itens (triagem_pendente) WHERE triagem_pendente = 1;
+        CREATE INDEX IF NOT EXISTS idx_itens_compatibilidade ON itens (compatibilidade_thomas, para_thomas);
+
+        CREATE TRIGGER IF NOT EXISTS trg_itens_triagem_update
+        AFTER UPDATE OF nome, ingredientes ON itens
+        BEGIN
+            UPDATE itens SET triagem_pendente = 1 WHERE id = NEW.id;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_restricoes_triagem_insert
+        AFTER INSERT ON restricoes_thomas
+        BEGIN
+            UPDATE itens SET triagem_pendente = 1;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_restricoes_triagem_update
+        AFTER UPDATE ON restricoes_thomas
+        BEGIN
+            UPDATE itens SET triagem_pendente = 1;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_restricoes_triagem_delete
+        AFTER DELETE ON restricoes_thomas
+        BEGIN
+            UPDATE itens SET triagem_pendente = 1;
+        END;
+        """)
+
+    def _migracao_densidade_nutricional(self):
+        """
+        Migração 4: nutricional.densidade_g_ml, usada com peso_por_unidade para
+        converter volume e contagem em gramas (ver utils.unidades). Bancos
+        antigos também não têm peso_por_unidade.
+        """
+        colunas = {row[1] for row in self.conn.execute("PRAGMA table_info(nutricional)")}
+        for coluna in ("peso_por_unidade", "densidade_g_ml"):
+            if coluna not in colunas:
+                self.conn.execute(f"ALTER TABLE nutricional ADD COLUMN {coluna} REAL DEFAULT NULL")
+
+    def _migracao_pontuacao(self):
+        """
+        Migração 5: tabela de descartes e contadores de pontuação por mês.
+
+        pontuacao_periodo guarda, por mês ('AAAA-MM') e métrica, a soma dos
+        eventos: gatilhos em consumo, historico_precos e descartes atualizam
+        os contadores no momento do evento, e registrar_vencimentos soma os
+        itens que venceram com estoque. O histórico existente é contado uma
+        única vez aqui.
+
+        Bancos antigos podem não ter itens.custo_unitario nem
+        historico_precos.quantidade_comprada, usadas pelos gatilhos. Tudo
+        roda em uma única transação (confirmada junto com o user_version em
+        _aplicar_migracoes), então uma falha não deixa gatilhos para trás.
+        """
+        upsert = "ON CONFLICT (periodo, metrica) DO UPDATE SET valor = valor + excluded.valor"
+        comandos = []
+        colunas_necessarias = (("itens", "custo_unitario", "REAL"),
+                               ("historico_precos", "quantidade_comprada", "REAL"))
+        for tabela, coluna, definicao in colunas_necessarias:
+            colunas = {row[1] for row in self.conn.execute(f"PRAGMA table_info({tabela})")}
+            if coluna not in colunas:
+                comandos.append(f"ALTER TABLE {tabela} ADD COLUMN {coluna} {definicao}")
+
+        comandos += [
+            """
+            CREATE TABLE IF NOT EXISTS descartes (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                item_id INTEGER NOT NULL,
+                quantidade REAL NOT NULL,
+                valor REAL NOT NULL DEFAULT 0,
+                motivo TEXT NOT NULL DEFAULT 'descartado',
+                data_descarte DATE DEFAULT CURRENT_DATE,
+                FOREIGN KEY (item_id) REFERENCES itens(id)
+            )
+            """,
+            "CREATE INDEX IF NOT EXISTS idx_descartes_data ON descartes (data_descarte)",
+            """
+            CREATE TABLE IF NOT EXISTS pontuacao_periodo (
+                periodo TEXT NOT NULL,
+                metrica TEXT NOT NULL,
+                valor REAL NOT NULL DEFAULT 0,
+                PRIMARY KEY (periodo, metrica)
+            ) WITHOUT ROWID
+            """,
+        ]
+        for gatilho, tabela, modelo in (("trg_consumo_pontuacao", "consumo", _EVENTOS_CONSUMO),
+                                        ("trg_compra_pontuacao", "historico_precos", _EVENTOS_COMPRA),
+                                        ("trg_descarte_pontuacao", "descartes", _EVENTOS_DESCARTE)):
+            comandos.append(f"""
+            CREATE TRIGGER IF NOT EXISTS {gatilho}
+            AFTER INSERT ON {tabela}
+            BEGIN
+                INSERT INTO pontuacao_periodo (periodo, metrica, valor) {_eventos_sql(modelo, "NEW")} {upsert};
+            END
+            """)
+        for modelo, fonte in ((_EVENTOS_CONSUMO, "consumo c, "), (_EVENTOS_COMPRA, "historico_precos c, ")):
+            comandos.append(f"""
+            INSERT INTO pontuacao_periodo (periodo, metrica, valor)
+            SELECT periodo, metrica, SUM(valor) FROM ({_eventos_sql(modelo, "c", fonte)})
+            GROUP BY periodo, metrica
+            {upsert}
+            """)
+
+        if not self.conn.in_transaction:
+            self.conn.execute("BEGIN")
+        try:
+            for comando in comandos:
+                self.conn.execute(comando)
+        except sqlite3.Error:
+            self.conn.rollback()
+            raise
+
     def _criar_indices(self):
         """Cria os índices necessários para melhorar a performance do banco de dados."""
         try:
@@ -276,11 +732,17 @@ class ExtendedDatabaseManager:
             self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_historico_precos_item_id ON historico_precos (item_id)")
             self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_historico_precos_data ON historico_precos (data_compra)")
             
+            # Índice para a busca de receitas por ingrediente disponível
+            self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_receita_ingredientes_chave ON receita_ingredientes (chave, receita_id)")
+            
+            # Índice para consultas de execuções do worker
+            self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_worker_execucoes_tarefa ON worker_execucoes (tarefa, inicio)")
+            
             logger.info("Índices criados com sucesso.")
         except sqlite3.Error as e:
             logger.error(f"Erro ao criar índices: {str(e)}")
 
-    def adicionar_item(self, nome: str, categoria: str, quantidade: float, unidade: str, validade: Optional[datetime.date], localizacao: str, custo_unitario: float = 0.0, para_thomas: bool = False, contem_leite: bool = False) -> int:
+    def adicionar_item(self, nome: str, categoria: str, quantidade: float, unidade: str, validade: Optional[datetime.date], localizacao: str, custo_unitario: float = 0.0, para_thomas: bool = False, contem_leite: bool = False, ingredientes: Optional[str] = None) -> int:
         """
         Adiciona um item ao inventário.
 
@@ -294,6 +756,7 @@ class ExtendedDatabaseManager:
             custo_unitario (float): Custo unitário do item.
             para_thomas (bool): Indica se o item é seguro para Thomás.
             contem_leite (bool): Indica se o item contém leite.
+            ingredientes (Optional[str]): Lista de ingredientes, usada na triagem de restrições.
 
         Returns:
             int: ID do item adicionado.
@@ -309,10 +772,10 @@ class ExtendedDatabaseManager:
             with self.transaction() as cursor:
                 cursor.execute(
                     """
-                    INSERT INTO itens (nome, categoria, quantidade, unidade, validade, localizacao, custo_unitario, para_thomas, contem_leite)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    INSERT INTO itens (nome, categoria, quantidade, unidade, validade, localizacao, custo_unitario, para_thomas, contem_leite, ingredientes)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                     """,
-                    (nome, categoria, quantidade, unidade, validade, localizacao, custo_unitario, para_thomas, contem_leite)
+                    (nome, categoria, quantidade, unidade, validade, localizacao, custo_unitario, para_thomas, contem_leite, ingredientes)
                 )
                 return cursor.lastrowid
         except sqlite3.Error as e:
@@ -588,7 +1051,8 @@ class ExtendedDatabaseManager:
                 n.vitamina_d_mcg,
                 n.acucar_100g,
                 n.sodio_100g,
-                n.peso_por_unidade
+                n.peso_por_unidade,
+                n.densidade_g_ml
             FROM consumo c
             JOIN itens i ON c.item_id = i.id
             LEFT JOIN nutricional n ON c.item_id = n.item_id
@@ -611,46 +1075,14 @@ class ExtendedDatabaseManager:
             df_resultado['Data'] = pd.to_datetime(df['data_consumo'])
             df_resultado['Quantidade'] = df['quantidade_consumida']
             
-            # Calcular nutrientes com base nas regras de unidade
-            for row_idx, row in df.iterrows():
-                quantidade = row['quantidade_consumida']
-                unidade = str(row['unidade']).lower() if row['unidade'] is not None else ''
-                peso_por_unidade = row['peso_por_unidade']
-                
-                # Determinar o fator multiplicador
-                fator = 0.0
-                
-                # Caso 1: Se há peso_por_unidade definido e unidade é 'unidade'
-                if unidade in ['unidade', 'unidades', 'unid', 'und', 'un', ''] and peso_por_unidade:
-                    fator = (quantidade * peso_por_unidade) / 100.0
-                # Caso 2: Se a unidade já é peso/volume
-                elif unidade in ['g', 'gramas', 'gr', 'grama', 'ml', 'mililitros', 'mililitro']:
-                    fator = quantidade / 100.0
-                # Caso 3: Se é unidade mas não temos peso_por_unidade
-                elif unidade in ['unidade', 'unidades', 'unid', 'und', 'un', '']:
-                    fator = quantidade
-                
-                # Calcular valores nutricionais
-                colunas = {
-                    'calorias_100g': 'Calorias (kcal)',
-                    'proteinas_g': 'Proteínas (g)',
-                    'carboidratos_g': 'Carboidratos (g)',
-                    'gorduras_g': 'Gorduras (g)',
-                    'fibras_g': 'Fibras (g)',
-                    'calcio_mg': 'Cálcio (mg)',
-                    'ferro_mg': 'Ferro (mg)',
-                    'vitamina_a_mcg': 'Vitamina A (mcg)',
-                    'vitamina_c_mg': 'Vitamina C (mg)',
-                    'vitamina_d_mcg': 'Vitamina D (mcg)',
-                    'acucar_100g': 'Açúcar (g)',
-                    'sodio_100g': 'Sódio (g)'
-                }
-                
-                for col_db, col_res in colunas.items():
-                    if col_db in row and pd.notna(row[col_db]):
-                        if col_res not in df_resultado.columns:
-                            df_resultado[col_res] = 0.0
-                        df_resultado.loc[row_idx, col_res] = float(row[col_db]) * fator
+            fator = _fator_nutricional(df['quantidade_consumida'], df['unidade'],
+                                       df['peso_por_unidade'], df['densidade_g_ml'])
+            
+            # Calcular valores nutricionais
+            for col_db, col_res in COLUNAS_NUTRIENTES.items():
+                valores = pd.to_numeric(df[col_db], errors='coerce')
+                if valores.notna().any():
+                    df_resultado[col_res] = valores.fillna(0.0) * fator
             
             return df_resultado
             
@@ -724,8 +1156,15 @@ class ExtendedDatabaseManager:
             # Cria diretórios para o backup se necessário
             os.makedirs(os.path.dirname(os.path.abspath(caminho_backup)), exist_ok=True)
             
-            # Copia o arquivo do banco
-            shutil.copy2(self.db_path, caminho_backup)
+            # Copia consistente pela API de backup (inclui páginas ainda no WAL)
+            destino = sqlite3.connect(caminho_backup)
+            try:
+                with self.lock:
+                    self.conn.backup(destino)
+                # O arquivo de backup deve ser autocontido, sem depender de -wal/-shm
+                destino.execute("PRAGMA journal_mode = DELETE")
+            finally:
+                destino.close()
             
             logger.info(f"Backup do banco criado em: {caminho_backup}")
             return True, f"Backup criado com sucesso em: {caminho_backup}"
@@ -734,6 +1173,99 @@ class ExtendedDatabaseManager:
             logger.exception(f"Erro ao criar backup:")
             return False, f"Erro ao criar backup: {str(e)}"
 
+    @staticmethod
+    def validar_backup(caminho_backup: str) -> Tuple[bool, str]:
+        """
+        Valida um arquivo de backup antes da restauração.
+
+        O arquivo é aberto somente para leitura e precisa passar no
+        PRAGMA quick_check, ter versão de schema compatível e conter
+        as tabelas essenciais do sistema.
+
+        Args:
+            caminho_backup (str): Caminho do arquivo .db a ser validado.
+
+        Returns:
+            Tuple[bool, str]: (valido, mensagem)
+        """
+        if not caminho_backup or not os.path.isfile(caminho_backup):
+            return False, "Arquivo de backup não encontrado."
+
+        uri = Path(caminho_backup).absolute().as_uri() + "?mode=ro"
+        conn = None
+        try:
+            conn = sqlite3.connect(uri, uri=True)
+
+            resultado = conn.execute("PRAGMA quick_check").fetchone()
+            if not resultado or resultado[0].lower() != "ok":
+                return False, f"Backup danificado: {resultado[0] if resultado else 'desconhecido'}"
+
+            versao = conn.execute("PRAGMA user_version").fetchone()[0]
+            if versao > VERSAO_SCHEMA:
+                return False, f"Backup de versão mais recente ({versao}) que a suportada ({VERSAO_SCHEMA})."
+
+            tabelas = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+            faltantes = [t for t in TABELAS_ESSENCIAIS if t not in tabelas]
+            if faltantes:
+                return False, f"Backup incompleto, tabelas ausentes: {', '.join(faltantes)}"
+
+            return True, f"Backup válido (versão do schema: {versao})"
+        except sqlite3.DatabaseError as e:
+            return False, f"Arquivo não é um banco de dados válido: {str(e)}"
+        finally:
+            if conn:
+                conn.close()
+
+    def restaurar_de_backup(self, caminho_backup: str) -> Tuple[bool, str]:
+        """
+        Restaura o banco de dados ativo a partir de um arquivo de backup.
+
+        O conteúdo do backup é copiado para a conexão ativa com a API de
+        backup do SQLite, sob o lock de escrita, de modo que o gerenciador
+        continua válido e as sessões passam a ver os dados restaurados sem
+        reiniciar o processo.
+
+        Args:
+            caminho_backup (str): Caminho do arquivo .db de backup.
+
+        Returns:
+            Tuple[bool, str]: (sucesso, mensagem)
+        """
+        if not self.conn:
+            return False, "Conexão com o banco de dados não está ativa."
+
+        valido, msg_validacao = self.validar_backup(caminho_backup)
+        if not valido:
+            return False, msg_validacao
+
+        uri = Path(caminho_backup).absolute().as_uri() + "?mode=ro"
+        origem = None
+        try:
+            with self.lock:
+                # A conexão de destino não pode ter transação aberta durante a cópia
+                self.conn.commit()
+
+                origem = sqlite3.connect(uri, uri=True)
+                origem.backup(self.conn)
+
+                # Recriar o cursor e completar tabelas/índices de backups mais antigos
+                self.cursor = self.conn.cursor()
+                sucesso, msg = self.inicializar_banco()
+                if not sucesso:
+                    return False, f"Backup restaurado, mas falhou ao atualizar o schema: {msg}"
+
+            logger.info(f"Banco de dados restaurado a partir de: {caminho_backup}")
+            return True, "Banco de dados restaurado com sucesso."
+        except sqlite3.Error as e:
+            logger.error(f"Erro de SQLite ao restaurar backup '{caminho_backup}': {str(e)}")
+            return False, f"Erro de banco de dados ao restaurar backup: {str(e)}"
+        except Exception as e:
+            logger.exception(f"Erro inesperado ao restaurar backup '{caminho_backup}':")
+            return False, f"Erro inesperado ao restaurar backup: {str(e)}"
+        finally:
+            if origem:
+                origem.close()
+
     def obter_historico_precos_por_nome(self, nome_item: str) -> pd.DataFrame:
         """
         Obtém o histórico de preços para um item específico pelo nome.
@@ -877,28 +1409,139 @@ class ExtendedDatabaseManager:
             logger.exception("Erro ao calcular estatísticas de preço:")
             return pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
 
-    def obter_sugestoes_compra(self, limite_quantidade: float = 1.0) -> pd.DataFrame:
+    def obter_precos_por_local(self, nomes: Optional[List[str]] = None, criterio: str = "recente",
+                               periodo_dias: Optional[int] = None) -> pd.DataFrame:
+        """
+        Obtém um preço por item e local de compra a partir do histórico.
+
+        Args:
+            nomes (Optional[List[str]]): Itens a consultar (comparação sem
+                diferenciar maiúsculas); todos se None.
+            criterio (str): "recente" (último preço registrado em cada local) ou
+                "media" (média dos preços no período).
+            periodo_dias (Optional[int]): Considera apenas compras dos últimos N dias.
+
+        Returns:
+            pd.DataFrame: Colunas 'nome_item' (em minúsculas), 'local_compra',
+            'preco' e 'data_compra' (última compra no local).
+        """
+        import json
+        if not self.conn:
+            logger.error("Conexão com o banco de dados não está ativa.")
+            return pd.DataFrame()
+        if criterio not in ("recente", "media"):
+            raise ValueError("criterio deve ser 'recente' ou 'media'")
+
+        filtros, params = ["hp.local_compra IS NOT NULL", "hp.local_compra != ''"], []
+        if nomes is not None:
+            filtros.append("lower(i.nome) IN (SELECT value FROM json_each(?))")
+            params.append(json.dumps(sorted({nome.lower() for nome in nomes})))
+        if periodo_dias is not None:
+            filtros.append("hp.data_compra >= ?")
+            params.append((datetime.date.today() - datetime.timedelta(days=periodo_dias)).isoformat())
+        where = " AND ".join(filtros)
+
+        if criterio == "recente":
+            query = f"""
+            SELECT nome_item, local_compra, valor_unitario AS preco, data_compra
+            FROM (
+                SELECT lower(i.nome) AS nome_item, hp.local_compra, hp.valor_unitario, hp.data_compra,
+                       ROW_NUMBER() OVER (
+                           PARTITION BY lower(i.nome), hp.local_compra
+                           ORDER BY hp.data_compra DESC, hp.id DESC
+                       ) AS ordem
+                FROM historico_precos hp
+                JOIN itens i ON hp.item_id = i.id
+                WHERE {where}
+            )
+            WHERE ordem = 1
+            """
+        else:
+            query = f"""
+            SELECT lower(i.nome) AS nome_item, hp.local_compra, AVG(hp.valor_unitario) AS preco,
+                   MAX(hp.data_compra) AS data_compra
+            FROM historico_precos hp
+            JOIN itens i ON hp.item_id = i.id
+            WHERE {where}
+            GROUP BY lower(i.nome), hp.local_compra
+            """
+        try:
+            return pd.read_sql_query(query + " ORDER BY 1, 2", self.conn, params=params)
+        except Exception as e:
+            logger.error(f"Erro ao obter preços por local: {str(e)}")
+            return pd.DataFrame()
+
+    def obter_consumo_desde(self, apos_id: int = 0) -> pd.DataFrame:
+        """
+        Obtém os registros de consumo com id maior que o informado.
+
+        Args:
+            apos_id (int): Último id já processado.
+
+        Returns:
+            pd.DataFrame: Colunas 'id', 'item_id', 'quantidade' e 'data_consumo', em ordem de id.
+        """
+        if not self.conn:
+            logger.error("Conexão com o banco de dados não está ativa.")
+            return pd.DataFrame()
+        try:
+            return pd.read_sql_query(
+                "SELECT id, item_id, quantidade, data_consumo FROM consumo WHERE id > ? ORDER BY id",
+                self.conn, params=(apos_id,)
+            )
+        except Exception as e:
+            logger.error(f"Erro ao obter consumos desde o id {apos_id}: {str(e)}")
+            return pd.DataFrame()
+
+    def contar_consumo(self, ate_id: Optional[int] = None) -> int:
+        """Número de registros de consumo (apenas com id até ate_id, se informado)."""
+        if not self.conn or not self.cursor:
+            return 0
+        try:
+            if ate_id is None:
+                self.cursor.execute("SELECT COUNT(*) FROM consumo")
+            else:
+                self.cursor.execute("SELECT COUNT(*) FROM consumo WHERE id <= ?", (ate_id,))
+            return self.cursor.fetchone()[0]
+        except sqlite3.Error as e:
+            logger.error(f"Erro ao contar consumos: {str(e)}")
+            return 0
+
+    def obter_sugestoes_compra(self, limite_quantidade: float = 1.0, horizonte_dias: int = 7) -> pd.DataFrame:
         """
-        Obtém sugestões de itens para compra com base em estoque baixo.
+        Obtém sugestões de itens para compra com base na previsão de consumo.
+
+        Sugere os itens que devem acabar dentro do horizonte, segundo a taxa de
+        consumo prevista (ver utils.previsao_consumo), e os que já estão com
+        quantidade até o limite.
 
         Args:
             limite_quantidade (float): Quantidade limite para considerar estoque baixo.
+            horizonte_dias (int): Dias que a compra deve cobrir.
 
         Returns:
-            pd.DataFrame: DataFrame com itens sugeridos para compra.
+            pd.DataFrame: Itens sugeridos (id, nome, quantidade, unidade,
+            categoria, localizacao, taxa_diaria, dias_restantes,
+            data_fim_prevista e quantidade_sugerida), dos que acabam antes.
         """
+        from utils.previsao_consumo import prever_consumo
+
         if not self.conn or not self.cursor:
             logger.error("Conexão com o banco de dados não está ativa.")
             return pd.DataFrame()
 
         try:
-            query = """
-            SELECT id, nome, quantidade, unidade, categoria, localizacao
-            FROM itens
-            WHERE quantidade <= ?
-            ORDER BY quantidade ASC
-            """
-            return pd.read_sql_query(query, self.conn, params=(limite_quantidade,))
+            previsao = prever_consumo(self, horizonte_dias=horizonte_dias)
+            if previsao.empty:
+                return previsao
+            sugestoes = previsao[
+                (previsao["dias_restantes"] <= horizonte_dias) | (previsao["quantidade"] <= limite_quantidade)
+            ]
+            detalhes = pd.read_sql_query("SELECT id, categoria, localizacao FROM itens", self.conn)
+            sugestoes = sugestoes.merge(detalhes, on="id", how="left")
+            colunas = ["id", "nome", "quantidade", "unidade", "categoria", "localizacao",
+                       "taxa_diaria", "dias_restantes", "data_fim_prevista", "quantidade_sugerida"]
+            return sugestoes[colunas].reset_index(drop=True)
         except sqlite3.Error as e:
             logger.error(f"Erro ao obter sugestões de compra: {str(e)}")
             return pd.DataFrame()
@@ -906,6 +1549,33 @@ class ExtendedDatabaseManager:
             logger.exception("Erro inesperado ao obter sugestões de compra:")
             return pd.DataFrame()
 
+    def obter_risco_desperdicio(self, horizonte_dias: Optional[int] = 7) -> pd.DataFrame:
+        """
+        Obtém os itens que devem sobrar na validade e o valor em risco de cada um.
+
+        Args:
+            horizonte_dias (Optional[int]): Considera apenas itens que vencem nos
+                próximos N dias (None para todos).
+
+        Returns:
+            pd.DataFrame: Itens com sobra prevista, do maior para o menor valor
+            em risco (ver utils.previsao_consumo.prever_desperdicio).
+        """
+        from utils.previsao_consumo import prever_desperdicio
+
+        if not self.conn or not self.cursor:
+            logger.error("Conexão com o banco de dados não está ativa.")
+            return pd.DataFrame()
+
+        try:
+            return prever_desperdicio(self, horizonte_dias=horizonte_dias)
+        except sqlite3.Error as e:
+            logger.error(f"Erro ao prever desperdício: {str(e)}")
+            return pd.DataFrame()
+        except Exception as e:
+            logger.exception("Erro inesperado ao prever desperdício:")
+            return pd.DataFrame()
+
     def obter_melhor_local_compra(self, nome_item: str) -> Optional[Dict[str, Any]]:
         """
         Determina o melhor local para compra de um item específico.
@@ -1224,6 +1894,876 @@ class ExtendedDatabaseManager:
             logger.exception(f"Erro ao criar alerta nutricional para {nutriente}:")
             return False
 
+    def obter_necessidades_thomas(self) -> List[Dict[str, Any]]:
+        """
+        Obtém as necessidades nutricionais diárias cadastradas para Thomás.
+
+        Returns:
+            List[Dict[str, Any]]: Lista com 'nutriente', 'quantidade_diaria' e 'unidade'.
+        """
+        if not self.conn or not self.cursor:
+            logger.error("Conexão com o banco de dados não está ativa.")
+            return []
+        try:
+            self.cursor.execute(
+                "SELECT nutriente, quantidade_diaria, unidade, idade_meses, peso_kg FROM necessidades_thomas ORDER BY nutriente"
+            )
+            return [dict(row) for row in self.cursor.fetchall()]
+        except sqlite3.Error as e:
+            logger.error(f"Erro ao obter necessidades nutricionais: {str(e)}")
+            return []
+
+    def obter_itens_sem_nutricional(self, apos_id: int = 0, limite: int = 100) -> List[Dict[str, Any]]:
+        """
+        Obtém itens que ainda não têm linha na tabela nutricional, em ordem de id.
+
+        Args:
+            apos_id (int): Retorna apenas itens com id maior (paginação para retomada).
+            limite (int): Número máximo de itens.
+
+        Returns:
+            List[Dict[str, Any]]: Lista com 'id' e 'nome'.
+        """
+        if not self.conn or not self.cursor:
+            return []
+        try:
+            self.cursor.execute(
+                """
+                SELECT i.id, i.nome
+                FROM itens i
+                WHERE i.id > ?
+                  AND NOT EXISTS (SELECT 1 FROM nutricional n WHERE n.item_id = i.id)
+                ORDER BY i.id
+                LIMIT ?
+                """,
+                (apos_id, limite)
+            )
+            return [dict(row) for row in self.cursor.fetchall()]
+        except sqlite3.Error as e:
+            logger.error(f"Erro ao buscar itens sem dados nutricionais: {str(e)}")
+            return []
+
+    def obter_nutricional_por_nome(self, nomes: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Obtém dados nutricionais já cadastrados para outros itens com o mesmo nome.
+
+        Args:
+            nomes (List[str]): Nomes a procurar (comparação sem diferenciar maiúsculas).
+
+        Returns:
+            Dict[str, Dict[str, Any]]: {nome em minúsculas: colunas de nutricional}
+        """
+        if not self.conn or not self.cursor or not nomes:
+            return {}
+        chaves = sorted({nome.lower() for nome in nomes})
+        marcadores = ", ".join("?" * len(chaves))
+        try:
+            self.cursor.execute(
+                f"""
+                SELECT lower(i.nome) AS chave, n.*
+                FROM nutricional n
+                JOIN itens i ON i.id = n.item_id
+                WHERE lower(i.nome) IN ({marcadores})
+                ORDER BY n.item_id DESC
+                """,
+                chaves
+            )
+            resultado = {}
+            for row in self.cursor.fetchall():
+                dados = dict(row)
+                chave = dados.pop("chave")
+                dados.pop("item_id", None)
+                resultado.setdefault(chave, dados)
+            return resultado
+        except sqlite3.Error as e:
+            logger.error(f"Erro ao buscar dados nutricionais por nome: {str(e)}")
+            return {}
+
+    def salvar_nutricional_lote(self, registros: List[Dict[str, Any]]) -> int:
+        """
+        Insere ou atualiza dados nutricionais de vários itens em uma transação.
+
+        Colunas ausentes (ou None) em um registro não sobrescrevem valores já salvos.
+
+        Args:
+            registros (List[Dict[str, Any]]): Dicionários com 'item_id' e colunas de nutricional.
+
+        Returns:
+            int: Número de itens gravados.
+        """
+        if not registros:
+            return 0
+        colunas = [
+            "calorias_100g", "proteinas_g", "carboidratos_g", "gorduras_g", "fibras_g", "calcio_mg",
+            "ferro_mg", "vitamina_a_mcg", "vitamina_c_mg", "vitamina_d_mcg", "acucar_100g", "sodio_100g",
+            "peso_por_unidade",
+        ]
+        atualizacoes = ", ".join(f"{c} = COALESCE(excluded.{c}, {c})" for c in colunas)
+        try:
+            with self.transaction() as cursor:
+                cursor.executemany(
+                    f"""
+                    INSERT INTO nutricional (item_id, {", ".join(colunas)})
+                    VALUES (?, {", ".join("?" * len(colunas))})
+                    ON CONFLICT(item_id) DO UPDATE SET {atualizacoes}
+                    """,
+                    [(r["item_id"], *(r.get(c) for c in colunas)) for r in registros]
+                )
+            return len(registros)
+        except Exception as e:
+            logger.error(f"Erro ao salvar dados nutricionais em lote: {str(e)}")
+            return 0
+
+    def obter_cobertura_nutricional(self) -> Dict[str, Any]:
+        """
+        Calcula quantos itens têm dados nutricionais cadastrados.
+
+        Returns:
+            Dict[str, Any]: 'total_itens', 'com_nutricional' e 'percentual'.
+        """
+        if not self.conn or not self.cursor:
+            return {"total_itens": 0, "com_nutricional": 0, "percentual": 0.0}
+        try:
+            self.cursor.execute(
+                """
+                SELECT COUNT(*) AS total,
+                       SUM(EXISTS (SELECT 1 FROM nutricional n WHERE n.item_id = i.id)) AS com_dados
+                FROM itens i
+                """
+            )
+            row = self.cursor.fetchone()
+            total, com_dados = row["total"], row["com_dados"] or 0
+            return {
+                "total_itens": total,
+                "com_nutricional": com_dados,
+                "percentual": (com_dados / total * 100) if total else 100.0,
+            }
+        except sqlite3.Error as e:
+            logger.error(f"Erro ao calcular cobertura nutricional: {str(e)}")
+            return {"total_itens": 0, "com_nutricional": 0, "percentual": 0.0}
+
+    def salvar_resultado_precomputado(self, chave: str, dados: Any) -> bool:
+        """
+        Salva um resultado pré-calculado, incrementando seu número de geração.
+
+        Args:
+            chave (str): Identificador do resultado.
+            dados (Any): Conteúdo serializável em JSON.
+
+        Returns:
+            bool: True se o resultado foi salvo.
+        """
+        import json
+        try:
+            with self.transaction() as cursor:
+                cursor.execute(
+                    """
+                    INSERT INTO resultados_precomputados (chave, geracao, gerado_em, dados)
+                    VALUES (?, 1, ?, ?)
+                    ON CONFLICT(chave) DO UPDATE SET
+                        geracao = geracao + 1,
+                        gerado_em = excluded.gerado_em,
+                        dados = excluded.dados
+                    """,
+                    (chave, datetime.datetime.now().isoformat(timespec="seconds"), json.dumps(dados, default=str))
+                )
+            return True
+        except Exception as e:
+            logger.error(f"Erro ao salvar resultado pré-calculado '{chave}': {str(e)}")
+            return False
+
+    def obter_resultado_precomputado(self, chave: str, max_idade_segundos: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Obtém um resultado pré-calculado pelo worker.
+
+        Args:
+            chave (str): Identificador do resultado.
+            max_idade_segundos (Optional[float]): Ignora resultados mais antigos que essa idade.
+
+        Returns:
+            Optional[Dict[str, Any]]: Dicionário com 'dados', 'geracao' e 'gerado_em',
+            ou None se não houver resultado válido.
+        """
+        import json
+        if not self.conn or not self.cursor:
+            return None
+        try:
+            self.cursor.execute(
+                "SELECT geracao, gerado_em, dados FROM resultados_precomputados WHERE chave = ?", (chave,)
+            )
+            row = self.cursor.fetchone()
+            if not row:
+                return None
+            gerado_em = datetime.datetime.fromisoformat(row["gerado_em"])
+            if max_idade_segundos is not None and (datetime.datetime.now() - gerado_em).total_seconds() > max_idade_segundos:
+                return None
+            return {"dados": json.loads(row["dados"]), "geracao": row["geracao"], "gerado_em": gerado_em}
+        except (sqlite3.Error, ValueError) as e:
+            logger.error(f"Erro ao obter resultado pré-calculado '{chave}': {str(e)}")
+            return None
+
+    def registrar_heartbeat_worker(self, worker_id: str, iniciado_em: Optional[datetime.datetime] = None) -> bool:
+        """
+        Registra que o worker de manutenção está ativo.
+
+        Args:
+            worker_id (str): Identificador do worker.
+            iniciado_em (Optional[datetime.datetime]): Momento de início do worker.
+
+        Returns:
+            bool: True se o heartbeat foi registrado.
+        """
+        import socket
+        agora = datetime.datetime.now().isoformat(timespec="seconds")
+        try:
+            with self.transaction() as cursor:
+                cursor.execute(
+                    """
+                    INSERT INTO worker_heartbeat (worker_id, pid, host, iniciado_em, ultimo_heartbeat)
+                    VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT(worker_id) DO UPDATE SET
+                        pid = excluded.pid,
+                        host = excluded.host,
+                        iniciado_em = COALESCE(excluded.iniciado_em, iniciado_em),
+                        ultimo_heartbeat = excluded.ultimo_heartbeat
+                    """,
+                    (worker_id, os.getpid(), socket.gethostname(),
+                     iniciado_em.isoformat(timespec="seconds") if iniciado_em else None, agora)
+                )
+            return True
+        except Exception as e:
+            logger.error(f"Erro ao registrar heartbeat do worker: {str(e)}")
+            return False
+
+    def registrar_execucao_tarefa(self, tarefa: str, inicio: datetime.datetime, duracao_segundos: float,
+                                  sucesso: bool, mensagem: str = "") -> bool:
+        """
+        Registra a execução de uma tarefa do worker de manutenção.
+
+        Args:
+            tarefa (str): Nome da tarefa.
+            inicio (datetime.datetime): Momento de início da execução.
+            duracao_segundos (float): Duração da execução.
+            sucesso (bool): Se a tarefa terminou sem erros.
+            mensagem (str): Resumo do resultado ou do erro.
+
+        Returns:
+            bool: True se a execução foi registrada.
+        """
+        try:
+            with self.transaction() as cursor:
+                cursor.execute(
+                    "INSERT INTO worker_execucoes (tarefa, inicio, duracao_segundos, sucesso, mensagem) VALUES (?, ?, ?, ?, ?)",
+                    (tarefa, inicio.isoformat(timespec="seconds"), duracao_segundos, 1 if sucesso else 0, mensagem)
+                )
+            return True
+        except Exception as e:
+            logger.error(f"Erro ao registrar execução da tarefa '{tarefa}': {str(e)}")
+            return False
+
+    def obter_status_worker(self) -> Dict[str, Any]:
+        """
+        Obtém o último heartbeat e a última execução de cada tarefa do worker.
+
+        Returns:
+            Dict[str, Any]: {'heartbeats': [...], 'tarefas': [...]}
+        """
+        if not self.conn or not self.cursor:
+            return {"heartbeats": [], "tarefas": []}
+        try:
+            self.cursor.execute("SELECT * FROM worker_heartbeat ORDER BY ultimo_heartbeat DESC")
+            heartbeats = [dict(row) for row in self.cursor.fetchall()]
+            self.cursor.execute(
+                """
+                SELECT e.tarefa, e.inicio, e.duracao_segundos, e.sucesso, e.mensagem,
+                       s.execucoes, s.duracao_media
+                FROM worker_execucoes e
+                JOIN (
+                    SELECT tarefa, MAX(id) AS ultimo_id, COUNT(*) AS execucoes,
+                           AVG(duracao_segundos) AS duracao_media
+                    FROM worker_execucoes
+                    GROUP BY tarefa
+                ) s ON s.ultimo_id = e.id
+                ORDER BY e.tarefa
+                """
+            )
+            return {"heartbeats": heartbeats, "tarefas": [dict(row) for row in self.cursor.fetchall()]}
+        except sqlite3.Error as e:
+            logger.error(f"Erro ao obter status do worker: {str(e)}")
+            return {"heartbeats": [], "tarefas": []}
+
+    def limpar_execucoes_worker(self, dias: int = 30) -> int:
+        """
+        Remove registros de execução do worker mais antigos que o período informado.
+
+        Args:
+            dias (int): Número de dias a manter.
+
+        Returns:
+            int: Quantidade de registros removidos.
+        """
+        limite = (datetime.datetime.now() - datetime.timedelta(days=dias)).isoformat(timespec="seconds")
+        try:
+            with self.transaction() as cursor:
+                cursor.execute("DELETE FROM worker_execucoes WHERE inicio < ?", (limite,))
+                return cursor.rowcount
+        except Exception as e:
+            logger.error(f"Erro ao limpar execuções do worker: {str(e)}")
+            return 0
+
+    def otimizar_incremental(self, orcamento_segundos: float = 0.5, paginas_por_fatia: int = 256) -> Dict[str, Any]:
+        """
+        Recupera páginas livres e atualiza estatísticas dentro de um orçamento de tempo.
+
+        Args:
+            orcamento_segundos (float): Tempo máximo aproximado a ser gasto.
+            paginas_por_fatia (int): Páginas liberadas por chamada de incremental_vacuum.
+
+        Returns:
+            Dict[str, Any]: Resultado de DatabaseErrorHandler.otimizar_incremental.
+        """
+        from db.error_handler import DatabaseErrorHandler
+
+        if not self.conn:
+            return {"sucesso": False, "paginas_recuperadas": 0, "paginas_livres_restantes": 0,
+                    "tabelas_analisadas": [], "duracao_segundos": 0.0, "concluido": False}
+        with self.lock:
+            return DatabaseErrorHandler.otimizar_incremental(self.conn, orcamento_segundos, paginas_por_fatia)
+
+    def executar_checkpoint_wal(self, modo: str = "TRUNCATE") -> Tuple[bool, str]:
+        """
+        Transfere o conteúdo do WAL para o arquivo principal do banco.
+
+        Args:
+            modo (str): PASSIVE, FULL, RESTART ou TRUNCATE.
+
+        Returns:
+            Tuple[bool, str]: (sucesso, mensagem)
+        """
+        if not self.conn:
+            return False, "Conexão com o banco de dados não está ativa."
+        if modo not in ("PASSIVE", "FULL", "RESTART", "TRUNCATE"):
+            return False, f"Modo de checkpoint inválido: {modo}"
+        try:
+            with self.lock:
+                ocupado, paginas_wal, paginas_copiadas = self.conn.execute(f"PRAGMA wal_checkpoint({modo})").fetchone()
+            if ocupado:
+                return False, "Checkpoint parcial: banco ocupado por outra conexão"
+            return True, f"Checkpoint concluído ({paginas_copiadas} de {paginas_wal} páginas)"
+        except sqlite3.Error as e:
+            logger.error(f"Erro ao executar checkpoint do WAL: {str(e)}")
+            return False, f"Erro ao executar checkpoint do WAL: {str(e)}"
+
+    def obter_restricoes_thomas(self, apenas_ativas: bool = True) -> List[Dict[str, Any]]:
+        """
+        Obtém as restrições alimentares de Thomás.
+
+        Args:
+            apenas_ativas (bool): Ignora restrições desativadas.
+
+        Returns:
+            List[Dict[str, Any]]: Restrições com todas as colunas de restricoes_thomas.
+        """
+        if not self.conn or not self.cursor:
+            return []
+        try:
+            filtro = "WHERE ativo = 1" if apenas_ativas else ""
+            self.cursor.execute(f"SELECT * FROM restricoes_thomas {filtro} ORDER BY id")
+            return [dict(row) for row in self.cursor.fetchall()]
+        except sqlite3.Error as e:
+            logger.error(f"Erro ao buscar restrições: {str(e)}")
+            return []
+
+    def obter_itens_para_triagem(self, completa: bool = False) -> List[Dict[str, Any]]:
+        """
+        Obtém os itens que precisam passar pela triagem de restrições.
+
+        Args:
+            completa (bool): Retorna todos os itens, não apenas os pendentes.
+
+        Returns:
+            List[Dict[str, Any]]: Itens com 'id', 'nome', 'ingredientes',
+            'contem_leite', 'compatibilidade_thomas' e 'restricoes_detectadas'.
+        """
+        if not self.conn or not self.cursor:
+            return []
+        try:
+            filtro = "" if completa else "WHERE triagem_pendente = 1"
+            self.cursor.execute(
+                f"""
+                SELECT id, nome, ingredientes, contem_leite, compatibilidade_thomas, restricoes_detectadas
+                FROM itens {filtro}
+                ORDER BY id
+                """
+            )
+            return [dict(row) for row in self.cursor.fetchall()]
+        except sqlite3.Error as e:
+            logger.error(f"Erro ao buscar itens para triagem: {str(e)}")
+            return []
+
+    def salvar_triagem_lote(self, resultados: List[Tuple[int, int, Optional[str], int]]) -> int:
+        """
+        Grava o resultado da triagem de vários itens com um único executemany.
+
+        Args:
+            resultados (List[Tuple]): (compatibilidade_thomas, contem_leite,
+                restricoes_detectadas, item_id) por item.
+
+        Returns:
+            int: Número de itens atualizados.
+        """
+        if not self.conn or not self.cursor or not resultados:
+            return 0
+        try:
+            with self.transaction() as cursor:
+                cursor.executemany(
+                    """
+                    UPDATE itens
+                    SET compatibilidade_thomas = ?, contem_leite = ?, restricoes_detectadas = ?, triagem_pendente = 0
+                    WHERE id = ?
+                    """,
+                    resultados
+                )
+                return cursor.rowcount
+        except sqlite3.Error as e:
+            logger.error(f"Erro ao salvar triagem de restrições: {str(e)}")
+            return 0
+
+    def obter_itens_restritos(self, apenas_para_thomas: bool = False) -> pd.DataFrame:
+        """
+        Obtém os itens marcados como não recomendados pela triagem (consulta indexada).
+
+        Args:
+            apenas_para_thomas (bool): Apenas itens marcados como para Thomás.
+
+        Returns:
+            pd.DataFrame: Itens restritos com as substâncias encontradas.
+        """
+        if not self.conn:
+            logger.error("Conexão com o banco de dados não está ativa.")
+            return pd.DataFrame()
+        query = """
+            SELECT id AS ID, nome AS Nome, categoria AS Categoria, quantidade AS Quantidade,
+                   unidade AS Unidade, localizacao AS Localização, para_thomas AS "Para Thomas",
+                   restricoes_detectadas AS "Restrições Encontradas"
+            FROM itens
+            WHERE compatibilidade_thomas = 1
+        """
+        if apenas_para_thomas:
+            query += " AND para_thomas = 1"
+        query += " ORDER BY para_thomas DESC, nome"
+        try:
+            return pd.read_sql_query(query, self.conn)
+        except Exception as e:
+            logger.error(f"Erro ao buscar itens restritos: {str(e)}")
+            return pd.DataFrame()
+
+    def salvar_receitas_lote(self, receitas: List[Dict[str, Any]]) -> int:
+        """
+        Insere ou substitui várias receitas e seus ingredientes em uma transação.
+
+        Args:
+            receitas (List[Dict[str, Any]]): Dicionários com 'chave', 'titulo',
+                'tempo_preparo', 'porcoes', 'instrucoes', 'imagem', 'dados' e
+                'ingredientes' (lista com 'chave', 'nome', 'quantidade' e 'unidade').
+
+        Returns:
+            int: Número de receitas gravadas.
+        """
+        import json
+        if not self.conn or not self.cursor or not receitas:
+            return 0
+        # Em chaves repetidas no mesmo lote, vale a última receita
+        receitas = list({r["chave"]: r for r in receitas}.values())
+        try:
+            with self.transaction() as cursor:
+                cursor.executemany(
+                    """
+                    INSERT INTO receitas (chave, titulo, tempo_preparo, porcoes, instrucoes, imagem, total_ingredientes, dados)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(chave) DO UPDATE SET
+                        titulo = excluded.titulo,
+                        tempo_preparo = excluded.tempo_preparo,
+                        porcoes = excluded.porcoes,
+                        instrucoes = excluded.instrucoes,
+                        imagem = excluded.imagem,
+                        total_ingredientes = excluded.total_ingredientes,
+                        dados = excluded.dados
+                    """,
+                    [
+                        (r["chave"], r["titulo"], r.get("tempo_preparo"), r.get("porcoes"), r.get("instrucoes"),
+                         r.get("imagem"), len(r["ingredientes"]), r.get("dados"))
+                        for r in receitas
+                    ]
+                )
+                chaves = [r["chave"] for r in receitas]
+                cursor.execute(
+                    "SELECT id, chave FROM receitas WHERE chave IN (SELECT value FROM json_each(?))",
+                    (json.dumps(chaves),)
+                )
+                ids = {row["chave"]: row["id"] for row in cursor.fetchall()}
+                cursor.executemany("DELETE FROM receita_ingredientes WHERE receita_id = ?", [(i,) for i in ids.values()])
+                cursor.executemany(
+                    "INSERT INTO receita_ingredientes (receita_id, chave, posicao, nome, quantidade, unidade) VALUES (?, ?, ?, ?, ?, ?)",
+                    [
+                        (ids[r["chave"]], ing["chave"], posicao, ing["nome"], ing.get("quantidade"), ing.get("unidade"))
+                        for r in receitas for posicao, ing in enumerate(r["ingredientes"])
+                    ]
+                )
+            return len(ids)
+        except sqlite3.Error as e:
+            logger.error(f"Erro ao salvar lote de receitas: {str(e)}")
+            return 0
+
+    def contar_receitas(self) -> int:
+        """Número de receitas no catálogo do banco."""
+        if not self.conn or not self.cursor:
+            return 0
+        try:
+            self.cursor.execute("SELECT COUNT(*) FROM receitas")
+            return self.cursor.fetchone()[0]
+        except sqlite3.Error as e:
+            logger.error(f"Erro ao contar receitas: {str(e)}")
+            return 0
+
+    def buscar_receitas_por_estoque(self, chaves: List[str], limite: int = 5) -> List[Dict[str, Any]]:
+        """
+        Receitas mais cobertas pelos ingredientes disponíveis.
+
+        A cobertura é calculada por uma junção agrupada entre as chaves
+        disponíveis e o índice de receita_ingredientes, sem carregar o catálogo
+        em memória. Empates são resolvidos pelo número de ingredientes
+        disponíveis e depois pelo id.
+
+        Args:
+            chaves (List[str]): Chaves de ingrediente disponíveis (ver
+                utils.catalogo_receitas.chaves_do_estoque).
+            limite (int): Número máximo de receitas.
+
+        Returns:
+            List[Dict[str, Any]]: Colunas de receitas mais 'disponiveis',
+            'cobertura' e 'ingredientes' (lista com 'chave', 'nome',
+            'quantidade', 'unidade' e 'disponivel').
+        """
+        import json
+        if not self.conn or not self.cursor or not chaves:
+            return []
+        try:
+            self.cursor.execute(
+                """
+                WITH estoque(chave) AS (SELECT DISTINCT value FROM json_each(?))
+                SELECT r.*, COUNT(*) AS disponiveis,
+                       CAST(COUNT(*) AS REAL) / r.total_ingredientes AS cobertura
+                FROM estoque e
+                JOIN receita_ingredientes ri ON ri.chave = e.chave
+                JOIN receitas r ON r.id = ri.receita_id
+                GROUP BY r.id
+                ORDER BY cobertura DESC, disponiveis DESC, r.id
+                LIMIT ?
+                """,
+                (json.dumps(sorted(chaves)), limite)
+            )
+            receitas = [dict(row) for row in self.cursor.fetchall()]
+            if not receitas:
+                return []
+
+            disponiveis = set(chaves)
+            por_id = {r["id"]: r for r in receitas}
+            for receita in receitas:
+                receita["ingredientes"] = []
+            self.cursor.execute(
+                f"""
+                SELECT receita_id, chave, nome, quantidade, unidade
+                FROM receita_ingredientes
+                WHERE receita_id IN ({", ".join("?" * len(por_id))})
+                ORDER BY receita_id, posicao
+                """,
+                list(por_id)
+            )
+            for row in self.cursor.fetchall():
+                ingrediente = dict(row)
+                receita_id = ingrediente.pop("receita_id")
+                ingrediente["disponivel"] = ingrediente["chave"] in disponiveis
+                por_id[receita_id]["ingredientes"].append(ingrediente)
+            return receitas
+        except sqlite3.Error as e:
+            logger.error(f"Erro ao buscar receitas por estoque: {str(e)}")
+            return []
+
+    def obter_estoque_nutricional(self) -> pd.DataFrame:
+        """
+        Itens com quantidade em estoque e seus dados nutricionais.
+
+        Returns:
+            pd.DataFrame: Colunas de itens usadas no planejamento (id, nome,
+            quantidade, unidade, validade, custo_unitario,
+            compatibilidade_thomas, restricoes_detectadas) e as colunas da
+            tabela nutricional (NULL quando o item não tem dados).
+        """
+        if not self.conn or not self.cursor:
+            logger.error("Conexão com o banco de dados não está ativa.")
+            return pd.DataFrame()
+        try:
+            return pd.read_sql_query(
+                """
+                SELECT i.id, i.nome, i.quantidade, i.unidade, i.validade, i.custo_unitario,
+                       i.compatibilidade_thomas, i.restricoes_detectadas,
+                       n.calorias_100g, n.proteinas_g, n.carboidratos_g, n.gorduras_g, n.fibras_g,
+                       n.calcio_mg, n.ferro_mg, n.vitamina_a_mcg, n.vitamina_c_mg, n.vitamina_d_mcg,
+                       n.peso_por_unidade, n.densidade_g_ml
+                FROM itens i
+                LEFT JOIN nutricional n ON n.item_id = i.id
+                WHERE i.quantidade > 0
+                ORDER BY i.id
+                """,
+                self.conn
+            )
+        except Exception as e:
+            logger.error(f"Erro ao obter estoque nutricional: {str(e)}")
+            return pd.DataFrame()
+
+    def calcular_resumo_semanal(self, dias: int = 7) -> Dict[str, Any]:
+        """
+        Calcula o resumo dos últimos/próximos dias com consultas agregadas.
+
+        Usado pelo worker para materializar o resumo semanal (ver
+        utils.assistente.gerar_resumo_semanal); cada parte é uma consulta
+        agrupada, sem carregar o inventário ou o histórico de consumo.
+
+        Args:
+            dias (int): Tamanho do período, para trás (consumo e compras) e
+                para frente (vencimentos e sugestões).
+
+        Returns:
+            Dict[str, Any]: 'periodo', 'itens_proximos_vencimento', 'itens_vencidos',
+            'estoque', 'compras', 'consumo', 'consumo_nutricional',
+            'consumo_nutricional_thomas', 'sugestoes_compras' e
+            'desperdicio_previsto'. Vazio se o banco não estiver disponível.
+        """
+        from utils.previsao_consumo import resumir_desperdicio
+
+        if not self.conn or not self.cursor:
+            logger.error("Conexão com o banco de dados não está ativa.")
+            return {}
+
+        hoje = datetime.date.today()
+        inicio, fim = (hoje - datetime.timedelta(days=dias)).isoformat(), (hoje + datetime.timedelta(days=dias)).isoformat()
+        try:
+            self.cursor.execute(
+                """
+                SELECT nome, quantidade, unidade, localizacao, validade,
+                       CAST(julianday(validade) - julianday(?) AS INTEGER) AS dias_ate_vencer
+                FROM itens
+                WHERE quantidade > 0 AND validade IS NOT NULL AND validade BETWEEN ? AND ?
+                ORDER BY validade, nome
+                """,
+                (hoje.isoformat(), hoje.isoformat(), fim)
+            )
+            proximos = [dict(row) for row in self.cursor.fetchall()]
+
+            self.cursor.execute(
+                """
+                SELECT COUNT(*) AS total_itens,
+                       COALESCE(SUM(quantidade <= 0), 0) AS itens_sem_estoque,
+                       COALESCE(SUM(CASE WHEN quantidade > 0 AND validade < ? THEN 1 ELSE 0 END), 0) AS itens_vencidos,
+                       COALESCE(SUM(CASE WHEN quantidade > 0 THEN quantidade * COALESCE(custo_unitario, 0) END), 0) AS valor_estoque
+                FROM itens
+                """,
+                (hoje.isoformat(),)
+            )
+            estoque = dict(self.cursor.fetchone())
+
+            self.cursor.execute(
+                """
+                SELECT COUNT(*) AS registros,
+                       COUNT(DISTINCT item_id) AS itens,
+                       COALESCE(SUM(valor_unitario * COALESCE(quantidade_comprada, 1)), 0) AS gasto
+                FROM historico_precos
+                WHERE data_compra >= ?
+                """,
+                (inicio,)
+            )
+            compras = dict(self.cursor.fetchone())
+
+            consumo = pd.read_sql_query(
+                f"""
+                SELECT c.item_id, i.nome, i.unidade,
+                       COUNT(*) AS registros,
+                       SUM(c.quantidade) AS quantidade,
+                       SUM(CASE WHEN c.para_thomas = 1 THEN c.quantidade ELSE 0 END) AS quantidade_thomas,
+                       {", ".join(f"n.{coluna}" for coluna in COLUNAS_NUTRIENTES)},
+                       n.peso_por_unidade, n.densidade_g_ml
+                FROM consumo c
+                JOIN itens i ON i.id = c.item_id
+                LEFT JOIN nutricional n ON n.item_id = c.item_id
+                WHERE c.data_consumo >= ?
+                GROUP BY c.item_id
+                """,
+                self.conn,
+                params=(inicio,)
+            )
+
+            nutrientes, nutrientes_thomas = {}, {}
+            if not consumo.empty:
+                for coluna_quantidade, destino in (("quantidade", nutrientes), ("quantidade_thomas", nutrientes_thomas)):
+                    fator = _fator_nutricional(consumo[coluna_quantidade], consumo["unidade"],
+                                               consumo["peso_por_unidade"], consumo["densidade_g_ml"])
+                    for col_db, col_res in COLUNAS_NUTRIENTES.items():
+                        valores = pd.to_numeric(consumo[col_db], errors="coerce")
+                        if valores.notna().any():
+                            destino[col_res] = round(float((valores.fillna(0.0) * fator).sum()), 2)
+            # Sem consumo no período o DataFrame vem com dtype object e nlargest falha
+            mais_consumidos = [] if consumo.empty else consumo.nlargest(5, "registros")[
+                ["nome", "registros", "quantidade", "unidade"]].to_dict(orient="records")
+
+            sugestoes = self.obter_sugestoes_compra(horizonte_dias=dias)
+            if not sugestoes.empty:
+                sugestoes = sugestoes[["nome", "quantidade", "unidade", "quantidade_sugerida", "data_fim_prevista"]]
+
+            return {
+                "periodo": {"inicio": inicio, "hoje": hoje.isoformat(), "fim": fim, "dias": dias},
+                "itens_proximos_vencimento": proximos,
+                "itens_vencidos": int(estoque["itens_vencidos"]),
+                "estoque": {chave: (round(float(valor), 2) if chave == "valor_estoque" else int(valor))
+                            for chave, valor in estoque.items() if chave != "itens_vencidos"},
+                "compras": {"registros": int(compras["registros"]), "itens": int(compras["itens"]),
+                            "gasto": round(float(compras["gasto"]), 2)},
+                "consumo": {
+                    "registros": int(consumo["registros"].sum()) if not consumo.empty else 0,
+                    "itens": int(len(consumo)),
+                    "mais_consumidos": mais_consumidos,
+                },
+                "consumo_nutricional": nutrientes,
+                "consumo_nutricional_thomas": nutrientes_thomas,
+                "sugestoes_compras": sugestoes.to_dict(orient="records"),
+                "desperdicio_previsto": resumir_desperdicio(self.obter_risco_desperdicio(horizonte_dias=dias)),
+            }
+        except Exception as e:
+            logger.error(f"Erro ao calcular resumo semanal: {str(e)}")
+            return {}
+
+    def registrar_descarte(self, item_id: int, quantidade: Optional[float] = None, motivo: str = "descartado",
+                           data: Optional[datetime.date] = None) -> Tuple[bool, str]:
+        """
+        Registra o descarte de um item e retira a quantidade do inventário.
+
+        O valor descartado (quantidade × custo unitário) entra nos contadores
+        de pontuação do mês pelo gatilho da tabela descartes.
+
+        Args:
+            item_id (int): ID do item descartado.
+            quantidade (Optional[float]): Quantidade descartada. Se None, descarta todo o estoque.
+            motivo (str): Motivo do descarte (ex.: 'vencido', 'estragado').
+            data (Optional[datetime.date]): Data do descarte. Se None, usa a data atual.
+
+        Returns:
+            Tuple[bool, str]: Sucesso e mensagem de status.
+        """
+        if quantidade is not None and quantidade <= 0:
+            return False, "A quantidade descartada deve ser maior que zero."
+        try:
+            with self.transaction() as cursor:
+                cursor.execute("SELECT quantidade, custo_unitario FROM itens WHERE id = ?", (item_id,))
+                result = cursor.fetchone()
+                if not result:
+                    return False, "Item não encontrado no inventário."
+
+                quantidade_descartar = min(quantidade, result["quantidade"]) if quantidade is not None else result["quantidade"]
+                if quantidade_descartar <= 0:
+                    return False, "Item sem estoque para descartar."
+
+                cursor.execute("UPDATE itens SET quantidade = ? WHERE id = ?",
+                               (result["quantidade"] - quantidade_descartar, item_id))
+                cursor.execute(
+                    "INSERT INTO descartes (item_id, quantidade, valor, motivo, data_descarte) VALUES (?, ?, ?, ?, ?)",
+                    (item_id, quantidade_descartar, quantidade_descartar * (result["custo_unitario"] or 0), motivo,
+                     (data or datetime.date.today()).isoformat())
+                )
+            return True, "Descarte registrado com sucesso e inventário atualizado."
+        except Exception as e:
+            logger.error(f"Erro ao registrar descarte para item_id {item_id}: {str(e)}")
+            return False, f"Erro ao registrar descarte: {str(e)}"
+
+    def registrar_vencimentos(self, hoje: Optional[datetime.date] = None) -> int:
+        """
+        Conta nos contadores de pontuação os itens que venceram com estoque.
+
+        Só considera validades entre a última execução e hoje (exclusive), então
+        cada vencimento é contado uma vez, no mês da validade. Na primeira
+        execução começa pelo primeiro dia do mês atual.
+
+        Args:
+            hoje (Optional[datetime.date]): Data de referência. Se None, usa a data atual.
+
+        Returns:
+            int: Número de itens vencidos contabilizados, ou -1 em caso de erro.
+        """
+        import json
+        hoje = hoje or datetime.date.today()
+        try:
+            with self.transaction() as cursor:
+                cursor.execute("SELECT dados FROM resultados_precomputados WHERE chave = 'vencimentos_contabilizados'")
+                row = cursor.fetchone()
+                desde = json.loads(row["dados"]) if row else hoje.replace(day=1).isoformat()
+                if desde >= hoje.isoformat():
+                    return 0
+
+                cursor.execute(
+                    """
+                    INSERT INTO pontuacao_periodo (periodo, metrica, valor)
+                    SELECT strftime('%Y-%m', i.validade), m.metrica,
+                           SUM(CASE m.metrica WHEN 'vencimentos' THEN 1
+                               ELSE i.quantidade * COALESCE(i.custo_unitario, 0) END)
+                    FROM itens i, (SELECT 'vencimentos' AS metrica UNION ALL SELECT 'valor_vencido') m
+                    WHERE i.quantidade > 0 AND i.validade >= ? AND i.validade < ?
+                    GROUP BY 1, 2
+                    ON CONFLICT (periodo, metrica) DO UPDATE SET valor = valor + excluded.valor
+                    """,
+                    (desde, hoje.isoformat())
+                )
+                cursor.execute("SELECT COUNT(*) FROM itens WHERE quantidade > 0 AND validade >= ? AND validade < ?",
+                               (desde, hoje.isoformat()))
+                contabilizados = cursor.fetchone()[0]
+
+                # Marca d'água na mesma transação (transaction() não é reentrante)
+                cursor.execute(
+                    """
+                    INSERT INTO resultados_precomputados (chave, geracao, gerado_em, dados)
+                    VALUES ('vencimentos_contabilizados', 1, ?, ?)
+                    ON CONFLICT(chave) DO UPDATE SET
+                        geracao = geracao + 1,
+                        gerado_em = excluded.gerado_em,
+                        dados = excluded.dados
+                    """,
+                    (datetime.datetime.now().isoformat(timespec="seconds"), json.dumps(hoje.isoformat()))
+                )
+            return contabilizados
+        except Exception as e:
+            logger.error(f"Erro ao registrar vencimentos: {str(e)}")
+            return -1
+
+    def obter_pontuacao_periodo(self, periodo: Optional[str] = None) -> Dict[str, float]:
+        """
+        Obtém os contadores de pontuação de um mês.
+
+        Args:
+            periodo (Optional[str]): Mês no formato 'AAAA-MM'. Se None, soma todos os meses.
+
+        Returns:
+            Dict[str, float]: Valor de cada métrica (ex.: 'consumos', 'economia', 'valor_descartado').
+        """
+        if not self.conn or not self.cursor:
+            return {}
+        try:
+            if periodo is None:
+                self.cursor.execute("SELECT metrica, SUM(valor) AS valor FROM pontuacao_periodo GROUP BY metrica")
+            else:
+                self.cursor.execute("SELECT metrica, valor FROM pontuacao_periodo WHERE periodo = ?", (periodo,))
+            return {row["metrica"]: float(row["valor"]) for row in self.cursor.fetchall()}
+        except sqlite3.Error as e:
+            logger.error(f"Erro ao obter pontuação do período {periodo}: {str(e)}")
+            return {}
+
     def fechar(self):
         """Fecha a conexão com o banco de dados."""
         if self.conn:
@@ -0,0 +1,227 @@
+"""
+Gerenciador de banco de dados compartilhado pelo processo.
+
+Todas as sessões do Streamlit de um mesmo processo usam um único
+ExtendedDatabaseManager por arquivo de banco. O módulo registra quais
+sessões usam cada instância, verifica periodicamente se a conexão ainda
+responde e, quando é preciso trocá-la, cria uma nova geração sem fechar a
+anterior enquanto alguma sessão ativa ainda depender dela. O Streamlit não
+avisa quando uma sessão termina; sessões sem acesso por
+SESSAO_INATIVA_SEGUNDOS deixam de ser contadas.
+"""
+import atexit
+import logging
+import os
+import sqlite3
+import time
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import Callable, Dict, List, Optional, Any
+
+from .extended_database_manager import ExtendedDatabaseManager
+
+logger = logging.getLogger(__name__)
+
+# Intervalo mínimo entre verificações de saúde da conexão compartilhada
+INTERVALO_VERIFICACAO_SAUDE = 30.0
+# Sessões sem acesso por esse tempo deixam de ser contadas e de segurar gerações aposentadas
+SESSAO_INATIVA_SEGUNDOS = 120.0
+
+
+@dataclass
+class _EntradaGerenciador:
+    """Instância compartilhada e as sessões que a utilizam."""
+    gerenciador: ExtendedDatabaseManager
+    geracao: int
+    criado_em: float = field(default_factory=time.monotonic)
+    ultima_verificacao: float = field(default_factory=time.monotonic)
+    sessoes: Dict[str, float] = field(default_factory=dict)
+
+
+_gerenciadores: Dict[str, _EntradaGerenciador] = {}
+_aposentados: List[_EntradaGerenciador] = []
+_lock = Lock()
+# Um lock de criação por banco: só quem espera pelo mesmo banco aguarda a fábrica
+_locks_criacao: Dict[str, Lock] = {}
+
+
+def _chave(db_path) -> str:
+    return str(db_path) if str(db_path) == ":memory:" else os.path.abspath(str(db_path))
+
+
+def _conexao_saudavel(gerenciador: ExtendedDatabaseManager) -> bool:
+    """Verifica se a conexão do gerenciador ainda responde."""
+    if not gerenciador.conn:
+        return False
+    try:
+        with gerenciador.lock:
+            gerenciador.conn.execute("SELECT 1").fetchone()
+        return True
+    except sqlite3.Error as e:
+        logger.warning(f"Conexão compartilhada com {gerenciador.db_path} não responde: {str(e)}")
+        return False
+
+
+def _criar_entrada(db_path, fabrica: Callable, geracao: int) -> Optional[_EntradaGerenciador]:
+    gerenciador = fabrica(db_path)
+    if gerenciador is None or not gerenciador.conn:
+        return None
+    logger.info(f"Gerenciador compartilhado criado para {db_path} (geração {geracao})")
+    return _EntradaGerenciador(gerenciador=gerenciador, geracao=geracao)
+
+
+def _aposentar(entrada: _EntradaGerenciador):
+    """Move uma entrada para a lista de aposentadas; é fechada quando ninguém mais a usa."""
+    _aposentados.append(entrada)
+
+
+def _remover_sessoes_inativas(entrada: _EntradaGerenciador, agora: float):
+    """Esquece as sessões sem acesso há mais de SESSAO_INATIVA_SEGUNDOS."""
+    entrada.sessoes = {s: t for s, t in entrada.sessoes.items() if agora - t < SESSAO_INATIVA_SEGUNDOS}
+
+
+def _fechar_aposentados(agora: float):
+    """Remove sessões inativas e fecha as gerações aposentadas sem sessões ativas."""
+    for entrada in _gerenciadores.values():
+        _remover_sessoes_inativas(entrada, agora)
+    for entrada in list(_aposentados):
+        _remover_sessoes_inativas(entrada, agora)
+        if not entrada.sessoes:
+            entrada.gerenciador.fechar()
+            _aposentados.remove(entrada)
+            logger.info(f"Gerenciador de {entrada.gerenciador.db_path} (geração {entrada.geracao}) fechado")
+
+
+def obter_gerenciador(db_path, sessao_id: Optional[str] = None,
+                      fabrica: Callable = ExtendedDatabaseManager) -> Optional[ExtendedDatabaseManager]:
+    """
+    Obtém o gerenciador compartilhado do banco, criando-o na primeira chamada.
+
+    Deve ser chamado a cada execução do script em vez de guardar o gerenciador
+    na sessão, para que todas as sessões passem para uma nova geração quando
+    a instância for substituída.
+
+    Args:
+        db_path: Caminho do banco de dados.
+        sessao_id (Optional[str]): Identificador da sessão que usará o gerenciador.
+        fabrica (Callable): Função que cria o gerenciador a partir do caminho.
+
+    Returns:
+        Optional[ExtendedDatabaseManager]: Gerenciador compartilhado, ou None se
+        não foi possível criá-lo.
+    """
+    chave = _chave(db_path)
+    with _lock:
+        entrada = _gerenciadores.get(chave)
+        lock_criacao = _locks_criacao.setdefault(chave, Lock())
+        agora = time.monotonic()
+        verificar = entrada is not None and agora - entrada.ultima_verificacao >= INTERVALO_VERIFICACAO_SAUDE
+        if verificar:
+            entrada.ultima_verificacao = agora
+
+    # Verificação de saúde periódica, fora do lock global: ela espera pelo lock
+    # do gerenciador, que uma escrita longa pode segurar. Conexão inválida é
+    # substituída, a menos que outra sessão já tenha feito isso
+    if verificar and not _conexao_saudavel(entrada.gerenciador):
+        with _lock:
+            if _gerenciadores.get(chave) is entrada:
+                del _gerenciadores[chave]
+                _aposentar(entrada)
+        entrada = None
+
+    if entrada is None:
+        # A fábrica roda fora do lock global; outra sessão pode ter criado a
+        # instância enquanto esta esperava pelo lock de criação
+        with lock_criacao:
+            with _lock:
+                entrada = _gerenciadores.get(chave)
+                geracao = max([e.geracao for e in _aposentados if _chave(e.gerenciador.db_path) == chave], default=0) + 1
+            if entrada is None:
+                entrada = _criar_entrada(db_path, fabrica, geracao)
+                if entrada is None:
+                    return None
+                with _lock:
+                    _gerenciadores[chave] = entrada
+
+    agora = time.monotonic()
+    with _lock:
+        # Outra sessão pode ter substituído a instância nesse meio-tempo
+        entrada = _gerenciadores.get(chave, entrada)
+        if sessao_id is not None:
+            # A sessão deixa de segurar as gerações anteriores
+            for aposentado in _aposentados:
+                aposentado.sessoes.pop(sessao_id, None)
+            entrada.sessoes[sessao_id] = agora
+        _fechar_aposentados(agora)
+        return entrada.gerenciador
+
+
+def substituir_gerenciador(db_path, fabrica: Callable = ExtendedDatabaseManager, motivo: str = "") -> Optional[int]:
+    """
+    Substitui o gerenciador compartilhado por uma nova instância.
+
+    A instância anterior continua aberta até que as sessões que a usavam
+    peçam o gerenciador novamente ou fiquem inativas.
+
+    Args:
+        db_path: Caminho do banco de dados.
+        fabrica (Callable): Função que cria o gerenciador a partir do caminho.
+        motivo (str): Motivo registrado no log.
+
+    Returns:
+        Optional[int]: Número da nova geração, ou None se a criação falhou
+        (nesse caso a instância atual é mantida).
+    """
+    chave = _chave(db_path)
+    with _lock:
+        lock_criacao = _locks_criacao.setdefault(chave, Lock())
+    with lock_criacao:
+        with _lock:
+            atual = _gerenciadores.get(chave)
+        nova = _criar_entrada(db_path, fabrica, (atual.geracao if atual else 0) + 1)
+        if nova is None:
+            logger.error(f"Falha ao substituir gerenciador de {db_path}; instância atual mantida")
+            return None
+        with _lock:
+            atual = _gerenciadores.get(chave)
+            if atual:
+                _aposentar(atual)
+            _gerenciadores[chave] = nova
+            logger.info(f"Gerenciador de {db_path} substituído (geração {nova.geracao}). {motivo}".strip())
+            _fechar_aposentados(time.monotonic())
+        return nova.geracao
+
+
+def estatisticas_gerenciadores() -> List[Dict[str, Any]]:
+    """
+    Retorna o estado das instâncias compartilhadas, ativas e aposentadas.
+
+    Returns:
+        List[Dict[str, Any]]: Uma entrada por instância com caminho, geração,
+        sessões, idade e se está ativa.
+    """
+    agora = time.monotonic()
+    with _lock:
+        entradas = [(e, True) for e in _gerenciadores.values()] + [(e, False) for e in _aposentados]
+        return [
+            {
+                "db_path": str(e.gerenciador.db_path),
+                "geracao": e.geracao,
+                "ativo": ativo,
+                "sessoes": len(e.sessoes),
+                "idade_segundos": agora - e.criado_em,
+            }
+            for e, ativo in entradas
+        ]
+
+
+def fechar_todos():
+    """Fecha todas as instâncias compartilhadas (chamado no encerramento do processo)."""
+    with _lock:
+        for entrada in list(_gerenciadores.values()) + _aposentados:
+            entrada.gerenciador.fechar()
+        _gerenciadores.clear()
+        _aposentados.clear()
+
+
+atexit.register(fechar_todos)
@@ -0,0 +1,81 @@
+import itertools
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from db.extended_database_manager import ExtendedDatabaseManager
+from utils.otimizador_compras import otimizar_lojas, planejar_roteiro_compras
+
+
+class TestOtimizadorCompras(unittest.TestCase):
+    """Testes para a escolha de lojas da lista de compras"""
+
+    def test_penalidade_por_loja(self):
+        """Testa a troca entre preço e número de lojas visitadas"""
+        precos = pd.DataFrame([
+            ("arroz", "Mercado A", 10.0), ("feijão", "Mercado A", 9.0), ("café", "Mercado A", 20.0),
+            ("arroz", "Mercado B", 12.0), ("feijão", "Mercado B", 6.0), ("café", "Mercado B", 14.0),
+            ("café", "Atacado", 11.0),
+        ], columns=["nome_item", "local_compra", "preco"])
+        lista = [{"nome": "Arroz", "quantidade": 2}, {"nome": "Feijão"}, {"nome": "Café"}, {"nome": "Sal"}]
+
+        uma_loja = otimizar_lojas(lista, precos, penalidade_por_loja=100)
+        self.assertEqual(uma_loja["lojas"], ["Mercado B"])
+        self.assertEqual(uma_loja["sem_preco"], ["Sal"])
+        self.assertAlmostEqual(uma_loja["custo_itens"], 44.0)
+
+        varias = otimizar_lojas(lista, precos, penalidade_por_loja=1)
+        self.assertEqual(varias["lojas"], ["Atacado", "Mercado A", "Mercado B"])
+        self.assertAlmostEqual(varias["custo_itens"], 37.0)
+        self.assertAlmostEqual(varias["economia_vs_loja_unica"], 7.0)
+        self.assertEqual([i["nome"] for i in varias["divisao"]["Mercado A"]], ["Arroz"])
+
+    def test_resultado_igual_ao_exaustivo(self):
+        """Compara a heurística com a busca exaustiva em instâncias pequenas"""
+        rng = np.random.default_rng(42)
+        for _ in range(5):
+            matriz = rng.uniform(1, 10, (15, 7))
+            matriz[rng.random(matriz.shape) < 0.3] = np.nan
+            matriz[:, 0] = np.where(np.isnan(matriz).all(axis=1), 5.0, matriz[:, 0])
+            precos = pd.DataFrame(
+                [(f"i{i}", f"l{j}", matriz[i, j]) for i, j in zip(*np.where(~np.isnan(matriz)))],
+                columns=["nome_item", "local_compra", "preco"],
+            )
+            lista = [{"nome": f"i{i}"} for i in range(15)]
+            for penalidade in (0, 3, 10):
+                resultado = otimizar_lojas(lista, precos, penalidade)
+                otimo = min(
+                    np.nan_to_num(matriz[:, list(lojas)], nan=1e9).min(axis=1).sum() + penalidade * (len(lojas) - 1)
+                    for k in range(1, 8) for lojas in itertools.combinations(range(7), k)
+                )
+                self.assertAlmostEqual(resultado["custo_total"], otimo, places=6)
+
+    def test_precos_do_historico(self):
+        """Testa o uso do último preço registrado em cada loja"""
+        fd, caminho = tempfile.mkstemp(suffix=".db")
+        try:
+            with ExtendedDatabaseManager(caminho) as db:
+                db.inicializar_banco()
+                item = db.adicionar_item("Leite", "Laticínios", 1, "l", None, "Geladeira")
+                db.conn.executemany(
+                    "INSERT INTO historico_precos (item_id, valor_unitario, data_compra, local_compra) VALUES (?, ?, ?, ?)",
+                    [(item, 4.0, "2026-01-01", "Mercado A"), (item, 6.0, "2026-02-01", "Mercado A"),
+                     (item, 5.0, "2026-01-15", "Mercado B")],
+                )
+                db.conn.commit()
+                self.assertEqual(db.obter_precos_por_local(["leite"])["preco"].tolist(), [6.0, 5.0])
+                self.assertEqual(db.obter_precos_por_local(["leite"], criterio="media")["preco"].tolist(), [5.0, 5.0])
+
+                roteiro = planejar_roteiro_compras(db, [{"nome": "Leite", "quantidade": 2}])
+                self.assertEqual(roteiro["lojas"], ["Mercado B"])
+                self.assertAlmostEqual(roteiro["custo_total"], 10.0)
+        finally:
+            os.close(fd)
+            os.unlink(caminho)
+
+
+if __name__ == '__main__':
+    unittest.main()
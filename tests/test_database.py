@@ -1,11 +1,12 @@
 import os
 import unittest
+import unittest.mock
 import tempfile
 import sqlite3
 from datetime import date, timedelta
 
 # Importe os componentes a serem testados
-from db.extended_database_manager import ExtendedDatabaseManager
+from db.extended_database_manager import ExtendedDatabaseManager, VERSAO_SCHEMA
 from db.error_handler import DatabaseErrorHandler
 
 class TestDatabaseManager(unittest.TestCase):
@@ -190,6 +191,467 @@ class TestDatabaseManager(unittest.TestCase):
         items = self.db_manager.carregar_inventario()
         self.assertEqual(items.iloc[0]['quantidade'], 1.0, "Quantidade não deveria ser alterada")
     
+    def test_restaurar_backup(self):
+        """Testa a restauração em funcionamento a partir de um backup"""
+        self.db_manager.adicionar_item(
+            nome="Arroz", categoria="Grãos", quantidade=2.0, unidade="kg",
+            validade=None, localizacao="Armário"
+        )
+        backup_path = self.temp_db_path + ".bak"
+        self.addCleanup(lambda: os.path.exists(backup_path) and os.unlink(backup_path))
+        sucesso, msg = self.db_manager.criar_backup(backup_path)
+        self.assertTrue(sucesso, msg)
+
+        # Alterar o banco depois do backup
+        self.db_manager.adicionar_item(
+            nome="Feijão", categoria="Grãos", quantidade=1.0, unidade="kg",
+            validade=None, localizacao="Armário"
+        )
+        self.assertEqual(len(self.db_manager.carregar_inventario()), 2)
+
+        # Restaurar sem fechar o gerenciador
+        sucesso, msg = self.db_manager.restaurar_de_backup(backup_path)
+        self.assertTrue(sucesso, msg)
+        items = self.db_manager.carregar_inventario()
+        self.assertEqual(items['nome'].tolist(), ['Arroz'], "Dados do backup não foram restaurados")
+
+        # Outra conexão ao mesmo arquivo enxerga os dados restaurados
+        conn = sqlite3.connect(self.temp_db_path)
+        self.assertEqual(conn.execute("SELECT COUNT(*) FROM itens").fetchone()[0], 1)
+        conn.close()
+
+    def test_restaurar_backup_valida_uma_vez(self):
+        """Testa que a restauração pelo assistente valida o arquivo uma única vez"""
+        from utils.assistente import restaurar_backup
+
+        backup_path = self.temp_db_path + ".bak"
+        self.addCleanup(lambda: os.path.exists(backup_path) and os.unlink(backup_path))
+        sucesso, msg = self.db_manager.criar_backup(backup_path)
+        self.assertTrue(sucesso, msg)
+
+        validar = ExtendedDatabaseManager.validar_backup
+        with unittest.mock.patch.object(ExtendedDatabaseManager, "validar_backup", side_effect=validar) as mock_validar:
+            sucesso, msg = restaurar_backup(backup_path, self.temp_db_path, db=self.db_manager)
+        self.assertTrue(sucesso, msg)
+        self.assertEqual(mock_validar.call_count, 1)
+
+        # A mensagem da validação chega a quem chamou
+        fd, invalido = tempfile.mkstemp(suffix='.db')
+        self.addCleanup(os.unlink, invalido)
+        os.close(fd)
+        sucesso, msg = restaurar_backup(invalido, self.temp_db_path, db=self.db_manager)
+        self.assertFalse(sucesso)
+        self.assertEqual(msg, ExtendedDatabaseManager.validar_backup(invalido)[1])
+
+    def test_restaurar_backup_invalido(self):
+        """Testa que arquivos inválidos são rejeitados sem alterar o banco"""
+        self.db_manager.adicionar_item(
+            nome="Arroz", categoria="Grãos", quantidade=2.0, unidade="kg",
+            validade=None, localizacao="Armário"
+        )
+        fd, invalido = tempfile.mkstemp(suffix='.db')
+        self.addCleanup(os.unlink, invalido)
+        os.write(fd, b"isto nao e um banco sqlite" * 100)
+        os.close(fd)
+
+        sucesso, msg = self.db_manager.restaurar_de_backup(invalido)
+        self.assertFalse(sucesso)
+        self.assertEqual(len(self.db_manager.carregar_inventario()), 1)
+
+        # Banco sem as tabelas do sistema também é rejeitado
+        fd, vazio = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        self.addCleanup(os.unlink, vazio)
+        conn = sqlite3.connect(vazio)
+        conn.execute("CREATE TABLE outra (id INTEGER)")
+        conn.close()
+        valido, msg = ExtendedDatabaseManager.validar_backup(vazio)
+        self.assertFalse(valido)
+        self.assertIn("itens", msg)
+
+    def test_verificacao_integridade_em_cache(self):
+        """Testa que o resultado da verificação é compartilhado e reaproveitado"""
+        sucesso, _ = self.db_manager.verificar_integridade()
+        self.assertTrue(sucesso)
+        ultima = self.db_manager.obter_ultima_verificacao_integridade()
+        self.assertEqual(ultima["tipo"], "rapida")
+
+        # Outro gerenciador do mesmo arquivo enxerga o resultado sem verificar de novo
+        outro = ExtendedDatabaseManager(self.temp_db_path)
+        self.addCleanup(outro.fechar)
+        with unittest.mock.patch("db.extended_database_manager.sqlite3.connect") as mock_connect:
+            sucesso, msg = outro.verificar_integridade(max_idade_segundos=3600)
+        self.assertTrue(sucesso, msg)
+        mock_connect.assert_not_called()
+
+        sucesso, _ = self.db_manager.verificar_integridade(completa=True)
+        self.assertTrue(sucesso)
+        self.assertEqual(outro.obter_ultima_verificacao_integridade()["tipo"], "completa")
+
+    def test_verificacao_completa_gravada_no_banco(self):
+        """Testa que a verificação completa do worker é lida por outros processos"""
+        from db import extended_database_manager as modulo
+
+        sucesso, _ = self.db_manager.verificar_integridade(completa=True)
+        self.assertTrue(sucesso)
+
+        # Outro processo não compartilha o cache em memória
+        with unittest.mock.patch.object(modulo, "_cache_integridade", {}):
+            ultima = self.db_manager.obter_ultima_verificacao_integridade()
+            self.assertEqual((ultima["tipo"], ultima["sucesso"]), ("completa", True))
+            with unittest.mock.patch("db.extended_database_manager.sqlite3.connect") as mock_connect:
+                sucesso, _ = self.db_manager.verificar_integridade(completa=True, max_idade_segundos=3600)
+            self.assertTrue(sucesso)
+            mock_connect.assert_not_called()
+
+    def test_resultado_precomputado(self):
+        """Testa o armazenamento de resultados pré-calculados pelo worker"""
+        self.assertIsNone(self.db_manager.obter_resultado_precomputado("alertas_vencimento:5"))
+        self.assertTrue(self.db_manager.salvar_resultado_precomputado("alertas_vencimento:5", [{"nome": "Leite"}]))
+        self.assertTrue(self.db_manager.salvar_resultado_precomputado("alertas_vencimento:5", [{"nome": "Queijo"}]))
+
+        resultado = self.db_manager.obter_resultado_precomputado("alertas_vencimento:5", max_idade_segundos=60)
+        self.assertEqual(resultado["dados"], [{"nome": "Queijo"}])
+        self.assertEqual(resultado["geracao"], 2)
+
+    def test_otimizacao_incremental(self):
+        """Testa a migração para auto_vacuum incremental e a recuperação de páginas em fatias"""
+        conn = self.db_manager.conn
+        self.assertEqual(conn.execute("PRAGMA auto_vacuum").fetchone()[0], 2)
+        self.assertEqual(conn.execute("PRAGMA user_version").fetchone()[0], VERSAO_SCHEMA)
+
+        conn.execute("CREATE TABLE temporaria (dados TEXT)")
+        conn.executemany("INSERT INTO temporaria VALUES (?)", [("x" * 1000,)] * 500)
+        conn.execute("DROP TABLE temporaria")
+        conn.commit()
+        self.assertGreater(conn.execute("PRAGMA freelist_count").fetchone()[0], 0)
+
+        resultado = self.db_manager.otimizar_incremental(orcamento_segundos=5, paginas_por_fatia=50)
+        self.assertTrue(resultado["sucesso"])
+        self.assertGreater(resultado["paginas_recuperadas"], 0)
+        self.assertEqual(resultado["paginas_livres_restantes"], 0)
+        self.assertIn("itens", resultado["tabelas_analisadas"])
+
+    def test_backfill_nutricional(self):
+        """Testa o preenchimento retomável dos dados nutricionais"""
+        from utils.backfill_nutricional import executar_backfill_nutricional
+
+        ids = [
+            self.db_manager.adicionar_item(nome=nome, categoria="Teste", quantidade=1.0, unidade="kg",
+                                           validade=None, localizacao="Armário")
+            for nome in ["Arroz", "arroz", "Produto Desconhecido"]
+        ]
+        integracao = unittest.mock.MagicMock()
+        integracao.buscar_info_nutricional_lote.side_effect = lambda nomes: {
+            nome: ({"encontrado": True, "calorias": 128, "proteinas": 2.5, "sodio": 1.0} if nome.lower() == "arroz"
+                   else {"encontrado": False})
+            for nome in nomes
+        }
+
+        # Um lote por execução: a segunda continua do checkpoint
+        relatorio = executar_backfill_nutricional(self.db_manager, integracao, tamanho_lote=1, max_lotes=1)
+        self.assertEqual((relatorio["processados"], relatorio["resolvidos"], relatorio["ultimo_id"]), (1, 1, ids[0]))
+        self.assertEqual(relatorio["cobertura_antes"]["com_nutricional"], 0)
+
+        relatorio = executar_backfill_nutricional(self.db_manager, integracao, tamanho_lote=10)
+        self.assertEqual(relatorio["retomado_de"], ids[0])
+        self.assertTrue(relatorio["concluido"])
+        self.assertEqual(relatorio["nao_encontrados"], 1)
+        self.assertEqual(relatorio["cobertura_depois"]["com_nutricional"], 2)
+        # "arroz" reaproveitou os dados de "Arroz" sem nova consulta
+        self.assertEqual(integracao.buscar_info_nutricional_lote.call_args_list[-1].args[0], ["Produto Desconhecido"])
+
+        row = self.db_manager.conn.execute(
+            "SELECT calorias_100g, proteinas_g, sodio_100g FROM nutricional WHERE item_id = ?", (ids[1],)
+        ).fetchone()
+        # Sódio chega em mg (Open Food Facts) e é gravado em gramas
+        self.assertEqual(tuple(row), (128, 2.5, 0.001))
+
+    def test_triagem_restricoes_incremental(self):
+        """Testa a triagem de restrições e a nova triagem apenas dos itens alterados"""
+        from utils.triagem_restricoes import executar_triagem
+
+        db = self.db_manager
+        hoje = date.today()
+        id_biscoito = db.adicionar_item("Biscoito", "Doces", 1, "pacote", hoje, "Armário",
+                                        ingredientes="farinha de trigo, açúcar, caseinato de cálcio")
+        id_arroz = db.adicionar_item("Arroz", "Grãos", 1, "kg", hoje, "Armário")
+        db.conn.execute("INSERT INTO restricoes_thomas (tipo, substancia) VALUES ('intolerância', 'Lactose')")
+        db.conn.commit()
+
+        relatorio = executar_triagem(db)
+        self.assertEqual(relatorio["itens_triados"], 2)
+        self.assertEqual(relatorio["itens_restritos"], 1)
+        restritos = db.obter_itens_restritos()
+        self.assertEqual(restritos["ID"].tolist(), [id_biscoito])
+        self.assertEqual(restritos["Restrições Encontradas"].tolist(), ["Lactose"])
+        leite = db.conn.execute("SELECT contem_leite FROM itens WHERE id = ?", (id_biscoito,)).fetchone()[0]
+        self.assertEqual(leite, 1)
+
+        # Sem alterações, nada é triado de novo
+        self.assertEqual(executar_triagem(db)["itens_triados"], 0)
+
+        # Alterar os ingredientes marca apenas aquele item
+        db.conn.execute("UPDATE itens SET ingredientes = 'farinha de trigo, açúcar' WHERE id = ?", (id_biscoito,))
+        db.conn.commit()
+        self.assertEqual(executar_triagem(db)["itens_triados"], 1)
+        self.assertTrue(db.obter_itens_restritos().empty)
+
+        # Mudar as restrições exige triar o inventário inteiro
+        db.conn.execute("INSERT INTO restricoes_thomas (tipo, substancia) VALUES ('alergia', 'glúten')")
+        db.conn.commit()
+        relatorio = executar_triagem(db)
+        self.assertEqual(relatorio["itens_triados"], 2)
+        self.assertEqual(db.obter_itens_restritos()["ID"].tolist(), [id_biscoito])
+        self.assertNotIn(id_arroz, db.obter_itens_restritos()["ID"].tolist())
+
+    def test_previsao_consumo_incremental(self):
+        """Testa a taxa de consumo prevista e a atualização incremental do estado"""
+        from utils.previsao_consumo import atualizar_estado, prever_consumo
+
+        db = self.db_manager
+        hoje = date.today()
+        id_leite = db.adicionar_item("Leite", "Laticínios", 30, "l", hoje + timedelta(days=30), "Geladeira")
+        id_sal = db.adicionar_item("Sal", "Temperos", 1, "kg", None, "Armário")
+        for dias in range(14):
+            db.registrar_consumo(id_leite, 1, data=hoje - timedelta(days=dias))
+
+        previsao = prever_consumo(db, horizonte_dias=7, hoje=hoje).set_index("id")
+        self.assertAlmostEqual(previsao.loc[id_leite, "taxa_diaria"], 1.0, places=6)
+        self.assertAlmostEqual(previsao.loc[id_leite, "dias_restantes"], 16.0, places=6)
+        self.assertEqual(previsao.loc[id_leite, "data_fim_prevista"], hoje + timedelta(days=16))
+        self.assertEqual(previsao.loc[id_sal, "taxa_diaria"], 0.0)
+        self.assertEqual(previsao.loc[id_sal, "quantidade_sugerida"], 0.0)
+
+        # Sem consumos novos o estado não é relido; consumos novos entram incrementalmente
+        self.assertFalse(atualizar_estado(db, hoje)["recalculo_completo"])
+        db.registrar_consumo(id_sal, 0.1, data=hoje)
+        estado = atualizar_estado(db, hoje)
+        self.assertFalse(estado["recalculo_completo"])
+        self.assertEqual(estado["total_linhas"], 15)
+
+        # Remover um registro antigo exige recalcular tudo
+        db.conn.execute("DELETE FROM consumo WHERE item_id = ? AND data_consumo < ?", (id_leite, hoje.isoformat()))
+        db.conn.commit()
+        estado = atualizar_estado(db, hoje)
+        self.assertTrue(estado["recalculo_completo"])
+        self.assertEqual(estado["total_linhas"], 2)
+
+        sugestoes = db.obter_sugestoes_compra(horizonte_dias=7)
+        self.assertIn(id_sal, sugestoes["id"].tolist())
+
+    def test_risco_desperdicio(self):
+        """Testa a sobra prevista na validade e a ordenação pelo valor em risco"""
+        db = self.db_manager
+        hoje = date.today()
+        id_iogurte = db.adicionar_item("Iogurte", "Laticínios", 24, "unidade", hoje + timedelta(days=4),
+                                       "Geladeira", custo_unitario=3.0)
+        id_queijo = db.adicionar_item("Queijo", "Laticínios", 1, "kg", hoje + timedelta(days=2),
+                                      "Geladeira", custo_unitario=60.0)
+        id_pao = db.adicionar_item("Pão", "Padaria", 2, "unidade", hoje - timedelta(days=1),
+                                   "Armário", custo_unitario=1.5)
+        db.adicionar_item("Arroz", "Grãos", 5, "kg", hoje + timedelta(days=200), "Armário", custo_unitario=6.0)
+        for dias in range(14):
+            db.registrar_consumo(id_iogurte, 1, data=hoje - timedelta(days=dias))
+
+        risco = db.obter_risco_desperdicio(horizonte_dias=7)
+        self.assertEqual(risco["id"].tolist(), [id_queijo, id_iogurte, id_pao])
+        linhas = risco.set_index("id")
+        # 1 iogurte por dia de hoje até a validade (5 dias): sobram 5
+        self.assertAlmostEqual(linhas.loc[id_iogurte, "sobra_prevista"], 5.0, places=6)
+        self.assertAlmostEqual(linhas.loc[id_iogurte, "valor_em_risco"], 15.0)
+        self.assertAlmostEqual(linhas.loc[id_pao, "valor_em_risco"], 3.0)
+        self.assertEqual(linhas.loc[id_queijo, "dias_ate_vencer"], 2)
+        self.assertEqual(len(db.obter_risco_desperdicio(horizonte_dias=None)), 4)
+
+    def test_resumo_semanal_snapshot(self):
+        """Testa o resumo semanal materializado e a leitura do snapshot"""
+        from utils.assistente import atualizar_resumo_semanal, gerar_resumo_semanal
+
+        db = self.db_manager
+        hoje = date.today()
+        id_leite = db.adicionar_item("Leite", "Laticínios", 3, "l", hoje + timedelta(days=3), "Geladeira",
+                                     custo_unitario=5.0)
+        db.adicionar_item("Arroz", "Grãos", 2, "kg", hoje + timedelta(days=90), "Armário", custo_unitario=6.0)
+        db.adicionar_item("Pão", "Padaria", 1, "unidade", hoje - timedelta(days=2), "Armário")
+        db.conn.execute("INSERT INTO nutricional (item_id, proteinas_g, calcio_mg) VALUES (?, 3.2, 120)", (id_leite,))
+        db.conn.commit()
+        db.registrar_consumo(id_leite, 0.5, data=hoje, para_thomas=True)
+        db.registrar_consumo(id_leite, 0.5, data=hoje - timedelta(days=1))
+
+        resumo = gerar_resumo_semanal(db)
+        self.assertEqual(resumo["geracao"], 1)
+        self.assertEqual([i["nome"] for i in resumo["itens_proximos_vencimento"]], ["Leite"])
+        self.assertEqual(resumo["itens_proximos_vencimento"][0]["dias_ate_vencer"], 3)
+        self.assertEqual(resumo["itens_vencidos"], 1)
+        self.assertEqual(resumo["estoque"]["valor_estoque"], 22.0)
+        self.assertEqual(resumo["consumo"]["registros"], 2)
+        # 1 l de leite (densidade padrão 1 g/ml) = 10 × 100 ml; metade para Thomás
+        self.assertAlmostEqual(resumo["consumo_nutricional"]["Proteínas (g)"], 32.0)
+        self.assertAlmostEqual(resumo["consumo_nutricional_thomas"]["Cálcio (mg)"], 600.0)
+        self.assertTrue(resumo["dicas_reaproveitamento"])
+
+        # Com snapshot recente, o resumo é só a leitura da linha
+        with unittest.mock.patch.object(db, "calcular_resumo_semanal") as calcular:
+            self.assertEqual(gerar_resumo_semanal(db)["geracao"], 1)
+            calcular.assert_not_called()
+
+        sucesso, _ = atualizar_resumo_semanal(db)
+        self.assertTrue(sucesso)
+        self.assertEqual(gerar_resumo_semanal(db)["geracao"], 2)
+
+    def test_resumo_semanal_sem_consumo(self):
+        """Testa o resumo semanal de um banco sem consumo no período"""
+        from utils.assistente import atualizar_resumo_semanal, gerar_resumo_semanal
+
+        db = self.db_manager
+        db.adicionar_item("Arroz", "Grãos", 2, "kg", date.today() + timedelta(days=3), "Armário", custo_unitario=6.0)
+
+        sucesso, mensagem = atualizar_resumo_semanal(db)
+        self.assertTrue(sucesso, mensagem)
+        resumo = gerar_resumo_semanal(db)
+        self.assertEqual(resumo["consumo"], {"registros": 0, "itens": 0, "mais_consumidos": []})
+        self.assertEqual([i["nome"] for i in resumo["itens_proximos_vencimento"]], ["Arroz"])
+
+    def test_resumo_semanal_banco_legado(self):
+        """Testa o resumo semanal materializado em um banco legado migrado"""
+        from utils.assistente import atualizar_resumo_semanal, gerar_resumo_semanal
+
+        db = self._abrir_copia_legado()
+        item_id = db.conn.execute("SELECT id FROM itens WHERE quantidade > 0").fetchone()[0]
+        db.conn.execute("INSERT INTO nutricional (item_id, calcio_mg, peso_por_unidade) VALUES (?, 100, 200)",
+                        (item_id,))
+        db.conn.commit()
+        db.registrar_consumo(item_id, 0.5, para_thomas=True)
+
+        sucesso, mensagem = atualizar_resumo_semanal(db)
+        self.assertTrue(sucesso, mensagem)
+        resumo = gerar_resumo_semanal(db, max_idade_segundos=None)
+        self.assertEqual(resumo["geracao"], 1)
+        self.assertEqual(resumo["consumo"]["registros"], 1)
+        self.assertAlmostEqual(resumo["consumo_nutricional_thomas"]["Cálcio (mg)"], 100.0)
+
+    def test_pontuacao_incremental(self):
+        """Testa os contadores de pontuação mantidos por gatilhos"""
+        from utils.assistente import calcular_pontuacao
+
+        db = self.db_manager
+        hoje = date.today()
+        id_banana = db.adicionar_item("Banana", "Frutas", 6, "unidade", hoje + timedelta(days=2), "Fruteira",
+                                      custo_unitario=1.0)
+        id_queijo = db.adicionar_item("Queijo", "Laticínios", 1, "kg", hoje + timedelta(days=30), "Geladeira",
+                                      custo_unitario=40.0)
+        id_pao = db.adicionar_item("Pão", "Padaria", 2, "unidade", hoje + timedelta(days=1), "Armário",
+                                   custo_unitario=3.0)
+        db.conn.execute("UPDATE itens SET compatibilidade_thomas = 1 WHERE id = ?", (id_queijo,))
+        db.conn.executemany(
+            "INSERT INTO historico_precos (item_id, valor_unitario, data_compra, quantidade_comprada) VALUES (?, ?, ?, ?)",
+            [(id_banana, 1.5, hoje.isoformat(), 6), (id_banana, 1.0, hoje.isoformat(), 6)]
+        )
+        db.conn.commit()
+
+        db.registrar_consumo(id_banana, 2, data=hoje)
+        db.registrar_consumo(id_queijo, 0.1, para_thomas=True, data=hoje)
+        sucesso, _ = db.registrar_descarte(id_pao, 1, motivo="estragado", data=hoje)
+        self.assertTrue(sucesso)
+
+        contadores = db.obter_pontuacao_periodo(hoje.strftime("%Y-%m"))
+        self.assertEqual(contadores["compras"], 2)
+        self.assertAlmostEqual(contadores["economia"], 3.0)
+        self.assertEqual(contadores["consumos"], 2)
+        self.assertEqual(contadores["consumos_saudaveis"], 1)
+        self.assertEqual(contadores["consumos_thomas_restritos"], 1)
+        self.assertAlmostEqual(contadores["valor_aproveitado"], 2.0)
+        self.assertAlmostEqual(contadores["valor_descartado"], 3.0)
+
+        # economia 10 × 3; saúde 2 + 1 − 5; desperdício 5 + 10 × (2 − 3) − 2
+        self.assertEqual(calcular_pontuacao(db), {"economia": 30, "saude": 0, "desperdicio": 0})
+
+        # Vencimentos são contados uma única vez, no mês da validade
+        self.assertEqual(db.registrar_vencimentos(hoje=hoje), 0)
+        depois = hoje + timedelta(days=3)
+        self.assertEqual(db.registrar_vencimentos(hoje=depois), 2)
+        self.assertEqual(db.registrar_vencimentos(hoje=depois), 0)
+        total = db.obter_pontuacao_periodo()
+        self.assertEqual(total["vencimentos"], 2)
+        self.assertAlmostEqual(total["valor_vencido"], 7.0)
+
+    def _abrir_copia_legado(self):
+        """Abre uma cópia migrada do banco legado distribuído em db/geladeira.db"""
+        import shutil
+
+        legado = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "db", "geladeira.db")
+        pasta = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, pasta)
+        caminho = os.path.join(pasta, "legado.db")
+        shutil.copy(legado, caminho)
+        conn = sqlite3.connect(caminho)
+        self.assertNotIn("custo_unitario", {row[1] for row in conn.execute("PRAGMA table_info(itens)")})
+        self.assertNotIn("peso_por_unidade", {row[1] for row in conn.execute("PRAGMA table_info(nutricional)")})
+        conn.close()
+
+        db = ExtendedDatabaseManager(caminho)
+        self.addCleanup(db.fechar)
+        self.assertEqual(db.conn.execute("PRAGMA user_version").fetchone()[0], VERSAO_SCHEMA)
+        return db
+
+    def test_migracao_banco_legado(self):
+        """Testa que um banco com o schema antigo migra e aceita consumos"""
+        db = self._abrir_copia_legado()
+        item_id = db.conn.execute("SELECT id FROM itens WHERE quantidade > 0").fetchone()[0]
+        sucesso, mensagem = db.registrar_consumo(item_id, 0.1)
+        self.assertTrue(sucesso, mensagem)
+        self.assertEqual(db.obter_pontuacao_periodo()["consumos"], 1)
+
+    def test_migracao_legado_nutricional(self):
+        """Testa as consultas nutricionais em um banco legado migrado"""
+        db = self._abrir_copia_legado()
+        item_id = db.conn.execute("SELECT id FROM itens WHERE quantidade > 0").fetchone()[0]
+        db.conn.execute("INSERT INTO nutricional (item_id, proteinas_g, peso_por_unidade) VALUES (?, 10, 50)",
+                        (item_id,))
+        db.conn.commit()
+        sucesso, mensagem = db.registrar_consumo(item_id, 0.5)
+        self.assertTrue(sucesso, mensagem)
+
+        # Meia unidade de 50 g = 0,25 × 100 g
+        consumidos = db.obter_nutrientes_consumidos()
+        self.assertAlmostEqual(consumidos["Proteínas (g)"].sum(), 2.5)
+        estoque = db.obter_estoque_nutricional()
+        self.assertEqual(estoque.loc[estoque["id"] == item_id, "peso_por_unidade"].iloc[0], 50)
+
+    def test_backfill_nutricional_banco_legado(self):
+        """Testa o preenchimento nutricional em um banco legado migrado"""
+        from utils.backfill_nutricional import executar_backfill_nutricional
+
+        db = self._abrir_copia_legado()
+        integracao = unittest.mock.MagicMock()
+        integracao.buscar_info_nutricional_lote.side_effect = lambda nomes: {
+            nome: {"encontrado": True, "calorias": 50, "sodio": 20.0} for nome in nomes
+        }
+
+        relatorio = executar_backfill_nutricional(db, integracao, tamanho_lote=10)
+        self.assertTrue(relatorio["concluido"])
+        self.assertEqual(relatorio["resolvidos"], relatorio["processados"])
+        self.assertEqual(relatorio["cobertura_depois"]["percentual"], 100.0)
+        row = db.conn.execute("SELECT calorias_100g, sodio_100g FROM nutricional").fetchone()
+        self.assertEqual(tuple(row), (50, 0.02))
+
+    def test_cursor_por_thread(self):
+        """Testa que cada thread usa seu próprio cursor na conexão compartilhada"""
+        import threading
+
+        db = self.db_manager
+        cursores = []
+        thread = threading.Thread(target=lambda: cursores.append(db.cursor))
+        thread.start()
+        thread.join()
+        self.assertIs(db.cursor, db.cursor)
+        self.assertIsNot(cursores[0], db.cursor)
+        self.assertIs(cursores[0].connection, db.conn)
+
+        db.fechar()
+        self.assertIsNone(db.cursor)
+
     def test_error_handler(self):
         """Testa o manipulador de erros do banco de dados"""
         # Criar uma conexão para testar
@@ -0,0 +1,393 @@
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+from urllib.parse import parse_qs, urlparse
+
+from utils.cache_nutricional import CacheNutricional
+from utils.taco import TabelaTaco
+from utils.alergenos import DetectorAlergenos, obter_detector
+from utils.food_api import IntegracaoAlimentos, LimitadorTaxa, GrupoChamadaUnica, criar_sessao_http
+
+
+class _ServidorOpenFoodFacts(BaseHTTPRequestHandler):
+    """Servidor local que imita a busca do Open Food Facts"""
+    atraso = 0.0
+    falhas_restantes = 0
+    em_andamento = 0
+    max_simultaneas = 0
+    requisicoes = 0
+    lock = threading.Lock()
+
+    def do_GET(self):
+        cls = type(self)
+        with cls.lock:
+            cls.requisicoes += 1
+            cls.em_andamento += 1
+            cls.max_simultaneas = max(cls.max_simultaneas, cls.em_andamento)
+            falhar = cls.falhas_restantes > 0
+            if falhar:
+                cls.falhas_restantes -= 1
+        try:
+            time.sleep(cls.atraso)
+            if falhar:
+                self.send_response(503)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            termo = parse_qs(urlparse(self.path).query)["search_terms"][0]
+            corpo = json.dumps({"count": 1, "products": [{
+                "product_name": termo, "nutriments": {"energy-kcal_100g": 100, "calcium_100g": 0.1}
+            }]}).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(corpo)))
+            self.end_headers()
+            self.wfile.write(corpo)
+        except (BrokenPipeError, ConnectionResetError):
+            # Cliente desistiu por timeout
+            pass
+        finally:
+            with cls.lock:
+                cls.em_andamento -= 1
+
+    def log_message(self, *args):
+        pass
+
+
+class TestCacheNutricional(unittest.TestCase):
+    """Testes para o cache de consultas nutricionais em SQLite"""
+
+    def setUp(self):
+        self.cache = CacheNutricional(":memory:", ttl_positivo=1000, ttl_negativo=10, max_entradas=3)
+
+    def tearDown(self):
+        self.cache.fechar()
+
+    def test_chave_normalizada(self):
+        """Variações de acento, caixa e espaços usam a mesma entrada"""
+        self.cache.salvar("Feijão  Preto", {"encontrado": True, "calorias": 76})
+        self.assertEqual(self.cache.obter("feijao preto")["calorias"], 76)
+        self.assertEqual(self.cache.estatisticas()["entradas"], 1)
+
+    def test_ttl_positivo_e_negativo(self):
+        """Resultados negativos expiram antes dos positivos"""
+        with patch("utils.cache_nutricional.time.time", return_value=1000.0):
+            self.cache.salvar("arroz", {"encontrado": True})
+            self.cache.salvar("produto raro", {"encontrado": False})
+
+        with patch("utils.cache_nutricional.time.time", return_value=1050.0):
+            self.assertIsNotNone(self.cache.obter("arroz"))
+            self.assertIsNone(self.cache.obter("produto raro"))
+
+        estatisticas = self.cache.estatisticas()
+        self.assertEqual(estatisticas["acertos"], 1)
+        self.assertEqual(estatisticas["falhas"], 1)
+        self.assertEqual(estatisticas["expirados"], 1)
+
+    def test_remocao_lru(self):
+        """Ao passar do limite, a entrada usada há mais tempo é removida"""
+        for instante, nome in enumerate(["a", "b", "c"]):
+            with patch("utils.cache_nutricional.time.time", return_value=1000.0 + instante * 100):
+                self.cache.salvar(nome, {"encontrado": True})
+        # "a" é acessado depois de "b", que passa a ser o menos usado
+        with patch("utils.cache_nutricional.time.time", return_value=1400.0):
+            self.cache.obter("a")
+        with patch("utils.cache_nutricional.time.time", return_value=1500.0):
+            self.cache.salvar("d", {"encontrado": True})
+            self.assertIsNone(self.cache.obter("b"))
+            self.assertIsNotNone(self.cache.obter("a"))
+        self.assertEqual(self.cache.estatisticas()["removidos_lru"], 1)
+        self.assertEqual(self.cache.estatisticas()["entradas"], 3)
+
+
+class TestGrupoChamadaUnica(unittest.TestCase):
+    """Testes para a deduplicação de chamadas simultâneas"""
+
+    def test_excecao_propagada_para_todos(self):
+        """Quem espera a chamada recebe a mesma exceção do líder"""
+        grupo = GrupoChamadaUnica()
+        liberar = threading.Event()
+        erros = []
+
+        def falhar():
+            liberar.wait(1)
+            raise ValueError("upstream fora do ar")
+
+        def chamar():
+            try:
+                grupo.executar("chave", falhar)
+            except ValueError as e:
+                erros.append(str(e))
+
+        threads = [threading.Thread(target=chamar) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        while grupo.estatisticas()["coalescidas"] < 2:
+            time.sleep(0.01)
+        liberar.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(erros, ["upstream fora do ar"] * 3)
+        self.assertEqual(grupo.estatisticas(), {"executadas": 1, "coalescidas": 2, "em_andamento": 0})
+
+
+CSV_TACO = """Número do Alimento;Categoria do alimento;Descrição dos alimentos;Energia (kcal);Proteína (g);Lipídeos (g);Carboidrato (g);Cálcio (mg);Sódio (mg)
+1;Cereais e derivados;Arroz, integral, cozido;124;2,6;1,0;25,8;5;2
+2;Cereais e derivados;Arroz, tipo 1, cozido;128;2,5;0,2;28,1;4;1
+3;Leite e derivados;Leite, de vaca, integral;61;3,2;3,3;4,7;123;64
+4;Leguminosas e derivados;Feijão, preto, cozido;77;4,5;0,5;14,0;29;2
+5;Frutas e derivados;Banana, prata, crua;98;1,3;Tr;26,0;NA;Tr
+"""
+
+
+class TestTabelaTaco(unittest.TestCase):
+    """Testes para a tabela TACO local"""
+
+    def setUp(self):
+        fd, self.csv_path = tempfile.mkstemp(suffix=".csv")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(CSV_TACO)
+        self.addCleanup(os.unlink, self.csv_path)
+        self.taco = TabelaTaco(":memory:")
+        self.addCleanup(self.taco.fechar)
+        self.assertEqual(self.taco.importar_csv(self.csv_path), 5)
+
+    def test_busca_exata_prefixo_e_palavras(self):
+        """A busca tenta nome exato, depois prefixo, depois palavras"""
+        exato = self.taco.buscar("ARROZ, INTEGRAL, COZIDO")
+        self.assertEqual((exato["id"], exato["correspondencia"]), (1, "exata"))
+
+        prefixo = self.taco.buscar("feijao preto")
+        self.assertEqual((prefixo["id"], prefixo["correspondencia"]), (4, "prefixo"))
+
+        palavras = self.taco.buscar("Leite integral UHT")
+        self.assertEqual((palavras["id"], palavras["correspondencia"]), (3, "palavras"))
+
+        self.assertIsNone(self.taco.buscar("chocolate"))
+        # A primeira palavra precisa estar presente: "integral" sozinho não vira arroz
+        self.assertIsNone(self.taco.buscar("pão integral"))
+
+    def test_valores_mapeados_para_nutricional(self):
+        """Nutrientes vêm por 100 g com os nomes das colunas de `nutricional`"""
+        info = self.taco.buscar_info("banana prata")
+        self.assertTrue(info["encontrado"])
+        self.assertEqual(info["fonte"], "TACO")
+        self.assertEqual(info["nutricional"]["calorias_100g"], 98)
+        self.assertEqual(info["nutricional"]["gorduras_g"], 0.0)
+        self.assertIsNone(info["nutricional"]["calcio_mg"])
+        # Sódio: mg na TACO, gramas em `nutricional`, mg na chave 'sodio'
+        leite = self.taco.buscar_info("leite de vaca")
+        self.assertAlmostEqual(leite["nutricional"]["sodio_100g"], 0.064)
+        self.assertAlmostEqual(leite["sodio"], 64)
+        self.assertTrue(self.taco.buscar_info("leite de vaca")["contem_leite"])
+
+    def test_taco_consultada_antes_da_rede(self):
+        """Alimentos da TACO são respondidos sem chamar o Open Food Facts"""
+        integracao = IntegracaoAlimentos(cache=CacheNutricional(":memory:"), taco=self.taco)
+        with patch.object(integracao, "_buscar_openfoodfacts") as off:
+            info = integracao.buscar_info_nutricional("Arroz integral")
+        off.assert_not_called()
+        self.assertEqual(info["calorias"], 124)
+
+
+class TestDetectorAlergenos(unittest.TestCase):
+    """Testes para o detector compilado de alergênicos"""
+
+    def test_acentos_e_posicoes(self):
+        """A busca ignora acentos e devolve posições do texto original"""
+        texto = "Açúcar, PROTEINA  DO Leite, Amêndoas"
+        ocorrencias = obter_detector().encontrar(texto)
+        self.assertEqual([o["termo"] for o in ocorrencias], ["proteina do leite", "amendoas"])
+        for ocorrencia in ocorrencias:
+            self.assertEqual(texto[ocorrencia["inicio"]:ocorrencia["fim"]], ocorrencia["trecho"])
+        self.assertEqual(ocorrencias[1]["trecho"], "Amêndoas")
+        self.assertIn("leite", ocorrencias[0]["categorias"])
+
+    def test_inicio_de_palavra(self):
+        """Termos só casam no início de palavra, mas aceitam sufixos"""
+        detector = DetectorAlergenos({"leite": ["nata"], "soja": ["soja"]})
+        self.assertEqual(detector.encontrar("natação, granata"), [{
+            "termo": "nata", "categorias": ("leite",), "inicio": 0, "fim": 4, "trecho": "nata"
+        }])
+        self.assertEqual(len(detector.encontrar("soja, sojas")), 2)
+
+    def test_lote_equivale_a_individual(self):
+        """O lote devolve o mesmo resultado que textos analisados um a um"""
+        textos = ["trigo, leite", "", "arroz", "camarão e soja", None, "Castanha-do-pará"]
+        detector = obter_detector()
+        self.assertEqual(detector.encontrar_lote(textos), [detector.encontrar(t) for t in textos])
+
+    def test_analise_compativel(self):
+        """analisar_ingredientes mantém o formato de saída"""
+        integracao = IntegracaoAlimentos(cache=CacheNutricional(":memory:"), taco=TabelaTaco(":memory:"))
+        analise = integracao.analisar_ingredientes("Farinha de trigo, lecitina de soja, conservante sorbato")
+        self.assertEqual(analise["alergenos"], {
+            "glúten": ["farinha de trigo"], "soja": ["lecitina de soja"]
+        })
+        self.assertTrue(analise["contem_gluten"])
+        self.assertFalse(analise["contem_leite"])
+        self.assertEqual(analise["aditivos"], ["conservante sorbato"])
+        self.assertEqual(integracao.analisar_ingredientes_lote(["queijo"])[0]["contem_leite"], True)
+
+
+class TestIntegracaoAlimentos(unittest.TestCase):
+    """Testes para a busca de informações nutricionais"""
+
+    def setUp(self):
+        self.integracao = IntegracaoAlimentos(cache=CacheNutricional(":memory:"), taco=TabelaTaco(":memory:"))
+
+    def test_resultado_negativo_em_cache(self):
+        """Produto não encontrado não é consultado de novo enquanto o negativo vale"""
+        with patch.object(self.integracao, "_buscar_openfoodfacts", return_value={"encontrado": False}) as off:
+            self.assertFalse(self.integracao.buscar_info_nutricional("xpto")["encontrado"])
+            self.assertFalse(self.integracao.buscar_info_nutricional("XPTO")["encontrado"])
+        self.assertEqual(off.call_count, 1)
+        self.assertEqual(self.integracao.cache.estatisticas()["acertos_negativos"], 1)
+
+    def test_erro_de_rede_nao_e_guardado(self):
+        """Falhas de consulta não viram resultado negativo em cache"""
+        with patch.object(self.integracao, "_buscar_openfoodfacts",
+                          return_value={"encontrado": False, "erro": "timeout"}) as off:
+            self.integracao.buscar_info_nutricional("xpto")
+            self.integracao.buscar_info_nutricional("xpto")
+        self.assertEqual(off.call_count, 2)
+
+    def test_cache_relido_pelo_lider(self):
+        """Resultado gravado depois da leitura do cache não é consultado de novo"""
+        cache = self.integracao.cache
+        cache.salvar("maçã", {"encontrado": True, "calorias": 52})
+        obter = cache.obter
+        leituras = []
+
+        def obter_com_corrida(nome, contabilizar=True):
+            # A primeira leitura acontece antes de outro líder gravar o resultado
+            leituras.append(contabilizar)
+            return None if len(leituras) == 1 else obter(nome, contabilizar)
+
+        with patch.object(cache, "obter", side_effect=obter_com_corrida), \
+                patch.object(self.integracao, "_buscar_openfoodfacts") as off:
+            self.assertEqual(self.integracao.buscar_info_nutricional("maçã")["calorias"], 52)
+        off.assert_not_called()
+        self.assertEqual(leituras, [True, False])
+
+    def test_cache_compartilhado_pelo_processo(self):
+        """Instâncias sem cache próprio usam o mesmo cache e os mesmos contadores"""
+        import utils.food_api as food_api
+
+        with tempfile.TemporaryDirectory() as pasta, \
+                patch.object(food_api, "CACHE_DIR", pasta), \
+                patch.object(food_api, "_cache_nutricional", None), \
+                patch.object(food_api.atexit, "register") as registrar:
+            taco = TabelaTaco(":memory:")
+            primeira = IntegracaoAlimentos(taco=taco)
+            segunda = IntegracaoAlimentos(taco=taco)
+            self.assertIs(primeira.cache, segunda.cache)
+            registrar.assert_called_once_with(primeira.cache.fechar)
+
+            primeira.cache.salvar("maçã", {"encontrado": True, "calorias": 52})
+            self.assertEqual(segunda.buscar_info_nutricional("maçã")["calorias"], 52)
+            self.assertEqual(primeira.estatisticas()["cache"]["acertos"], 1)
+            primeira.cache.fechar()
+
+
+class TestIntegracaoAlimentosHTTP(unittest.TestCase):
+    """Testes de rede contra um servidor local, sem acesso à internet"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.servidor = ThreadingHTTPServer(("127.0.0.1", 0), _ServidorOpenFoodFacts)
+        cls.thread = threading.Thread(target=cls.servidor.serve_forever, daemon=True)
+        cls.thread.start()
+        cls.url = f"http://127.0.0.1:{cls.servidor.server_address[1]}/cgi/search.pl"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.servidor.shutdown()
+        cls.servidor.server_close()
+
+    def setUp(self):
+        _ServidorOpenFoodFacts.atraso = 0.0
+        _ServidorOpenFoodFacts.falhas_restantes = 0
+        _ServidorOpenFoodFacts.max_simultaneas = 0
+        _ServidorOpenFoodFacts.requisicoes = 0
+        self.sessao = criar_sessao_http(backoff=0.01)
+        self.addCleanup(self.sessao.close)
+
+    def _integracao(self, taxa=0, timeout=(1, 2)):
+        return IntegracaoAlimentos(cache=CacheNutricional(":memory:"), taco=TabelaTaco(":memory:"), sessao=self.sessao,
+                                   url_openfoodfacts=self.url, limitador=LimitadorTaxa(taxa), timeout=timeout,
+                                   chamadas=GrupoChamadaUnica())
+
+    def test_lote_paralelo(self):
+        """Consultas em lote rodam em paralelo e nomes equivalentes são consultados uma vez"""
+        _ServidorOpenFoodFacts.atraso = 0.05
+        nomes = [f"produto {i}" for i in range(40)]
+        resultados = self._integracao().buscar_info_nutricional_lote(nomes + ["PRODUTO 1"], max_workers=8)
+
+        self.assertTrue(all(r["encontrado"] for r in resultados.values()))
+        self.assertEqual(resultados["PRODUTO 1"], resultados["produto 1"])
+        self.assertEqual(_ServidorOpenFoodFacts.requisicoes, 40, "Nomes equivalentes devem ser consultados uma vez")
+        self.assertGreater(_ServidorOpenFoodFacts.max_simultaneas, 1)
+
+    def test_consultas_simultaneas_coalescidas(self):
+        """Threads pedindo o mesmo produto ao mesmo tempo geram uma única requisição"""
+        _ServidorOpenFoodFacts.atraso = 0.2
+        integracao = self._integracao()
+        barreira = threading.Barrier(8)
+        resultados = []
+
+        def buscar(nome):
+            barreira.wait()
+            resultados.append(integracao.buscar_info_nutricional(nome))
+
+        threads = [threading.Thread(target=buscar, args=(nome,))
+                   for nome in ["Pão de Queijo"] * 4 + ["pao de queijo"] * 4]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(_ServidorOpenFoodFacts.requisicoes, 1)
+        self.assertEqual(len(resultados), 8)
+        self.assertTrue(all(r["encontrado"] for r in resultados))
+        chamadas = integracao.estatisticas()["chamadas"]
+        self.assertEqual(chamadas["executadas"], 1)
+        self.assertEqual(chamadas["coalescidas"], 7)
+        self.assertEqual(chamadas["em_andamento"], 0)
+
+    def test_limitador_de_taxa(self):
+        """O limitador segura a vazão do lote"""
+        integracao = self._integracao(taxa=20)
+        integracao.limitador.tokens = 1
+        inicio = time.perf_counter()
+        integracao.buscar_info_nutricional_lote([f"item {i}" for i in range(6)], max_workers=6)
+        self.assertGreaterEqual(time.perf_counter() - inicio, 0.2)
+
+    def test_repete_apos_erro_temporario(self):
+        """Respostas 503 são repetidas com backoff pela sessão"""
+        _ServidorOpenFoodFacts.falhas_restantes = 2
+        info = self._integracao().buscar_info_nutricional("iogurte natural")
+        self.assertTrue(info["encontrado"])
+        self.assertEqual(_ServidorOpenFoodFacts.requisicoes, 3)
+
+    def test_timeout(self):
+        """Servidor lento não prende a consulta além do timeout"""
+        _ServidorOpenFoodFacts.atraso = 0.5
+        integracao = self._integracao(timeout=(1, 0.1))
+        integracao.sessao = criar_sessao_http(tentativas=0)
+        self.addCleanup(integracao.sessao.close)
+        inicio = time.perf_counter()
+        info = integracao._buscar_openfoodfacts("qualquer")
+        self.assertFalse(info["encontrado"])
+        self.assertIn("erro", info)
+        self.assertLess(time.perf_counter() - inicio, 0.45)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -60,16 +60,11 @@ class TestReceitas(unittest.TestCase):
         """Limpeza após cada teste"""
         self.temp_dir.cleanup()
     
-    @patch('utils.assistente.os.path.exists')
-    @patch('utils.assistente.json.load')
-    def test_sugerir_receitas(self, mock_json_load, mock_path_exists):
+    def test_sugerir_receitas(self):
         """Testa a sugestão de receitas baseada no inventário"""
-        # Configurar mocks
-        mock_path_exists.return_value = True
-        mock_json_load.return_value = self.test_recipes
-        
-        # Chamar a função sendo testada
-        receitas_sugeridas = sugerir_receitas(self.test_inventory)
+        # Catálogo lido do arquivo de teste
+        with patch('utils.catalogo_receitas.CAMINHO_RECEITAS', str(self.test_recipe_file)):
+            receitas_sugeridas = sugerir_receitas(self.test_inventory)
         
         # Verificar se encontrou duas receitas
         self.assertEqual(len(receitas_sugeridas), 2, "Deveria sugerir duas receitas")
@@ -85,6 +80,56 @@ class TestReceitas(unittest.TestCase):
         self.assertIn('Fermento', bolo.get('ingredientes_faltantes', []),
                      "Não identificou corretamente os ingredientes faltantes")
     
+    def test_catalogo_recarrega_quando_arquivo_muda(self):
+        """Testa o cache do catálogo por data de modificação e o ranking determinístico"""
+        from utils.catalogo_receitas import obter_catalogo_receitas
+
+        caminho = str(self.test_recipe_file)
+        catalogo = obter_catalogo_receitas(caminho)
+        self.assertIs(obter_catalogo_receitas(caminho), catalogo)
+
+        nomes = ['Ovos', 'Farinha de Trigo', 'Açúcar', 'Manteiga', 'Fermento químico']
+        titulos = [r['titulo'] for r in catalogo.sugerir(nomes)]
+        self.assertEqual(titulos, ['Bolo de Baunilha', 'Panquecas Simples'])
+        self.assertEqual(titulos, [r['titulo'] for r in catalogo.sugerir(nomes)])
+
+        with open(self.test_recipe_file, 'w', encoding='utf-8') as f:
+            json.dump(self.test_recipes[:1], f)
+        estado = os.stat(self.test_recipe_file)
+        os.utime(self.test_recipe_file, ns=(estado.st_atime_ns, estado.st_mtime_ns + 10**9))
+
+        recarregado = obter_catalogo_receitas(caminho)
+        self.assertIsNot(recarregado, catalogo)
+        self.assertEqual([r['titulo'] for r in recarregado.sugerir(nomes)], ['Panquecas Simples'])
+
+    def test_importar_receitas_jsonl(self):
+        """Testa a importação em lotes de JSONL e a busca por cobertura no banco"""
+        from db.extended_database_manager import ExtendedDatabaseManager
+        from utils.importador_receitas import importar_receitas_arquivo
+
+        caminho = Path(self.temp_dir.name) / 'receitas.jsonl'
+        with open(caminho, 'w', encoding='utf-8') as f:
+            for receita in self.test_recipes:
+                f.write(json.dumps(receita, ensure_ascii=False) + '\n')
+            f.write('{linha inválida\n')
+            f.write(json.dumps({"titulo": "Sem ingredientes"}) + '\n')
+
+        with ExtendedDatabaseManager(str(Path(self.temp_dir.name) / 'receitas.db')) as db:
+            db.inicializar_banco()
+            relatorio = importar_receitas_arquivo(db, str(caminho), tamanho_lote=1)
+            self.assertEqual((relatorio['importadas'], relatorio['ignoradas'], relatorio['invalidas']), (2, 1, 1))
+            self.assertEqual(relatorio['lotes'], 2)
+
+            # Reimportar substitui as receitas em vez de duplicá-las
+            importar_receitas_arquivo(db, str(caminho))
+            self.assertEqual(db.contar_receitas(), 2)
+
+            receitas = sugerir_receitas(self.test_inventory, db=db)
+            self.assertEqual([r['titulo'] for r in receitas], ['Panquecas Simples', 'Bolo de Baunilha'])
+            self.assertEqual(receitas[1]['ingredientes_faltantes'], ['Fermento'])
+            self.assertEqual(receitas[1]['ingredientes_quantidades']['Fermento'], 10)
+            self.assertAlmostEqual(receitas[1]['cobertura'], 0.8)
+
     def test_gerar_lista_compras(self):
         """Testa a geração de lista de compras para receitas"""
         # Preparar dados de teste
@@ -107,5 +152,69 @@ class TestReceitas(unittest.TestCase):
         self.assertEqual(lista_compras[0]['receitas'], ['Panquecas Simples'], 
                          "A receita associada não corresponde")
 
+    def test_lista_compras_soma_unidades_e_desconta_estoque(self):
+        """Testa a soma entre receitas com conversão de unidades e o desconto do estoque"""
+        receitas = [
+            {"titulo": "Pão", "ingredientes": [{"nome": "Farinha de trigo", "quantidade": 300, "unidade": "g"},
+                                              {"nome": "Leite", "quantidade": 0.5, "unidade": "l"}]},
+            {"titulo": "Bolo", "ingredientes": [{"nome": "farinha de trigo", "quantidade": 0.4, "unidade": "kg"},
+                                               {"nome": "Leite", "quantidade": 200, "unidade": "ml"},
+                                               {"nome": "Ovos", "quantidade": 8, "unidade": "unidades"}]},
+        ]
+        lista = gerar_lista_compras_para_receitas(receitas, self.test_inventory)
+        por_nome = {item['nome']: item for item in lista}
+
+        self.assertEqual(set(por_nome), {'Farinha de trigo', 'Ovos'})
+        self.assertEqual((por_nome['Farinha de trigo']['quantidade'], por_nome['Farinha de trigo']['unidade']), (200, 'g'))
+        self.assertEqual(por_nome['Farinha de trigo']['receitas'], ['Pão', 'Bolo'])
+        self.assertEqual((por_nome['Ovos']['quantidade'], por_nome['Ovos']['unidade']), (2, 'unidade'))
+
+    def test_montar_cardapio_semanal(self):
+        """Testa o cardápio: restrições, estoque, validade e aproveitamento dos itens que vencem antes"""
+        from datetime import date, timedelta
+        from db.extended_database_manager import ExtendedDatabaseManager
+        from utils.assistente import montar_cardapio_semanal
+        from utils.importador_receitas import importar_receitas
+
+        hoje = date.today()
+        with ExtendedDatabaseManager(str(Path(self.temp_dir.name) / 'cardapio.db')) as db:
+            db.inicializar_banco()
+            db.adicionar_item("Iogurte", "Laticínios", 3, "unidade", hoje + timedelta(days=2), "Geladeira")
+            db.adicionar_item("Aveia", "Grãos", 500, "g", hoje + timedelta(days=90), "Armário")
+            db.adicionar_item("Banana", "Frutas", 6, "unidade", hoje + timedelta(days=20), "Fruteira")
+            db.adicionar_item("Amendoim", "Grãos", 500, "g", hoje + timedelta(days=90), "Armário")
+            frango = db.adicionar_item("Frango", "Carnes", 600, "g", hoje + timedelta(days=30), "Freezer")
+            db.conn.execute("INSERT INTO nutricional (item_id, proteinas_g) VALUES (?, 25)", (frango,))
+            db.conn.execute("INSERT INTO necessidades_thomas (nutriente, quantidade_diaria, unidade) VALUES ('Proteínas', 30, 'g')")
+            db.conn.execute("INSERT INTO restricoes_thomas (tipo, substancia) VALUES ('alergia', 'amendoim')")
+            db.conn.commit()
+            importar_receitas(db, [
+                {"titulo": "Iogurte com aveia", "porcoes": 1,
+                 "ingredientes": [{"nome": "iogurte", "quantidade": 1, "unidade": "unidade"},
+                                  {"nome": "aveia", "quantidade": 30, "unidade": "g"}]},
+                {"titulo": "Banana com aveia", "porcoes": 1,
+                 "ingredientes": [{"nome": "banana", "quantidade": 1}, {"nome": "aveia", "quantidade": 30, "unidade": "g"}]},
+                {"titulo": "Banana com amendoim", "porcoes": 1,
+                 "ingredientes": [{"nome": "banana", "quantidade": 1}, {"nome": "amendoim", "quantidade": 20, "unidade": "g"}]},
+                {"titulo": "Frango grelhado", "porcoes": 1,
+                 "ingredientes": [{"nome": "frango", "quantidade": 150, "unidade": "g"}, {"nome": "sal"}]},
+            ])
+
+            plano = montar_cardapio_semanal(db, {"refeicoes": ["Almoço"], "porcoes": [1]})
+
+        refeicoes = [(indice, dia["refeicoes"][0]["receita"]) for indice, dia in enumerate(plano["dias"])]
+        titulos = [receita["titulo"] for _, receita in refeicoes if receita]
+        self.assertEqual(len(plano["dias"]), 7)
+        self.assertEqual(plano["refeicoes_vazias"], 0)
+        self.assertNotIn("Banana com amendoim", titulos)
+        # Frango (4 porções) atende a proteína; o iogurte é usado inteiro antes de vencer
+        self.assertEqual(titulos.count("Frango grelhado"), 4)
+        dias_iogurte = [indice for indice, receita in refeicoes if receita and receita["titulo"] == "Iogurte com aveia"]
+        self.assertEqual(len(dias_iogurte), 3)
+        self.assertLessEqual(max(dias_iogurte), 2)
+        self.assertIn("Iogurte", plano["itens_vencendo_aproveitados"])
+        self.assertLessEqual(plano["consumo_estoque"]["Frango"], 600)
+        self.assertEqual(plano["metas"], {"Proteínas": 30.0})
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,127 @@
+import os
+import threading
+import unittest
+import tempfile
+
+from db import shared_manager
+from db.shared_manager import (
+    obter_gerenciador,
+    substituir_gerenciador,
+    estatisticas_gerenciadores,
+    fechar_todos,
+)
+
+
+class TestGerenciadorCompartilhado(unittest.TestCase):
+    """Testes para o gerenciador de banco compartilhado entre sessões"""
+
+    def setUp(self):
+        self.temp_db_fd, self.temp_db_path = tempfile.mkstemp(suffix='.db')
+
+    def tearDown(self):
+        fechar_todos()
+        os.close(self.temp_db_fd)
+        os.unlink(self.temp_db_path)
+
+    def test_sessoes_compartilham_instancia(self):
+        """Várias sessões recebem a mesma instância e conexão"""
+        db1 = obter_gerenciador(self.temp_db_path, "sessao-1")
+        db2 = obter_gerenciador(self.temp_db_path, "sessao-2")
+        self.assertIs(db1, db2)
+
+        estatisticas = estatisticas_gerenciadores()
+        self.assertEqual(len(estatisticas), 1)
+        self.assertEqual(estatisticas[0]["sessoes"], 2)
+
+    def test_sessao_inativa_deixa_de_ser_contada(self):
+        """Sessões sem acesso recente são esquecidas pela instância ativa"""
+        obter_gerenciador(self.temp_db_path, "sessao-1")
+        entrada = shared_manager._gerenciadores[shared_manager._chave(self.temp_db_path)]
+        entrada.sessoes["sessao-1"] -= shared_manager.SESSAO_INATIVA_SEGUNDOS
+
+        obter_gerenciador(self.temp_db_path, "sessao-2")
+        self.assertEqual(list(entrada.sessoes), ["sessao-2"])
+
+    def test_verificacao_de_saude_nao_bloqueia_outros_bancos(self):
+        """A verificação de saúde espera pelo gerenciador fora do lock global"""
+        outro_fd, outro_path = tempfile.mkstemp(suffix='.db')
+        self.addCleanup(os.unlink, outro_path)
+        self.addCleanup(os.close, outro_fd)
+        ocupado = obter_gerenciador(self.temp_db_path, "sessao-1")
+        obter_gerenciador(outro_path, "sessao-2")
+
+        original = shared_manager.INTERVALO_VERIFICACAO_SAUDE
+        shared_manager.INTERVALO_VERIFICACAO_SAUDE = 0
+        self.addCleanup(setattr, shared_manager, "INTERVALO_VERIFICACAO_SAUDE", original)
+
+        # Uma escrita longa segura o lock do gerenciador durante a verificação
+        with ocupado.lock:
+            verificacao = threading.Thread(target=obter_gerenciador, args=(self.temp_db_path, "sessao-1"))
+            verificacao.start()
+            verificacao.join(0.1)
+            self.assertTrue(verificacao.is_alive(), "A verificação deveria esperar pelo lock do gerenciador")
+
+            outra_sessao = threading.Thread(target=obter_gerenciador, args=(outro_path, "sessao-2"))
+            outra_sessao.start()
+            outra_sessao.join(5)
+            self.assertFalse(outra_sessao.is_alive(), "Outro banco não pode esperar pela verificação")
+        verificacao.join(5)
+        self.assertIs(obter_gerenciador(self.temp_db_path, "sessao-1"), ocupado)
+
+    def test_criacao_nao_bloqueia_outros_bancos(self):
+        """A fábrica de um banco não segura o lock usado pelos demais"""
+        outro_fd, outro_path = tempfile.mkstemp(suffix='.db')
+        self.addCleanup(os.unlink, outro_path)
+        self.addCleanup(os.close, outro_fd)
+        obter_gerenciador(outro_path, "sessao-2")
+
+        na_fabrica, liberar = threading.Event(), threading.Event()
+
+        def fabrica_lenta(db_path):
+            na_fabrica.set()
+            liberar.wait(5)
+            return shared_manager.ExtendedDatabaseManager(db_path)
+
+        criacao = threading.Thread(target=obter_gerenciador, args=(self.temp_db_path, "sessao-1", fabrica_lenta))
+        criacao.start()
+        try:
+            self.assertTrue(na_fabrica.wait(5))
+            self.assertIsNotNone(obter_gerenciador(outro_path, "sessao-2"))
+            self.assertTrue(criacao.is_alive(), "A criação lenta ainda deveria estar em andamento")
+        finally:
+            liberar.set()
+            criacao.join(5)
+        self.assertEqual(len(estatisticas_gerenciadores()), 2)
+
+    def test_substituicao_fecha_geracao_antiga_sem_sessoes(self):
+        """A geração antiga continua aberta até que suas sessões migrem"""
+        antigo = obter_gerenciador(self.temp_db_path, "sessao-1")
+        obter_gerenciador(self.temp_db_path, "sessao-2")
+
+        self.assertEqual(substituir_gerenciador(self.temp_db_path, motivo="teste"), 2)
+        self.assertIsNotNone(antigo.conn, "Geração antiga não pode fechar com sessões ativas")
+
+        novo = obter_gerenciador(self.temp_db_path, "sessao-1")
+        self.assertIsNot(novo, antigo)
+        self.assertIsNotNone(antigo.conn)
+
+        obter_gerenciador(self.temp_db_path, "sessao-2")
+        self.assertIsNone(antigo.conn, "Geração antiga deveria ser fechada sem sessões")
+        self.assertEqual([e["geracao"] for e in estatisticas_gerenciadores()], [2])
+
+    def test_conexao_invalida_e_substituida(self):
+        """A verificação de saúde troca uma conexão que não responde"""
+        db = obter_gerenciador(self.temp_db_path, "sessao-1")
+        db.conn.close()
+
+        original = shared_manager.INTERVALO_VERIFICACAO_SAUDE
+        shared_manager.INTERVALO_VERIFICACAO_SAUDE = 0
+        self.addCleanup(setattr, shared_manager, "INTERVALO_VERIFICACAO_SAUDE", original)
+
+        novo = obter_gerenciador(self.temp_db_path, "sessao-1")
+        self.assertIsNot(novo, db)
+        self.assertEqual(len(novo.carregar_inventario()), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
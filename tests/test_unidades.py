@@ -0,0 +1,43 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from utils.unidades import converter, converter_serie, para_gramas, unidade_canonica
+
+
+class TestUnidades(unittest.TestCase):
+    """Testes para a conversão de unidades"""
+
+    def test_apelidos(self):
+        """Testa a resolução de apelidos para unidades canônicas"""
+        self.assertEqual(unidade_canonica("Gramas"), "g")
+        self.assertEqual(unidade_canonica("Kg."), "kg")
+        self.assertEqual(unidade_canonica("xícaras"), "xícara")
+        self.assertEqual(unidade_canonica("pacote"), "pacote")
+        self.assertIsNone(unidade_canonica(""))
+
+    def test_converter_escalar(self):
+        """Testa a conversão entre unidades da mesma dimensão"""
+        self.assertEqual(converter(1.5, "kg", "g"), 1500)
+        self.assertEqual(converter(2, "xícara", "ml"), 480)
+        self.assertIsNone(converter(1, "kg", "l"))
+        self.assertIsNone(converter(1, "pacote", "unidade"))
+
+    def test_converter_serie_com_peso_e_densidade(self):
+        """Testa a conversão vetorizada com peso por unidade e densidade por item"""
+        quantidades = pd.Series([1, 2, 3, 500, 1], index=[10, 11, 12, 13, 14])
+        unidades = ["kg", "unidades", "unidade", "ml", "lata"]
+        gramas = para_gramas(quantidades, unidades,
+                             peso_por_unidade=[None, 50, None, None, None],
+                             densidade=[None, None, None, 1.03, None])
+
+        self.assertEqual(list(gramas.index), [10, 11, 12, 13, 14])
+        np.testing.assert_allclose(gramas.to_numpy(), [1000, 100, np.nan, 515, np.nan])
+
+        litros = converter_serie(np.array([250.0, 2.0]), ["g", "unidade"], "l", peso_por_unidade=[None, 500])
+        np.testing.assert_allclose(litros, [0.25, 1.0])
+
+
+if __name__ == '__main__':
+    unittest.main()
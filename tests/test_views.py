@@ -154,5 +154,31 @@ class TestViews(unittest.TestCase):
         form_mock.date_input.assert_called()
         form_mock.form_submit_button.assert_called()
 
+class TestCarregamentoViews(unittest.TestCase):
+    """Testes para a importação sob demanda das views"""
+
+    def test_importar_pacote_nao_carrega_views(self):
+        """Importar o pacote views não deve importar plotly nem os módulos de página"""
+        import subprocess
+        import sys
+        raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        codigo = (
+            "import sys, views; "
+            "print(','.join(sorted(m for m in sys.modules "
+            "if m.startswith('views.') or m.startswith('plotly.express'))))"
+        )
+        saida = subprocess.run([sys.executable, "-c", codigo], cwd=raiz,
+                               capture_output=True, text=True, check=True).stdout.strip()
+        self.assertEqual(saida, "")
+
+    def test_funcao_resolvida_sob_demanda(self):
+        """A função é importada no primeiro acesso e reaproveitada depois"""
+        import views
+        funcao = views.mostrar_receitas
+        self.assertTrue(callable(funcao))
+        self.assertIs(views.mostrar_receitas, funcao)
+        with self.assertRaises(AttributeError):
+            views.pagina_inexistente
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,162 @@
+"""
+Detecção de alergênicos e aditivos em listas de ingredientes.
+
+Todos os termos (alergênicos, TERMOS_LACTEOS e palavras de aditivos) são
+compilados uma única vez em uma expressão regular de alternação, sobre texto
+sem acentos. Cada texto é percorrido uma vez, independentemente do número de
+termos, e as ocorrências trazem a posição no texto original.
+"""
+import re
+from bisect import bisect_right
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Tuple
+
+from .constants import TERMOS_LACTEOS
+from .normalizacao import dobrar_preservando_posicoes, normalizar_texto
+
+# Lista de ingredientes alérgicos comuns
+ALERGENOS = {
+    "leite": ["leite", "lactose", "caseína", "whey", "manteiga", "queijo", "iogurte"],
+    "glúten": ["trigo", "gluten", "cevada", "centeio", "aveia", "malte"],
+    "soja": ["soja", "lecitina de soja", "proteína de soja"],
+    "frutos do mar": ["peixe", "camarão", "lagosta", "caranguejo", "mariscos", "frutos do mar"],
+    "nozes": ["amendoim", "nozes", "castanha", "avelã", "macadâmia", "pistache", "amêndoas"],
+}
+
+# Padrões comuns de corantes, conservantes e adoçantes artificiais
+TERMOS_ADITIVOS = [
+    "corante", "artificial", "conservante", "ácido", "nitrito", "nitrato", "benzoato",
+    "sorbato", "adoçante", "aspartame", "sacarina", "glutamato",
+]
+
+CATEGORIA_ADITIVOS = "aditivos"
+
+
+class DetectorAlergenos:
+    """
+    Detector compilado de termos por categoria.
+
+    Os termos são comparados sem acentos e sem diferenciar maiúsculas. A
+    ocorrência precisa começar no início de uma palavra, mas pode continuar
+    nela ("caseína" encontra "caseinato"); termos com várias palavras aceitam
+    qualquer espaçamento entre elas.
+    """
+
+    def __init__(self, categorias: Dict[str, Iterable[str]]):
+        """
+        Compila os termos.
+
+        Args:
+            categorias: {categoria: termos}. Um termo pode pertencer a várias categorias.
+        """
+        self.categorias_por_termo: Dict[str, Tuple[str, ...]] = {}
+        for categoria, termos in categorias.items():
+            for termo in termos:
+                chave = normalizar_texto(termo)
+                atuais = self.categorias_por_termo.get(chave, ())
+                if categoria not in atuais:
+                    self.categorias_por_termo[chave] = atuais + (categoria,)
+
+        # Termos mais longos primeiro: "lecitina de soja" vence "soja" na mesma posição
+        alternativas = "|".join(
+            r"\s+".join(re.escape(parte) for parte in termo.split())
+            for termo in sorted(self.categorias_por_termo, key=len, reverse=True)
+        )
+        self.padrao = re.compile(rf"(?<![0-9a-z])(?:{alternativas})")
+
+    def _ocorrencia(self, match, texto: str, deslocamento: int = 0) -> Dict[str, Any]:
+        termo = " ".join(match.group().split())
+        return {
+            "termo": termo,
+            "categorias": self.categorias_por_termo[termo],
+            "inicio": match.start() - deslocamento,
+            "fim": match.end() - deslocamento,
+            "trecho": texto[match.start() - deslocamento:match.end() - deslocamento],
+        }
+
+    def encontrar(self, texto: str) -> List[Dict[str, Any]]:
+        """
+        Encontra todas as ocorrências em um texto.
+
+        Args:
+            texto: Texto livre (ex.: lista de ingredientes).
+
+        Returns:
+            List[Dict[str, Any]]: Ocorrências com 'termo', 'categorias',
+            'inicio', 'fim' e 'trecho' (posições no texto original).
+        """
+        if not texto:
+            return []
+        return [self._ocorrencia(m, texto) for m in self.padrao.finditer(dobrar_preservando_posicoes(texto))]
+
+    def encontrar_lote(self, textos: List[str]) -> List[List[Dict[str, Any]]]:
+        """
+        Encontra as ocorrências de vários textos em uma única passada.
+
+        Os textos são unidos com quebras de linha e percorridos uma vez; cada
+        ocorrência é devolvida no texto de origem, com posições relativas a ele.
+
+        Args:
+            textos: Lista de textos.
+
+        Returns:
+            List[List[Dict[str, Any]]]: Uma lista de ocorrências por texto, na mesma ordem.
+        """
+        textos = [t or "" for t in textos]
+        inicios, posicao = [], 0
+        for texto in textos:
+            inicios.append(posicao)
+            posicao += len(texto) + 1
+        unido = dobrar_preservando_posicoes("\n".join(textos))
+
+        resultado: List[List[Dict[str, Any]]] = [[] for _ in textos]
+        for match in self.padrao.finditer(unido):
+            indice = bisect_right(inicios, match.start()) - 1
+            resultado[indice].append(self._ocorrencia(match, textos[indice], inicios[indice]))
+        return resultado
+
+
+@lru_cache(maxsize=1)
+def obter_detector() -> DetectorAlergenos:
+    """Detector padrão (alergênicos, termos lácteos e aditivos), compilado uma vez por processo."""
+    categorias = {categoria: list(termos) for categoria, termos in ALERGENOS.items()}
+    categorias["leite"] = categorias["leite"] + list(TERMOS_LACTEOS)
+    categorias[CATEGORIA_ADITIVOS] = TERMOS_ADITIVOS
+    return DetectorAlergenos(categorias)
+
+
+def resumir_ingredientes(texto: str, ocorrencias: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Agrupa as ocorrências por ingrediente (itens separados por vírgula).
+
+    Args:
+        texto: Lista de ingredientes separados por vírgula.
+        ocorrencias: Resultado de encontrar() para o texto.
+
+    Returns:
+        Dict[str, Any]: Mesmo formato de IntegracaoAlimentos.analisar_ingredientes,
+        com as ocorrências em 'ocorrencias'.
+    """
+    inicios, ingredientes, posicao = [], [], 0
+    for parte in texto.split(","):
+        inicios.append(posicao)
+        ingredientes.append(parte.strip().lower())
+        posicao += len(parte) + 1
+
+    alergenos_encontrados: Dict[str, List[str]] = {}
+    aditivos: List[str] = []
+    for ocorrencia in ocorrencias:
+        ingrediente = ingredientes[bisect_right(inicios, ocorrencia["inicio"]) - 1]
+        for categoria in ocorrencia["categorias"]:
+            destino = aditivos if categoria == CATEGORIA_ADITIVOS else alergenos_encontrados.setdefault(categoria, [])
+            if ingrediente not in destino:
+                destino.append(ingrediente)
+
+    return {
+        "alergenos": alergenos_encontrados,
+        "contem_leite": "leite" in alergenos_encontrados,
+        "contem_gluten": "glúten" in alergenos_encontrados,
+        "aditivos": aditivos,
+        "ingredientes_processados": len(aditivos) > 0,
+        "ocorrencias": ocorrencias,
+    }
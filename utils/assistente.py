@@ -4,198 +4,307 @@ Funções para automação, sugestões, previsão, relatórios e gamificação.
 """
 import pandas as pd
 import datetime
-import requests
 import os
-from typing import List, Dict, Any
-import json
-import random
+from typing import List, Dict, Any, Optional, Tuple
 
 # 1. Resumo Semanal Automático
-def gerar_resumo_semanal(db) -> Dict[str, Any]:
+CHAVE_RESUMO_SEMANAL = "resumo_semanal"
+
+DICAS_REAPROVEITAMENTO = [
+    "Use talos e folhas em sopas e refogados.",
+    "Congele frutas maduras para sucos ou vitaminas.",
+    "Faça caldos com sobras de legumes."
+]
+
+def atualizar_resumo_semanal(db) -> Tuple[bool, str]:
+    """
+    Calcula o resumo semanal e grava o snapshot em resultados_precomputados.
+
+    Chamada pelo worker; cada gravação incrementa a geração do snapshot.
+
+    Returns:
+        Tupla (sucesso, mensagem)
+    """
+    resumo = db.calcular_resumo_semanal(dias=7)
+    if not resumo:
+        return False, "Falha ao calcular resumo semanal"
+    if not db.salvar_resultado_precomputado(CHAVE_RESUMO_SEMANAL, resumo):
+        return False, "Falha ao salvar resumo semanal"
+    return True, f"Resumo semanal atualizado ({len(resumo['itens_proximos_vencimento'])} item(s) vencendo)"
+
+def gerar_resumo_semanal(db, max_idade_segundos: Optional[float] = 3600) -> Dict[str, Any]:
     """
     Gera um resumo semanal com:
     - Itens próximos do vencimento
     - Sugestões de compras
     - Consumo nutricional
     - Dicas de reaproveitamento
-    """
-    resumo = {}
 
-    # Itens próximos do vencimento (próximos 7 dias)
-    df = db.carregar_inventario()
-    if not df.empty and "Validade" in df.columns:
-        df["Dias Até Vencer"] = (pd.to_datetime(df["Validade"]).dt.date - datetime.date.today()).dt.days
-        proximos = df[(df["Perecível"] == 1) & (df["Dias Até Vencer"] <= 7) & (df["Dias Até Vencer"] >= 0)]
-        resumo["itens_proximos_vencimento"] = proximos[["Nome", "Dias Até Vencer", "Quantidade", "Unidade"]].to_dict(orient="records")
-    else:
-        resumo["itens_proximos_vencimento"] = []
+    O resumo é lido do snapshot mantido pelo worker (uma única linha). Sem
+    snapshot, ou com um mais antigo que max_idade_segundos, ele é calculado
+    e gravado na hora.
 
-    # Sugestões de compras (estoque baixo)
-    if not df.empty and "Quantidade" in df.columns:
-        estoque_baixo = df[df["Quantidade"] < 2]
-        resumo["sugestoes_compras"] = estoque_baixo[["Nome", "Quantidade", "Unidade"]].to_dict(orient="records")
-    else:
-        resumo["sugestoes_compras"] = []
-
-    # Consumo nutricional da semana (exemplo simplificado)
-    try:
-        consumo = db.obter_nutrientes_consumidos(periodo_dias=7)
-        resumo["consumo_nutricional"] = consumo.to_dict(orient="records") if not consumo.empty else []
-    except Exception:
-        resumo["consumo_nutricional"] = []
-
-    # Dicas de reaproveitamento (exemplo estático)
-    resumo["dicas_reaproveitamento"] = [
-        "Use talos e folhas em sopas e refogados.",
-        "Congele frutas maduras para sucos ou vitaminas.",
-        "Faça caldos com sobras de legumes."
-    ]
+    Args:
+        db: Instância do banco de dados
+        max_idade_segundos: Idade máxima aceita para o snapshot (None aceita qualquer idade)
+
+    Returns:
+        Dicionário do resumo (ver calcular_resumo_semanal), com 'geracao',
+        'gerado_em' e 'dicas_reaproveitamento'
+    """
+    snapshot = db.obter_resultado_precomputado(CHAVE_RESUMO_SEMANAL, max_idade_segundos=max_idade_segundos)
+    if snapshot is None:
+        sucesso, _ = atualizar_resumo_semanal(db)
+        snapshot = db.obter_resultado_precomputado(CHAVE_RESUMO_SEMANAL) if sucesso else None
+    if snapshot is None:
+        return {"itens_proximos_vencimento": [], "sugestoes_compras": [], "consumo_nutricional": {},
+                "dicas_reaproveitamento": list(DICAS_REAPROVEITAMENTO), "geracao": None, "gerado_em": None}
 
+    resumo = snapshot["dados"]
+    resumo["geracao"] = snapshot["geracao"]
+    resumo["gerado_em"] = snapshot["gerado_em"].isoformat(timespec="seconds")
+    resumo["dicas_reaproveitamento"] = list(DICAS_REAPROVEITAMENTO)
     return resumo
 
 # 2. Receitas Baseadas no Inventário
-def sugerir_receitas(inventario: pd.DataFrame) -> List[Dict[str, Any]]:
+def _nomes_inventario(inventario: pd.DataFrame) -> List[str]:
+    """Nomes dos itens, aceitando a coluna do banco ('nome') ou a formatada ('Nome')."""
+    coluna = "nome" if "nome" in inventario.columns else "Nome" if "Nome" in inventario.columns else None
+    return [] if coluna is None else inventario[coluna].dropna().astype(str).tolist()
+
+def sugerir_receitas(inventario: pd.DataFrame, limite: int = 5, db=None) -> List[Dict[str, Any]]:
     """
     Sugere receitas com base nos ingredientes disponíveis no inventário
     
+    Com um banco que tenha receitas importadas, a busca é feita nas tabelas
+    de receitas; caso contrário, usa o catálogo em cache (recarregado quando
+    data/receitas.json muda). Em ambos os casos as receitas são ordenadas
+    pela fração de ingredientes disponíveis.
+    
     Args:
         inventario: DataFrame com itens do inventário
+        limite: Número máximo de receitas
+        db: Gerenciador do banco de dados (opcional)
         
     Returns:
-        Lista de receitas sugeridas
+        Lista de receitas sugeridas, com 'ingredientes_usados' (disponíveis),
+        'ingredientes_faltantes' e 'cobertura'
     """
+    from .catalogo_receitas import obter_catalogo_receitas, sugerir_receitas_banco
+
     # Se inventário vazio, retorna lista vazia
     if inventario is None or inventario.empty:
         return []
     
-    # Obter receitas do banco local baseado nos ingredientes disponíveis
-    receitas_filtradas = []
-    
-    # Verificar se o inventário está vazio
-    if not inventario.empty and "Nome" in inventario.columns:
-        # Extrair ingredientes disponíveis
-        ingredientes = inventario["Nome"].tolist()
-        
-        # Carregar receitas offline de um arquivo JSON
-        try:
-            receitas_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "receitas.json")
-            if os.path.exists(receitas_path):
-                with open(receitas_path, 'r', encoding='utf-8') as f:
-                    receitas_offline = json.load(f)
-            else:
-                # Receitas padrão se arquivo não for encontrado
-                receitas_offline = [
-                    {
-                        "titulo": "Omelete Simples",
-                        "ingredientes_usados": ["ovo", "sal", "queijo"],
-                        "ingredientes_faltantes": [],
-                        "tempo_preparo": 10,
-                        "porcoes": 1,
-                        "instrucoes": "Bata os ovos, adicione sal a gosto. Aqueça uma frigideira com um fio de óleo, despeje os ovos batidos. Quando começar a firmar, adicione queijo ralado. Dobre ao meio e sirva.",
-                        "imagem": "https://img.cybercook.com.br/receitas/776/omelete-simples-1.jpeg"
-                    },
-                    {
-                        "titulo": "Salada Verde",
-                        "ingredientes_usados": ["alface", "tomate", "cebola", "azeite"],
-                        "ingredientes_faltantes": [],
-                        "tempo_preparo": 5,
-                        "porcoes": 2,
-                        "instrucoes": "Lave e corte a alface. Corte o tomate em cubos e a cebola em rodelas finas. Misture tudo e tempere com azeite, sal e limão a gosto.",
-                        "imagem": "https://img.cybercook.com.br/receitas/42/salada-verde-1.jpeg"
-                    }
-                ]
-        except Exception as e:
-            print(f"Erro ao carregar receitas: {e}")
-            receitas_offline = []
-        
-        # Filtrar receitas com base nos ingredientes disponíveis
-        for receita in receitas_offline:
-            # Verificar se algum ingrediente da receita está no inventário
-            for ing_usado in receita['ingredientes_usados']:
-                if any(ing.lower() in ing_usado.lower() for ing in ingredientes):
-                    receitas_filtradas.append(receita)
-                    break
-        
-        # Se encontrou alguma receita correspondente, retorna-a
-        if receitas_filtradas:
-            return random.sample(receitas_filtradas, min(5, len(receitas_filtradas)))
-    
-    return []
+    nomes = _nomes_inventario(inventario)
+    if not nomes:
+        return []
+    if db is not None and db.contar_receitas() > 0:
+        return sugerir_receitas_banco(db, nomes, limite=limite)
+    return obter_catalogo_receitas().sugerir(nomes, limite=limite)
+
+def _estoque_por_chave(inventario: pd.DataFrame) -> Tuple[Dict[str, Dict[str, float]], Dict[str, Dict[str, float]]]:
+    """
+    Quantidades em estoque por chave de ingrediente, na unidade base de cada dimensão.
+
+    Returns:
+        Tupla (por combinação de palavras do nome, por nome completo), ambos no
+        formato {chave: {dimensão: quantidade}}
+    """
+    from .catalogo_receitas import chaves_do_estoque
+    from .normalizacao import chave_ingrediente
+    from .unidades import para_base
+
+    colunas = {c.lower(): c for c in inventario.columns}
+    if "nome" not in colunas:
+        return {}, {}
+    nomes = inventario[colunas["nome"]].astype(str)
+    quantidades = inventario[colunas["quantidade"]] if "quantidade" in colunas else pd.Series(1.0, index=inventario.index)
+    unidades = inventario[colunas["unidade"]] if "unidade" in colunas else pd.Series(None, index=inventario.index)
+
+    por_combinacao: Dict[str, Dict[str, float]] = {}
+    por_nome: Dict[str, Dict[str, float]] = {}
+    for nome, quantidade, unidade in zip(nomes, pd.to_numeric(quantidades, errors="coerce").fillna(0.0), unidades):
+        base, dim = para_base(float(quantidade), unidade if isinstance(unidade, str) else None)
+        dim = dim or "unidade"
+        for destino, chaves in ((por_combinacao, chaves_do_estoque([nome])), (por_nome, [chave_ingrediente(nome)])):
+            for chave in chaves:
+                por_dimensao = destino.setdefault(chave, {})
+                por_dimensao[dim] = por_dimensao.get(dim, 0.0) + base
+    return por_combinacao, por_nome
 
 def gerar_lista_compras_para_receitas(receitas: List[Dict[str, Any]], inventario: pd.DataFrame) -> List[Dict[str, Any]]:
     """
     Gera lista de compras complementar para as receitas sugeridas.
     
+    As quantidades de todas as receitas são somadas por chave normalizada do
+    ingrediente (convertidas para a unidade base de cada dimensão) e o que
+    há em estoque é descontado. Sem quantidade na receita, conta 1 unidade;
+    sem unidade, assume a unidade do item em estoque. Quando o estoque está
+    em uma unidade que não pode ser comparada, o ingrediente é considerado
+    disponível.
+    
     Args:
         receitas: Lista de receitas retornadas por sugerir_receitas()
         inventario: DataFrame com itens do inventário
     
     Returns:
-        Lista de itens faltantes para as receitas
+        Lista de itens faltantes para as receitas, com 'nome', 'quantidade',
+        'unidade' e 'receitas'
     """
-    # Lista de compras a ser retornada
-    lista_compras = []
-    
-    # Verificar se o inventário está vazio
-    if inventario.empty or "Nome" not in inventario.columns:
-        # Se o inventário estiver vazio, retorna todos os ingredientes de todas as receitas
-        for receita in receitas:
-            for ingrediente in receita.get('ingredientes_usados', []):
-                # Verificar se já está na lista
-                if not any(item['nome'] == ingrediente for item in lista_compras):
-                    lista_compras.append({
-                        'nome': ingrediente,
-                        'quantidade': 1,
-                        'unidade': 'unidade',
-                        'receitas': [receita['titulo']]
-                    })
-        return lista_compras
-    
-    # Extrair ingredientes disponíveis para comparação
-    ingredientes_disponiveis = [nome.lower() for nome in inventario["Nome"].tolist()]
-    
-    # Para cada receita, verificar ingredientes faltantes
+    from .catalogo_receitas import chaves_do_estoque, ingredientes_detalhados
+    from .unidades import UNIDADE_BASE, de_base, para_base, unidade_canonica
+
+    if inventario is None or inventario.empty:
+        por_combinacao, por_nome = {}, {}
+    else:
+        por_combinacao, por_nome = _estoque_por_chave(inventario)
+
+    def em_estoque(chave: str) -> Dict[str, float]:
+        # "leite" é coberto por "Leite Integral"; "queijo ralado", por "Queijo"
+        if chave in por_combinacao:
+            return por_combinacao[chave]
+        for sub in sorted(chaves_do_estoque([chave]), key=len, reverse=True):
+            if sub in por_nome:
+                return por_nome[sub]
+        return {}
+
+    # (chave, dimensão) -> item da lista, com a quantidade na unidade base
+    necessidades: Dict[Tuple[str, str], Dict[str, Any]] = {}
     for receita in receitas:
-        for ingrediente in receita.get('ingredientes_usados', []):
-            # Verificar se o ingrediente já está disponível
-            if not any(ing in ingrediente.lower() for ing in ingredientes_disponiveis):
-                # Verificar se já está na lista de compras
-                item_existente = next((item for item in lista_compras if item['nome'] == ingrediente), None)
-                
-                if item_existente:
-                    # Atualizar item existente
-                    if receita['titulo'] not in item_existente['receitas']:
-                        item_existente['receitas'].append(receita['titulo'])
-                else:
-                    # Adicionar novo item
-                    lista_compras.append({
-                        'nome': ingrediente,
-                        'quantidade': 1,
-                        'unidade': 'unidade',
-                        'receitas': [receita['titulo']]
-                    })
-    
+        for ingrediente in ingredientes_detalhados(receita):
+            estoque = em_estoque(ingrediente["chave"])
+            unidade = ingrediente["unidade"]
+            if unidade is None and len(estoque) == 1:
+                dim_estoque = next(iter(estoque))
+                unidade = UNIDADE_BASE.get(dim_estoque, dim_estoque)
+            quantidade = ingrediente["quantidade"] if ingrediente["quantidade"] is not None else 1.0
+            base, dim = para_base(quantidade, unidade or "unidade")
+
+            item = necessidades.get((ingrediente["chave"], dim))
+            if item is None:
+                item = necessidades[(ingrediente["chave"], dim)] = {
+                    "nome": ingrediente["nome"],
+                    "unidade": unidade_canonica(unidade) or "unidade",
+                    "base": 0.0,
+                    "receitas": [],
+                    "estoque": estoque,
+                }
+            item["base"] += base
+            if receita.get("titulo") not in item["receitas"]:
+                item["receitas"].append(receita.get("titulo"))
+
+    lista_compras = []
+    for (chave, dim), item in necessidades.items():
+        estoque = item["estoque"]
+        if estoque and dim not in estoque:
+            continue
+        faltante = item["base"] - estoque.get(dim, 0.0)
+        if faltante <= 1e-9:
+            continue
+        lista_compras.append({
+            "nome": item["nome"],
+            "quantidade": round(de_base(faltante, item["unidade"]), 3),
+            "unidade": item["unidade"],
+            "receitas": item["receitas"],
+        })
     return lista_compras
 
 # 3. Cardápio Semanal Personalizado
-def montar_cardapio_semanal(db, preferencias: Dict[str, Any]) -> Dict[str, Any]:
+def montar_cardapio_semanal(db, preferencias: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     """
     Monta cardápio semanal considerando restrições e necessidades nutricionais.
+
+    As receitas e porções de cada refeição são escolhidas para atender
+    necessidades_thomas, evitar restricoes_thomas, aproveitar primeiro os
+    itens que vencem antes e caber no estoque (ver utils.planejador_cardapio).
+
+    Args:
+        db: Instância do banco de dados
+        preferencias: Opcional, com 'dias' (padrão 7), 'refeicoes' (nomes das
+            refeições do dia), 'porcoes' (números de porções permitidos) e
+            'data_inicio'.
+
+    Returns:
+        Dicionário com o plano dia a dia (ver planejar_cardapio)
     """
-    # TODO: Implementar lógica de cardápio personalizado
-    pass
+    from .planejador_cardapio import PORCOES_PADRAO, planejar_cardapio
 
-def restaurar_backup(backup_path: str, db_path: str):
+    preferencias = preferencias or {}
+    return planejar_cardapio(
+        db,
+        dias=int(preferencias.get("dias", 7)),
+        refeicoes=preferencias.get("refeicoes"),
+        porcoes=tuple(preferencias.get("porcoes") or PORCOES_PADRAO),
+        data_inicio=preferencias.get("data_inicio"),
+    )
+
+def restaurar_backup(backup_path: str, db_path: str, db=None) -> Tuple[bool, str]:
     """
     Restaura banco de dados a partir de backup.
+
+    A restauração é feita em três etapas: validação do arquivo enviado,
+    cópia para o banco ativo com a API de backup do SQLite e atualização
+    do gerenciador em uso, sem necessidade de reiniciar o processo. A
+    validação é a de restaurar_de_backup; um backup inválido volta com a
+    mensagem dela.
+
+    Args:
+        backup_path: Caminho do arquivo .db de backup
+        db_path: Caminho do banco de dados ativo
+        db: Gerenciador já conectado a db_path (opcional). Se omitido,
+            uma conexão temporária é aberta para a restauração.
+
+    Returns:
+        Tupla (sucesso, mensagem)
     """
-    # TODO: Implementar restauração
-    pass
+    from db.extended_database_manager import ExtendedDatabaseManager
+
+    if db is not None and os.path.abspath(str(db.db_path)) == os.path.abspath(str(db_path)):
+        return db.restaurar_de_backup(backup_path)
+
+    with ExtendedDatabaseManager(str(db_path)) as gerenciador:
+        return gerenciador.restaurar_de_backup(backup_path)
 
 # 8. Gamificação
-def calcular_pontuacao(db) -> Dict[str, int]:
+PONTOS_POR_REAL = 10
+PONTOS_CONSUMO = 1
+PONTOS_CONSUMO_SAUDAVEL = 2
+PENALIDADE_CONSUMO_RESTRITO = 5
+PONTOS_APROVEITAMENTO = 5
+PENALIDADE_DESPERDICIO = 2
+
+
+def calcular_pontuacao(db, periodo: Optional[str] = None) -> Dict[str, int]:
     """
     Calcula pontuação por economia, saúde e desperdício evitado.
+
+    Lê os contadores de pontuacao_periodo, mantidos por gatilhos a cada
+    consumo, compra e descarte, então o custo não cresce com o histórico.
+
+    Args:
+        db: Gerenciador do banco de dados.
+        periodo (Optional[str]): Mês 'AAAA-MM'; None usa o mês atual e
+            "total" soma todos os meses.
+
+    Returns:
+        Dict[str, int]: Pontos de 'economia', 'saude' e 'desperdicio' (nunca negativos).
     """
-    # TODO: Implementar cálculo de pontos
-    return {"economia": 0, "saude": 0, "desperdicio": 0}
+    if periodo is None:
+        periodo = datetime.date.today().strftime("%Y-%m")
+    m = db.obter_pontuacao_periodo(None if periodo == "total" else periodo)
+
+    economia = PONTOS_POR_REAL * m.get("economia", 0.0)
+    consumos_saudaveis = m.get("consumos_saudaveis", 0.0)
+    saude = (PONTOS_CONSUMO_SAUDAVEL * consumos_saudaveis
+             + PONTOS_CONSUMO * (m.get("consumos", 0.0) - consumos_saudaveis)
+             - PENALIDADE_CONSUMO_RESTRITO * m.get("consumos_thomas_restritos", 0.0))
+    desperdicio = (PONTOS_APROVEITAMENTO * m.get("aproveitamentos", 0.0)
+                   + PONTOS_POR_REAL * (m.get("valor_aproveitado", 0.0) - m.get("valor_descartado", 0.0)
+                                        - m.get("valor_vencido", 0.0))
+                   - PENALIDADE_DESPERDICIO * (m.get("descartes", 0.0) + m.get("vencimentos", 0.0)))
+    return {
+        "economia": max(0, round(economia)),
+        "saude": max(0, round(saude)),
+        "desperdicio": max(0, round(desperdicio)),
+    }
@@ -0,0 +1,123 @@
+"""
+Preenchimento em lote dos dados nutricionais que faltam.
+
+Percorre os itens sem linha na tabela `nutricional`, em ordem de id e em
+lotes. Para cada lote tenta primeiro os dados de outro item com o mesmo nome
+e depois IntegracaoAlimentos (cache local, TACO e Open Food Facts, com limite
+de requisições por segundo). Os resultados são gravados com um único
+upsert por lote. O último id processado é salvo como checkpoint, então uma
+execução interrompida continua de onde parou.
+"""
+import logging
+import time
+from typing import Any, Dict, Optional
+
+from .taco import CHAVES_INFO, FATORES_INFO
+
+logger = logging.getLogger(__name__)
+
+CHAVE_CHECKPOINT = "checkpoint:backfill_nutricional"
+
+# Chaves de IntegracaoAlimentos -> colunas da tabela `nutricional`
+COLUNAS_NUTRICIONAL = {chave: coluna for coluna, chave in CHAVES_INFO.items()}
+COLUNAS_NUTRICIONAL["acucar"] = "acucar_100g"
+
+
+def converter_para_nutricional(info: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Converte o resultado de IntegracaoAlimentos para as colunas de `nutricional`.
+
+    A chave 'sodio' vem em mg e vira sodio_100g em gramas.
+
+    Args:
+        info: Resultado de buscar_info_nutricional.
+
+    Returns:
+        Dict[str, Any]: Colunas de `nutricional` (sem item_id).
+    """
+    if info.get("nutricional"):
+        return dict(info["nutricional"])
+    return {coluna: info[chave] / FATORES_INFO.get(chave, 1)
+            for chave, coluna in COLUNAS_NUTRICIONAL.items() if info.get(chave) is not None}
+
+
+def executar_backfill_nutricional(db, integracao=None, tamanho_lote: int = 50,
+                                  requisicoes_por_segundo: float = 2.0,
+                                  orcamento_segundos: Optional[float] = None,
+                                  max_lotes: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Preenche a tabela `nutricional` para itens que ainda não têm dados.
+
+    Args:
+        db: Gerenciador do banco de dados.
+        integracao: Instância de IntegracaoAlimentos (criada com o limite de
+            taxa informado se omitida).
+        tamanho_lote: Itens resolvidos e gravados por lote.
+        requisicoes_por_segundo: Limite de consultas externas por segundo.
+        orcamento_segundos: Para após este tempo, salvando o checkpoint.
+        max_lotes: Número máximo de lotes nesta execução.
+
+    Returns:
+        Dict[str, Any]: cobertura_antes, cobertura_depois, processados,
+        resolvidos, nao_encontrados, lotes, concluido e ultimo_id.
+    """
+    if integracao is None:
+        from .food_api import IntegracaoAlimentos, LimitadorTaxa
+        integracao = IntegracaoAlimentos(limitador=LimitadorTaxa(requisicoes_por_segundo))
+
+    inicio = time.monotonic()
+    checkpoint = db.obter_resultado_precomputado(CHAVE_CHECKPOINT)
+    ultimo_id = checkpoint["dados"].get("ultimo_id", 0) if checkpoint else 0
+    relatorio = {
+        "cobertura_antes": db.obter_cobertura_nutricional(),
+        "processados": 0,
+        "resolvidos": 0,
+        "nao_encontrados": 0,
+        "lotes": 0,
+        "concluido": False,
+        "retomado_de": ultimo_id,
+    }
+
+    while True:
+        if max_lotes is not None and relatorio["lotes"] >= max_lotes:
+            break
+        if orcamento_segundos is not None and time.monotonic() - inicio >= orcamento_segundos:
+            break
+
+        itens = db.obter_itens_sem_nutricional(apos_id=ultimo_id, limite=tamanho_lote)
+        if not itens:
+            # Volta ao início na próxima execução para tentar de novo os não encontrados
+            relatorio["concluido"] = True
+            ultimo_id = 0
+            break
+
+        conhecidos = db.obter_nutricional_por_nome([item["nome"] for item in itens])
+        pendentes = [item for item in itens if item["nome"].lower() not in conhecidos]
+        consultados = integracao.buscar_info_nutricional_lote([item["nome"] for item in pendentes]) if pendentes else {}
+
+        registros = []
+        for item in itens:
+            dados = conhecidos.get(item["nome"].lower())
+            if dados is None:
+                info = consultados.get(item["nome"], {})
+                dados = converter_para_nutricional(info) if info.get("encontrado") else None
+            if dados:
+                registros.append({"item_id": item["id"], **dados})
+            else:
+                relatorio["nao_encontrados"] += 1
+
+        relatorio["resolvidos"] += db.salvar_nutricional_lote(registros)
+        relatorio["processados"] += len(itens)
+        relatorio["lotes"] += 1
+        ultimo_id = itens[-1]["id"]
+        db.salvar_resultado_precomputado(CHAVE_CHECKPOINT, {"ultimo_id": ultimo_id})
+
+    db.salvar_resultado_precomputado(CHAVE_CHECKPOINT, {"ultimo_id": ultimo_id})
+    relatorio["ultimo_id"] = ultimo_id
+    relatorio["cobertura_depois"] = db.obter_cobertura_nutricional()
+    relatorio["duracao_segundos"] = time.monotonic() - inicio
+    logger.info(
+        f"Backfill nutricional: {relatorio['resolvidos']}/{relatorio['processados']} itens resolvidos, "
+        f"cobertura {relatorio['cobertura_antes']['percentual']:.1f}% -> {relatorio['cobertura_depois']['percentual']:.1f}%"
+    )
+    return relatorio
@@ -0,0 +1,235 @@
+"""
+Cache persistente de consultas nutricionais em SQLite.
+
+Substitui o antigo cache/alimentos_cache.json, que era lido por inteiro na
+inicialização e reescrito a cada consulta. Cada entrada é uma linha indexada
+pela chave normalizada do produto, com validade própria: resultados
+encontrados expiram em dias, resultados negativos em horas. Quando o número
+de entradas passa do limite, as menos usadas recentemente são removidas.
+"""
+import json
+import logging
+import os
+import sqlite3
+import time
+from threading import Lock
+from typing import Any, Dict, Optional
+
+from .normalizacao import normalizar_texto
+
+logger = logging.getLogger(__name__)
+
+TTL_POSITIVO_SEGUNDOS = 30 * 24 * 3600
+TTL_NEGATIVO_SEGUNDOS = 6 * 3600
+MAX_ENTRADAS = 5000
+# Evita uma escrita por leitura: o último acesso só é atualizado após esse intervalo
+INTERVALO_ATUALIZACAO_ACESSO = 60.0
+
+
+class CacheNutricional:
+    """
+    Cache chave-valor de informações nutricionais armazenado em SQLite.
+
+    Todas as operações acessam uma única linha pela chave primária; nenhuma
+    delas reescreve o arquivo inteiro.
+    """
+
+    def __init__(self, caminho: str, ttl_positivo: float = TTL_POSITIVO_SEGUNDOS,
+                 ttl_negativo: float = TTL_NEGATIVO_SEGUNDOS, max_entradas: int = MAX_ENTRADAS):
+        """
+        Abre (ou cria) o cache.
+
+        Args:
+            caminho: Arquivo SQLite do cache (":memory:" para testes).
+            ttl_positivo: Validade, em segundos, de produtos encontrados.
+            ttl_negativo: Validade, em segundos, de produtos não encontrados.
+            max_entradas: Número máximo de entradas antes da remoção LRU.
+        """
+        self.caminho = caminho
+        self.ttl_positivo = ttl_positivo
+        self.ttl_negativo = ttl_negativo
+        self.max_entradas = max_entradas
+        self.lock = Lock()
+        self.acertos = 0
+        self.acertos_negativos = 0
+        self.falhas = 0
+        self.expirados = 0
+        self.removidos_lru = 0
+
+        if caminho != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+        self.conn = sqlite3.connect(caminho, check_same_thread=False, timeout=10.0)
+        if caminho != ":memory:":
+            self.conn.execute("PRAGMA journal_mode = WAL")
+            self.conn.execute("PRAGMA synchronous = NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS cache_alimentos (
+                chave TEXT PRIMARY KEY,
+                dados TEXT NOT NULL,
+                encontrado INTEGER NOT NULL,
+                criado_em REAL NOT NULL,
+                expira_em REAL NOT NULL,
+                ultimo_acesso REAL NOT NULL
+            ) WITHOUT ROWID
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_alimentos_acesso ON cache_alimentos (ultimo_acesso)")
+        self.conn.commit()
+        self._total = self.conn.execute("SELECT COUNT(*) FROM cache_alimentos").fetchone()[0]
+
+    @staticmethod
+    def chave(nome_produto: str) -> str:
+        """Chave de cache de um produto (nome normalizado)."""
+        return normalizar_texto(nome_produto)
+
+    def obter(self, nome_produto: str, contabilizar: bool = True) -> Optional[Dict[str, Any]]:
+        """
+        Busca um produto no cache.
+
+        Args:
+            nome_produto: Nome do produto (normalizado internamente).
+            contabilizar: Se False, não conta acerto nem falha (nova leitura
+                da mesma consulta, que já foi contabilizada).
+
+        Returns:
+            Optional[Dict[str, Any]]: Dados armazenados (inclusive resultados
+            negativos, com 'encontrado' False) ou None se ausente ou expirado.
+        """
+        chave = self.chave(nome_produto)
+        agora = time.time()
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT dados, encontrado, expira_em, ultimo_acesso FROM cache_alimentos WHERE chave = ?",
+                (chave,)
+            ).fetchone()
+            if row is None:
+                if contabilizar:
+                    self.falhas += 1
+                return None
+
+            dados, encontrado, expira_em, ultimo_acesso = row
+            if expira_em <= agora:
+                self.conn.execute("DELETE FROM cache_alimentos WHERE chave = ?", (chave,))
+                self.conn.commit()
+                self._total -= 1
+                self.expirados += 1
+                if contabilizar:
+                    self.falhas += 1
+                return None
+
+            if agora - ultimo_acesso >= INTERVALO_ATUALIZACAO_ACESSO:
+                self.conn.execute("UPDATE cache_alimentos SET ultimo_acesso = ? WHERE chave = ?", (agora, chave))
+                self.conn.commit()
+
+            if contabilizar:
+                if encontrado:
+                    self.acertos += 1
+                else:
+                    self.acertos_negativos += 1
+            return json.loads(dados)
+
+    def salvar(self, nome_produto: str, dados: Dict[str, Any]) -> None:
+        """
+        Armazena o resultado de uma consulta.
+
+        O TTL é escolhido por dados['encontrado']: resultados negativos expiram
+        mais cedo para que produtos novos nas bases apareçam logo.
+
+        Args:
+            nome_produto: Nome do produto (normalizado internamente).
+            dados: Resultado da consulta.
+        """
+        chave = self.chave(nome_produto)
+        encontrado = bool(dados.get("encontrado", False))
+        agora = time.time()
+        expira_em = agora + (self.ttl_positivo if encontrado else self.ttl_negativo)
+        with self.lock:
+            existia = self.conn.execute("SELECT 1 FROM cache_alimentos WHERE chave = ?", (chave,)).fetchone()
+            self.conn.execute(
+                """
+                INSERT INTO cache_alimentos (chave, dados, encontrado, criado_em, expira_em, ultimo_acesso)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(chave) DO UPDATE SET
+                    dados = excluded.dados,
+                    encontrado = excluded.encontrado,
+                    criado_em = excluded.criado_em,
+                    expira_em = excluded.expira_em,
+                    ultimo_acesso = excluded.ultimo_acesso
+                """,
+                (chave, json.dumps(dados, ensure_ascii=False), int(encontrado), agora, expira_em, agora)
+            )
+            if not existia:
+                self._total += 1
+            if self._total > self.max_entradas:
+                self._remover_menos_usados()
+            self.conn.commit()
+
+    def _remover_menos_usados(self):
+        """Remove as entradas menos usadas recentemente até voltar ao limite (chamado com o lock)."""
+        self._total = self.conn.execute("SELECT COUNT(*) FROM cache_alimentos").fetchone()[0]
+        excesso = self._total - self.max_entradas
+        if excesso <= 0:
+            return
+        self.conn.execute(
+            """
+            DELETE FROM cache_alimentos WHERE chave IN (
+                SELECT chave FROM cache_alimentos ORDER BY ultimo_acesso ASC LIMIT ?
+            )
+            """,
+            (excesso,)
+        )
+        self._total -= excesso
+        self.removidos_lru += excesso
+
+    def limpar_expirados(self) -> int:
+        """Remove todas as entradas expiradas. Retorna a quantidade removida."""
+        with self.lock:
+            removidos = self.conn.execute("DELETE FROM cache_alimentos WHERE expira_em <= ?", (time.time(),)).rowcount
+            self.conn.commit()
+            self._total -= removidos
+            self.expirados += removidos
+            return removidos
+
+    def importar_json(self, caminho_json: str) -> int:
+        """
+        Importa entradas do antigo cache em JSON ({nome: dados}).
+
+        Args:
+            caminho_json: Caminho do arquivo alimentos_cache.json.
+
+        Returns:
+            int: Número de entradas importadas.
+        """
+        try:
+            with open(caminho_json, "r", encoding="utf-8") as f:
+                antigo = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Não foi possível importar cache antigo {caminho_json}: {e}")
+            return 0
+        for nome, dados in antigo.items():
+            if isinstance(dados, dict):
+                self.salvar(nome, dados)
+        return len(antigo)
+
+    def estatisticas(self) -> Dict[str, Any]:
+        """
+        Retorna contadores de uso do cache desde a sua abertura.
+
+        Returns:
+            Dict[str, Any]: acertos, acertos_negativos, falhas, taxa_acerto,
+            expirados, removidos_lru e entradas.
+        """
+        consultas = self.acertos + self.acertos_negativos + self.falhas
+        return {
+            "acertos": self.acertos,
+            "acertos_negativos": self.acertos_negativos,
+            "falhas": self.falhas,
+            "taxa_acerto": (self.acertos + self.acertos_negativos) / consultas if consultas else 0.0,
+            "expirados": self.expirados,
+            "removidos_lru": self.removidos_lru,
+            "entradas": self._total,
+        }
+
+    def fechar(self):
+        """Fecha a conexão com o arquivo do cache."""
+        with self.lock:
+            self.conn.close()
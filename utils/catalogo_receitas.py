@@ -0,0 +1,313 @@
+"""
+Catálogo de receitas em memória com índice invertido de ingredientes.
+
+O arquivo data/receitas.json é lido uma vez por processo e relido apenas
+quando sua data de modificação (ou tamanho) muda. Ao carregar, cada
+ingrediente recebe uma chave normalizada (utils.normalizacao.chave_ingrediente)
+e são montados dois índices:
+
+- chave do ingrediente -> receitas que o usam;
+- palavra -> chaves de ingredientes que a contêm.
+
+Para sugerir receitas, os nomes do inventário são convertidos nas chaves de
+ingredientes que cobrem (por interseção de conjuntos), as receitas são
+pontuadas apenas a partir dessas chaves e as melhores são escolhidas com um
+heap. O custo cresce com o número de correspondências, não com
+receitas × ingredientes × itens.
+"""
+import heapq
+import json
+import logging
+import os
+import re
+from itertools import combinations
+from threading import Lock
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from .normalizacao import chave_ingrediente
+
+logger = logging.getLogger(__name__)
+
+CAMINHO_RECEITAS = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "receitas.json")
+
+# Receitas usadas quando o arquivo não existe
+RECEITAS_PADRAO = [
+    {
+        "titulo": "Omelete Simples",
+        "ingredientes_usados": ["ovo", "sal", "queijo"],
+        "ingredientes_faltantes": [],
+        "tempo_preparo": 10,
+        "porcoes": 1,
+        "instrucoes": "Bata os ovos, adicione sal a gosto. Aqueça uma frigideira com um fio de óleo, despeje os ovos batidos. Quando começar a firmar, adicione queijo ralado. Dobre ao meio e sirva.",
+        "imagem": "https://img.cybercook.com.br/receitas/776/omelete-simples-1.jpeg"
+    },
+    {
+        "titulo": "Salada Verde",
+        "ingredientes_usados": ["alface", "tomate", "cebola", "azeite"],
+        "ingredientes_faltantes": [],
+        "tempo_preparo": 5,
+        "porcoes": 2,
+        "instrucoes": "Lave e corte a alface. Corte o tomate em cubos e a cebola em rodelas finas. Misture tudo e tempere com azeite, sal e limão a gosto.",
+        "imagem": "https://img.cybercook.com.br/receitas/42/salada-verde-1.jpeg"
+    }
+]
+
+
+def _lista_ingredientes(receita: Dict[str, Any]) -> List[Any]:
+    if receita.get("ingredientes"):
+        return list(receita["ingredientes"])
+    return list(receita.get("ingredientes_usados", [])) + list(receita.get("ingredientes_faltantes", []))
+
+
+def ingredientes_da_receita(receita: Dict[str, Any]) -> List[str]:
+    """
+    Lista completa de ingredientes de uma receita.
+
+    Aceita o formato com 'ingredientes' (nomes ou dicionários com 'nome') e o
+    formato do arquivo, em que a lista está dividida em 'ingredientes_usados'
+    e 'ingredientes_faltantes'.
+    """
+    return [str(e.get("nome", "")) if isinstance(e, dict) else str(e) for e in _lista_ingredientes(receita)]
+
+
+_QUANTIDADE_TEXTO = re.compile(r"^\s*(\d+(?:[.,]\d+)?)\s*(.*?)\s*$")
+
+
+def _ler_quantidade(valor: Any) -> Tuple[Optional[float], Optional[str]]:
+    if isinstance(valor, dict):
+        valor, unidade = valor.get("quantidade"), valor.get("unidade")
+        return (float(valor) if isinstance(valor, (int, float)) else None), unidade
+    if isinstance(valor, (int, float)) and not isinstance(valor, bool):
+        return float(valor), None
+    if isinstance(valor, str):
+        match = _QUANTIDADE_TEXTO.match(valor)
+        if match:
+            return float(match.group(1).replace(",", ".")), match.group(2) or None
+    return None, None
+
+
+def ingredientes_detalhados(receita: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Ingredientes com quantidade e unidade, quando a receita os informa.
+
+    As quantidades podem vir em cada ingrediente ({"nome", "quantidade",
+    "unidade"}) ou em 'ingredientes_quantidades' ({nome: 200}, {nome: "200 g"}
+    ou {nome: {"quantidade": 200, "unidade": "g"}}), com unidades opcionais
+    em 'ingredientes_unidades'.
+
+    Returns:
+        List[Dict[str, Any]]: 'nome', 'chave', 'quantidade' e 'unidade'
+        (None quando não informados), sem chaves repetidas.
+    """
+    quantidades = receita.get("ingredientes_quantidades") or {}
+    unidades = receita.get("ingredientes_unidades") or {}
+    resultado, vistos = [], set()
+    for entrada in _lista_ingredientes(receita):
+        if isinstance(entrada, dict):
+            nome = str(entrada.get("nome", ""))
+            quantidade, unidade = _ler_quantidade(entrada)
+        else:
+            nome = str(entrada)
+            quantidade, unidade = _ler_quantidade(quantidades.get(nome))
+        unidade = unidades.get(nome, unidade)
+        chave = chave_ingrediente(nome)
+        if not chave or chave in vistos:
+            continue
+        vistos.add(chave)
+        resultado.append({"nome": nome, "chave": chave, "quantidade": quantidade, "unidade": unidade})
+    return resultado
+
+
+def chaves_do_estoque(nomes: Iterable[str], max_palavras: int = 5) -> Set[str]:
+    """
+    Chaves de ingrediente que os itens do inventário podem cobrir.
+
+    Para cada item, gera as combinações das suas palavras na ordem original
+    ("leite integral" -> "leite", "integral", "leite integral"), para comparar
+    com as chaves da tabela receita_ingredientes por igualdade. Apenas as
+    primeiras max_palavras palavras de cada nome são combinadas.
+
+    Args:
+        nomes: Nomes dos itens do inventário.
+        max_palavras: Limite de palavras combinadas por nome.
+
+    Returns:
+        Set[str]: Chaves de ingrediente.
+    """
+    chaves: Set[str] = set()
+    for chave_item in {chave_ingrediente(nome) for nome in nomes}:
+        palavras = chave_item.split()[:max_palavras]
+        for tamanho in range(1, len(palavras) + 1):
+            chaves.update(" ".join(c) for c in combinations(palavras, tamanho))
+    return chaves
+
+
+class CatalogoReceitas:
+    """Receitas indexadas pelas chaves normalizadas de seus ingredientes."""
+
+    def __init__(self, receitas: List[Dict[str, Any]]):
+        """
+        Monta os índices do catálogo.
+
+        Args:
+            receitas: Receitas com 'titulo' e ingredientes (ver ingredientes_da_receita).
+        """
+        self.receitas = receitas
+        # Por receita: [(nome original, chave)] sem chaves repetidas
+        self.ingredientes: List[List[Tuple[str, str]]] = []
+        self.receitas_por_chave: Dict[str, List[int]] = {}
+        self.chaves_por_palavra: Dict[str, Set[str]] = {}
+        self.palavras_da_chave: Dict[str, frozenset] = {}
+
+        for indice, receita in enumerate(receitas):
+            vistos, ingredientes = set(), []
+            for nome in ingredientes_da_receita(receita):
+                chave = chave_ingrediente(nome)
+                if not chave or chave in vistos:
+                    continue
+                vistos.add(chave)
+                ingredientes.append((nome, chave))
+                self.receitas_por_chave.setdefault(chave, []).append(indice)
+                if chave not in self.palavras_da_chave:
+                    palavras = frozenset(chave.split())
+                    self.palavras_da_chave[chave] = palavras
+                    for palavra in palavras:
+                        self.chaves_por_palavra.setdefault(palavra, set()).add(chave)
+            self.ingredientes.append(ingredientes)
+
+    def chaves_disponiveis(self, nomes: Iterable[str]) -> Set[str]:
+        """
+        Chaves de ingredientes cobertas pelos nomes do inventário.
+
+        Um item cobre um ingrediente quando as palavras de um estão contidas
+        nas do outro: "Leite Integral" cobre "leite" e "queijo" cobre
+        "queijo ralado".
+
+        Args:
+            nomes: Nomes dos itens do inventário.
+
+        Returns:
+            Set[str]: Chaves de ingredientes do catálogo.
+        """
+        disponiveis: Set[str] = set()
+        for chave_item in {chave_ingrediente(nome) for nome in nomes}:
+            palavras = chave_item.split()
+            if not palavras:
+                continue
+            conjuntos = [self.chaves_por_palavra.get(p, set()) for p in palavras]
+            # Ingredientes que contêm todas as palavras do item
+            disponiveis |= set.intersection(*conjuntos)
+            # Ingredientes cujas palavras estão todas no item
+            palavras_item = frozenset(palavras)
+            for chave in set().union(*conjuntos):
+                if self.palavras_da_chave[chave] <= palavras_item:
+                    disponiveis.add(chave)
+        return disponiveis
+
+    def sugerir(self, nomes: Iterable[str], limite: int = 5) -> List[Dict[str, Any]]:
+        """
+        Receitas mais cobertas pelo inventário.
+
+        A ordem é determinística: maior fração de ingredientes disponíveis,
+        depois mais ingredientes disponíveis, depois a ordem do catálogo.
+
+        Args:
+            nomes: Nomes dos itens do inventário.
+            limite: Número máximo de receitas.
+
+        Returns:
+            List[Dict[str, Any]]: Cópias das receitas com 'ingredientes_usados'
+            (disponíveis), 'ingredientes_faltantes' e 'cobertura' (0 a 1).
+        """
+        disponiveis = self.chaves_disponiveis(nomes)
+        cobertos: Dict[int, int] = {}
+        for chave in disponiveis:
+            for indice in self.receitas_por_chave.get(chave, ()):
+                cobertos[indice] = cobertos.get(indice, 0) + 1
+
+        melhores = heapq.nlargest(
+            limite,
+            cobertos.items(),
+            key=lambda par: (par[1] / len(self.ingredientes[par[0]]), par[1], -par[0]),
+        )
+
+        sugestoes = []
+        for indice, quantidade in melhores:
+            receita = dict(self.receitas[indice])
+            ingredientes = self.ingredientes[indice]
+            receita["ingredientes_usados"] = [nome for nome, chave in ingredientes if chave in disponiveis]
+            receita["ingredientes_faltantes"] = [nome for nome, chave in ingredientes if chave not in disponiveis]
+            receita["cobertura"] = quantidade / len(ingredientes)
+            sugestoes.append(receita)
+        return sugestoes
+
+
+def sugerir_receitas_banco(db, nomes: Iterable[str], limite: int = 5) -> List[Dict[str, Any]]:
+    """
+    Receitas mais cobertas pelo inventário, consultadas nas tabelas do banco.
+
+    Args:
+        db: Gerenciador do banco de dados.
+        nomes: Nomes dos itens do inventário.
+        limite: Número máximo de receitas.
+
+    Returns:
+        List[Dict[str, Any]]: Mesmo formato de CatalogoReceitas.sugerir, com
+        'ingredientes_quantidades' e 'ingredientes_unidades' quando informados.
+    """
+    sugestoes = []
+    for linha in db.buscar_receitas_por_estoque(sorted(chaves_do_estoque(nomes)), limite=limite):
+        receita = json.loads(linha["dados"]) if linha.get("dados") else {}
+        receita.update({campo: linha[campo] for campo in ("titulo", "tempo_preparo", "porcoes", "instrucoes", "imagem")})
+        ingredientes = linha["ingredientes"]
+        receita["ingredientes_usados"] = [i["nome"] for i in ingredientes if i["disponivel"]]
+        receita["ingredientes_faltantes"] = [i["nome"] for i in ingredientes if not i["disponivel"]]
+        receita["ingredientes_quantidades"] = {i["nome"]: i["quantidade"] for i in ingredientes if i["quantidade"] is not None}
+        receita["ingredientes_unidades"] = {i["nome"]: i["unidade"] for i in ingredientes if i["unidade"]}
+        receita["cobertura"] = linha["cobertura"]
+        sugestoes.append(receita)
+    return sugestoes
+
+
+_catalogos: Dict[str, Tuple[Any, CatalogoReceitas]] = {}
+_catalogos_lock = Lock()
+
+
+def obter_catalogo_receitas(caminho: Optional[str] = None) -> CatalogoReceitas:
+    """
+    Catálogo do arquivo de receitas, recarregado somente quando o arquivo muda.
+
+    Args:
+        caminho: Arquivo JSON com a lista de receitas (padrão: data/receitas.json).
+
+    Returns:
+        CatalogoReceitas: Catálogo indexado. Sem arquivo, usa RECEITAS_PADRAO;
+        se o arquivo for inválido, mantém a última versão carregada.
+    """
+    caminho = caminho or CAMINHO_RECEITAS
+    try:
+        estado = os.stat(caminho) if os.path.exists(caminho) else None
+        assinatura = (estado.st_mtime_ns, estado.st_size) if estado else None
+    except OSError:
+        assinatura = None
+
+    with _catalogos_lock:
+        atual = _catalogos.get(caminho)
+        if atual and atual[0] == assinatura:
+            return atual[1]
+
+        if assinatura is None:
+            receitas = RECEITAS_PADRAO
+        else:
+            try:
+                with open(caminho, "r", encoding="utf-8") as f:
+                    receitas = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.error(f"Erro ao carregar receitas de {caminho}: {str(e)}")
+                if atual:
+                    return atual[1]
+                receitas = []
+
+        catalogo = CatalogoReceitas(receitas)
+        _catalogos[caminho] = (assinatura, catalogo)
+        return catalogo
@@ -6,7 +6,7 @@ CATEGORIAS_ALIMENTOS = [
     "Massas", "Snacks", "Ovos", "Óleos/Gorduras", "Outros"
 ]
 
-# Unidades de medida
+# Unidades de medida (convertidas por utils.unidades; embalagens só se comparam entre si)
 UNIDADES_MEDIDA = [
     "unidade", "kg", "g", "mg", "l", "ml", "xícara", "colher de sopa",
     "colher de chá", "porção", "pacote", "caixa", "lata", "garrafa"
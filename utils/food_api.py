@@ -1,3 +1,4 @@
+import atexit
 import requests
 import pandas as pd
 import time
@@ -6,37 +7,209 @@ import os
 import traceback
 from typing import Dict, Any, Optional, List, Tuple
 
-class IntegracaoAlimentos:
+from concurrent.futures import Future, ThreadPoolExecutor
+from threading import Lock
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .cache_nutricional import CacheNutricional
+from .normalizacao import normalizar_texto
+from .taco import TabelaTaco, obter_tabela_taco
+from .alergenos import obter_detector, resumir_ingredientes
+
+URL_OPENFOODFACTS = os.getenv("OPENFOODFACTS_URL", "https://world.openfoodfacts.org/cgi/search.pl")
+# (conexão, leitura) em segundos
+TIMEOUT_HTTP = (3.05, 10)
+TENTATIVAS_HTTP = 3
+BACKOFF_HTTP = 0.5
+MAX_CONEXOES_HTTP = 10
+# Limite de requisições por segundo ao Open Food Facts, compartilhado pelo processo
+REQUISICOES_POR_SEGUNDO = float(os.getenv("OPENFOODFACTS_REQ_POR_SEGUNDO", "10"))
+
+# Cache em SQLite compartilhado pelo processo (ver obter_cache_nutricional)
+CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "cache")
+
+_sessao_http = None
+_sessao_http_lock = Lock()
+_cache_nutricional = None
+_cache_nutricional_lock = Lock()
+
+
+def criar_sessao_http(tentativas: int = TENTATIVAS_HTTP, backoff: float = BACKOFF_HTTP,
+                      max_conexoes: int = MAX_CONEXOES_HTTP) -> requests.Session:
     """
-    Classe para integração com APIs de informações nutricionais
+    Cria uma sessão HTTP com keep-alive e novas tentativas limitadas.
+    
+    Repete apenas GETs com falha de conexão ou respostas 429/5xx, com espera
+    exponencial e respeitando o cabeçalho Retry-After.
+    """
+    retry = Retry(
+        total=tentativas,
+        connect=tentativas,
+        read=tentativas,
+        backoff_factor=backoff,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset(["GET"]),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adaptador = HTTPAdapter(pool_connections=max_conexoes, pool_maxsize=max_conexoes, max_retries=retry)
+    sessao = requests.Session()
+    sessao.mount("https://", adaptador)
+    sessao.mount("http://", adaptador)
+    sessao.headers.update({"User-Agent": "GELADEIRA/1.0 (gerenciamento de alimentos)"})
+    return sessao
+
+
+def obter_sessao_http() -> requests.Session:
+    """Retorna a sessão HTTP compartilhada pelo processo, criando-a na primeira chamada"""
+    global _sessao_http
+    if _sessao_http is None:
+        with _sessao_http_lock:
+            if _sessao_http is None:
+                _sessao_http = criar_sessao_http()
+    return _sessao_http
+
+
+def _migrar_cache_json(cache: CacheNutricional):
+    """Importa uma única vez o antigo cache em JSON para o cache em SQLite"""
+    cache_json = os.path.join(CACHE_DIR, "alimentos_cache.json")
+    if os.path.exists(cache_json):
+        importados = cache.importar_json(cache_json)
+        os.replace(cache_json, cache_json + ".migrado")
+        print(f"Cache antigo migrado para SQLite: {importados} entradas")
+
+
+def obter_cache_nutricional() -> CacheNutricional:
+    """
+    Retorna o cache nutricional compartilhado pelo processo, criando-o na
+    primeira chamada. Uma única conexão e um único conjunto de contadores de
+    acerto servem todas as sessões; a conexão é fechada no encerramento.
+    """
+    global _cache_nutricional
+    if _cache_nutricional is None:
+        with _cache_nutricional_lock:
+            if _cache_nutricional is None:
+                cache = CacheNutricional(os.path.join(CACHE_DIR, "alimentos_cache.db"))
+                _migrar_cache_json(cache)
+                atexit.register(cache.fechar)
+                _cache_nutricional = cache
+    return _cache_nutricional
+
+
+class LimitadorTaxa:
+    """
+    Limitador de taxa (token bucket) seguro entre threads.
+    
+    Permite rajadas de até 'capacidade' requisições e depois no máximo
+    'taxa' requisições por segundo.
+    """
+    
+    def __init__(self, taxa: float, capacidade: Optional[int] = None):
+        self.taxa = taxa
+        self.capacidade = capacidade or max(1, int(taxa))
+        self.tokens = float(self.capacidade)
+        self.ultimo = time.monotonic()
+        self.lock = Lock()
+    
+    def aguardar(self):
+        """Bloqueia até haver um token disponível"""
+        if self.taxa <= 0:
+            return
+        while True:
+            with self.lock:
+                agora = time.monotonic()
+                self.tokens = min(self.capacidade, self.tokens + (agora - self.ultimo) * self.taxa)
+                self.ultimo = agora
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                espera = (1 - self.tokens) / self.taxa
+            time.sleep(espera)
+
+
+_limitador_openfoodfacts = LimitadorTaxa(REQUISICOES_POR_SEGUNDO)
+
+
+class GrupoChamadaUnica:
+    """
+    Deduplicação de chamadas simultâneas (single-flight).
+    
+    A primeira thread que pede uma chave executa a função; as que pedirem a
+    mesma chave enquanto ela roda esperam o mesmo Future e recebem o mesmo
+    resultado (ou a mesma exceção), sem repetir a chamada.
     """
     
     def __init__(self):
-        self.cache_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "cache")
-        if not os.path.exists(self.cache_dir):
-            os.makedirs(self.cache_dir)
-        self.cache_file = os.path.join(self.cache_dir, "alimentos_cache.json")
-        self._load_cache()
-    
-    def _load_cache(self):
-        """Carrega o cache de um arquivo JSON"""
-        try:
-            if os.path.exists(self.cache_file):
-                with open(self.cache_file, 'r', encoding='utf-8') as f:
-                    self.cache = json.load(f)
-            else:
-                self.cache = {}
-        except Exception as e:
-            print(f"Erro ao carregar cache: {e}")
-            self.cache = {}
+        self._lock = Lock()
+        self._em_andamento: Dict[Any, Future] = {}
+        self.executadas = 0
+        self.coalescidas = 0
     
-    def _save_cache(self):
-        """Salva o cache em um arquivo JSON"""
+    def executar(self, chave, funcao, *args, **kwargs):
+        """
+        Executa funcao(*args, **kwargs) uma vez por chave entre as chamadas simultâneas
+        
+        Args:
+            chave: Identificador da chamada (ex.: nome normalizado do produto)
+            funcao: Função a executar
+            
+        Returns:
+            Resultado da função, compartilhado entre as chamadas coalescidas
+        """
+        with self._lock:
+            futuro = self._em_andamento.get(chave)
+            lider = futuro is None
+            if lider:
+                futuro = Future()
+                self._em_andamento[chave] = futuro
+                self.executadas += 1
+            else:
+                self.coalescidas += 1
+        
+        if not lider:
+            return futuro.result()
+        
         try:
-            with open(self.cache_file, 'w', encoding='utf-8') as f:
-                json.dump(self.cache, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            print(f"Erro ao salvar cache: {e}")
+            resultado = funcao(*args, **kwargs)
+            futuro.set_result(resultado)
+            return resultado
+        except BaseException as e:
+            futuro.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._em_andamento[chave]
+    
+    def estatisticas(self) -> Dict[str, int]:
+        """Retorna o número de chamadas executadas, coalescidas e em andamento"""
+        with self._lock:
+            return {
+                "executadas": self.executadas,
+                "coalescidas": self.coalescidas,
+                "em_andamento": len(self._em_andamento),
+            }
+
+
+# Compartilhado por todas as instâncias do processo (sessões, importações em lote)
+_chamadas_nutricionais = GrupoChamadaUnica()
+
+class IntegracaoAlimentos:
+    """
+    Classe para integração com APIs de informações nutricionais
+    """
+    
+    def __init__(self, cache: Optional[CacheNutricional] = None, sessao: Optional[requests.Session] = None,
+                 url_openfoodfacts: str = URL_OPENFOODFACTS, limitador: Optional[LimitadorTaxa] = None,
+                 timeout=TIMEOUT_HTTP, chamadas: Optional[GrupoChamadaUnica] = None,
+                 taco: Optional[TabelaTaco] = None):
+        self.taco = taco or obter_tabela_taco()
+        self.sessao = sessao or obter_sessao_http()
+        self.chamadas = chamadas or _chamadas_nutricionais
+        self.url_openfoodfacts = url_openfoodfacts
+        self.limitador = limitador or _limitador_openfoodfacts
+        self.timeout = timeout
+        self.cache = cache or obter_cache_nutricional()
     
     def buscar_info_nutricional(self, nome_produto: str) -> Dict[str, Any]:
         """
@@ -48,38 +221,89 @@ class IntegracaoAlimentos:
         Returns:
             dict: Informações nutricionais ou dicionário vazio se não encontrado
         """
-        # Verifica se está no cache
-        if nome_produto in self.cache:
-            return self.cache[nome_produto]
+        # Verifica se está no cache (inclusive resultados negativos recentes)
+        em_cache = self.cache.obter(nome_produto)
+        if em_cache is not None:
+            return em_cache
         
+        # Consultas simultâneas do mesmo produto esperam a primeira terminar
+        chave = (self.url_openfoodfacts, self.cache.chave(nome_produto))
+        resultado = self.chamadas.executar(chave, self._consultar_fontes, nome_produto)
+        return dict(resultado)
+    
+    def _consultar_fontes(self, nome_produto: str) -> Dict[str, Any]:
+        """Consulta as fontes externas e grava o resultado no cache"""
+        # Um líder anterior pode ter gravado o resultado entre a leitura do
+        # cache em buscar_info_nutricional e o registro desta consulta
+        em_cache = self.cache.obter(nome_produto, contabilizar=False)
+        if em_cache is not None:
+            return em_cache
+
         try:
-            # Primeiro método: Open Food Facts
-            info = self._buscar_openfoodfacts(nome_produto)
+            # Primeiro método: TACO local (Tabela Brasileira de Composição de Alimentos)
+            info = self._buscar_taco(nome_produto)
             if info and info.get("encontrado", False):
-                self.cache[nome_produto] = info
-                self._save_cache()
+                self.cache.salvar(nome_produto, info)
                 return info
             
-            # Segundo método: TACO (Tabela Brasileira de Composição de Alimentos)
-            info = self._buscar_taco(nome_produto)
+            # Segundo método: Open Food Facts
+            info = self._buscar_openfoodfacts(nome_produto)
             if info and info.get("encontrado", False):
-                self.cache[nome_produto] = info
-                self._save_cache()
+                self.cache.salvar(nome_produto, info)
                 return info
-                
-            # Nenhum resultado encontrado
-            return {"encontrado": False}
+            erro_consulta = info.get("erro") if info else None
+            
+            # Nenhum resultado encontrado; falhas de rede não são guardadas como negativas
+            resultado = {"encontrado": False}
+            if erro_consulta:
+                resultado["erro"] = erro_consulta
+            else:
+                self.cache.salvar(nome_produto, resultado)
+            return resultado
         except Exception as e:
             traceback.print_exc()
             return {"encontrado": False, "erro": str(e)}
     
+    def estatisticas(self) -> Dict[str, Any]:
+        """
+        Retorna métricas do cache e da deduplicação de consultas
+        
+        Returns:
+            dict: {'cache': {...}, 'chamadas': {...}}
+        """
+        return {"cache": self.cache.estatisticas(), "chamadas": self.chamadas.estatisticas()}
+    
+    def buscar_info_nutricional_lote(self, nomes: List[str], max_workers: int = 8) -> Dict[str, Dict[str, Any]]:
+        """
+        Busca informações nutricionais de vários produtos em paralelo
+        
+        Nomes que normalizam para a mesma chave são consultados uma única vez.
+        As requisições passam pelo limitador de taxa compartilhado.
+        
+        Args:
+            nomes: Nomes dos produtos
+            max_workers: Número máximo de consultas simultâneas
+            
+        Returns:
+            dict: {nome original: informações nutricionais}
+        """
+        unicos = {}
+        for nome in nomes:
+            unicos.setdefault(normalizar_texto(nome), nome)
+        if not unicos:
+            return {}
+        
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(unicos))),
+                                thread_name_prefix="food-api") as executor:
+            resultados = dict(zip(unicos.keys(), executor.map(self.buscar_info_nutricional, unicos.values())))
+        return {nome: resultados[normalizar_texto(nome)] for nome in nomes}
+    
     def _buscar_openfoodfacts(self, nome_produto: str) -> Dict[str, Any]:
         """
         Busca no Open Food Facts
         """
         try:
             # Usando a API do Open Food Facts
-            url = f"https://world.openfoodfacts.org/cgi/search.pl"
             params = {
                 "search_terms": nome_produto,
                 "search_simple": 1,
@@ -88,7 +312,9 @@ class IntegracaoAlimentos:
                 "page_size": 1
             }
             
-            response = requests.get(url, params=params)
+            self.limitador.aguardar()
+            response = self.sessao.get(self.url_openfoodfacts, params=params, timeout=self.timeout)
+            response.raise_for_status()
             data = response.json()
             
             if data["count"] > 0:
@@ -119,35 +345,10 @@ class IntegracaoAlimentos:
     
     def _buscar_taco(self, nome_produto: str) -> Dict[str, Any]:
         """
-        Busca na base TACO (implementação simulada, em produção usaria uma API real)
+        Busca na tabela TACO local (exato, prefixo, palavras), sem acesso à rede
         """
         try:
-            # Simular busca na base TACO com alguns alimentos comuns
-            base_taco = {
-                "arroz": {"calorias": 128, "proteinas": 2.5, "carboidratos": 28.1, 
-                         "gorduras": 0.2, "calcio": 4, "ferro": 0.3, "vitamina_c": 0},
-                "feijão": {"calorias": 76, "proteinas": 4.8, "carboidratos": 13.6, 
-                          "gorduras": 0.5, "calcio": 27, "ferro": 1.5, "vitamina_c": 0},
-                "leite": {"calorias": 61, "proteinas": 3.2, "carboidratos": 4.7, 
-                         "gorduras": 3.3, "calcio": 123, "ferro": 0.1, "vitamina_c": 1.5, 
-                         "contem_leite": True},
-                "banana": {"calorias": 89, "proteinas": 1.1, "carboidratos": 22.8, 
-                          "gorduras": 0.1, "calcio": 6, "ferro": 0.4, "vitamina_c": 21.6},
-                "carne": {"calorias": 219, "proteinas": 26.7, "carboidratos": 0, 
-                         "gorduras": 13, "calcio": 9, "ferro": 3.4, "vitamina_c": 0}
-            }
-            
-            # Procurar na base de alimentos
-            for key, dados in base_taco.items():
-                if key in nome_produto.lower():
-                    dados["encontrado"] = True
-                    dados["nome"] = nome_produto
-                    if "contem_leite" not in dados:
-                        dados["contem_leite"] = False
-                    return dados
-            
-            return {"encontrado": False}
-            
+            return self.taco.buscar_info(nome_produto)
         except Exception as e:
             print(f"Erro ao buscar TACO: {e}")
             return {"encontrado": False, "erro": str(e)}
@@ -160,49 +361,12 @@ class IntegracaoAlimentos:
             ingredientes_texto: Texto com ingredientes separados por vírgula
             
         Returns:
-            dict: Análise dos ingredientes
+            dict: Análise dos ingredientes, com as ocorrências encontradas
+            (termo, categorias e posição no texto) em 'ocorrencias'
         """
         try:
-            # Lista de ingredientes alérgicos comuns
-            alergenos = {
-                "leite": ["leite", "lactose", "caseína", "whey", "manteiga", "queijo", "iogurte"],
-                "glúten": ["trigo", "gluten", "cevada", "centeio", "aveia", "malte"],
-                "soja": ["soja", "lecitina de soja", "proteína de soja"],
-                "frutos do mar": ["peixe", "camarão", "lagosta", "caranguejo", "mariscos", "frutos do mar"],
-                "nozes": ["amendoim", "nozes", "castanha", "avelã", "macadâmia", "pistache", "amêndoas"]
-            }
-            
-            ingredientes = [ing.strip().lower() for ing in ingredientes_texto.split(',')]
-            alergenos_encontrados = {}
-            
-            # Para cada tipo de alérgeno, verificar se algum item da lista está nos ingredientes
-            for tipo, lista in alergenos.items():
-                encontrados = []
-                for ingrediente in ingredientes:
-                    if any(alerg in ingrediente for alerg in lista):
-                        encontrados.append(ingrediente)
-                
-                if encontrados:
-                    alergenos_encontrados[tipo] = encontrados
-            
-            # Analisar aditivos artificiais
-            aditivos = []
-            for ingrediente in ingredientes:
-                # Identificar corantes, conservantes e adoçantes artificiais por padrões comuns
-                if any(palavra in ingrediente for palavra in ["corante", "artificial", "conservante", 
-                                                               "ácido", "nitrito", "nitrato", "benzoato", 
-                                                               "sorbato", "adoçante", "aspartame", 
-                                                               "sacarina", "glutamato"]):
-                    aditivos.append(ingrediente)
-            
-            return {
-                "alergenos": alergenos_encontrados,
-                "contem_leite": any(alerg in ["leite"] for alerg in alergenos_encontrados.keys()),
-                "contem_gluten": any(alerg in ["glúten"] for alerg in alergenos_encontrados.keys()),
-                "aditivos": aditivos,
-                "ingredientes_processados": len(aditivos) > 0
-            }
-            
+            ocorrencias = obter_detector().encontrar(ingredientes_texto)
+            return resumir_ingredientes(ingredientes_texto, ocorrencias)
         except Exception as e:
             print(f"Erro ao analisar ingredientes: {e}")
             return {
@@ -210,3 +374,16 @@ class IntegracaoAlimentos:
                 "aditivos": [],
                 "erro": str(e)
             }
+    
+    def analisar_ingredientes_lote(self, textos: List[str]) -> List[Dict[str, Any]]:
+        """
+        Analisa várias listas de ingredientes em uma única passada
+        
+        Args:
+            textos: Listas de ingredientes (uma string por produto)
+            
+        Returns:
+            list: Uma análise por texto, no formato de analisar_ingredientes
+        """
+        ocorrencias = obter_detector().encontrar_lote(textos)
+        return [resumir_ingredientes(texto or "", encontradas) for texto, encontradas in zip(textos, ocorrencias)]
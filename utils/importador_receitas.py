@@ -0,0 +1,182 @@
+"""
+Importação de receitas para as tabelas `receitas` e `receita_ingredientes`.
+
+Arquivos JSONL (uma receita por linha) são lidos em streaming e gravados em
+transações de tamanho fixo, então a memória usada não depende do tamanho do
+arquivo. Arquivos .json com uma lista (como data/receitas.json) também são
+aceitos. Receitas com a mesma chave ('id' da receita ou, na falta dele, o
+título normalizado) são substituídas, então reimportar um arquivo é seguro.
+
+Uso:
+    python -m utils.importador_receitas receitas.jsonl [--db caminho] [--lote 1000]
+"""
+import argparse
+import json
+import logging
+import sys
+import time
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+from .catalogo_receitas import ingredientes_detalhados
+from .normalizacao import normalizar_termo_busca
+
+logger = logging.getLogger(__name__)
+
+# Campos gravados em colunas próprias; o restante vai para receitas.dados
+CAMPOS_RECEITA = ("titulo", "tempo_preparo", "porcoes", "instrucoes", "imagem")
+CAMPOS_INGREDIENTES = ("ingredientes", "ingredientes_usados", "ingredientes_faltantes",
+                       "ingredientes_quantidades", "ingredientes_unidades")
+
+
+def _inteiro(valor: Any) -> Optional[int]:
+    try:
+        return int(valor) if valor is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def preparar_receita(receita: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Converte uma receita do arquivo no formato de salvar_receitas_lote.
+
+    Args:
+        receita: Receita com 'titulo' e ingredientes.
+
+    Returns:
+        Optional[Dict[str, Any]]: Registro pronto para gravar, ou None se a
+        receita não tiver título ou ingredientes.
+    """
+    titulo = str(receita.get("titulo") or "").strip()
+    ingredientes = ingredientes_detalhados(receita)
+    if not titulo or not ingredientes:
+        return None
+    extras = {k: v for k, v in receita.items() if k not in CAMPOS_RECEITA and k not in CAMPOS_INGREDIENTES and k != "id"}
+    return {
+        "chave": str(receita["id"]) if receita.get("id") is not None else normalizar_termo_busca(titulo),
+        "titulo": titulo,
+        "tempo_preparo": _inteiro(receita.get("tempo_preparo")),
+        "porcoes": _inteiro(receita.get("porcoes")),
+        "instrucoes": receita.get("instrucoes"),
+        "imagem": receita.get("imagem"),
+        "dados": json.dumps(extras, ensure_ascii=False) if extras else None,
+        "ingredientes": ingredientes,
+    }
+
+
+def ler_receitas(caminho: str, relatorio: Optional[Dict[str, Any]] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Lê receitas de um arquivo JSONL (em streaming) ou de uma lista JSON.
+
+    Linhas inválidas são ignoradas e contadas em relatorio['invalidas'].
+
+    Args:
+        caminho: Arquivo .jsonl ou .json.
+        relatorio: Dicionário opcional para acumular a contagem de linhas inválidas.
+
+    Yields:
+        Dict[str, Any]: Uma receita por vez.
+    """
+    relatorio = relatorio if relatorio is not None else {}
+    relatorio.setdefault("invalidas", 0)
+    with open(caminho, "r", encoding="utf-8") as f:
+        if caminho.endswith(".json"):
+            yield from json.load(f)
+            return
+        for numero, linha in enumerate(f, start=1):
+            linha = linha.strip()
+            if not linha:
+                continue
+            try:
+                receita = json.loads(linha)
+            except ValueError as e:
+                relatorio["invalidas"] += 1
+                logger.warning(f"Linha {numero} de {caminho} ignorada: {str(e)}")
+                continue
+            if isinstance(receita, dict):
+                yield receita
+            else:
+                relatorio["invalidas"] += 1
+
+
+def importar_receitas(db, receitas: Iterable[Dict[str, Any]], tamanho_lote: int = 1000,
+                      relatorio: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Grava receitas no banco em transações de tamanho_lote receitas.
+
+    Args:
+        db: Gerenciador do banco de dados.
+        receitas: Receitas (qualquer iterável; é consumido uma única vez).
+        tamanho_lote: Receitas por transação.
+        relatorio: Dicionário opcional com contagens já iniciadas (ex.: por ler_receitas).
+
+    Returns:
+        Dict[str, Any]: lidas, importadas, ignoradas, lotes, invalidas e duracao_segundos.
+    """
+    inicio = time.perf_counter()
+    relatorio = relatorio if relatorio is not None else {}
+    relatorio.update({"lidas": 0, "importadas": 0, "ignoradas": 0, "lotes": 0})
+    relatorio.setdefault("invalidas", 0)
+
+    lote = []
+    for receita in receitas:
+        relatorio["lidas"] += 1
+        registro = preparar_receita(receita)
+        if registro is None:
+            relatorio["ignoradas"] += 1
+            continue
+        lote.append(registro)
+        if len(lote) >= tamanho_lote:
+            relatorio["importadas"] += db.salvar_receitas_lote(lote)
+            relatorio["lotes"] += 1
+            lote = []
+    if lote:
+        relatorio["importadas"] += db.salvar_receitas_lote(lote)
+        relatorio["lotes"] += 1
+
+    relatorio["duracao_segundos"] = time.perf_counter() - inicio
+    logger.info(
+        f"Importação de receitas: {relatorio['importadas']}/{relatorio['lidas']} receitas "
+        f"em {relatorio['lotes']} lote(s), {relatorio['duracao_segundos']:.2f}s"
+    )
+    return relatorio
+
+
+def importar_receitas_arquivo(db, caminho: str, tamanho_lote: int = 1000) -> Dict[str, Any]:
+    """
+    Importa um arquivo JSONL (ou lista JSON) de receitas.
+
+    Args:
+        db: Gerenciador do banco de dados.
+        caminho: Caminho do arquivo.
+        tamanho_lote: Receitas por transação.
+
+    Returns:
+        Dict[str, Any]: Mesmo relatório de importar_receitas.
+    """
+    relatorio: Dict[str, Any] = {}
+    return importar_receitas(db, ler_receitas(caminho, relatorio), tamanho_lote, relatorio)
+
+
+def main(argv=None) -> int:
+    from config import DB_PATH
+    from db.extended_database_manager import ExtendedDatabaseManager
+
+    parser = argparse.ArgumentParser(description="Importa receitas para o banco do GELADEIRA")
+    parser.add_argument("arquivo", help="Arquivo .jsonl (uma receita por linha) ou .json (lista)")
+    parser.add_argument("--db", default=str(DB_PATH), help="Caminho do banco de dados")
+    parser.add_argument("--lote", type=int, default=1000, help="Receitas por transação")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    with ExtendedDatabaseManager(args.db) as db:
+        sucesso, msg = db.inicializar_banco()
+        if not sucesso:
+            logger.error(f"Falha ao inicializar banco: {msg}")
+            return 1
+        relatorio = importar_receitas_arquivo(db, args.arquivo, args.lote)
+    print(json.dumps(relatorio, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+"""
+Normalização de nomes de alimentos e ingredientes.
+
+Funções usadas para gerar chaves de cache e de busca: remove acentos,
+converte para minúsculas e compacta espaços, de forma que "Feijão  Preto"
+e "feijao preto" resultem na mesma chave.
+"""
+import re
+import unicodedata
+from functools import lru_cache
+
+_ESPACOS = re.compile(r"\s+")
+_NAO_ALFANUMERICO = re.compile(r"[^0-9a-z]+")
+
+# Palavras ignoradas na busca por termos
+PALAVRAS_VAZIAS = frozenset({"a", "o", "as", "os", "e", "de", "da", "do", "das", "dos", "com", "sem", "em", "para", "tipo"})
+
+
+def remover_acentos(texto: str) -> str:
+    """Remove acentos e cedilhas mantendo as letras base ("ção" -> "cao")."""
+    decomposto = unicodedata.normalize("NFKD", texto)
+    return "".join(c for c in decomposto if not unicodedata.combining(c))
+
+
+def normalizar_texto(texto: str) -> str:
+    """
+    Normaliza um texto para comparação e uso como chave.
+
+    Args:
+        texto: Nome do produto ou ingrediente.
+
+    Returns:
+        str: Texto sem acentos, em minúsculas e com espaços simples.
+    """
+    if not texto:
+        return ""
+    return _ESPACOS.sub(" ", remover_acentos(str(texto)).casefold()).strip()
+
+
+def normalizar_termo_busca(texto: str) -> str:
+    """
+    Normaliza um nome para busca, trocando pontuação por espaços.
+
+    "Arroz, integral, cozido" -> "arroz integral cozido"
+    """
+    return _NAO_ALFANUMERICO.sub(" ", normalizar_texto(texto)).strip()
+
+
+def tokens_busca(texto: str) -> list:
+    """Palavras significativas do nome, na ordem em que aparecem e sem repetição."""
+    vistos = []
+    for token in normalizar_termo_busca(texto).split():
+        if token not in PALAVRAS_VAZIAS and token not in vistos:
+            vistos.append(token)
+    return vistos
+
+
+@lru_cache(maxsize=4096)
+def _dobrar_caractere(c: str) -> str:
+    base = remover_acentos(c.casefold())
+    return base if len(base) == 1 else c.lower()
+
+
+def dobrar_preservando_posicoes(texto: str) -> str:
+    """
+    Remove acentos e converte para minúsculas sem alterar o comprimento.
+
+    Cada caractere vira exatamente um caractere, então posições encontradas
+    no texto dobrado valem também no texto original (útil para destacar
+    trechos). Caracteres que se expandiriam ("ß" -> "ss") ficam só em minúsculas.
+    """
+    return "".join(map(_dobrar_caractere, texto))
+
+
+def _singular(token: str) -> str:
+    if len(token) <= 3 or not token.endswith("s"):
+        return token
+    if token.endswith(("oes", "aes")):
+        return token[:-3] + "ao"
+    if token.endswith("ns"):
+        return token[:-2] + "m"
+    return token[:-1]
+
+
+def chave_ingrediente(texto: str) -> str:
+    """
+    Chave de comparação de ingredientes: palavras significativas no singular.
+
+    "Farinha de Trigo" -> "farinha trigo", "Ovos" -> "ovo", "Limões" -> "limao"
+    """
+    return " ".join(_singular(token) for token in tokens_busca(texto))
@@ -0,0 +1,218 @@
+"""
+Escolha de lojas para uma lista de compras.
+
+Dado um preço por item e loja (historico_precos), escolhe o conjunto de lojas
+que minimiza o custo total dos itens mais uma penalidade por loja adicional
+visitada. É um problema de localização de facilidades (parecido com cobertura
+de conjuntos), resolvido com uma heurística:
+
+1. guloso: adiciona a loja que mais reduz o custo enquanto a redução for
+   maior que a penalidade (cobrir todos os itens tem prioridade);
+2. busca local: aplica o melhor movimento entre remover, adicionar ou trocar
+   uma loja até não haver melhora.
+
+Os dois passos são repetidos a partir de algumas lojas iniciais diferentes
+e fica a melhor solução.
+
+Cada passo avalia todas as lojas candidatas de uma vez sobre a matriz
+itens × lojas, então listas de 200 itens com dezenas de lojas são resolvidas
+em milissegundos.
+"""
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+def _custo(custos: np.ndarray, lojas: List[int], penalidade: float) -> float:
+    return float(custos[:, lojas].min(axis=1).sum()) + penalidade * (len(lojas) - 1)
+
+
+def _busca_local(custos: np.ndarray, escolhidas: List[int], penalidade: float, max_iteracoes: int) -> List[int]:
+    """Aplica o melhor movimento (adicionar, remover ou trocar uma loja) até não haver melhora."""
+    n_lojas = custos.shape[1]
+    atual = custos[:, escolhidas].min(axis=1)
+    valor = _custo(custos, escolhidas, penalidade)
+    for _ in range(max_iteracoes):
+        melhor_valor, melhor_lojas = valor, None
+        fora = [j for j in range(n_lojas) if j not in escolhidas]
+
+        # Adicionar uma loja
+        if fora:
+            candidatos = np.minimum(atual[:, None], custos[:, fora]).sum(axis=0) + penalidade * len(escolhidas)
+            k = int(np.argmin(candidatos))
+            if candidatos[k] < melhor_valor - 1e-9:
+                melhor_valor, melhor_lojas = float(candidatos[k]), escolhidas + [fora[k]]
+
+        for loja in escolhidas:
+            restantes = [j for j in escolhidas if j != loja]
+            if not restantes:
+                # Trocar a única loja pela melhor outra
+                if fora:
+                    candidatos = custos[:, fora].sum(axis=0)
+                    k = int(np.argmin(candidatos))
+                    if candidatos[k] < melhor_valor - 1e-9:
+                        melhor_valor, melhor_lojas = float(candidatos[k]), [fora[k]]
+                continue
+            base = custos[:, restantes].min(axis=1)
+            # Remover a loja
+            sem_loja = float(base.sum()) + penalidade * (len(restantes) - 1)
+            if sem_loja < melhor_valor - 1e-9:
+                melhor_valor, melhor_lojas = sem_loja, restantes
+            # Trocar a loja por outra
+            if fora:
+                candidatos = np.minimum(base[:, None], custos[:, fora]).sum(axis=0) + penalidade * len(restantes)
+                k = int(np.argmin(candidatos))
+                if candidatos[k] < melhor_valor - 1e-9:
+                    melhor_valor, melhor_lojas = float(candidatos[k]), restantes + [fora[k]]
+
+        if melhor_lojas is None:
+            break
+        escolhidas, valor = melhor_lojas, melhor_valor
+        atual = custos[:, escolhidas].min(axis=1)
+    return sorted(escolhidas)
+
+
+def _guloso(custos: np.ndarray, escolhidas: List[int], penalidade: float) -> List[int]:
+    """Adiciona lojas enquanto a redução de custo superar a penalidade."""
+    escolhidas = list(escolhidas)
+    atual = custos[:, escolhidas].min(axis=1) if escolhidas else np.full(custos.shape[0], np.inf)
+    while len(escolhidas) < custos.shape[1]:
+        candidatos = np.minimum(atual[:, None], custos).sum(axis=0)
+        candidatos[escolhidas] = np.inf
+        melhor = int(np.argmin(candidatos))
+        if escolhidas and atual.sum() - candidatos[melhor] <= penalidade:
+            break
+        escolhidas.append(melhor)
+        atual = np.minimum(atual, custos[:, melhor])
+    return escolhidas
+
+
+def _escolher_lojas(custos: np.ndarray, penalidade: float, max_iteracoes: int, inicios: int = 8) -> List[int]:
+    """
+    Guloso seguido de busca local, a partir de vários pontos de partida.
+
+    O primeiro ponto é o guloso puro; os demais começam pelas lojas
+    individualmente mais baratas. Os custos já trazem o valor alto no lugar
+    dos preços ausentes.
+    """
+    melhores_individuais = np.argsort(custos.sum(axis=0), kind="stable")[:inicios]
+    partidas = [_guloso(custos, [], penalidade)] + [_guloso(custos, [int(j)], penalidade) for j in melhores_individuais]
+
+    melhor, melhor_valor = None, np.inf
+    for partida in partidas:
+        lojas = _busca_local(custos, partida, penalidade, max_iteracoes)
+        valor = _custo(custos, lojas, penalidade)
+        if valor < melhor_valor - 1e-9:
+            melhor, melhor_valor = lojas, valor
+    return melhor
+
+
+def otimizar_lojas(lista: List[Dict[str, Any]], precos: pd.DataFrame, penalidade_por_loja: float = 10.0,
+                   max_iteracoes: int = 100) -> Dict[str, Any]:
+    """
+    Escolhe as lojas e em qual delas comprar cada item.
+
+    Args:
+        lista: Itens com 'nome' e 'quantidade' (padrão 1). Nomes repetidos são somados.
+        precos: Preço por item e loja, com 'nome_item', 'local_compra' e 'preco'
+            (ver ExtendedDatabaseManager.obter_precos_por_local).
+        penalidade_por_loja: Custo (R$) de cada loja visitada além da primeira.
+        max_iteracoes: Limite de movimentos da busca local.
+
+    Returns:
+        Dict[str, Any]: 'lojas', 'divisao' ({loja: itens com nome, quantidade,
+        preco_unitario e custo}), 'total_por_loja', 'custo_itens', 'penalidade',
+        'custo_total', 'melhor_loja_unica', 'custo_loja_unica',
+        'economia_vs_loja_unica', 'custo_preco_medio', 'economia_vs_preco_medio',
+        'sem_preco' e 'duracao_segundos'.
+    """
+    inicio = time.perf_counter()
+    quantidades: Dict[str, float] = {}
+    nomes_originais: Dict[str, str] = {}
+    for item in lista:
+        chave = str(item["nome"]).lower()
+        nomes_originais.setdefault(chave, item["nome"])
+        quantidades[chave] = quantidades.get(chave, 0.0) + float(item.get("quantidade") or 1)
+
+    resultado: Dict[str, Any] = {
+        "lojas": [], "divisao": {}, "total_por_loja": {}, "custo_itens": 0.0, "penalidade": 0.0,
+        "custo_total": 0.0, "melhor_loja_unica": None, "custo_loja_unica": None,
+        "economia_vs_loja_unica": None, "custo_preco_medio": 0.0, "economia_vs_preco_medio": 0.0,
+        "sem_preco": [],
+    }
+    if precos is None or precos.empty or not quantidades:
+        resultado["sem_preco"] = list(nomes_originais.values())
+        resultado["duracao_segundos"] = time.perf_counter() - inicio
+        return resultado
+
+    matriz = precos.assign(nome_item=precos["nome_item"].str.lower()).pivot_table(
+        index="nome_item", columns="local_compra", values="preco", aggfunc="min"
+    ).reindex(list(quantidades))
+    matriz = matriz.reindex(sorted(matriz.columns), axis=1)
+    com_preco = matriz.notna().any(axis=1).to_numpy()
+    resultado["sem_preco"] = [nomes_originais[n] for n, ok in zip(matriz.index, com_preco) if not ok]
+    matriz = matriz[com_preco]
+    if matriz.empty:
+        resultado["duracao_segundos"] = time.perf_counter() - inicio
+        return resultado
+
+    lojas = list(matriz.columns)
+    q = np.array([quantidades[n] for n in matriz.index])
+    precos_unitarios = matriz.to_numpy(dtype=float)
+    custos_reais = precos_unitarios * q[:, None]
+
+    # Preço ausente: valor maior que qualquer solução completa, para que cobrir
+    # todos os itens tenha prioridade sobre a penalidade por loja
+    ausente = np.nansum(np.nanmax(custos_reais, axis=1)) * 10 + penalidade_por_loja * len(lojas) + 1
+    custos = np.where(np.isnan(custos_reais), ausente, custos_reais)
+
+    escolhidas = _escolher_lojas(custos, penalidade_por_loja, max_iteracoes)
+    atribuicao = np.array(escolhidas)[np.argmin(custos[:, escolhidas], axis=1)]
+
+    for linha, (nome, coluna) in enumerate(zip(matriz.index, atribuicao)):
+        loja = lojas[coluna]
+        resultado["divisao"].setdefault(loja, []).append({
+            "nome": nomes_originais[nome],
+            "quantidade": float(q[linha]),
+            "preco_unitario": float(precos_unitarios[linha, coluna]),
+            "custo": float(custos_reais[linha, coluna]),
+        })
+    resultado["lojas"] = [lojas[j] for j in escolhidas]
+    resultado["total_por_loja"] = {loja: sum(i["custo"] for i in itens) for loja, itens in resultado["divisao"].items()}
+    resultado["custo_itens"] = float(custos_reais[np.arange(len(q)), atribuicao].sum())
+    resultado["penalidade"] = penalidade_por_loja * (len(escolhidas) - 1)
+    resultado["custo_total"] = resultado["custo_itens"] + resultado["penalidade"]
+
+    # Referências: a loja mais barata que tem todos os itens e o preço médio entre lojas
+    completas = ~np.isnan(custos_reais).any(axis=0)
+    if completas.any():
+        totais = np.where(completas, np.nan_to_num(custos_reais).sum(axis=0), np.inf)
+        melhor = int(np.argmin(totais))
+        resultado["melhor_loja_unica"] = lojas[melhor]
+        resultado["custo_loja_unica"] = float(totais[melhor])
+        resultado["economia_vs_loja_unica"] = resultado["custo_loja_unica"] - resultado["custo_itens"]
+    resultado["custo_preco_medio"] = float((np.nanmean(precos_unitarios, axis=1) * q).sum())
+    resultado["economia_vs_preco_medio"] = resultado["custo_preco_medio"] - resultado["custo_itens"]
+    resultado["duracao_segundos"] = time.perf_counter() - inicio
+    return resultado
+
+
+def planejar_roteiro_compras(db, lista: List[Dict[str, Any]], penalidade_por_loja: float = 10.0,
+                             criterio: str = "recente", periodo_dias: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Consulta os preços no histórico e otimiza as lojas para a lista.
+
+    Args:
+        db: Gerenciador do banco de dados.
+        lista: Itens com 'nome' e 'quantidade'.
+        penalidade_por_loja: Custo (R$) de cada loja adicional.
+        criterio: "recente" ou "media" (ver obter_precos_por_local).
+        periodo_dias: Considera apenas preços dos últimos N dias.
+
+    Returns:
+        Dict[str, Any]: Resultado de otimizar_lojas.
+    """
+    precos = db.obter_precos_por_local([item["nome"] for item in lista], criterio=criterio, periodo_dias=periodo_dias)
+    return otimizar_lojas(lista, precos, penalidade_por_loja)
@@ -0,0 +1,376 @@
+"""
+Planejamento do cardápio semanal de Thomás.
+
+Cada refeição do plano é uma receita do catálogo com um número de porções.
+São candidatas as receitas cujos ingredientes o estoque cobre (ingredientes
+básicos como sal e água são considerados sempre disponíveis) e que não
+contêm substâncias de restricoes_thomas; itens marcados pela triagem como
+não recomendados ficam fora do estoque. Para as candidatas é montada, uma
+única vez, uma tabela esparsa (receita, item, consumo por porção) e a matriz
+de nutrientes por porção.
+
+A pontuação de uma escolha soma:
+
+- um valor fixo por refeição preenchida;
+- o ganho de atendimento das necessidades diárias (necessidades_thomas),
+  com cada nutriente limitado a 100% da meta do dia;
+- o aproveitamento de itens perto do vencimento, proporcional à fração do
+  item usada e à urgência;
+
+menos uma penalidade por receita repetida na semana. Uma escolha só é
+possível se o estoque restante comporta as porções e nenhum item usado já
+venceu no dia.
+
+O plano é montado por um guloso que preenche as refeições em ordem e depois
+melhorado por busca local: cada refeição é trocada pela melhor alternativa
+dadas as demais, até não haver melhora. Todas as alternativas (receita ×
+porções) de uma refeição são avaliadas de uma vez com numpy.
+"""
+import datetime
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .catalogo_receitas import chaves_do_estoque, ingredientes_detalhados, obter_catalogo_receitas
+from .normalizacao import normalizar_texto
+from .triagem_restricoes import COMPATIBILIDADE_NAO_RECOMENDADO, detectar_restricoes
+from .unidades import converter_serie, para_gramas
+
+logger = logging.getLogger(__name__)
+
+REFEICOES_PADRAO = ["Almoço", "Jantar"]
+PORCOES_PADRAO = (0.5, 1.0, 1.5, 2.0)
+DIAS_SEMANA = ["Segunda-feira", "Terça-feira", "Quarta-feira", "Quinta-feira", "Sexta-feira", "Sábado", "Domingo"]
+
+# Chaves de ingrediente que não precisam estar no inventário
+INGREDIENTES_BASICOS = frozenset({"sal", "agua", "oleo", "azeite", "acucar", "pimenta", "pimenta reino", "vinagre"})
+# Quantidade assumida para a nutrição quando a receita não informa
+GRAMAS_PADRAO_INGREDIENTE = 100.0
+MAX_RECEITAS_CANDIDATAS = 3000
+
+# Nome do nutriente (normalizado, sem a unidade entre parênteses) -> (coluna da tabela nutricional, unidade)
+NUTRIENTES = {
+    "calorias": ("calorias_100g", "kcal"),
+    "energia": ("calorias_100g", "kcal"),
+    "proteinas": ("proteinas_g", "g"),
+    "proteina": ("proteinas_g", "g"),
+    "carboidratos": ("carboidratos_g", "g"),
+    "gorduras": ("gorduras_g", "g"),
+    "fibras": ("fibras_g", "g"),
+    "calcio": ("calcio_mg", "mg"),
+    "ferro": ("ferro_mg", "mg"),
+    "vitamina a": ("vitamina_a_mcg", "mcg"),
+    "vitamina c": ("vitamina_c_mg", "mg"),
+    "vitamina d": ("vitamina_d_mcg", "mcg"),
+}
+_FATORES_MASSA = {"g": 1.0, "mg": 1e-3, "mcg": 1e-6, "µg": 1e-6, "ug": 1e-6}
+
+PESO_REFEICAO = 1.0
+PESO_NUTRICAO = 3.0
+PESO_VENCIMENTO = 3.0
+PENALIDADE_REPETICAO = 0.3
+PENALIDADE_PORCAO = 0.01
+# Itens que vencem dentro desta janela recebem bônus de aproveitamento
+JANELA_VENCIMENTO_DIAS = 14
+# Fração creditada a um item usado sem quantidade informada na receita
+FRACAO_SEM_QUANTIDADE = 0.25
+
+
+def _metas_diarias(necessidades: List[Dict[str, Any]]) -> Dict[str, Tuple[str, float]]:
+    """Meta diária de cada nutriente reconhecido, na unidade da coluna nutricional."""
+    metas = {}
+    for necessidade in necessidades:
+        nome = necessidade.get("nutriente") or ""
+        chave = normalizar_texto(nome.split("(")[0])
+        if chave not in NUTRIENTES or not necessidade.get("quantidade_diaria"):
+            continue
+        coluna, unidade_coluna = NUTRIENTES[chave]
+        quantidade = float(necessidade["quantidade_diaria"])
+        unidade = (necessidade.get("unidade") or unidade_coluna).strip().lower()
+        if unidade in _FATORES_MASSA and unidade_coluna in _FATORES_MASSA:
+            quantidade *= _FATORES_MASSA[unidade] / _FATORES_MASSA[unidade_coluna]
+        if quantidade > 0:
+            metas[nome] = (coluna, quantidade)
+    return metas
+
+
+def _receitas_candidatas(db, nomes: List[str], limite: int) -> List[Dict[str, Any]]:
+    """Receitas mais cobertas pelo estoque, do banco ou do arquivo de receitas."""
+    if db.contar_receitas() > 0:
+        linhas = db.buscar_receitas_por_estoque(sorted(chaves_do_estoque(nomes)), limite=limite)
+        return [{"titulo": l["titulo"], "porcoes": l.get("porcoes"), "ingredientes": l["ingredientes"]} for l in linhas]
+    return [
+        {"titulo": r["titulo"], "porcoes": r.get("porcoes"), "ingredientes": ingredientes_detalhados(r)}
+        for r in obter_catalogo_receitas().sugerir(nomes, limite)
+    ]
+
+
+class _Modelo:
+    """Tabelas vetorizadas das receitas candidatas sobre os itens do estoque."""
+
+    def __init__(self, estoque: pd.DataFrame, receitas: List[Dict[str, Any]], metas: Dict[str, Tuple[str, float]],
+                 inicio: datetime.date):
+        self.estoque = estoque.reset_index(drop=True)
+        validade = pd.to_datetime(self.estoque["validade"], errors="coerce").dt.normalize()
+        self.dias_validade = ((validade - pd.Timestamp(inicio)) / pd.Timedelta(days=1)).fillna(np.inf).to_numpy()
+        self.quantidades = self.estoque["quantidade"].to_numpy(dtype=float)
+        self.urgencia = np.clip(1 - self.dias_validade / JANELA_VENCIMENTO_DIAS, 0, 1)
+
+        # Chave de ingrediente -> item; o item que vence antes tem prioridade
+        item_por_chave: Dict[str, int] = {}
+        for indice in np.argsort(self.dias_validade, kind="stable"):
+            for chave in chaves_do_estoque([self.estoque.at[indice, "nome"]]):
+                item_por_chave.setdefault(chave, int(indice))
+
+        self.receitas: List[Dict[str, Any]] = []
+        linhas = []  # (receita, item, quantidade, unidade, porções, nome do ingrediente)
+        for receita in receitas:
+            ingredientes = [i for i in receita["ingredientes"] if i["chave"] not in INGREDIENTES_BASICOS]
+            itens = [item_por_chave.get(i["chave"]) for i in ingredientes]
+            if not ingredientes or any(item is None for item in itens):
+                continue
+            indice = len(self.receitas)
+            self.receitas.append(receita)
+            porcoes = float(receita.get("porcoes") or 1) or 1.0
+            for ingrediente, item in zip(ingredientes, itens):
+                linhas.append((indice, item, ingrediente.get("quantidade"), ingrediente.get("unidade"),
+                               porcoes, ingrediente["nome"]))
+
+        colunas = ["receita", "item", "quantidade", "unidade", "porcoes", "ingrediente"]
+        tabela = pd.DataFrame(linhas, columns=colunas)
+        self.ingrediente = tabela["ingrediente"].tolist()
+        self.receita_linha = tabela["receita"].to_numpy(dtype=np.int64)
+        self.item_linha = tabela["item"].to_numpy(dtype=np.int64)
+        self.inicio_receita = np.searchsorted(self.receita_linha, np.arange(len(self.receitas)))
+
+        itens = self.estoque.iloc[self.item_linha]
+        peso = itens["peso_por_unidade"].to_numpy(dtype=float)
+        densidade = itens["densidade_g_ml"].to_numpy(dtype=float)
+        unidade_item = itens["unidade"].fillna("unidade").to_numpy(dtype=object)
+        # Sem unidade na receita, a quantidade está na unidade do item
+        unidade = tabela["unidade"].where(tabela["unidade"].notna(), pd.Series(unidade_item)).to_numpy(dtype=object)
+        quantidade = pd.to_numeric(tabela["quantidade"], errors="coerce").to_numpy(dtype=float)
+        porcoes = tabela["porcoes"].to_numpy(dtype=float)
+
+        # Consumo por porção na unidade do item (NaN: quantidade desconhecida)
+        consumo = np.full(len(tabela), np.nan)
+        for destino in pd.unique(unidade_item):
+            mascara = unidade_item == destino
+            consumo[mascara] = converter_serie(quantidade[mascara], unidade[mascara], destino,
+                                               peso[mascara], densidade[mascara])
+        self.consumo = np.nan_to_num(consumo / porcoes, nan=0.0)
+        # Consumo do item somando todos os ingredientes da receita que ele cobre
+        self.consumo_item = pd.Series(self.consumo).groupby([self.receita_linha, self.item_linha]).transform("sum").to_numpy()
+
+        gramas = para_gramas(quantidade, unidade, peso, densidade)
+        gramas = np.where(np.isnan(gramas), GRAMAS_PADRAO_INGREDIENTE, gramas) / porcoes
+        self.nomes_metas = list(metas)
+        self.metas = np.array([meta for _, meta in metas.values()], dtype=float)
+        self.nutrientes = np.zeros((len(self.receitas), len(metas)))
+        for k, (coluna, _) in enumerate(metas.values()):
+            por_100g = np.nan_to_num(itens[coluna].to_numpy(dtype=float))
+            self.nutrientes[:, k] = np.bincount(self.receita_linha, weights=gramas * por_100g / 100,
+                                                minlength=len(self.receitas))
+
+        fracao = np.where(self.consumo > 0, self.consumo / self.quantidades[self.item_linha], FRACAO_SEM_QUANTIDADE)
+        self.vencimento = np.bincount(self.receita_linha, weights=fracao * self.urgencia[self.item_linha],
+                                      minlength=len(self.receitas))
+
+    def porcoes_maximas(self, restante: np.ndarray, dia: int) -> np.ndarray:
+        """Maior número de porções de cada receita que o estoque restante comporta no dia."""
+        disponivel = restante[self.item_linha]
+        consumo = self.consumo_item
+        razao = np.where(consumo > 0, disponivel / np.where(consumo > 0, consumo, 1),
+                         np.where(disponivel > 1e-9, np.inf, 0.0))
+        razao[self.dias_validade[self.item_linha] < dia] = 0.0
+        return np.minimum.reduceat(razao, self.inicio_receita)
+
+    def usar(self, restante: np.ndarray, receita: int, porcoes: float, sinal: float = 1.0) -> None:
+        fim = self.inicio_receita[receita + 1] if receita + 1 < len(self.receitas) else len(self.receita_linha)
+        np.add.at(restante, self.item_linha[self.inicio_receita[receita]:fim],
+                  -sinal * porcoes * self.consumo[self.inicio_receita[receita]:fim])
+
+    def linhas(self, receita: int) -> range:
+        fim = self.inicio_receita[receita + 1] if receita + 1 < len(self.receitas) else len(self.receita_linha)
+        return range(self.inicio_receita[receita], fim)
+
+
+def _pontuar(modelo: _Modelo, niveis: np.ndarray, acumulado: np.ndarray, restante: np.ndarray,
+             usos: np.ndarray, dia: int) -> np.ndarray:
+    """
+    Pontuação de cada alternativa (receita × porções) de uma refeição; -inf se inviável.
+
+    A soma das pontuações das refeições, com o estado acumulado até cada uma,
+    é o objetivo do plano; por isso trocar uma refeição pela de maior
+    pontuação, com as demais fixas, nunca piora o plano.
+    """
+    pontos = PESO_REFEICAO + PESO_VENCIMENTO * modelo.vencimento[:, None] * niveis[None, :]
+    if len(modelo.metas):
+        atual = np.minimum(acumulado, modelo.metas)
+        novo = np.minimum(acumulado + niveis[None, :, None] * modelo.nutrientes[:, None, :], modelo.metas)
+        pontos = pontos + PESO_NUTRICAO * ((novo - atual) / modelo.metas).mean(axis=2)
+    pontos = pontos - PENALIDADE_REPETICAO * usos[:, None] - PENALIDADE_PORCAO * niveis[None, :]
+    viaveis = niveis[None, :] <= modelo.porcoes_maximas(restante, dia)[:, None] + 1e-9
+    return np.where(viaveis, pontos, -np.inf)
+
+
+def planejar_cardapio(db, dias: int = 7, refeicoes: Optional[List[str]] = None,
+                      porcoes: Tuple[float, ...] = PORCOES_PADRAO, data_inicio: Optional[datetime.date] = None,
+                      max_receitas: int = MAX_RECEITAS_CANDIDATAS, max_passadas: int = 10) -> Dict[str, Any]:
+    """
+    Monta o cardápio de vários dias com as receitas que o estoque permite.
+
+    Args:
+        db: Gerenciador do banco de dados.
+        dias: Número de dias do cardápio.
+        refeicoes: Nomes das refeições de cada dia (padrão: REFEICOES_PADRAO).
+        porcoes: Números de porções permitidos por refeição.
+        data_inicio: Primeiro dia do cardápio (padrão: hoje).
+        max_receitas: Limite de receitas candidatas lidas do catálogo.
+        max_passadas: Limite de passadas da busca local.
+
+    Returns:
+        Dict[str, Any]: 'dias' (data, dia_semana, refeicoes, nutrientes e
+        atendimento por nutriente), 'metas', 'consumo_estoque' (item ->
+        quantidade usada), 'itens_vencendo_aproveitados', 'refeicoes_vazias',
+        'receitas_candidatas', 'pontuacao' e 'duracao_segundos'. Refeições sem
+        receita possível ficam com 'receita' None.
+    """
+    inicio = time.perf_counter()
+    data_inicio = data_inicio or datetime.date.today()
+    refeicoes = list(refeicoes or REFEICOES_PADRAO)
+    niveis = np.array(sorted(set(float(p) for p in porcoes if p > 0)), dtype=float)
+
+    estoque = db.obter_estoque_nutricional()
+    restricoes = db.obter_restricoes_thomas(apenas_ativas=True)
+    metas = _metas_diarias(db.obter_necessidades_thomas())
+    if not estoque.empty:
+        validade = pd.to_datetime(estoque["validade"], errors="coerce").dt.normalize()
+        restrito = (estoque["compatibilidade_thomas"] == COMPATIBILIDADE_NAO_RECOMENDADO) | \
+            estoque["restricoes_detectadas"].fillna("").astype(bool)
+        estoque = estoque[~restrito & ~(validade < pd.Timestamp(data_inicio))]
+
+    receitas = _receitas_candidatas(db, estoque["nome"].tolist(), max_receitas) if not estoque.empty else []
+    if receitas and restricoes:
+        ingredientes = sorted({i["nome"] for r in receitas for i in r["ingredientes"]})
+        proibidos = {nome for nome, achadas in zip(ingredientes, detectar_restricoes(ingredientes, restricoes)) if achadas}
+        receitas = [r for r in receitas if not any(i["nome"] in proibidos for i in r["ingredientes"])]
+
+    modelo = _Modelo(estoque, receitas, metas, data_inicio) if receitas else None
+    vagas = [(dia, refeicao) for dia in range(dias) for refeicao in range(len(refeicoes))]
+    escolhas: List[Optional[Tuple[int, float]]] = [None] * len(vagas)
+
+    if modelo is not None and modelo.receitas:
+        restante = modelo.quantidades.copy()
+        acumulado = np.zeros((dias, len(modelo.metas)))
+        usos = np.zeros(len(modelo.receitas))
+
+        def aplicar(vaga: int, escolha: Optional[Tuple[int, float]], sinal: float) -> None:
+            if escolha is None:
+                return
+            receita, nivel = escolha
+            modelo.usar(restante, receita, nivel, sinal)
+            acumulado[vagas[vaga][0]] += sinal * nivel * modelo.nutrientes[receita]
+            usos[receita] += sinal
+
+        def melhor(vaga: int, permitidas: Optional[np.ndarray] = None) -> Tuple[Optional[Tuple[int, float]], np.ndarray]:
+            dia = vagas[vaga][0]
+            pontos = _pontuar(modelo, niveis, acumulado[dia], restante, usos, dia)
+            if permitidas is not None:
+                pontos[~permitidas] = -np.inf
+            receita, nivel = np.unravel_index(int(np.argmax(pontos)), pontos.shape)
+            if not np.isfinite(pontos[receita, nivel]):
+                return None, pontos
+            return (int(receita), float(niveis[nivel])), pontos
+
+        # Guloso: primeiro as refeições, em ordem, aproveitam as receitas com
+        # itens que vencem durante o cardápio; depois as vagas restantes
+        # recebem a melhor alternativa entre todas
+        vencem_no_periodo = modelo.dias_validade[modelo.item_linha] < dias
+        urgentes = np.bincount(modelo.receita_linha, weights=vencem_no_periodo, minlength=len(modelo.receitas)) > 0
+        for permitidas in ((urgentes if urgentes.any() else None), None):
+            for vaga in range(len(vagas)):
+                if escolhas[vaga] is None:
+                    escolhas[vaga], _ = melhor(vaga, permitidas)
+                    aplicar(vaga, escolhas[vaga], 1.0)
+            if permitidas is None:
+                break
+
+        # Busca local: troca cada refeição pela melhor alternativa dadas as demais
+        for _ in range(max_passadas):
+            melhorou = False
+            for vaga in range(len(vagas)):
+                atual = escolhas[vaga]
+                aplicar(vaga, atual, -1.0)
+                candidata, pontos = melhor(vaga)
+                if candidata is not None:
+                    valor_atual = pontos[atual[0], np.searchsorted(niveis, atual[1])] if atual else -np.inf
+                    if pontos[candidata[0], np.searchsorted(niveis, candidata[1])] > valor_atual + 1e-9:
+                        escolhas[vaga], melhorou = candidata, True
+                aplicar(vaga, escolhas[vaga], 1.0)
+            if not melhorou:
+                break
+
+    return _montar_resultado(modelo, escolhas, vagas, refeicoes, dias, data_inicio, metas, niveis, inicio)
+
+
+def _montar_resultado(modelo: Optional[_Modelo], escolhas: List[Optional[Tuple[int, float]]],
+                      vagas: List[Tuple[int, int]], refeicoes: List[str], dias: int, data_inicio: datetime.date,
+                      metas: Dict[str, Tuple[str, float]], niveis: np.ndarray, inicio: float) -> Dict[str, Any]:
+    plano = []
+    for dia in range(dias):
+        data = data_inicio + datetime.timedelta(days=dia)
+        plano.append({"data": data.isoformat(), "dia_semana": DIAS_SEMANA[data.weekday()],
+                      "refeicoes": [], "nutrientes": {}, "atendimento": {}})
+
+    nomes_itens = modelo.estoque["nome"].tolist() if modelo else []
+    unidades_itens = modelo.estoque["unidade"].tolist() if modelo else []
+    consumo_estoque: Dict[str, float] = {}
+    vencendo: Dict[str, float] = {}
+    totais = np.zeros((dias, len(metas)))
+    usos: Dict[int, int] = {}
+    pontuacao = 0.0
+    for (dia, refeicao), escolha in zip(vagas, escolhas):
+        entrada = {"refeicao": refeicoes[refeicao], "receita": None}
+        if escolha is not None:
+            receita, nivel = escolha
+            ingredientes = []
+            for linha in modelo.linhas(receita):
+                item = modelo.item_linha[linha]
+                nome_item = nomes_itens[item]
+                quantidade = round(float(nivel * modelo.consumo[linha]), 3)
+                ingredientes.append({"nome": modelo.ingrediente[linha], "item": nome_item,
+                                     "quantidade": quantidade or None, "unidade": unidades_itens[item]})
+                consumo_estoque[nome_item] = consumo_estoque.get(nome_item, 0.0) + quantidade
+                if modelo.urgencia[item] > 0:
+                    vencendo[nome_item] = vencendo.get(nome_item, 0.0) + quantidade
+            totais[dia] += nivel * modelo.nutrientes[receita]
+            # Mesma pontuação de _pontuar; a repetição conta os usos anteriores da receita
+            pontuacao += (PESO_REFEICAO + PESO_VENCIMENTO * nivel * float(modelo.vencimento[receita])
+                          - PENALIDADE_REPETICAO * usos.get(receita, 0) - PENALIDADE_PORCAO * nivel)
+            usos[receita] = usos.get(receita, 0) + 1
+            entrada["receita"] = {"titulo": modelo.receitas[receita]["titulo"], "porcoes": nivel,
+                                  "ingredientes": ingredientes}
+        plano[dia]["refeicoes"].append(entrada)
+
+    for dia in range(dias):
+        for k, (nome, (_, meta)) in enumerate(metas.items()):
+            plano[dia]["nutrientes"][nome] = round(float(totais[dia, k]), 2)
+            plano[dia]["atendimento"][nome] = round(float(min(totais[dia, k] / meta, 1.0)) * 100, 1)
+    if metas:
+        alvo = np.array([meta for _, meta in metas.values()])
+        pontuacao += PESO_NUTRICAO * float((np.minimum(totais, alvo) / alvo).mean(axis=1).sum())
+
+    return {
+        "dias": plano,
+        "metas": {nome: meta for nome, (_, meta) in metas.items()},
+        "consumo_estoque": {nome: round(valor, 3) for nome, valor in consumo_estoque.items()},
+        "itens_vencendo_aproveitados": sorted(vencendo),
+        "refeicoes_vazias": sum(1 for e in escolhas if e is None),
+        "receitas_candidatas": len(modelo.receitas) if modelo else 0,
+        "pontuacao": round(pontuacao, 4),
+        "duracao_segundos": time.perf_counter() - inicio,
+    }
@@ -0,0 +1,252 @@
+"""
+Previsão de consumo por item a partir da tabela `consumo`.
+
+A taxa diária de cada item é uma média móvel exponencial (EWMA) do consumo
+por dia, com meia-vida configurável. Dias sem consumo entram como zero: o
+numerador é a soma de quantidade × peso de cada registro e o denominador é
+a soma dos pesos de todos os dias desde o primeiro consumo, que tem forma
+fechada. Assim a taxa de todos os itens sai de uma única agregação
+vetorizada sobre os registros.
+
+O estado (numerador e primeiro dia por item, último id de consumo lido) é
+guardado em resultados_precomputados. Em cada atualização o numerador é
+apenas decaído até a nova data de referência e recebe os registros novos;
+a releitura completa só acontece quando registros antigos mudam ou quando a
+meia-vida é alterada.
+
+A mesma taxa alimenta a previsão de desperdício: o que não deve ser
+consumido até a validade é a sobra prevista, valorada pelo custo unitário.
+"""
+import datetime
+import logging
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+CHAVE_ESTADO = "previsao_consumo:estado"
+MEIA_VIDA_DIAS = 14.0
+# Itens com histórico curto são tratados como se tivessem ao menos esta janela
+JANELA_MINIMA_DIAS = 7
+# Previsões de fim além disso (consumo quase parado) ficam sem data
+MAX_DIAS_PREVISAO = 3650
+
+
+_ORDINAL_EPOCA = datetime.date(1970, 1, 1).toordinal()
+
+
+def _decaimento(meia_vida: float) -> float:
+    return 0.5 ** (1.0 / meia_vida)
+
+
+def _somar_registros(consumo: pd.DataFrame, referencia: int, decaimento: float) -> pd.DataFrame:
+    """Numerador ponderado e primeiro dia por item, em uma agregação."""
+    dias = (pd.to_datetime(consumo["data_consumo"]).to_numpy().astype("datetime64[D]").astype(np.int64)
+            + _ORDINAL_EPOCA)
+    idade = np.clip(referencia - dias, 0, None)
+    return pd.DataFrame({
+        "item_id": consumo["item_id"].to_numpy(),
+        "ponderado": consumo["quantidade"].to_numpy(dtype=float) * decaimento ** idade,
+        "dia": dias,
+    }).groupby("item_id").agg(numerador=("ponderado", "sum"), primeira=("dia", "min"))
+
+
+def atualizar_estado(db, hoje: Optional[datetime.date] = None, meia_vida: float = MEIA_VIDA_DIAS) -> Dict[str, Any]:
+    """
+    Atualiza o estado da previsão com os consumos registrados desde a última vez.
+
+    Args:
+        db: Gerenciador do banco de dados.
+        hoje: Data de referência (padrão: hoje).
+        meia_vida: Meia-vida da média exponencial, em dias.
+
+    Returns:
+        Dict[str, Any]: Estado com 'referencia' (ordinal da data), 'ultimo_id',
+        'total_linhas', 'meia_vida', 'itens' ({item_id: [numerador, primeiro dia]})
+        e 'recalculo_completo' (se a última atualização releu todo o histórico).
+    """
+    referencia = (hoje or datetime.date.today()).toordinal()
+    decaimento = _decaimento(meia_vida)
+    salvo = db.obter_resultado_precomputado(CHAVE_ESTADO)
+    estado = salvo["dados"] if salvo else None
+
+    # Registros antigos removidos ou alterados invalidam o estado incremental
+    if (estado is None or estado.get("meia_vida") != meia_vida
+            or db.contar_consumo(ate_id=estado["ultimo_id"]) != estado["total_linhas"]
+            or referencia < estado["referencia"]):
+        estado = {"referencia": referencia, "ultimo_id": 0, "total_linhas": 0, "meia_vida": meia_vida, "itens": {}}
+        recalculo_completo = True
+    else:
+        recalculo_completo = False
+
+    alterado = recalculo_completo or referencia != estado["referencia"]
+    itens = pd.DataFrame(
+        [(int(k), v[0], v[1]) for k, v in estado["itens"].items()], columns=["item_id", "numerador", "primeira"]
+    ).set_index("item_id")
+    itens["numerador"] *= decaimento ** (referencia - estado["referencia"])
+
+    novos = db.obter_consumo_desde(apos_id=estado["ultimo_id"])
+    if not novos.empty:
+        itens = pd.concat([itens, _somar_registros(novos, referencia, decaimento)]).groupby(level=0).agg(
+            numerador=("numerador", "sum"), primeira=("primeira", "min")
+        )
+        estado["ultimo_id"] = int(novos["id"].max())
+        estado["total_linhas"] += len(novos)
+        alterado = True
+
+    itens = {int(i): [float(n), int(p)] for i, n, p in zip(itens.index, itens["numerador"], itens["primeira"])}
+    estado.update({"referencia": referencia, "itens": itens})
+    if alterado:
+        db.salvar_resultado_precomputado(CHAVE_ESTADO, estado)
+    estado["recalculo_completo"] = recalculo_completo
+    return estado
+
+
+def taxas_diarias(estado: Dict[str, Any]) -> pd.Series:
+    """
+    Taxa diária de consumo por item a partir do estado.
+
+    Returns:
+        pd.Series: Taxa indexada por item_id.
+    """
+    if not estado["itens"]:
+        return pd.Series(dtype=float)
+    ids = np.fromiter((int(k) for k in estado["itens"]), dtype=np.int64)
+    valores = np.array(list(estado["itens"].values()), dtype=float)
+    decaimento = _decaimento(estado["meia_vida"])
+    dias = np.maximum(estado["referencia"] - valores[:, 1] + 1, JANELA_MINIMA_DIAS)
+    soma_pesos = (1 - decaimento ** dias) / (1 - decaimento)
+    return pd.Series(valores[:, 0] / soma_pesos, index=ids)
+
+
+def _inventario_com_taxas(db, hoje: datetime.date, meia_vida: float) -> pd.DataFrame:
+    """Inventário com a coluna 'taxa_diaria' (0 para itens sem consumo)."""
+    inventario = db.carregar_inventario()
+    if inventario.empty:
+        return inventario
+    taxas = taxas_diarias(atualizar_estado(db, hoje, meia_vida))
+    inventario["taxa_diaria"] = inventario["id"].map(taxas).fillna(0.0).to_numpy()
+    return inventario
+
+
+def prever_consumo(db, horizonte_dias: int = 7, hoje: Optional[datetime.date] = None,
+                   meia_vida: float = MEIA_VIDA_DIAS) -> pd.DataFrame:
+    """
+    Prevê a data em que cada item acaba e quanto comprar para o horizonte.
+
+    Args:
+        db: Gerenciador do banco de dados.
+        horizonte_dias: Dias que a compra deve cobrir.
+        hoje: Data de referência (padrão: hoje).
+        meia_vida: Meia-vida da média exponencial, em dias.
+
+    Returns:
+        pd.DataFrame: Uma linha por item com 'id', 'nome', 'quantidade',
+        'unidade', 'taxa_diaria', 'dias_restantes' (inf sem consumo),
+        'data_fim_prevista' (NaT sem consumo ou
+        além de MAX_DIAS_PREVISAO) e 'quantidade_sugerida'.
+    """
+    from .unidades import MASSA, VOLUME, dimensoes_serie
+
+    hoje = hoje or datetime.date.today()
+    inventario = _inventario_com_taxas(db, hoje, meia_vida)
+    if inventario.empty:
+        return pd.DataFrame(columns=["id", "nome", "quantidade", "unidade", "taxa_diaria",
+                                     "dias_restantes", "data_fim_prevista", "quantidade_sugerida"])
+
+    previsao = inventario[["id", "nome", "quantidade", "unidade", "taxa_diaria"]].copy()
+    quantidade = previsao["quantidade"].astype(float).to_numpy()
+    taxa = previsao["taxa_diaria"].to_numpy()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        dias_restantes = np.where(taxa > 0, quantidade / taxa, np.inf)
+    previsao["dias_restantes"] = dias_restantes
+    dias_inteiros = np.floor(np.where(dias_restantes <= MAX_DIAS_PREVISAO, dias_restantes, np.nan))
+    previsao["data_fim_prevista"] = (pd.Timestamp(hoje) + pd.to_timedelta(dias_inteiros, unit="D")).date
+
+    sugerida = np.maximum(taxa * horizonte_dias - quantidade, 0.0)
+    # Unidades que não são massa/volume (unidade, pacote, lata...) são compradas inteiras
+    inteiras = ~np.isin(dimensoes_serie(previsao["unidade"].fillna("unidade")), [MASSA, VOLUME])
+    previsao["quantidade_sugerida"] = np.where(inteiras, np.ceil(sugerida - 1e-9), np.round(sugerida, 3))
+    return previsao.sort_values(["dias_restantes", "nome"], kind="stable").reset_index(drop=True)
+
+
+COLUNAS_DESPERDICIO = ["id", "nome", "quantidade", "unidade", "localizacao", "validade", "dias_ate_vencer",
+                       "taxa_diaria", "consumo_previsto", "sobra_prevista", "custo_unitario", "valor_em_risco"]
+
+
+def prever_desperdicio(db, horizonte_dias: Optional[int] = 7, hoje: Optional[datetime.date] = None,
+                       meia_vida: float = MEIA_VIDA_DIAS) -> pd.DataFrame:
+    """
+    Prevê quanto de cada item deve sobrar quando a validade chegar.
+
+    O consumo previsto até a validade é a taxa diária vezes os dias de hoje
+    até o vencimento, inclusive. O que passar da quantidade em estoque é a
+    sobra prevista, e a sobra vezes o custo unitário é o valor em risco.
+    Itens já vencidos têm toda a quantidade em risco.
+
+    Args:
+        db: Gerenciador do banco de dados.
+        horizonte_dias: Considera apenas itens que vencem nos próximos N dias
+            (None considera todos os itens com validade).
+        hoje: Data de referência (padrão: hoje).
+        meia_vida: Meia-vida da média exponencial, em dias.
+
+    Returns:
+        pd.DataFrame: Itens com sobra prevista (colunas em COLUNAS_DESPERDICIO),
+        do maior para o menor valor em risco.
+    """
+    hoje = hoje or datetime.date.today()
+    inventario = _inventario_com_taxas(db, hoje, meia_vida)
+    if inventario.empty:
+        return pd.DataFrame(columns=COLUNAS_DESPERDICIO)
+
+    validade = pd.to_datetime(inventario["validade"], errors="coerce").dt.normalize()
+    quantidade = pd.to_numeric(inventario["quantidade"], errors="coerce").fillna(0.0).to_numpy(dtype=float)
+    custo = pd.to_numeric(inventario["custo_unitario"], errors="coerce").fillna(0.0).to_numpy(dtype=float)
+    taxa = inventario["taxa_diaria"].to_numpy(dtype=float)
+    dias = ((validade - pd.Timestamp(hoje)) / pd.Timedelta(days=1)).to_numpy(dtype=float)
+
+    consumo_previsto = taxa * np.clip(dias + 1, 0, None)
+    sobra = np.clip(quantidade - np.nan_to_num(consumo_previsto), 0, None)
+    selecionados = ~np.isnan(dias) & (sobra > 0)
+    if horizonte_dias is not None:
+        selecionados &= dias <= horizonte_dias
+
+    risco = inventario.loc[selecionados, ["id", "nome", "quantidade", "unidade", "localizacao"]].copy()
+    risco["validade"] = validade[selecionados].dt.date
+    risco["dias_ate_vencer"] = dias[selecionados].astype(int)
+    risco["taxa_diaria"] = taxa[selecionados]
+    risco["consumo_previsto"] = np.minimum(consumo_previsto[selecionados], quantidade[selecionados])
+    risco["sobra_prevista"] = sobra[selecionados]
+    risco["custo_unitario"] = custo[selecionados]
+    risco["valor_em_risco"] = np.round(sobra[selecionados] * custo[selecionados], 2)
+    return risco.sort_values(["valor_em_risco", "dias_ate_vencer"], ascending=[False, True],
+                             kind="stable")[COLUNAS_DESPERDICIO].reset_index(drop=True)
+
+
+def resumir_desperdicio(risco: pd.DataFrame, limite: int = 5) -> Dict[str, Any]:
+    """
+    Resumo da previsão de desperdício para alertas.
+
+    Args:
+        risco: Resultado de prever_desperdicio.
+        limite: Quantidade de itens incluídos no resumo.
+
+    Returns:
+        Dict[str, Any]: 'valor_total' em risco, 'total_itens' e 'itens' (os
+        de maior valor, com nome, sobra_prevista, unidade, validade e valor_em_risco).
+    """
+    if risco is None or risco.empty:
+        return {"valor_total": 0.0, "total_itens": 0, "itens": []}
+    itens = risco.head(limite)[["nome", "sobra_prevista", "unidade", "validade", "valor_em_risco"]]
+    return {
+        "valor_total": round(float(risco["valor_em_risco"].sum()), 2),
+        "total_itens": int(len(risco)),
+        "itens": [
+            {"nome": nome, "sobra_prevista": float(sobra), "unidade": unidade,
+             "validade": str(validade), "valor_em_risco": float(valor)}
+            for nome, sobra, unidade, validade, valor in itens.itertuples(index=False)
+        ],
+    }
@@ -0,0 +1,322 @@
+"""
+Tabela TACO (Tabela Brasileira de Composição de Alimentos) em SQLite local.
+
+O importador lê a tabela TACO exportada em CSV (colunas como "Descrição dos
+alimentos", "Energia (kcal)", "Proteína (g)"...) e grava os valores por 100 g
+em uma tabela indexada, com os nomes já normalizados e sem acentos. As
+colunas de nutrientes seguem os nomes da tabela `nutricional` do sistema.
+
+A busca tenta, nessa ordem: nome exato, prefixo do nome e correspondência
+por palavras, sempre por índice, sem acessar a rede.
+
+Uso:
+    python -m utils.taco caminho/para/taco.csv [--db data/taco.db]
+"""
+import csv
+import logging
+import os
+import sqlite3
+import sys
+from threading import Lock
+from typing import Any, Dict, List, Optional
+
+from .normalizacao import normalizar_termo_busca, normalizar_texto, tokens_busca
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+CSV_PADRAO = os.path.join(DATA_DIR, "taco.csv")
+DB_PADRAO = os.path.join(DATA_DIR, "taco.db")
+
+# Coluna da tabela `nutricional` -> nomes possíveis no CSV (normalizados, sem unidade)
+COLUNAS_CSV = {
+    "calorias_100g": ("energia kcal", "energia", "kcal", "calorias"),
+    "proteinas_g": ("proteina g", "proteina", "proteinas"),
+    "gorduras_g": ("lipideos g", "lipideos", "lipidios", "gorduras", "gordura total"),
+    "carboidratos_g": ("carboidrato g", "carboidrato", "carboidratos"),
+    "fibras_g": ("fibra alimentar g", "fibra alimentar", "fibras", "fibra"),
+    "calcio_mg": ("calcio mg", "calcio"),
+    "ferro_mg": ("ferro mg", "ferro"),
+    "sodio_100g": ("sodio mg", "sodio"),
+    "vitamina_c_mg": ("vitamina c mg", "vitamina c"),
+    "vitamina_a_mcg": ("re mcg", "rae mcg", "retinol mcg", "vitamina a"),
+}
+# Conversão do valor do CSV para a unidade da tabela `nutricional`: a TACO
+# traz o sódio em mg, `nutricional.sodio_100g` guarda gramas
+FATORES_CSV = {"sodio_100g": 0.001}
+# user_version do banco da TACO; a versão 1 passou sodio_100g de mg para g
+VERSAO_TACO = 1
+COLUNAS_DESCRICAO = ("descricao dos alimentos", "descricao do alimento", "descricao", "alimento", "nome")
+COLUNAS_CATEGORIA = ("categoria do alimento", "categoria", "grupo")
+COLUNAS_CODIGO = ("numero do alimento", "numero", "codigo", "id")
+
+# Colunas da tabela `nutricional` -> chaves usadas por IntegracaoAlimentos
+CHAVES_INFO = {
+    "calorias_100g": "calorias",
+    "proteinas_g": "proteinas",
+    "carboidratos_g": "carboidratos",
+    "gorduras_g": "gorduras",
+    "fibras_g": "fibras",
+    "calcio_mg": "calcio",
+    "ferro_mg": "ferro",
+    "sodio_100g": "sodio",
+    "vitamina_c_mg": "vitamina_c",
+    "vitamina_a_mcg": "vitamina_a",
+}
+# Chaves de IntegracaoAlimentos em unidade diferente da coluna (sódio em mg, como no Open Food Facts)
+FATORES_INFO = {"sodio": 1000}
+
+
+def _converter_valor(valor: str) -> Optional[float]:
+    """Converte valores do CSV da TACO ("12,5", "Tr", "NA", "*") para float."""
+    valor = (valor or "").strip()
+    if not valor or valor.upper() in ("NA", "*", "-", "ND"):
+        return None
+    if valor.lower() in ("tr", "traco", "traço"):
+        return 0.0
+    try:
+        return float(valor.replace(",", "."))
+    except ValueError:
+        return None
+
+
+def _mapear_cabecalho(cabecalho: List[str]) -> Dict[str, int]:
+    """Associa cada coluna conhecida à sua posição no CSV."""
+    normalizados = [normalizar_termo_busca(c) for c in cabecalho]
+    mapa = {}
+
+    def localizar(nomes):
+        for nome in nomes:
+            if nome in normalizados:
+                return normalizados.index(nome)
+        return None
+
+    for coluna, nomes in list(COLUNAS_CSV.items()) + [
+        ("descricao", COLUNAS_DESCRICAO), ("categoria", COLUNAS_CATEGORIA), ("codigo", COLUNAS_CODIGO)
+    ]:
+        posicao = localizar(nomes)
+        if posicao is not None:
+            mapa[coluna] = posicao
+    if "descricao" not in mapa:
+        raise ValueError("CSV da TACO sem coluna de descrição dos alimentos")
+    return mapa
+
+
+class TabelaTaco:
+    """Tabela TACO local com busca por nome exato, prefixo e palavras."""
+
+    def __init__(self, caminho: str = DB_PADRAO):
+        """
+        Abre (ou cria) o banco da tabela TACO.
+
+        Args:
+            caminho: Arquivo SQLite (":memory:" para testes).
+        """
+        self.caminho = caminho
+        self.lock = Lock()
+        if caminho != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+        self.conn = sqlite3.connect(caminho, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        colunas = ",\n".join(f"                {c} REAL" for c in COLUNAS_CSV)
+        self.conn.executescript(f"""
+            CREATE TABLE IF NOT EXISTS taco_alimentos (
+                id INTEGER PRIMARY KEY,
+                codigo INTEGER,
+                descricao TEXT NOT NULL,
+                nome_normalizado TEXT NOT NULL,
+                categoria TEXT,
+{colunas}
+            );
+            CREATE INDEX IF NOT EXISTS idx_taco_nome ON taco_alimentos (nome_normalizado);
+            CREATE TABLE IF NOT EXISTS taco_tokens (
+                token TEXT NOT NULL,
+                alimento_id INTEGER NOT NULL REFERENCES taco_alimentos(id),
+                PRIMARY KEY (token, alimento_id)
+            ) WITHOUT ROWID;
+        """)
+        with self.conn:
+            if self.conn.execute("PRAGMA user_version").fetchone()[0] < VERSAO_TACO:
+                # Bancos importados antes da versão 1 guardavam o sódio em mg
+                self.conn.execute("UPDATE taco_alimentos SET sodio_100g = sodio_100g / 1000.0")
+                self.conn.execute(f"PRAGMA user_version = {VERSAO_TACO}")
+
+    def total(self) -> int:
+        """Número de alimentos carregados."""
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM taco_alimentos").fetchone()[0]
+
+    def importar_csv(self, caminho_csv: str) -> int:
+        """
+        Importa a tabela TACO de um CSV, substituindo o conteúdo atual.
+
+        Aceita separador ',' ou ';', decimal com vírgula e os marcadores da
+        TACO ("Tr" = traço, tratado como 0; "NA" e "*" = sem dado).
+
+        Args:
+            caminho_csv: Caminho do arquivo CSV.
+
+        Returns:
+            int: Número de alimentos importados.
+        """
+        with open(caminho_csv, "r", encoding="utf-8-sig", newline="") as f:
+            amostra = f.read(4096)
+            f.seek(0)
+            dialeto = csv.Sniffer().sniff(amostra, delimiters=",;\t")
+            leitor = csv.reader(f, dialeto)
+            mapa = _mapear_cabecalho(next(leitor))
+
+            alimentos, tokens = [], []
+            for numero, linha in enumerate(leitor, start=1):
+                if len(linha) <= mapa["descricao"] or not linha[mapa["descricao"]].strip():
+                    continue
+                descricao = linha[mapa["descricao"]].strip()
+                codigo = _converter_valor(linha[mapa["codigo"]]) if "codigo" in mapa else None
+                categoria = linha[mapa["categoria"]].strip() if "categoria" in mapa else None
+                valores = [
+                    _converter_valor(linha[mapa[c]]) if c in mapa and mapa[c] < len(linha) else None
+                    for c in COLUNAS_CSV
+                ]
+                valores = [v * FATORES_CSV[c] if v is not None and c in FATORES_CSV else v
+                           for c, v in zip(COLUNAS_CSV, valores)]
+                alimentos.append((numero, int(codigo) if codigo is not None else None, descricao,
+                                  normalizar_termo_busca(descricao), categoria, *valores))
+                tokens.extend((token, numero) for token in tokens_busca(descricao))
+
+        colunas = ", ".join(COLUNAS_CSV)
+        marcadores = ", ".join("?" * (5 + len(COLUNAS_CSV)))
+        with self.lock:
+            with self.conn:
+                self.conn.execute("DELETE FROM taco_tokens")
+                self.conn.execute("DELETE FROM taco_alimentos")
+                self.conn.executemany(
+                    f"INSERT INTO taco_alimentos (id, codigo, descricao, nome_normalizado, categoria, {colunas}) "
+                    f"VALUES ({marcadores})",
+                    alimentos
+                )
+                self.conn.executemany("INSERT OR IGNORE INTO taco_tokens (token, alimento_id) VALUES (?, ?)", tokens)
+            self.conn.execute("ANALYZE")
+        logger.info(f"{len(alimentos)} alimentos da TACO importados de {caminho_csv}")
+        return len(alimentos)
+
+    def buscar(self, nome: str) -> Optional[Dict[str, Any]]:
+        """
+        Busca um alimento pelo nome: exato, depois prefixo, depois palavras.
+
+        Na busca por palavras vence o alimento com mais palavras em comum,
+        exigindo a primeira palavra do nome pesquisado (em geral o alimento
+        base: "leite" em "leite integral uht"); empates ficam com a descrição
+        mais curta.
+
+        Args:
+            nome: Nome do produto.
+
+        Returns:
+            Optional[Dict[str, Any]]: Linha da tabela com 'correspondencia'
+            ('exata', 'prefixo' ou 'palavras'), ou None.
+        """
+        termo = normalizar_termo_busca(nome)
+        if not termo:
+            return None
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT * FROM taco_alimentos WHERE nome_normalizado = ? ORDER BY id LIMIT 1", (termo,)
+            ).fetchone()
+            if row:
+                return dict(row, correspondencia="exata")
+
+            # Intervalo [termo + " ", termo + "!") cobre "termo ..." usando o índice
+            row = self.conn.execute(
+                """
+                SELECT * FROM taco_alimentos
+                WHERE nome_normalizado >= ? AND nome_normalizado < ?
+                ORDER BY length(nome_normalizado), id LIMIT 1
+                """,
+                (termo + " ", termo + "!")
+            ).fetchone()
+            if row:
+                return dict(row, correspondencia="prefixo")
+
+            tokens = tokens_busca(nome)
+            if not tokens:
+                return None
+            marcadores = ", ".join("?" * len(tokens))
+            row = self.conn.execute(
+                f"""
+                SELECT a.*, COUNT(*) AS palavras_em_comum
+                FROM taco_tokens t
+                JOIN taco_alimentos a ON a.id = t.alimento_id
+                WHERE t.token IN ({marcadores})
+                  AND t.alimento_id IN (SELECT alimento_id FROM taco_tokens WHERE token = ?)
+                GROUP BY a.id
+                ORDER BY palavras_em_comum DESC, length(a.nome_normalizado), a.id
+                LIMIT 1
+                """,
+                (*tokens, tokens[0])
+            ).fetchone()
+            if row:
+                return dict(row, correspondencia="palavras")
+        return None
+
+    def buscar_info(self, nome: str) -> Dict[str, Any]:
+        """
+        Busca um alimento e devolve no formato de IntegracaoAlimentos.
+
+        Returns:
+            Dict[str, Any]: Nutrientes por 100 g, 'nutricional' com os nomes das
+            colunas da tabela `nutricional`, ou {'encontrado': False}.
+        """
+        row = self.buscar(nome)
+        if row is None:
+            return {"encontrado": False}
+        nutricional = {coluna: row[coluna] for coluna in COLUNAS_CSV}
+        info = {chave: (nutricional[coluna] or 0) * FATORES_INFO.get(chave, 1) for coluna, chave in CHAVES_INFO.items()}
+        categoria = normalizar_texto(row["categoria"] or "")
+        info.update({
+            "encontrado": True,
+            "nome": row["descricao"],
+            "fonte": "TACO",
+            "correspondencia": row["correspondencia"],
+            "contem_leite": "leite" in categoria or "leite" in row["nome_normalizado"].split(),
+            "nutricional": nutricional,
+        })
+        return info
+
+    def fechar(self):
+        """Fecha a conexão com o banco da tabela."""
+        with self.lock:
+            self.conn.close()
+
+
+_tabela_padrao: Optional[TabelaTaco] = None
+_tabela_padrao_lock = Lock()
+
+
+def obter_tabela_taco() -> TabelaTaco:
+    """
+    Retorna a tabela TACO do processo, (re)importando data/taco.csv quando o
+    banco ainda não existe ou o CSV é mais recente que ele.
+    """
+    global _tabela_padrao
+    with _tabela_padrao_lock:
+        if _tabela_padrao is None:
+            desatualizado = os.path.exists(CSV_PADRAO) and (
+                not os.path.exists(DB_PADRAO) or os.path.getmtime(CSV_PADRAO) > os.path.getmtime(DB_PADRAO)
+            )
+            _tabela_padrao = TabelaTaco(DB_PADRAO)
+            if desatualizado or (_tabela_padrao.total() == 0 and os.path.exists(CSV_PADRAO)):
+                _tabela_padrao.importar_csv(CSV_PADRAO)
+        return _tabela_padrao
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Importa a tabela TACO de um CSV para SQLite")
+    parser.add_argument("csv", help="Arquivo CSV da tabela TACO")
+    parser.add_argument("--db", default=DB_PADRAO, help="Banco SQLite de destino")
+    args = parser.parse_args()
+    tabela = TabelaTaco(args.db)
+    print(f"{tabela.importar_csv(args.csv)} alimentos importados em {args.db}")
+    tabela.fechar()
+    sys.exit(0)
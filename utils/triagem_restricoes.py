@@ -0,0 +1,156 @@
+"""
+Triagem do inventário contra as restrições alimentares de Thomás.
+
+Os nomes e ingredientes de todos os itens pendentes são percorridos em uma
+única passada por um DetectorAlergenos montado a partir das restrições ativas.
+Cada substância restrita é expandida com os termos da categoria de
+alergênicos correspondente ("leite" também encontra "caseína", "whey" etc.).
+O resultado é gravado com um único executemany e os itens deixam de estar
+pendentes; gatilhos no banco voltam a marcá-los quando o nome, os
+ingredientes ou as restrições mudam.
+"""
+import logging
+import time
+from functools import lru_cache
+from typing import Any, Dict, List, Tuple
+
+from .alergenos import ALERGENOS, DetectorAlergenos
+from .constants import TERMOS_LACTEOS
+from .normalizacao import normalizar_texto
+
+logger = logging.getLogger(__name__)
+
+# Valores de itens.compatibilidade_thomas (ver utils.formatters.format_compatibilidade)
+COMPATIBILIDADE_NAO_RECOMENDADO = 1
+COMPATIBILIDADE_VERIFICAR = 2
+
+# Categoria interna usada para o sinalizador contem_leite
+_CATEGORIA_LEITE = "_leite"
+_PREFIXO_RESTRICAO = "restricao:"
+
+
+def expandir_substancia(substancia: str) -> List[str]:
+    """
+    Termos que identificam uma substância restrita.
+
+    Args:
+        substancia: Substância cadastrada em restricoes_thomas (ex.: "Lactose").
+
+    Returns:
+        List[str]: A própria substância e os termos das categorias de
+        alergênicos a que ela pertence.
+    """
+    chave = normalizar_texto(substancia)
+    termos = [substancia]
+    for categoria, termos_categoria in ALERGENOS.items():
+        if chave == normalizar_texto(categoria) or chave in {normalizar_texto(t) for t in termos_categoria}:
+            termos.extend(termos_categoria)
+            if categoria == "leite":
+                termos.extend(TERMOS_LACTEOS)
+    return termos
+
+
+@lru_cache(maxsize=8)
+def _detector_para(substancias: Tuple[str, ...]) -> DetectorAlergenos:
+    categorias = {_CATEGORIA_LEITE: ALERGENOS["leite"] + list(TERMOS_LACTEOS)}
+    for substancia in substancias:
+        categorias[_PREFIXO_RESTRICAO + substancia] = expandir_substancia(substancia)
+    return DetectorAlergenos(categorias)
+
+
+def triar_itens(itens: List[Dict[str, Any]], restricoes: List[Dict[str, Any]]) -> List[Tuple[int, int, Any, int]]:
+    """
+    Calcula os sinalizadores de restrição de vários itens em uma passada.
+
+    Itens com alguma substância restrita ficam como não recomendados. Itens
+    que a triagem anterior havia marcado e que deixaram de ter ocorrências
+    voltam para "verificar"; os demais mantêm a compatibilidade cadastrada.
+    contem_leite só é ligado pela triagem, nunca desligado.
+
+    Args:
+        itens: Resultado de obter_itens_para_triagem.
+        restricoes: Restrições ativas (obter_restricoes_thomas).
+
+    Returns:
+        List[Tuple]: (compatibilidade_thomas, contem_leite, restricoes_detectadas, id)
+        por item, no formato de salvar_triagem_lote.
+    """
+    substancias = tuple(sorted({r["substancia"].strip() for r in restricoes if r.get("substancia", "").strip()}))
+    detector = _detector_para(substancias)
+    textos = [f"{item['nome']}, {item.get('ingredientes') or ''}" for item in itens]
+
+    resultados = []
+    for item, ocorrencias in zip(itens, detector.encontrar_lote(textos)):
+        encontradas, contem_leite = [], bool(item.get("contem_leite"))
+        for ocorrencia in ocorrencias:
+            for categoria in ocorrencia["categorias"]:
+                if categoria == _CATEGORIA_LEITE:
+                    contem_leite = True
+                elif categoria[len(_PREFIXO_RESTRICAO):] not in encontradas:
+                    encontradas.append(categoria[len(_PREFIXO_RESTRICAO):])
+
+        if encontradas:
+            compatibilidade = COMPATIBILIDADE_NAO_RECOMENDADO
+        elif item.get("restricoes_detectadas"):
+            compatibilidade = COMPATIBILIDADE_VERIFICAR
+        else:
+            compatibilidade = item.get("compatibilidade_thomas")
+            if compatibilidade is None:
+                compatibilidade = COMPATIBILIDADE_VERIFICAR
+        resultados.append((compatibilidade, int(contem_leite), ", ".join(encontradas) or None, item["id"]))
+    return resultados
+
+
+def detectar_restricoes(textos: List[str], restricoes: List[Dict[str, Any]]) -> List[List[str]]:
+    """
+    Substâncias restritas encontradas em cada texto.
+
+    Args:
+        textos: Textos livres (nomes de ingredientes, rótulos...).
+        restricoes: Restrições ativas (obter_restricoes_thomas).
+
+    Returns:
+        List[List[str]]: Substâncias encontradas, na ordem dos textos.
+    """
+    substancias = tuple(sorted({r["substancia"].strip() for r in restricoes if r.get("substancia", "").strip()}))
+    if not substancias:
+        return [[] for _ in textos]
+    resultados = []
+    for ocorrencias in _detector_para(substancias).encontrar_lote(list(textos)):
+        encontradas = []
+        for ocorrencia in ocorrencias:
+            for categoria in ocorrencia["categorias"]:
+                substancia = categoria[len(_PREFIXO_RESTRICAO):]
+                if categoria.startswith(_PREFIXO_RESTRICAO) and substancia not in encontradas:
+                    encontradas.append(substancia)
+        resultados.append(encontradas)
+    return resultados
+
+
+def executar_triagem(db, completa: bool = False) -> Dict[str, Any]:
+    """
+    Tria os itens pendentes (ou todos) e grava os sinalizadores.
+
+    Args:
+        db: Gerenciador do banco de dados.
+        completa: Tria todo o inventário, mesmo os itens já triados.
+
+    Returns:
+        Dict[str, Any]: itens_triados, itens_restritos, restricoes_ativas e duracao_segundos.
+    """
+    inicio = time.perf_counter()
+    itens = db.obter_itens_para_triagem(completa=completa)
+    relatorio = {"itens_triados": 0, "itens_restritos": 0, "restricoes_ativas": 0}
+    if itens:
+        restricoes = db.obter_restricoes_thomas(apenas_ativas=True)
+        resultados = triar_itens(itens, restricoes)
+        relatorio["itens_triados"] = db.salvar_triagem_lote(resultados)
+        relatorio["itens_restritos"] = sum(1 for r in resultados if r[0] == COMPATIBILIDADE_NAO_RECOMENDADO)
+        relatorio["restricoes_ativas"] = len(restricoes)
+    relatorio["duracao_segundos"] = time.perf_counter() - inicio
+    if itens:
+        logger.info(
+            f"Triagem de restrições: {relatorio['itens_triados']} item(s) triados, "
+            f"{relatorio['itens_restritos']} restritos em {relatorio['duracao_segundos']:.3f}s"
+        )
+    return relatorio
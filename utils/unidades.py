@@ -0,0 +1,201 @@
+"""
+Unidades de medida: apelidos, unidades canônicas e conversão.
+
+Cada unidade pertence a uma dimensão (massa, volume ou contagem) e tem um
+fator para a unidade base da dimensão (g, ml e unidade). Embalagens
+("pacote", "lata"...) e unidades desconhecidas formam dimensões próprias,
+comparáveis apenas com elas mesmas.
+
+Entre dimensões, a conversão passa por gramas: volume usa a densidade do
+item (g/ml, padrão 1) e contagem usa o peso por unidade
+(nutricional.peso_por_unidade). converter_serie aplica isso a Series ou
+arrays inteiros de uma vez; apenas os valores distintos de unidade são
+resolvidos em Python.
+"""
+from typing import Any, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .normalizacao import normalizar_texto
+
+MASSA = "massa"
+VOLUME = "volume"
+CONTAGEM = "contagem"
+
+# Unidade canônica -> (dimensão, fator para a unidade base da dimensão)
+UNIDADES = {
+    "mg": (MASSA, 0.001),
+    "g": (MASSA, 1.0),
+    "kg": (MASSA, 1000.0),
+    "ml": (VOLUME, 1.0),
+    "l": (VOLUME, 1000.0),
+    "colher de chá": (VOLUME, 5.0),
+    "colher de sopa": (VOLUME, 15.0),
+    "xícara": (VOLUME, 240.0),
+    "unidade": (CONTAGEM, 1.0),
+    "dúzia": (CONTAGEM, 12.0),
+}
+
+UNIDADE_BASE = {MASSA: "g", VOLUME: "ml", CONTAGEM: "unidade"}
+
+# Apelido (sem acentos, minúsculas) -> unidade canônica
+APELIDOS = {
+    "mg": "mg", "miligrama": "mg", "miligramas": "mg",
+    "g": "g", "gr": "g", "grs": "g", "grama": "g", "gramas": "g",
+    "kg": "kg", "kgs": "kg", "quilo": "kg", "quilos": "kg", "quilograma": "kg", "quilogramas": "kg",
+    "ml": "ml", "mililitro": "ml", "mililitros": "ml",
+    "l": "l", "lt": "l", "litro": "l", "litros": "l",
+    "colher de cha": "colher de chá", "colheres de cha": "colher de chá", "colher cha": "colher de chá", "csc": "colher de chá",
+    "colher de sopa": "colher de sopa", "colheres de sopa": "colher de sopa", "colher sopa": "colher de sopa", "csp": "colher de sopa",
+    "xicara": "xícara", "xicaras": "xícara", "xic": "xícara",
+    "unidade": "unidade", "unidades": "unidade", "un": "unidade", "und": "unidade", "unid": "unidade", "u": "unidade",
+    "duzia": "dúzia", "duzias": "dúzia", "dz": "dúzia",
+}
+
+
+def unidade_canonica(unidade: Optional[str]) -> Optional[str]:
+    """
+    Nome canônico de uma unidade.
+
+    Args:
+        unidade: Unidade como digitada ("Gramas", "kg.", "xícaras").
+
+    Returns:
+        Optional[str]: Unidade canônica; para unidades desconhecidas, o texto
+        normalizado; None se vazia.
+    """
+    chave = normalizar_texto(unidade).rstrip(".") if unidade else ""
+    if not chave:
+        return None
+    return APELIDOS.get(chave, chave)
+
+
+def dimensao(unidade: Optional[str]) -> Optional[str]:
+    """Dimensão da unidade; embalagens e unidades desconhecidas são sua própria dimensão."""
+    canonica = unidade_canonica(unidade)
+    if canonica is None:
+        return None
+    return UNIDADES[canonica][0] if canonica in UNIDADES else canonica
+
+
+def para_base(quantidade: float, unidade: Optional[str]) -> Tuple[float, Optional[str]]:
+    """
+    Converte uma quantidade para a unidade base da sua dimensão.
+
+    Returns:
+        Tuple[float, Optional[str]]: (quantidade na unidade base, dimensão).
+    """
+    canonica = unidade_canonica(unidade)
+    if canonica in UNIDADES:
+        dim, fator = UNIDADES[canonica]
+        return quantidade * fator, dim
+    return quantidade, canonica
+
+
+def de_base(quantidade: float, unidade: Optional[str]) -> float:
+    """Converte uma quantidade na unidade base para a unidade informada."""
+    canonica = unidade_canonica(unidade)
+    return quantidade / UNIDADES[canonica][1] if canonica in UNIDADES else quantidade
+
+
+def converter(quantidade: float, de: Optional[str], para: Optional[str]) -> Optional[float]:
+    """
+    Converte entre unidades da mesma dimensão.
+
+    Args:
+        quantidade: Valor na unidade de origem.
+        de: Unidade de origem.
+        para: Unidade de destino.
+
+    Returns:
+        Optional[float]: Valor convertido, ou None se as dimensões forem diferentes.
+    """
+    base, dim = para_base(quantidade, de)
+    if dim is None or dim != dimensao(para):
+        return None
+    return de_base(base, para)
+
+
+DENSIDADE_PADRAO = 1.0  # g/ml
+
+
+def _resolver_unidades(unidades: Any) -> Tuple[np.ndarray, np.ndarray]:
+    """Fatores para a unidade base e dimensões, resolvendo cada unidade distinta uma única vez."""
+    serie = pd.Series([unidades] if isinstance(unidades, str) else list(unidades), dtype=object)
+    serie = serie.where(serie.notna(), None)
+    fatores, dimensoes = {}, {}
+    for unidade in pd.unique(serie):
+        canonica = unidade_canonica(unidade) if isinstance(unidade, str) else None
+        dim, fator = UNIDADES.get(canonica, (canonica, 1.0 if canonica else np.nan))
+        fatores[unidade], dimensoes[unidade] = fator, dim
+    return serie.map(fatores).to_numpy(dtype=float), serie.map(dimensoes).to_numpy(dtype=object)
+
+
+def _como_array(valores: Any, tamanho: int, padrao: float) -> np.ndarray:
+    if valores is None:
+        return np.full(tamanho, padrao)
+    if np.ndim(valores):
+        valores = list(valores)
+    array = np.broadcast_to(pd.to_numeric(pd.Series(valores), errors="coerce").to_numpy(dtype=float), (tamanho,))
+    return np.where(np.isfinite(array) & (array > 0), array, padrao)
+
+
+def converter_serie(quantidades: Any, unidades: Any, para: str,
+                    peso_por_unidade: Any = None, densidade: Any = None):
+    """
+    Converte quantidades em unidades variadas para uma unidade de destino.
+
+    Args:
+        quantidades: Series, array ou lista de valores.
+        unidades: Unidade de cada valor (ou uma unidade para todos).
+        para: Unidade de destino.
+        peso_por_unidade: Gramas por unidade de cada item (Series, array ou
+            escalar); necessário para converter contagem de/para massa ou volume.
+        densidade: Densidade de cada item em g/ml (padrão 1).
+
+    Returns:
+        Series (com o mesmo índice, se quantidades for Series) ou array com os
+        valores convertidos; NaN onde a conversão não é possível.
+    """
+    q = pd.to_numeric(pd.Series(list(quantidades)), errors="coerce").to_numpy(dtype=float)
+    n = len(q)
+    if isinstance(unidades, str) or unidades is None:
+        unidades = [unidades] * n
+    fatores, dimensoes = _resolver_unidades(unidades)
+    peso = _como_array(peso_por_unidade, n, np.nan)
+    dens = _como_array(densidade, n, DENSIDADE_PADRAO)
+
+    canonica = unidade_canonica(para)
+    dim_destino, fator_destino = UNIDADES.get(canonica, (canonica, 1.0))
+
+    base = q * fatores
+    mesma_dimensao = dimensoes == dim_destino
+    gramas = np.select(
+        [dimensoes == MASSA, dimensoes == VOLUME, dimensoes == CONTAGEM],
+        [base, base * dens, base * peso],
+        default=np.nan,
+    )
+    if dim_destino == MASSA:
+        via_gramas = gramas
+    elif dim_destino == VOLUME:
+        via_gramas = gramas / dens
+    elif dim_destino == CONTAGEM:
+        via_gramas = gramas / peso
+    else:
+        via_gramas = np.full(n, np.nan)
+
+    resultado = np.where(mesma_dimensao, base, via_gramas) / fator_destino
+    if isinstance(quantidades, pd.Series):
+        return pd.Series(resultado, index=quantidades.index)
+    return resultado
+
+
+def para_gramas(quantidades: Any, unidades: Any, peso_por_unidade: Any = None, densidade: Any = None):
+    """Atalho para converter_serie(..., "g")."""
+    return converter_serie(quantidades, unidades, "g", peso_por_unidade, densidade)
+
+
+def dimensoes_serie(unidades: Any) -> np.ndarray:
+    """Dimensão de cada unidade, resolvendo cada valor distinto uma única vez."""
+    return _resolver_unidades(unidades)[1]
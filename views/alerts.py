@@ -58,11 +58,8 @@ def mostrar_alertas_restricoes(db):
     """Exibe alertas relacionados a restrições alimentares"""
     st.header("🚫 Alertas de Restrições")
     try:
-        df = db.carregar_inventario()
-        if df.empty or "Para Thomas" not in df.columns:
-            st.info("Não há itens com restrições alimentares cadastrados.")
-            return
-        restritos = df[(df["Para Thomas"] == 1) & (df["Compatibilidade Thomas"] == 0)]
+        # A triagem roda no worker; aqui só se lê o resultado
+        restritos = db.obter_itens_restritos(apenas_para_thomas=True)
         if restritos.empty:
             st.info("Nenhum alerta de restrição alimentar encontrado.")
         else:
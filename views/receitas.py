@@ -15,7 +15,7 @@ def mostrar_receitas(db):
             return
             
         # Sugere receitas
-        receitas = sugerir_receitas(df)
+        receitas = sugerir_receitas(df, db=db)
         
         if not receitas or len(receitas) == 0:
             st.info("Não foi possível obter sugestões de receitas com base no seu inventário atual.")
@@ -9,13 +9,15 @@ def mostrar_relatorios(db):
     # Selecionar tipo de relatório
     relatorio = st.selectbox(
         "Selecione o tipo de relatório", 
-        ["Análise de Preços", "Consumo e Perfil Alimentar", "Nutrição e Saúde"]
+        ["Análise de Preços", "Consumo e Perfil Alimentar", "Nutrição e Saúde", "Desperdício Previsto"]
     )
     
     if relatorio == "Análise de Preços":
         mostrar_relatorio_precos(db)
     elif relatorio == "Consumo e Perfil Alimentar":
         mostrar_relatorio_consumo(db)
+    elif relatorio == "Desperdício Previsto":
+        mostrar_relatorio_desperdicio(db)
     else:
         mostrar_relatorio_nutricional(db)
 
@@ -72,6 +74,47 @@ def mostrar_relatorio_precos(db):
     else:
         st.info("Histórico insuficiente para gerar gráfico de tendência.")
 
+def mostrar_relatorio_desperdicio(db):
+    st.subheader("🗑️ Desperdício Previsto")
+    st.caption("Compara o consumo previsto de cada item até a validade com a quantidade em estoque.")
+    
+    horizonte = st.selectbox(
+        "Itens que vencem em",
+        [7, 14, 30, None],
+        format_func=lambda d: "Todos com validade" if d is None else f"{d} dias"
+    )
+    risco = db.obter_risco_desperdicio(horizonte_dias=horizonte)
+    
+    if risco.empty:
+        st.success("✅ Nenhum item deve sobrar até a validade no período.")
+        return
+    
+    col1, col2 = st.columns(2)
+    col1.metric("Valor em risco", f"R$ {risco['valor_em_risco'].sum():.2f}")
+    col2.metric("Itens com sobra prevista", len(risco))
+    
+    tabela = risco.rename(columns={
+        "nome": "Nome",
+        "quantidade": "Quantidade",
+        "unidade": "Unidade",
+        "localizacao": "Localização",
+        "validade": "Validade",
+        "dias_ate_vencer": "Dias até Vencer",
+        "taxa_diaria": "Consumo Diário",
+        "sobra_prevista": "Sobra Prevista",
+        "valor_em_risco": "Valor em Risco (R$)"
+    })
+    st.dataframe(
+        tabela[["Nome", "Quantidade", "Unidade", "Localização", "Validade", "Dias até Vencer",
+                "Consumo Diário", "Sobra Prevista", "Valor em Risco (R$)"]].round(2),
+        use_container_width=True,
+        hide_index=True
+    )
+    
+    sem_custo = risco[risco["custo_unitario"] <= 0]
+    if not sem_custo.empty:
+        st.info(f"{len(sem_custo)} item(s) sem custo unitário cadastrado entram com valor zero.")
+
 def mostrar_relatorio_consumo(db):
     st.subheader("🍽️ Análise de Consumo")
     
@@ -6,6 +6,7 @@ import io
 import json
 import zipfile
 import shutil
+import tempfile
 import traceback
 
 def mostrar_configuracoes(db):
@@ -202,70 +203,68 @@ def mostrar_backup_restauracao(db):
         )
         
         if uploaded_file is not None:
-            try:
-                temp_dir = "temp_restore_dir"
-                os.makedirs(temp_dir, exist_ok=True)
-                
-                backup_db_path = None
+            # Diretório temporário do sistema, removido ao final do processamento
+            with tempfile.TemporaryDirectory(prefix="geladeira_restore_") as temp_dir:
+                try:
+                    backup_db_path = None
 
-                if uploaded_file.name.endswith(".zip"):
-                    with zipfile.ZipFile(uploaded_file) as zip_ref:
-                        # Encontrar o primeiro arquivo .db dentro do zip
-                        db_files_in_zip = [name for name in zip_ref.namelist() if name.endswith('.db')]
-                        if not db_files_in_zip:
-                            st.error("❌ O arquivo ZIP não contém um arquivo de banco de dados (.db).")
-                            return
-                        
-                        # Extrair o arquivo .db para um local temporário
-                        zip_ref.extract(db_files_in_zip[0], path=temp_dir)
-                        backup_db_path = os.path.join(temp_dir, db_files_in_zip[0])
-                        st.info(f"Arquivo .db extraído do ZIP: {db_files_in_zip[0]}")
-                elif uploaded_file.name.endswith(".db"):
-                    # Salvar o arquivo .db carregado diretamente em um local temporário
-                    backup_db_path = os.path.join(temp_dir, uploaded_file.name)
-                    with open(backup_db_path, "wb") as f:
-                        f.write(uploaded_file.getbuffer())
-                    st.info(f"Arquivo .db carregado: {uploaded_file.name}")
-                else:
-                    st.error("Tipo de arquivo não suportado. Por favor, envie um arquivo .db ou .zip.")
-                    return
+                    if uploaded_file.name.endswith(".zip"):
+                        with zipfile.ZipFile(uploaded_file) as zip_ref:
+                            # Encontrar o primeiro arquivo .db dentro do zip
+                            db_files_in_zip = [name for name in zip_ref.namelist() if name.endswith('.db')]
+                            if not db_files_in_zip:
+                                st.error("❌ O arquivo ZIP não contém um arquivo de banco de dados (.db).")
+                                return
+                            
+                            # Extrair o arquivo .db para o diretório temporário
+                            backup_db_path = os.path.join(temp_dir, "backup_enviado.db")
+                            with zip_ref.open(db_files_in_zip[0]) as origem, open(backup_db_path, "wb") as destino:
+                                shutil.copyfileobj(origem, destino)
+                            st.info(f"Arquivo .db extraído do ZIP: {db_files_in_zip[0]}")
+                    elif uploaded_file.name.endswith(".db"):
+                        # Salvar o arquivo .db carregado no diretório temporário
+                        backup_db_path = os.path.join(temp_dir, "backup_enviado.db")
+                        with open(backup_db_path, "wb") as f:
+                            f.write(uploaded_file.getbuffer())
+                        st.info(f"Arquivo .db carregado: {uploaded_file.name}")
+                    else:
+                        st.error("Tipo de arquivo não suportado. Por favor, envie um arquivo .db ou .zip.")
+                        return
 
-                if backup_db_path and os.path.exists(backup_db_path):
-                    if st.button("🔄 Restaurar Banco de Dados Agora"):
-                        # Importar a função de restauração do assistente
-                        from utils.assistente import restaurar_backup as assistente_restaurar_backup
-                        
-                        # Obter o caminho do banco de dados atual
-                        # É crucial que db.db_path seja o caminho correto para o arquivo .db ativo
-                        current_db_path = db.db_path 
-                        
-                        # Fechar a conexão atual antes de restaurar, se possível
-                        # Idealmente, o objeto db teria um método para fechar a conexão
-                        if hasattr(db, 'fechar') and callable(db.fechar):
-                            db.fechar()
-                            st.info("Conexão com o banco de dados atual fechada.")
-                        else:
-                            st.warning("Não foi possível fechar a conexão com o banco de dados automaticamente. A restauração prosseguirá, mas pode ser necessário reiniciar a aplicação.")
+                    if backup_db_path and os.path.exists(backup_db_path):
+                        # Validar antes de oferecer a restauração, uma vez por arquivo enviado;
+                        # restaurar_de_backup valida de novo o arquivo que for de fato copiado
+                        arquivo = (uploaded_file.name, uploaded_file.size)
+                        validacao = st.session_state.get("validacao_backup")
+                        if not validacao or validacao[0] != arquivo:
+                            validacao = (arquivo, *db.validar_backup(backup_db_path))
+                            st.session_state.validacao_backup = validacao
+                        _, valido, msg_validacao = validacao
+                        if not valido:
+                            st.error(f"❌ Backup inválido: {msg_validacao}")
+                            return
+                        st.caption(f"✔️ {msg_validacao}")
 
-                        success, msg = assistente_restaurar_backup(current_db_path, backup_db_path)
-                        
-                        if success:
-                            st.success(f"✅ Banco de dados restaurado com sucesso! {msg}")
-                            st.warning("⚠️ Por favor, recarregue a aplicação para aplicar as alterações.")
-                            if st.button("🔄 Recarregar Aplicação Agora"):
-                                st.rerun()
-                        else:
-                            st.error(f"❌ Erro ao restaurar o banco de dados: {msg}")
-                else:
-                    st.error("Não foi possível processar o arquivo de backup.")
-            
-            except Exception as e:
-                st.error(f"❌ Erro ao processar arquivo de backup: {str(e)}")
-                st.code(traceback.format_exc())
-            finally:
-                # Limpar diretório temporário
-                if os.path.exists(temp_dir):
-                    shutil.rmtree(temp_dir)
+                        if st.button("🔄 Restaurar Banco de Dados Agora"):
+                            from utils.assistente import restaurar_backup as assistente_restaurar_backup
+                            
+                            # A restauração é feita sobre a conexão ativa, sem fechá-la
+                            success, msg = assistente_restaurar_backup(backup_db_path, db.db_path, db=db)
+                            
+                            if success:
+                                # Descartar dados em cache calculados a partir do banco anterior
+                                st.cache_data.clear()
+                                for chave in ("config", "config_alertas"):
+                                    st.session_state.pop(chave, None)
+                                st.success(f"✅ {msg}")
+                            else:
+                                st.error(f"❌ Erro ao restaurar o banco de dados: {msg}")
+                    else:
+                        st.error("Não foi possível processar o arquivo de backup.")
+                
+                except Exception as e:
+                    st.error(f"❌ Erro ao processar arquivo de backup: {str(e)}")
+                    st.code(traceback.format_exc())
 
 def mostrar_configuracoes_alertas(db):
     st.header("⚠️ Configurações de Alertas")
@@ -6,6 +6,8 @@ import plotly.express as px
 import plotly.graph_objects as go
 import logging
 
+from utils.constants import UNIDADES_MEDIDA
+
 # Funções com cache - Modificado para resolver o erro de unhashable type
 @st.cache_data(ttl=600)  # Cache por 10 minutos
 def cached_carregar_inventario(_db):  # Adicionado underscore ao parâmetro db
@@ -104,7 +106,7 @@ def planejar_compras(db):
                 quantidade = st.number_input("Quantidade:", min_value=0.1, value=1.0, step=0.1)
                 
             with col3:
-                unidade = st.selectbox("Unidade:", ["unidade", "kg", "g", "litro", "ml"])
+                unidade = st.selectbox("Unidade:", UNIDADES_MEDIDA)
             
             if st.button("➕ Adicionar à lista"):
                 # Verificar se já existe na lista para não duplicar
@@ -164,6 +166,8 @@ def planejar_compras(db):
                 hide_index=True
             )
             
+            mostrar_roteiro_otimizado(db, lista_compras)
+            
             # Opção para salvar lista (implementação simplificada)
             if st.button("💾 Salvar Lista"):
                 st.info("Funcionalidade de salvar lista será implementada em versões futuras.")
@@ -221,6 +225,48 @@ def planejar_compras(db):
         unsafe_allow_html=True
     )
 
+def mostrar_roteiro_otimizado(db, lista_compras):
+    """Mostra em quais lojas comprar a lista, considerando uma penalidade por loja extra"""
+    from utils.otimizador_compras import planejar_roteiro_compras
+
+    with st.expander("🧭 Otimizar lojas da lista"):
+        col1, col2 = st.columns(2)
+        with col1:
+            penalidade = st.number_input("Custo de cada loja extra (R$):", min_value=0.0, value=10.0, step=1.0,
+                                         help="Tempo e deslocamento de visitar mais uma loja, em reais.")
+        with col2:
+            criterio = st.radio("Preço considerado:", ["recente", "media"], horizontal=True,
+                                format_func=lambda c: "Último preço" if c == "recente" else "Preço médio")
+
+        roteiro = planejar_roteiro_compras(db, lista_compras, penalidade_por_loja=penalidade, criterio=criterio)
+        if not roteiro["lojas"]:
+            st.info("Sem histórico de preços para os itens da lista.")
+            return
+
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Lojas", len(roteiro["lojas"]))
+        col2.metric("Custo dos itens", f"R$ {roteiro['custo_itens']:.2f}")
+        if roteiro["economia_vs_loja_unica"] is not None:
+            col3.metric("Economia vs. uma loja", f"R$ {roteiro['economia_vs_loja_unica']:.2f}",
+                        help=f"Comparado a comprar tudo em {roteiro['melhor_loja_unica']}.")
+        else:
+            col3.metric("Economia vs. preço médio", f"R$ {roteiro['economia_vs_preco_medio']:.2f}")
+
+        for loja in roteiro["lojas"]:
+            st.markdown(f"**{loja}** — R$ {roteiro['total_por_loja'][loja]:.2f}")
+            st.dataframe(
+                pd.DataFrame(roteiro["divisao"][loja]),
+                column_config={
+                    "nome": "Item",
+                    "quantidade": "Quantidade",
+                    "preco_unitario": st.column_config.NumberColumn("Preço Unitário", format="R$ %.2f"),
+                    "custo": st.column_config.NumberColumn("Custo", format="R$ %.2f")
+                },
+                hide_index=True
+            )
+        if roteiro["sem_preco"]:
+            st.caption("Sem preço registrado: " + ", ".join(roteiro["sem_preco"]))
+
 def obter_melhor_local_compra(db, item_nome):
     """Determina o melhor local para compra de um item com base no histórico de preços"""
     try:
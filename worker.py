@@ -0,0 +1,284 @@
+"""
+Worker de manutenção em segundo plano.
+
+Executa fora do processo web (entrada 'worker' do Procfile) as tarefas
+periódicas que antes ficavam no caminho das requisições do Streamlit:
+otimização do SQLite, checkpoint do WAL, backups agendados, pré-cálculo
+de alertas, aquecimento de cache e verificação completa de integridade.
+
+Cada execução é registrada em 'worker_execucoes' e o worker publica um
+heartbeat em 'worker_heartbeat', que a interface pode consultar.
+
+Uso:
+    python worker.py              # executa continuamente
+    python worker.py --uma-vez    # executa todas as tarefas uma vez e sai
+"""
+import argparse
+import datetime
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from threading import Event
+from typing import Callable, List, Tuple
+
+from config import DB_PATH
+from db.extended_database_manager import ExtendedDatabaseManager
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger("worker")
+
+# Intervalos padrão (em segundos), ajustáveis por variáveis de ambiente
+INTERVALO_HEARTBEAT = int(os.getenv("WORKER_INTERVALO_HEARTBEAT", "30"))
+INTERVALO_OTIMIZACAO = int(os.getenv("WORKER_INTERVALO_OTIMIZACAO", "1800"))
+INTERVALO_CHECKPOINT = int(os.getenv("WORKER_INTERVALO_CHECKPOINT", "900"))
+INTERVALO_BACKUP = int(os.getenv("WORKER_INTERVALO_BACKUP", str(24 * 3600)))
+INTERVALO_ALERTAS = int(os.getenv("WORKER_INTERVALO_ALERTAS", "600"))
+INTERVALO_AQUECIMENTO = int(os.getenv("WORKER_INTERVALO_AQUECIMENTO", "300"))
+INTERVALO_INTEGRIDADE = int(os.getenv("WORKER_INTERVALO_INTEGRIDADE", str(24 * 3600)))
+ORCAMENTO_OTIMIZACAO = float(os.getenv("WORKER_ORCAMENTO_OTIMIZACAO", "0.5"))
+INTERVALO_TRIAGEM = int(os.getenv("WORKER_INTERVALO_TRIAGEM", "300"))
+INTERVALO_PREVISAO = int(os.getenv("WORKER_INTERVALO_PREVISAO", "600"))
+INTERVALO_RESUMO = int(os.getenv("WORKER_INTERVALO_RESUMO", "1800"))
+INTERVALO_BACKFILL = int(os.getenv("WORKER_INTERVALO_BACKFILL", "3600"))
+ORCAMENTO_BACKFILL = float(os.getenv("WORKER_ORCAMENTO_BACKFILL", "120"))
+BACKFILL_REQ_POR_SEGUNDO = float(os.getenv("WORKER_BACKFILL_REQ_POR_SEGUNDO", "2"))
+BACKUPS_MANTIDOS = int(os.getenv("WORKER_BACKUPS_MANTIDOS", "7"))
+DIAS_ALERTA_VENCIMENTO = int(os.getenv("DIAS_ALERTA_VENCIMENTO", "5"))
+
+
+@dataclass
+class Tarefa:
+    """Tarefa periódica do worker."""
+    nome: str
+    intervalo_segundos: float
+    funcao: Callable[[ExtendedDatabaseManager], Tuple[bool, str]]
+    proxima_execucao: float = field(default=0.0)
+
+
+def tarefa_otimizar(db: ExtendedDatabaseManager) -> Tuple[bool, str]:
+    """Recupera páginas livres e atualiza estatísticas em fatias limitadas pelo orçamento."""
+    resultado = db.otimizar_incremental(orcamento_segundos=ORCAMENTO_OTIMIZACAO)
+    if not resultado["sucesso"]:
+        return False, "Falha na otimização incremental"
+    return True, (
+        f"{resultado['paginas_recuperadas']} páginas recuperadas, "
+        f"{resultado['paginas_livres_restantes']} restantes, "
+        f"{len(resultado['tabelas_analisadas'])} tabelas analisadas"
+    )
+
+
+def tarefa_checkpoint(db: ExtendedDatabaseManager) -> Tuple[bool, str]:
+    """Transfere o WAL para o arquivo principal e trunca o arquivo de log."""
+    return db.executar_checkpoint_wal("TRUNCATE")
+
+
+def tarefa_backup(db: ExtendedDatabaseManager) -> Tuple[bool, str]:
+    """Cria um backup consistente e remove os mais antigos além do limite."""
+    pasta = Path(db.db_path).absolute().parent / "backups"
+    nome = f"{Path(db.db_path).stem}_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.db"
+    sucesso, msg = db.criar_backup(str(pasta / nome))
+    if not sucesso:
+        return False, msg
+
+    backups = sorted(pasta.glob(f"{Path(db.db_path).stem}_*.db"), key=lambda p: p.stat().st_mtime, reverse=True)
+    for antigo in backups[BACKUPS_MANTIDOS:]:
+        try:
+            antigo.unlink()
+        except OSError as e:
+            logger.warning(f"Não foi possível remover backup antigo {antigo}: {str(e)}")
+    return True, f"{msg} ({min(len(backups), BACKUPS_MANTIDOS)} backups mantidos)"
+
+
+def tarefa_alertas(db: ExtendedDatabaseManager) -> Tuple[bool, str]:
+    """Pré-calcula os alertas de vencimento e desperdício e verifica deficiências nutricionais."""
+    from utils.nutrition import verificar_deficiencias_nutricionais
+    from utils.previsao_consumo import resumir_desperdicio
+
+    itens = db.obter_itens_proximos_vencimento(dias=DIAS_ALERTA_VENCIMENTO)
+    if not db.salvar_resultado_precomputado(f"alertas_vencimento:{DIAS_ALERTA_VENCIMENTO}", itens):
+        return False, "Falha ao salvar alertas de vencimento"
+    desperdicio = resumir_desperdicio(db.obter_risco_desperdicio(horizonte_dias=7))
+    if not db.salvar_resultado_precomputado("desperdicio_previsto:7", desperdicio):
+        return False, "Falha ao salvar previsão de desperdício"
+
+    # Itens que venceram desde a última execução entram na pontuação de desperdício
+    if db.registrar_vencimentos() < 0:
+        return False, "Falha ao contabilizar vencimentos"
+
+    verificar_deficiencias_nutricionais(db, para_thomas=False)
+    verificar_deficiencias_nutricionais(db, para_thomas=True)
+    return True, f"{len(itens)} item(s) próximos do vencimento"
+
+
+def tarefa_aquecer_cache(db: ExtendedDatabaseManager) -> Tuple[bool, str]:
+    """Executa as consultas mais frequentes para manter as páginas no cache do SQLite."""
+    inicio = time.perf_counter()
+    db.carregar_inventario()
+    db.obter_nutrientes_consumidos(periodo_dias=7)
+    db.obter_nutrientes_consumidos(apenas_thomas=True, periodo_dias=7)
+    return True, f"Consultas aquecidas em {time.perf_counter() - inicio:.3f}s"
+
+
+def tarefa_triagem_restricoes(db: ExtendedDatabaseManager) -> Tuple[bool, str]:
+    """Tria contra as restrições os itens alterados desde a última execução."""
+    from utils.triagem_restricoes import executar_triagem
+
+    relatorio = executar_triagem(db)
+    return True, f"{relatorio['itens_triados']} item(s) triados, {relatorio['itens_restritos']} restritos"
+
+
+def tarefa_previsao_consumo(db: ExtendedDatabaseManager) -> Tuple[bool, str]:
+    """Incorpora os consumos novos ao estado da previsão de consumo."""
+    from utils.previsao_consumo import atualizar_estado
+
+    estado = atualizar_estado(db)
+    modo = "recálculo completo" if estado["recalculo_completo"] else "incremental"
+    return True, f"Previsão de {len(estado['itens'])} item(s) atualizada ({modo})"
+
+
+def tarefa_resumo_semanal(db: ExtendedDatabaseManager) -> Tuple[bool, str]:
+    """Materializa o resumo semanal servido por gerar_resumo_semanal."""
+    from utils.assistente import atualizar_resumo_semanal
+
+    return atualizar_resumo_semanal(db)
+
+
+def tarefa_backfill_nutricional(db: ExtendedDatabaseManager) -> Tuple[bool, str]:
+    """Preenche dados nutricionais faltantes em lotes, retomando do último checkpoint."""
+    from utils.backfill_nutricional import executar_backfill_nutricional
+
+    relatorio = executar_backfill_nutricional(
+        db, requisicoes_por_segundo=BACKFILL_REQ_POR_SEGUNDO, orcamento_segundos=ORCAMENTO_BACKFILL
+    )
+    return True, (
+        f"{relatorio['resolvidos']}/{relatorio['processados']} itens resolvidos; cobertura "
+        f"{relatorio['cobertura_antes']['percentual']:.1f}% -> {relatorio['cobertura_depois']['percentual']:.1f}%"
+    )
+
+
+def tarefa_integridade(db: ExtendedDatabaseManager) -> Tuple[bool, str]:
+    """Executa a verificação completa de integridade, fora do processo web."""
+    return db.verificar_integridade(completa=True, max_idade_segundos=INTERVALO_INTEGRIDADE)
+
+
+def criar_tarefas() -> List[Tarefa]:
+    """Lista as tarefas do worker com seus intervalos configurados."""
+    return [
+        Tarefa("checkpoint_wal", INTERVALO_CHECKPOINT, tarefa_checkpoint),
+        Tarefa("alertas", INTERVALO_ALERTAS, tarefa_alertas),
+        Tarefa("aquecimento_cache", INTERVALO_AQUECIMENTO, tarefa_aquecer_cache),
+        Tarefa("otimizacao", INTERVALO_OTIMIZACAO, tarefa_otimizar),
+        Tarefa("triagem_restricoes", INTERVALO_TRIAGEM, tarefa_triagem_restricoes),
+        Tarefa("previsao_consumo", INTERVALO_PREVISAO, tarefa_previsao_consumo),
+        Tarefa("resumo_semanal", INTERVALO_RESUMO, tarefa_resumo_semanal),
+        Tarefa("backfill_nutricional", INTERVALO_BACKFILL, tarefa_backfill_nutricional),
+        Tarefa("integridade", INTERVALO_INTEGRIDADE, tarefa_integridade),
+        Tarefa("backup", INTERVALO_BACKUP, tarefa_backup),
+    ]
+
+
+class Agendador:
+    """Executa tarefas periódicas em sequência até receber um sinal de parada."""
+
+    def __init__(self, db: ExtendedDatabaseManager, tarefas: List[Tarefa]):
+        self.db = db
+        self.tarefas = tarefas
+        self.parar = Event()
+        self.worker_id = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self.iniciado_em = datetime.datetime.now()
+
+    def executar_tarefa(self, tarefa: Tarefa) -> bool:
+        """
+        Executa uma tarefa registrando duração e resultado.
+
+        Args:
+            tarefa (Tarefa): Tarefa a executar.
+
+        Returns:
+            bool: True se a tarefa terminou com sucesso.
+        """
+        inicio = datetime.datetime.now()
+        relogio = time.perf_counter()
+        try:
+            sucesso, mensagem = tarefa.funcao(self.db)
+        except Exception as e:
+            logger.exception(f"Erro na tarefa '{tarefa.nome}'")
+            sucesso, mensagem = False, str(e)
+        duracao = time.perf_counter() - relogio
+
+        nivel = logging.INFO if sucesso else logging.WARNING
+        logger.log(nivel, f"Tarefa '{tarefa.nome}' ({duracao:.2f}s): {mensagem}")
+        self.db.registrar_execucao_tarefa(tarefa.nome, inicio, duracao, sucesso, mensagem)
+        return sucesso
+
+    def executar_uma_vez(self) -> bool:
+        """Executa todas as tarefas uma única vez. Retorna True se todas tiveram sucesso."""
+        self.db.registrar_heartbeat_worker(self.worker_id, self.iniciado_em)
+        resultados = [self.executar_tarefa(tarefa) for tarefa in self.tarefas if not self.parar.is_set()]
+        return all(resultados)
+
+    def executar(self):
+        """Laço principal: executa as tarefas vencidas e publica o heartbeat."""
+        logger.info(f"Worker {self.worker_id} iniciado com {len(self.tarefas)} tarefas")
+        self.db.registrar_heartbeat_worker(self.worker_id, self.iniciado_em)
+        proximo_heartbeat = time.monotonic() + INTERVALO_HEARTBEAT
+
+        while not self.parar.is_set():
+            agora = time.monotonic()
+            for tarefa in self.tarefas:
+                if self.parar.is_set():
+                    break
+                if tarefa.proxima_execucao <= agora:
+                    self.executar_tarefa(tarefa)
+                    tarefa.proxima_execucao = time.monotonic() + tarefa.intervalo_segundos
+
+            if time.monotonic() >= proximo_heartbeat:
+                self.db.registrar_heartbeat_worker(self.worker_id)
+                proximo_heartbeat = time.monotonic() + INTERVALO_HEARTBEAT
+
+            espera = min([t.proxima_execucao for t in self.tarefas] + [proximo_heartbeat]) - time.monotonic()
+            self.parar.wait(max(1.0, espera))
+
+        logger.info(f"Worker {self.worker_id} encerrado")
+
+    def solicitar_parada(self, signum=None, frame=None):
+        """Interrompe o laço após a tarefa em andamento (SIGTERM/SIGINT)."""
+        logger.info("Sinal de parada recebido, encerrando após a tarefa atual...")
+        self.parar.set()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Worker de manutenção do GELADEIRA")
+    parser.add_argument("--db", default=str(DB_PATH), help="Caminho do banco de dados")
+    parser.add_argument("--uma-vez", action="store_true", help="Executa todas as tarefas uma vez e sai")
+    args = parser.parse_args(argv)
+
+    with ExtendedDatabaseManager(args.db) as db:
+        sucesso, msg = db.inicializar_banco()
+        if not sucesso:
+            logger.error(f"Falha ao inicializar banco: {msg}")
+            return 1
+
+        agendador = Agendador(db, criar_tarefas())
+        signal.signal(signal.SIGTERM, agendador.solicitar_parada)
+        signal.signal(signal.SIGINT, agendador.solicitar_parada)
+
+        if args.uma_vez:
+            return 0 if agendador.executar_uma_vez() else 1
+
+        db.limpar_execucoes_worker()
+        agendador.executar()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())